@@ -0,0 +1,109 @@
+"""
+Benchmark authenticated request throughput with and without the principal cache
+
+Runs GET /user/saved-jobs against a throwaway SQLite database, first with
+the principal cache disabled (one users-table query per request, the old
+behaviour) and then enabled. Requests are driven in-process over ASGI by
+concurrent async clients, so no network or test-client thread hops are measured.
+
+Usage (from backend/):
+    python -m benchmarks.bench_auth
+    python -m benchmarks.bench_auth --iterations 2000 --saved-jobs 25
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--saved-jobs", type=int, default=10, help="Saved jobs for the benchmark user")
+    args = parser.parse_args()
+
+    # Point the app at a throwaway database before anything imports `database`
+    tmp_dir = tempfile.mkdtemp(prefix="applesauce-bench-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}"
+
+    import httpx
+    from sqlalchemy import event
+
+    import main as app_module
+    from benchmarks.common import print_table
+    from database import SessionLocal, async_engine, init_db
+    from models.db_models import User, SavedJob
+    from services.auth_service import auth_service
+    from services.principal_cache import principal_cache
+
+    init_db()
+    db = SessionLocal()
+    user = User(email="bench@example.com", name="Bench User")
+    db.add(user)
+    db.commit()
+    for i in range(args.saved_jobs):
+        db.add(SavedJob(user_id=user.id, title=f"Engineer {i}", company="Acme", status="saved"))
+    db.commit()
+    token = auth_service.create_access_token(user.id, user.email)
+    db.close()
+
+    statements = {"count": 0}
+
+    @event.listens_for(async_engine.sync_engine, "before_cursor_execute")
+    def count_statements(conn, cursor, statement, parameters, context, executemany):
+        statements["count"] += 1
+
+    headers = {"Authorization": f"Bearer {token}"}
+
+    async def run(iterations: int) -> dict:
+        transport = httpx.ASGITransport(app=app_module.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            latencies = []
+            remaining = iterations
+
+            async def worker():
+                nonlocal remaining
+                while remaining > 0:
+                    remaining -= 1
+                    start = time.perf_counter()
+                    response = await client.get("/user/saved-jobs", headers=headers)
+                    latencies.append((time.perf_counter() - start) * 1000)
+                    assert response.status_code == 200, response.text
+
+            start = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+            elapsed = time.perf_counter() - start
+
+        latencies.sort()
+        return {
+            "requests_per_sec": round(len(latencies) / elapsed, 1),
+            "p50_ms": round(latencies[len(latencies) // 2], 2),
+            "p95_ms": round(latencies[int(len(latencies) * 0.95)], 2),
+        }
+
+    async def compare() -> list:
+        rows = []
+        for label, ttl in [("no cache (before)", 0), ("principal cache (after)", 60)]:
+            principal_cache.set_ttl(ttl)
+            await run(50)  # warm up and prime the cache
+            statements["count"] = 0
+            stats = await run(args.iterations)
+            rows.append({
+                "mode": label,
+                "queries_per_req": round(statements["count"] / args.iterations, 2),
+                **stats,
+            })
+        return rows
+
+    # One event loop for the whole run - the async engine's pool is bound to it
+    rows = asyncio.run(compare())
+
+    print(f"\nGET /user/saved-jobs ({args.iterations} requests, concurrency {args.concurrency}, "
+          f"{args.saved_jobs} saved jobs)\n")
+    print_table(rows, ["mode", "queries_per_req", "requests_per_sec", "p50_ms", "p95_ms"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Shared cache backends: operation latency and cross-worker stampede protection
+
+For each backend (memory, sqlite, redis against the local stand-in in
+benchmarks/fake_redis.py, or a real server with --redis-url):
+
+  1. get (hit), get (miss) and set latency for a ~2 KB JSON value
+  2. stampede: --processes forked workers x --threads threads ask for the
+     same missing key at once, with a compute that takes --compute-ms.
+     Without protection every caller would compute it; with the shared
+     lock one caller per cache computes and the rest wait for its result.
+     The memory backend isn't shared, so it computes once per process.
+
+Usage (from backend/):
+    python -m benchmarks.bench_cache
+    python -m benchmarks.bench_cache --processes 8 --threads 8 --redis-url redis://127.0.0.1:6379/15
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from typing import Dict, List
+
+from benchmarks.common import load_sample_jobs, print_table, time_call
+from benchmarks.fake_redis import FakeRedis
+from services.shared_cache import MemoryBackend, RedisBackend, SharedCache, SQLiteBackend
+
+
+def make_backend(kind: str, sqlite_path: str, redis_url: str):
+    if kind == "sqlite":
+        return SQLiteBackend(sqlite_path)
+    if kind == "redis":
+        return RedisBackend(redis_url)
+    return MemoryBackend()
+
+
+def bench_operations(kind: str, sqlite_path: str, redis_url: str, iterations: int) -> List[Dict]:
+    cache = SharedCache(f"bench-ops-{os.getpid()}", ttl=300, backend=make_backend(kind, sqlite_path, redis_url))
+    value = load_sample_jobs()[:1]  # One job posting, ~2 KB of JSON
+    cache.set("hit", value)
+    counter = iter(range(10 ** 9))
+    rows = []
+    for op, fn in (
+        ("get hit", lambda: cache.get("hit")),
+        ("get miss", lambda: cache.get(f"miss-{next(counter)}")),
+        ("set", lambda: cache.set(f"set-{next(counter)}", value)),
+    ):
+        stats = time_call(fn, iterations)
+        rows.append({"backend": kind, "op": op, **stats})
+    return rows
+
+
+def _stampede_worker(kind: str, sqlite_path: str, redis_url: str, namespace: str, threads: int, compute_s: float,
+                     computes, barrier) -> None:
+    cache = SharedCache(namespace, ttl=300, backend=make_backend(kind, sqlite_path, redis_url))
+
+    def compute():
+        with computes.get_lock():
+            computes.value += 1
+        time.sleep(compute_s)
+        return {"computed_by": os.getpid()}
+
+    def call():
+        barrier.wait()
+        assert cache.get_or_compute("hot-key", compute)["computed_by"]
+
+    workers = [threading.Thread(target=call) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+
+def bench_stampede(kind: str, sqlite_path: str, redis_url: str, processes: int, threads: int,
+                   compute_ms: float) -> Dict:
+    context = multiprocessing.get_context("fork")
+    computes = context.Value("i", 0)
+    barrier = context.Barrier(processes * threads)
+    namespace = f"bench-stampede-{time.time_ns()}"
+    start = time.perf_counter()
+    children = [context.Process(target=_stampede_worker,
+                                args=(kind, sqlite_path, redis_url, namespace, threads, compute_ms / 1000,
+                                      computes, barrier))
+                for _ in range(processes)]
+    for child in children:
+        child.start()
+    for child in children:
+        child.join()
+    return {
+        "backend": kind,
+        "callers": processes * threads,
+        "computes": computes.value,
+        "unprotected_computes": processes * threads,
+        "wall_ms": round((time.perf_counter() - start) * 1000, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", default="memory,sqlite,redis")
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--compute-ms", type=float, default=300)
+    parser.add_argument("--redis-url", help="Use a real Redis server instead of benchmarks/fake_redis.py")
+    args = parser.parse_args()
+
+    fake = None
+    redis_url = args.redis_url
+    if not redis_url:
+        fake = FakeRedis().start()
+        redis_url = fake.url
+    sqlite_path = os.path.join(tempfile.mkdtemp(prefix="applesauce-cache-bench-"), "cache.db")
+    kinds = [kind.strip() for kind in args.backends.split(",") if kind.strip()]
+
+    try:
+        op_rows, stampede_rows = [], []
+        for kind in kinds:
+            op_rows.extend(bench_operations(kind, sqlite_path, redis_url, args.iterations))
+            stampede_rows.append(bench_stampede(kind, sqlite_path, redis_url, args.processes, args.threads,
+                                                args.compute_ms))
+    finally:
+        if fake:
+            fake.stop()
+
+    print(f"Operation latency ({args.iterations} iterations, redis at {redis_url}"
+          f"{' (fake)' if fake else ''})\n")
+    print_table(op_rows, ["backend", "op", "p50_ms", "p95_ms", "p99_ms", "ops_per_sec"])
+    print(f"\nStampede: {args.processes} processes x {args.threads} threads, {args.compute_ms:g} ms compute\n")
+    print_table(stampede_rows, ["backend", "callers", "computes", "unprotected_computes", "wall_ms"])
+
+
+if __name__ == "__main__":
+    main()
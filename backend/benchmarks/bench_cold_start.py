@@ -0,0 +1,158 @@
+"""
+Cold-start benchmark: process start to first response, lazy vs eager startup
+
+Each run launches a fresh interpreter that imports main, runs the app's
+startup (init_db, task queue) through an in-process ASGI client, which is
+how a serverless adapter drives it, then times the first GET / and the
+first resume upload (the first request that needs the deferred document
+parsers). Two modes are compared:
+
+    eager  LAZY_IMPORTS=off SCHEMA_CHECK=always (everything up front)
+    lazy   the defaults: deferred heavy imports, schema checks skipped
+           when the stored schema version matches
+
+Runs alternate between a brand-new database and one that already has the
+schema. The slowest top-level imports come from python -X importtime.
+
+Usage (from backend/):
+    python -m benchmarks.bench_cold_start
+    python -m benchmarks.bench_cold_start --runs 10 --output cold-start.json
+"""
+import argparse
+import json
+import os
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+from benchmarks.common import BACKEND_DIR, print_table
+
+MODES = {
+    "eager": {"LAZY_IMPORTS": "off", "SCHEMA_CHECK": "always"},
+    "lazy": {"LAZY_IMPORTS": "on", "SCHEMA_CHECK": "auto"},
+}
+PHASES = ["import_ms", "startup_ms", "first_request_ms", "ready_ms", "first_upload_ms", "process_ms"]
+
+# Runs in the measured interpreter. Timings start after the test client import so only the app is counted
+CHILD = r"""
+import json, sys, time
+from fastapi.testclient import TestClient  # The harness, not part of the app's cold start
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+with TestClient(main.app) as client:
+    started = time.perf_counter()
+    assert client.get("/").status_code == 200
+    first = time.perf_counter()
+    with open(sys.argv[1], "rb") as f:
+        upload = client.post("/upload-resume", files={"file": ("resume.docx", f.read())})
+    assert upload.status_code == 200, upload.text
+    uploaded = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "startup_ms": (started - imported) * 1000,
+    "first_request_ms": (first - started) * 1000,
+    "ready_ms": (first - start) * 1000,
+    "first_upload_ms": (uploaded - first) * 1000,
+}))
+"""
+
+
+def child_env(mode: str, tmp_dir: str) -> Dict[str, str]:
+    return {
+        **os.environ,
+        **MODES[mode],
+        "DATABASE_URL": f"sqlite:///{os.path.join(tmp_dir, 'cold_start.db')}",
+        "BLOB_STORE_DIR": os.path.join(tmp_dir, "blobs"),
+        "VECTOR_INDEX_DIR": os.path.join(tmp_dir, "vector_index"),
+        "JWT_SECRET_KEY": "cold-start-secret",
+        "ANTHROPIC_API_KEY": "cold-start",  # Configured, as in production, but never called
+        "CACHE_BACKEND": "memory",  # A shared cache would let later runs skip the upload's parse
+    }
+
+
+def run_once(mode: str, tmp_dir: str, resume_path: str) -> Dict[str, float]:
+    began = time.perf_counter()
+    result = subprocess.run([sys.executable, "-c", CHILD, resume_path], cwd=BACKEND_DIR, env=child_env(mode, tmp_dir),
+                            capture_output=True, text=True)
+    elapsed = (time.perf_counter() - began) * 1000
+    if result.returncode != 0:
+        raise SystemExit(f"{mode} run failed:\n{result.stderr}")
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    timings["process_ms"] = elapsed
+    return timings
+
+
+def slowest_imports(mode: str, tmp_dir: str, top: int) -> List[Dict]:
+    """Top-level packages by cumulative import time under `import main`"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"], cwd=BACKEND_DIR,
+                            env=child_env(mode, tmp_dir), capture_output=True, text=True)
+    totals: Dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        match = re.match(r"import time:\s+\d+ \|\s+(\d+) \|( *)(\S+)$", line)
+        if match and match.group(3) != "main":
+            package = match.group(3).split(".")[0]
+            totals[package] = max(totals.get(package, 0), int(match.group(1)))
+    ranked = sorted(totals.items(), key=lambda item: item[1], reverse=True)[:top]
+    return [{"module": name, "cumulative_ms": round(us / 1000, 1)} for name, us in ranked]
+
+
+def summarize(samples: List[Dict[str, float]]) -> Dict[str, float]:
+    return {phase: round(statistics.median(s[phase] for s in samples), 1) for phase in PHASES}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Cold starts per mode and database state")
+    parser.add_argument("--top", type=int, default=10, help="Slowest imports to list per mode")
+    parser.add_argument("--output", help="Write the results as JSON")
+    args = parser.parse_args()
+
+    from benchmarks.corpus import make_resume_texts, resume_to_docx
+
+    tmp_root = tempfile.mkdtemp(prefix="applesauce-cold-start-")
+    resume_path = os.path.join(tmp_root, "resume.docx")
+    with open(resume_path, "wb") as f:
+        f.write(resume_to_docx(make_resume_texts(1)[0]))
+
+    results: Dict[str, Dict] = {}
+    try:
+        for mode in MODES:
+            samples = {"new_db": [], "existing_db": []}
+            for run in range(args.runs):
+                tmp_dir = os.path.join(tmp_root, f"{mode}-{run}")
+                os.makedirs(tmp_dir)
+                samples["new_db"].append(run_once(mode, tmp_dir, resume_path))
+                samples["existing_db"].append(run_once(mode, tmp_dir, resume_path))
+            results[mode] = {
+                "new_db": summarize(samples["new_db"]),
+                "existing_db": summarize(samples["existing_db"]),
+                "slowest_imports": slowest_imports(mode, os.path.join(tmp_root, f"{mode}-0"), args.top),
+            }
+    finally:
+        shutil.rmtree(tmp_root, ignore_errors=True)
+
+    print(f"Median of {args.runs} cold starts (ms)\n")
+    print_table([{"mode": mode, "database": state, **results[mode][state]}
+                 for mode in MODES for state in ("new_db", "existing_db")], ["mode", "database"] + PHASES)
+    for mode in MODES:
+        print(f"\nSlowest imports ({mode}):")
+        print_table(results[mode]["slowest_imports"], ["module", "cumulative_ms"])
+
+    eager, lazy = results["eager"]["existing_db"], results["lazy"]["existing_db"]
+    print(f"\nTime to first response: {eager['ready_ms']:.0f} ms eager -> {lazy['ready_ms']:.0f} ms lazy "
+          f"({1 - lazy['ready_ms'] / eager['ready_ms']:.0%} less)")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"runs": args.runs, "modes": MODES, "results": results}, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
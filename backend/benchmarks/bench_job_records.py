@@ -0,0 +1,86 @@
+"""
+Job postings as dicts vs JobRecords (services/job_record.py): memory and scoring
+
+For each corpus (the real JSearch sample postings cloned, and synthetic
+postings), the jobs are decoded from JSON as the cache and job pool hand
+them over, then held either as those dicts or as records:
+
+  1. retained bytes per job (tracemalloc), including the shared keyword
+     vocabulary the records fill
+  2. match_jobs over the whole list, given dicts (converted every call, as
+     callers outside the catalog do) or the records
+  3. filter_jobs_by_clearance, and converting a page of 20 back to dicts
+
+Usage (from backend/):
+    python -m benchmarks.bench_job_records
+    python -m benchmarks.bench_job_records --jobs 5000 --iterations 20
+"""
+import argparse
+import gc
+import json
+import tracemalloc
+from typing import Callable, Dict, List
+
+from benchmarks.common import make_jobs, print_table, time_call
+from benchmarks.corpus import make_job_postings, make_resume_texts
+from services.clearance_filter import ClearanceLevel, clearance_filter
+from services.job_matcher import match_jobs
+from services.job_record import JobRecord
+
+
+def retained_bytes(build: Callable[[], List]) -> int:
+    """Bytes still allocated once build() returns (its result kept alive)"""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current
+
+
+def bench_corpus(name: str, jobs: List[Dict], resume_text: str, iterations: int) -> List[Dict]:
+    encoded = json.dumps(jobs)
+    count = len(jobs)
+    dict_bytes = retained_bytes(lambda: json.loads(encoded))
+    decoded = json.loads(encoded)
+    record_bytes = retained_bytes(lambda: [JobRecord.from_dict(job) for job in decoded])
+    records = [JobRecord.from_dict(job) for job in decoded]
+
+    rows = [
+        {"corpus": name, "layout": "dicts", "bytes_per_job": dict_bytes // count,
+         **_ms("match_ms", time_call(lambda: match_jobs(resume_text, decoded), iterations)),
+         **_ms("page_to_dict_ms", time_call(lambda: [dict(job) for job in decoded[:20]], iterations))},
+        {"corpus": name, "layout": "records", "bytes_per_job": record_bytes // count,
+         **_ms("match_ms", time_call(lambda: match_jobs(resume_text, records), iterations)),
+         **_ms("clearance_ms", time_call(
+             lambda: clearance_filter.filter_jobs_by_clearance(records, ClearanceLevel.SECRET), iterations)),
+         **_ms("page_to_dict_ms", time_call(lambda: [job.to_dict() for job in records[:20]], iterations))},
+    ]
+    rows[0].update(_ms("clearance_ms", time_call(
+        lambda: clearance_filter.filter_jobs_by_clearance(decoded, ClearanceLevel.SECRET), iterations)))
+    rows[1]["ratio"] = round(dict_bytes / record_bytes, 1)
+    return rows
+
+
+def _ms(column: str, stats: Dict[str, float]) -> Dict[str, float]:
+    return {column: round(stats["mean_ms"], 3)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=2000)
+    parser.add_argument("--iterations", type=int, default=10)
+    args = parser.parse_args()
+
+    resume_text = make_resume_texts(1, 7)[0]
+    rows = bench_corpus("sample", make_jobs(args.jobs), resume_text, args.iterations)
+    rows += bench_corpus("synthetic", make_job_postings(args.jobs), resume_text, args.iterations)
+
+    print(f"\n{args.jobs} jobs per corpus, {args.iterations} iterations\n")
+    print_table(rows, ["corpus", "layout", "bytes_per_job", "ratio", "match_ms", "clearance_ms", "page_to_dict_ms"])
+
+
+if __name__ == "__main__":
+    main()
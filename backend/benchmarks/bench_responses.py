@@ -0,0 +1,92 @@
+"""
+Benchmark JSON serialization and compression for /match and /jobs
+
+Compares FastAPI's default path (jsonable_encoder + json.dumps) with
+FastJSONResponse, then measures end-to-end latency and wire size through
+the app with identity, gzip and brotli encodings. Upstream job APIs are
+replaced by synthetic jobs cloned from match_result.json.
+
+Usage (from backend/):
+    python -m benchmarks.bench_responses
+    python -m benchmarks.bench_responses --jobs 100 --iterations 200
+"""
+import argparse
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+
+from benchmarks.common import make_jobs, time_call, print_table
+from services.job_matcher import match_jobs
+from services.job_record import JobRecord
+
+
+def bench_render(label: str, payload: dict, iterations: int) -> list:
+    """Time only the serialization step, old path vs new path"""
+    from responses import FastJSONResponse
+
+    before = time_call(lambda: JSONResponse(jsonable_encoder(payload)), iterations)
+    after = time_call(lambda: FastJSONResponse(payload), iterations)
+    size = len(FastJSONResponse(payload).body)
+    return [
+        {"payload": label, "path": "jsonable_encoder+json", "bytes": size, **before},
+        {"payload": label, "path": "FastJSONResponse", "bytes": size, **after},
+    ]
+
+
+def bench_http(client: TestClient, label: str, method: str, url: str, body: dict, iterations: int) -> list:
+    """Time full requests through the app with each content encoding"""
+    rows = []
+    for encoding in ["identity", "gzip", "br"]:
+        headers = {"Accept-Encoding": encoding}
+
+        def request():
+            if method == "POST":
+                return client.post(url, json=body, headers=headers)
+            return client.get(url, headers=headers)
+
+        response = request()
+        wire_bytes = int(response.headers.get("content-length", len(response.content)))
+        stats = time_call(request, iterations)
+        rows.append({
+            "endpoint": label,
+            "encoding": response.headers.get("content-encoding", "identity"),
+            "wire_bytes": wire_bytes,
+            **stats,
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=50, help="Jobs per response")
+    parser.add_argument("--iterations", type=int, default=100)
+    args = parser.parse_args()
+
+    import main as app_module
+    from services.job_api_service import job_api_service
+
+    jobs = make_jobs(args.jobs)
+    resume_text = "Python developer with AWS, PostgreSQL, Docker and CI/CD experience building REST APIs"
+
+    # Serve synthetic jobs instead of calling the real upstream APIs
+    job_api_service.search_indeed_jobs = lambda query, *a, **kw: [JobRecord.from_dict(j) for j in jobs]
+    job_api_service.search_company_careers = lambda company, keywords="": []
+
+    match_payload = {"matches": [match.to_dict() for match in match_jobs(resume_text, jobs)], "count": len(jobs)}
+    jobs_payload = {"jobs": jobs, "count": len(jobs), "query": "software engineer"}
+
+    print(f"\nSerialization ({args.jobs} jobs, {args.iterations} iterations)\n")
+    rows = bench_render("/match", match_payload, args.iterations)
+    rows += bench_render("/jobs", jobs_payload, args.iterations)
+    print_table(rows, ["payload", "path", "bytes", "mean_ms", "p95_ms", "ops_per_sec"])
+
+    client = TestClient(app_module.app)
+    print(f"\nEnd-to-end through the app\n")
+    rows = bench_http(client, "/match", "POST", "/match", {"resume_text": resume_text}, args.iterations)
+    rows += bench_http(client, "/jobs", "GET", "/jobs?source=indeed", {}, args.iterations)
+    print_table(rows, ["endpoint", "encoding", "wire_bytes", "mean_ms", "p95_ms", "ops_per_sec"])
+
+
+if __name__ == "__main__":
+    main()
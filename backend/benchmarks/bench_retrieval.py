@@ -0,0 +1,72 @@
+"""
+Benchmark two-stage retrieval against scoring the whole job pool
+
+Seeds a throwaway job pool, then for a set of synthetic resumes compares the
+retrieve -> hydrate -> rank pipeline with running match_jobs over every job.
+Reports per-stage latency and recall@limit of the pipeline's final ranking.
+
+Usage (from backend/):
+    python -m benchmarks.bench_retrieval
+    python -m benchmarks.bench_retrieval --jobs 100000 --candidates 500 --resumes 20
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=20000)
+    parser.add_argument("--candidates", type=int, default=300)
+    parser.add_argument("--resumes", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    # Point the app at a throwaway database before anything opens the default one
+    db_path = os.path.join(tempfile.mkdtemp(prefix="applesauce-retrieval-"), "bench.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+
+    from benchmarks.common import SYNTHETIC_SKILLS, make_synthetic_jobs, print_table
+    from database import init_db
+    from services.job_matcher import match_jobs
+    from services.job_pool import job_pool
+    from services.job_record import JobRecord
+    from services.retrieval import RetrievalPipeline, recall_at_k
+
+    init_db()
+    jobs = make_synthetic_jobs(args.jobs)
+    start = time.perf_counter()
+    for i in range(0, len(jobs), 2000):
+        job_pool.add_jobs(jobs[i:i + 2000])
+    print(f"Seeded {len(job_pool)} jobs in {time.perf_counter() - start:.1f}s")
+    records = [JobRecord.from_dict(job) for job in jobs]
+
+    pipeline = RetrievalPipeline(candidates=args.candidates)
+    rng = random.Random(7)
+    recalls, full_ms = [], []
+    for _ in range(args.resumes):
+        skills = rng.sample(SYNTHETIC_SKILLS, rng.randint(3, 6))
+        template = rng.choice(jobs)
+        resume_text = f"{template['title']}\n{', '.join(skills)}\n{template['description']}"
+
+        returned = pipeline.match(resume_text, skills, args.limit)["matches"]
+
+        start = time.perf_counter()
+        expected = match_jobs(resume_text, records, skills)[:args.limit]
+        full_ms.append((time.perf_counter() - start) * 1000)
+        recalls.append(recall_at_k(expected, returned))
+
+    stats = pipeline.stats()["stages"]
+    rows = [{"stage": name, **summary} for name, summary in stats.items()]
+    full_ms.sort()
+    rows.append({"stage": "exhaustive match_jobs", "count": len(full_ms),
+                 "p50_ms": round(full_ms[len(full_ms) // 2], 3), "max_ms": round(full_ms[-1], 3)})
+    print(f"\n{args.jobs} jobs, {args.candidates} candidates, {args.resumes} resumes\n")
+    print_table(rows, ["stage", "count", "p50_ms", "p95_ms", "max_ms"])
+    print(f"\nrecall@{args.limit} vs exhaustive: mean {sum(recalls) / len(recalls):.3f}, min {min(recalls):.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Benchmark /match scoring against the memory-mapped job snapshot (services/job_snapshot.py)
+
+Seeds a throwaway job pool, writes a snapshot generation from it, then:
+
+  1. checks match_snapshot returns exactly what match_jobs does over the
+     same jobs (IDs, percentages, breakdowns, matched skills, tie order)
+  2. compares its latency with match_jobs over every record and with the
+     two-stage retrieval pipeline
+  3. opens the snapshot in several worker processes and reads their
+     mappings' Rss/Pss from /proc/self/smaps (Linux only): Pss is each
+     worker's share, so the columns are held once however many map them
+
+Usage (from backend/):
+    python -m benchmarks.bench_snapshot
+    python -m benchmarks.bench_snapshot --jobs 100000 --resumes 20 --workers 4
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+from typing import Dict, List
+
+
+def mapped_memory(path: str) -> Dict[str, int]:
+    """Rss and Pss (KiB) of this process's mappings of files under path"""
+    totals = {"Rss": 0, "Pss": 0}
+    in_snapshot = False
+    with open("/proc/self/smaps") as f:
+        for line in f:
+            fields = line.split()
+            if "-" in fields[0] and len(fields) >= 5:
+                in_snapshot = len(fields) >= 6 and fields[5].startswith(path)
+            elif in_snapshot and fields[0].rstrip(":") in totals:
+                totals[fields[0].rstrip(":")] += int(fields[1])
+    return totals
+
+
+def _worker(path: str, barrier, results) -> None:
+    from services.job_snapshot import JobSnapshot
+    snapshot = JobSnapshot(path)
+    for column in snapshot.columns.values():
+        column.tobytes()  # Fault every page in, as a scoring pass eventually does
+    if len(snapshot.payloads):
+        snapshot.payloads[:].tobytes()
+    barrier.wait()  # Every worker has it mapped before any is measured
+    results.put(mapped_memory(path))
+    barrier.wait()
+
+
+def measure_workers(path: str, workers: int) -> List[Dict[str, int]]:
+    context = multiprocessing.get_context("fork")
+    barrier, results = context.Barrier(workers), context.Queue()
+    processes = [context.Process(target=_worker, args=(path, barrier, results)) for _ in range(workers)]
+    for process in processes:
+        process.start()
+    measured = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    return measured
+
+
+def _match_key(match) -> tuple:
+    return match.id, match.match_percentage, match.score_breakdown, match.matched_skills
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=20000)
+    parser.add_argument("--resumes", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    # Point the app at a throwaway database and snapshot directory before anything opens the defaults
+    tmp_dir = tempfile.mkdtemp(prefix="applesauce-snapshot-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}"
+    os.environ["JOB_SNAPSHOT_DIR"] = os.path.join(tmp_dir, "job_snapshot")
+
+    from benchmarks.common import SYNTHETIC_SKILLS, make_synthetic_jobs, print_table
+    from database import init_db
+    from services.job_matcher import match_jobs, match_snapshot
+    from services.job_pool import job_pool
+    from services.job_record import JobRecord
+    from services.job_snapshot import JobSnapshotStore
+    from services.retrieval import RetrievalPipeline
+
+    init_db()
+    jobs = make_synthetic_jobs(args.jobs)
+    for i in range(0, len(jobs), 2000):
+        job_pool.add_jobs(jobs[i:i + 2000])
+    store = JobSnapshotStore(os.environ["JOB_SNAPSHOT_DIR"])
+    start = time.perf_counter()
+    store.build()
+    build_seconds = time.perf_counter() - start
+    snapshot = store.current()
+    print(f"Seeded {len(job_pool)} jobs; snapshot {snapshot.name} built in {build_seconds:.1f}s, "
+          f"{snapshot.nbytes() / 1e6:.1f} MB on disk")
+
+    # match_jobs keeps input order among ties, and snapshot rows are in ID order
+    records = sorted((JobRecord.from_dict(job) for job in {job["id"]: job for job in jobs}.values()),
+                     key=lambda record: record.id)
+    pipeline = RetrievalPipeline()
+    rng = random.Random(7)
+    timings: Dict[str, List[float]] = {"match_snapshot": [], "match_jobs (all records)": [], "two-stage pipeline": []}
+    mismatches = 0
+    for _ in range(args.resumes):
+        skills = rng.sample(SYNTHETIC_SKILLS, rng.randint(3, 6))
+        template = rng.choice(jobs)
+        resume_text = f"{template['title']}\n{', '.join(skills)}\n{template['description']}"
+
+        start = time.perf_counter()
+        returned = match_snapshot(resume_text, snapshot, skills, args.limit)
+        timings["match_snapshot"].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        expected = match_jobs(resume_text, records, skills)[:args.limit]
+        timings["match_jobs (all records)"].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        pipeline._match_pool(resume_text, skills, args.limit, [], None)
+        timings["two-stage pipeline"].append(time.perf_counter() - start)
+
+        mismatches += [_match_key(m) for m in returned] != [_match_key(m) for m in expected]
+
+    rows = []
+    for name, seconds in timings.items():
+        seconds.sort()
+        rows.append({"scorer": name, "p50_ms": round(seconds[len(seconds) // 2] * 1000, 3),
+                     "max_ms": round(seconds[-1] * 1000, 3)})
+    print(f"\n{args.jobs} jobs, {args.resumes} resumes, top {args.limit}\n")
+    print_table(rows, ["scorer", "p50_ms", "max_ms"])
+    print(f"\nResults differing from match_jobs: {mismatches} of {args.resumes}")
+
+    if not os.path.exists("/proc/self/smaps"):
+        return
+    measured = measure_workers(snapshot.path, args.workers)
+    rows = [{"worker": i, "rss_kib": m["Rss"], "pss_kib": m["Pss"]} for i, m in enumerate(measured)]
+    print(f"\nSnapshot mappings in {args.workers} worker processes\n")
+    print_table(rows, ["worker", "rss_kib", "pss_kib"])
+    # This process has the snapshot mapped too, so the workers' Pss adds up to a bit under one copy
+    print(f"\nOne copy {max(m['Rss'] for m in measured)} KiB; workers' Pss sums to "
+          f"{sum(m['Pss'] for m in measured)} KiB (vs {sum(m['Rss'] for m in measured)} KiB if each held its own)")
+
+
+if __name__ == "__main__":
+    main()
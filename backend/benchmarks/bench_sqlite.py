@@ -0,0 +1,120 @@
+"""
+Benchmark concurrent SQLite reads and writes with the stock vs production profile
+
+Writer threads insert saved jobs (like POST /user/saved-jobs) while reader
+threads list them (like GET /user/saved-jobs) for a fixed duration. Each
+profile runs against its own fresh database file.
+
+Usage (from backend/):
+    python -m benchmarks.bench_sqlite
+    python -m benchmarks.bench_sqlite --writers 8 --readers 8 --seconds 10
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import create_engine, event, insert, select
+from sqlalchemy.exc import OperationalError
+
+from benchmarks.common import print_table
+from database import Base, apply_sqlite_pragmas
+from models.db_models import User, SavedJob
+
+
+def make_engine(path: str, profile: str, pool_size: int):
+    engine = create_engine(
+        f"sqlite:///{path}",
+        connect_args={"check_same_thread": False},
+        pool_size=pool_size,
+        max_overflow=0,
+    )
+    if profile == "production":
+        event.listen(engine, "connect", lambda conn, record: apply_sqlite_pragmas(conn))
+    return engine
+
+
+def run_profile(profile: str, writers: int, readers: int, seconds: float) -> dict:
+    path = os.path.join(tempfile.mkdtemp(prefix="applesauce-sqlite-"), "bench.db")
+    engine = make_engine(path, profile, pool_size=writers + readers)
+    Base.metadata.create_all(bind=engine)
+
+    users = User.__table__
+    saved_jobs = SavedJob.__table__
+    with engine.begin() as conn:
+        conn.execute(insert(users).values(id=1, email="bench@example.com"))
+
+    counts = {"writes": 0, "reads": 0, "locked": 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def record(key):
+        with lock:
+            counts[key] += 1
+
+    def writer(worker_id: int):
+        n = 0
+        while time.perf_counter() < deadline:
+            n += 1
+            try:
+                with engine.begin() as conn:
+                    conn.execute(insert(saved_jobs).values(
+                        user_id=1,
+                        title=f"Engineer {worker_id}-{n}",
+                        company="Acme",
+                        description="x" * 2000,
+                        status="saved",
+                        created_at=datetime.utcnow(),
+                    ))
+                record("writes")
+            except OperationalError:
+                record("locked")
+
+    def reader():
+        query = (
+            select(saved_jobs.c.id, saved_jobs.c.title, saved_jobs.c.company)
+            .where(saved_jobs.c.user_id == 1)
+            .order_by(saved_jobs.c.created_at.desc())
+            .limit(50)
+        )
+        while time.perf_counter() < deadline:
+            try:
+                with engine.connect() as conn:
+                    conn.execute(query).fetchall()
+                record("reads")
+            except OperationalError:
+                record("locked")
+
+    threads = [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+    threads += [threading.Thread(target=reader) for _ in range(readers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    engine.dispose()
+
+    return {
+        "profile": profile,
+        "writes_per_sec": round(counts["writes"] / seconds, 1),
+        "reads_per_sec": round(counts["reads"] / seconds, 1),
+        "lock_errors": counts["locked"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    rows = [run_profile(profile, args.writers, args.readers, args.seconds) for profile in ["default", "production"]]
+
+    print(f"\n{args.writers} writers + {args.readers} readers for {args.seconds}s\n")
+    print_table(rows, ["profile", "writes_per_sec", "reads_per_sec", "lock_errors"])
+
+
+if __name__ == "__main__":
+    main()
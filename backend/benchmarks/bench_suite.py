@@ -0,0 +1,213 @@
+"""
+Reproducible parsing and matching benchmark suite
+
+Generates a seeded synthetic corpus (PDF and DOCX resumes, job postings
+with a share of clearance requirements) and times the hot paths of resume
+parsing and job matching. Each benchmark reports latency percentiles,
+throughput in items per second and peak Python heap usage (tracemalloc,
+measured in a separate pass so it doesn't slow the timed runs).
+
+Results are written as JSON with the commit, Python version and corpus
+parameters, so two runs can be diffed with --compare.
+
+Usage (from backend/):
+    python -m benchmarks.bench_suite
+    python -m benchmarks.bench_suite --scale 5 --output /tmp/after.json
+    python -m benchmarks.bench_suite --compare benchmarks/results/<before>.json
+    python -m benchmarks.bench_suite --only match_jobs,filter_jobs_by_clearance
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.common import BACKEND_DIR, print_table, time_call
+from benchmarks.corpus import make_job_postings, make_resume_files, make_resume_texts
+from services.clearance_filter import ClearanceLevel, clearance_filter
+from services.job_matcher import match_jobs
+from services.job_record import JobRecord
+from services.resume_parser import _extract_sections, _extract_skills, _parse_resume_structured
+
+RESULTS_DIR = os.path.join(BACKEND_DIR, "benchmarks", "results")
+SCHEMA_VERSION = 1
+# Metrics compared by --compare, and whether a higher value is better
+COMPARED_METRICS = {"p50_ms": False, "p95_ms": False, "p99_ms": False, "items_per_sec": True, "peak_kib": False}
+
+
+def peak_memory_kib(fn: Callable[[], object]) -> float:
+    """Peak traced heap allocated while running fn once"""
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return round(peak / 1024, 1)
+
+
+def cycling(items: List, fn: Callable) -> Callable[[], object]:
+    """A no-argument call that applies fn to the next item each time, wrapping around"""
+    source = itertools.cycle(items)
+    return lambda: fn(next(source))
+
+
+def run_benchmark(fn: Callable[[], object], iterations: int, items_per_call: int) -> Dict:
+    stats = time_call(fn, iterations)
+    stats["items_per_call"] = items_per_call
+    stats["items_per_sec"] = round(items_per_call * 1000 / stats["mean_ms"], 1)
+    stats["peak_kib"] = peak_memory_kib(fn)
+    return stats
+
+
+def build_benchmarks(args) -> Dict[str, Dict]:
+    """name -> {"fn", "iterations", "items"} over a freshly generated corpus"""
+    resumes = max(2, int(args.resumes * args.scale))
+    job_count = max(1, int(args.jobs * args.scale))
+
+    start = time.perf_counter()
+    files = make_resume_files(resumes, args.seed)
+    texts = make_resume_texts(resumes, args.seed)
+    # As the catalog holds them: matching and clearance checks run on records
+    jobs = [JobRecord.from_dict(job) for job in make_job_postings(job_count, args.seed)]
+    print(f"Corpus: {resumes} resumes, {job_count} jobs (seed {args.seed}) "
+          f"generated in {time.perf_counter() - start:.1f}s")
+
+    pdfs = [f for f in files if f["filename"].endswith(".pdf")]
+    docxs = [f for f in files if f["filename"].endswith(".docx")]
+    parsed = [(text, _extract_skills(text)) for text in texts]
+    per_item = args.iterations
+    per_batch = max(5, args.iterations // 20)
+
+    # The uncached parser, so repeated files measure parsing rather than parse_cache lookups
+    return {
+        "parse_resume_structured[pdf]": {
+            "fn": cycling(pdfs, lambda f: _parse_resume_structured(f["content"], f["filename"])),
+            "iterations": per_item, "items": 1,
+        },
+        "parse_resume_structured[docx]": {
+            "fn": cycling(docxs, lambda f: _parse_resume_structured(f["content"], f["filename"])),
+            "iterations": per_item, "items": 1,
+        },
+        "_extract_skills": {"fn": cycling(texts, _extract_skills), "iterations": per_item, "items": 1},
+        "_extract_sections": {"fn": cycling(texts, _extract_sections), "iterations": per_item, "items": 1},
+        "match_jobs": {
+            "fn": cycling(parsed, lambda p: match_jobs(p[0], jobs, p[1])),
+            "iterations": per_batch, "items": len(jobs),
+        },
+        "filter_jobs_by_clearance": {
+            "fn": lambda: clearance_filter.filter_jobs_by_clearance(jobs, ClearanceLevel.SECRET),
+            "iterations": per_batch, "items": len(jobs),
+        },
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        sha = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                             capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=BACKEND_DIR,
+                               capture_output=True, text=True, check=True).stdout.strip()
+        return f"{sha}-dirty" if dirty else sha
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline: Dict, current: Dict, threshold: float) -> int:
+    """Print per-metric changes against a previous run; returns how many exceed the threshold"""
+    rows = []
+    regressions = 0
+    for name, result in current["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if not before:
+            rows.append({"benchmark": name, "metric": "-", "change": "new"})
+            continue
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            old, new = before.get(metric), result.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old * 100
+            worse = -change if higher_is_better else change
+            flag = ""
+            if worse > threshold:
+                flag = "REGRESSION"
+                regressions += 1
+            elif worse < -threshold:
+                flag = "improved"
+            rows.append({"benchmark": name, "metric": metric, "before": old, "after": new,
+                         "change": f"{change:+.1f}%", "": flag})
+
+    print(f"\nCompared with {baseline.get('commit') or 'baseline'} ({baseline.get('timestamp', '?')}), "
+          f"threshold {threshold:.0f}%\n")
+    print_table(rows, ["benchmark", "metric", "before", "after", "change", ""])
+    if baseline.get("corpus") != current["corpus"]:
+        print("\nWarning: corpus parameters differ between the runs; numbers are not directly comparable")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resumes", type=int, default=200, help="Synthetic resumes (half PDF, half DOCX)")
+    parser.add_argument("--jobs", type=int, default=2000, help="Synthetic job postings")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiplier applied to --resumes and --jobs")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--iterations", type=int, default=200, help="Timed calls per single-item benchmark")
+    parser.add_argument("--only", help="Comma-separated benchmark names to run")
+    parser.add_argument("--output", help="Result file (default benchmarks/results/<timestamp>-<commit>.json)")
+    parser.add_argument("--compare", help="Previous result file to diff against")
+    parser.add_argument("--threshold", type=float, default=10.0,
+                        help="Percent change counted as a regression by --compare (exit status 1)")
+    args = parser.parse_args()
+
+    benchmarks = build_benchmarks(args)
+    if args.only:
+        wanted = set(args.only.split(","))
+        unknown = wanted - set(benchmarks)
+        if unknown:
+            parser.error(f"unknown benchmark(s): {', '.join(sorted(unknown))}; choose from {', '.join(benchmarks)}")
+        benchmarks = {name: spec for name, spec in benchmarks.items() if name in wanted}
+
+    results = {}
+    for name, spec in benchmarks.items():
+        print(f"Running {name}...")
+        results[name] = run_benchmark(spec["fn"], spec["iterations"], spec["items"])
+
+    timestamp = datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
+    commit = git_commit()
+    report = {
+        "schema_version": SCHEMA_VERSION,
+        "timestamp": timestamp,
+        "commit": commit,
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "corpus": {"resumes": args.resumes, "jobs": args.jobs, "scale": args.scale, "seed": args.seed},
+        "results": results,
+    }
+
+    print()
+    print_table([{"benchmark": name, **stats} for name, stats in results.items()],
+                ["benchmark", "iterations", "p50_ms", "p95_ms", "p99_ms", "items_per_sec", "peak_kib"])
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{timestamp}-{commit or 'nogit'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if compare(baseline, report, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
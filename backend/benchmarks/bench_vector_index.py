@@ -0,0 +1,88 @@
+"""
+Benchmark the on-disk IVF vector index against an exact scan
+
+Builds an index over synthetic clustered embeddings (the shape real job
+embeddings take: many postings per topic), then measures query latency and
+recall@k against brute-force search. Also reports embedding throughput for
+the active embedder on the sample job postings.
+
+Usage (from backend/):
+    python -m benchmarks.bench_vector_index
+    python -m benchmarks.bench_vector_index --jobs 200000 --nprobe 16 --k 100
+"""
+import argparse
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.common import make_jobs, print_table, time_call
+from services.embeddings import get_embedder, job_embedding_text
+from services.vector_index import VectorIndex
+
+
+def synthetic_vectors(count: int, dim: int, topics: int, noise: float = 1.0, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((topics, dim)).astype(np.float32)
+    vectors = centers[rng.integers(0, topics, count)] + noise * rng.standard_normal((count, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=100000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--topics", type=int, default=500)
+    parser.add_argument("--noise", type=float, default=1.0, help="Spread of postings around their topic")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=50)
+    parser.add_argument("--nprobe", type=int, default=12)
+    parser.add_argument("--embed-jobs", type=int, default=2000, help="Sample postings to embed for throughput")
+    args = parser.parse_args()
+
+    vectors = synthetic_vectors(args.jobs + args.queries, args.dim, args.topics, args.noise)
+    corpus, queries = vectors[:args.jobs], vectors[args.jobs:]
+    ids = [str(i) for i in range(args.jobs)]
+
+    path = tempfile.mkdtemp(prefix="applesauce-vectors-")
+    index = VectorIndex(path, nprobe=args.nprobe)
+    index.load("bench", args.dim)
+    start = time.perf_counter()
+    index.add(ids, corpus)
+    index.save()
+    build_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    reopened = VectorIndex(path, nprobe=args.nprobe)
+    reopened.load("bench", args.dim)
+    load_ms = (time.perf_counter() - start) * 1000
+
+    def exact(query):
+        scores = corpus @ query
+        top = np.argpartition(-scores, args.k)[:args.k]
+        return {str(i) for i in top}
+
+    recalls = []
+    for query in queries:
+        found = {item_id for item_id, _ in reopened.search(query, args.k)}
+        recalls.append(len(found & exact(query)) / args.k)
+
+    cycle = iter(range(10 ** 9))
+    ivf = time_call(lambda: reopened.search(queries[next(cycle) % len(queries)], args.k), args.queries)
+    brute = time_call(lambda: exact(queries[next(cycle) % len(queries)]), args.queries)
+
+    print(f"\n{args.jobs} vectors x {args.dim} dims, {len(reopened._centroids)} lists, nprobe={args.nprobe}")
+    print(f"build {build_s:.1f}s, reopen (mmap) {load_ms:.1f} ms, recall@{args.k} {np.mean(recalls):.3f}\n")
+    print_table([{"search": "ivf", **ivf}, {"search": "exact scan", **brute}],
+                ["search", "p50_ms", "p95_ms", "ops_per_sec"])
+
+    embedder = get_embedder()
+    texts = [job_embedding_text(job) for job in make_jobs(args.embed_jobs)]
+    start = time.perf_counter()
+    embedder.embed(texts)
+    elapsed = time.perf_counter() - start
+    print(f"\nEmbedding ({embedder.name}): {args.embed_jobs / elapsed:.0f} postings/s")
+
+
+if __name__ == "__main__":
+    main()
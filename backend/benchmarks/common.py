@@ -0,0 +1,111 @@
+"""Shared helpers for benchmark scripts"""
+import json
+import os
+import random
+import statistics
+import time
+from typing import Callable, Dict, List
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE_MATCH_FILE = os.path.join(BACKEND_DIR, "match_result.json")
+
+
+def load_sample_jobs() -> List[Dict]:
+    """Load the captured /match output shipped with the repo (real JSearch postings)"""
+    with open(SAMPLE_MATCH_FILE, encoding="utf-8") as f:
+        return json.load(f)["matches"]
+
+
+def make_jobs(count: int, seed: int = 42) -> List[Dict]:
+    """Build `count` job dicts in the JobAPIService format, cloned from the sample postings"""
+    rng = random.Random(seed)
+    templates = load_sample_jobs()
+    jobs = []
+    for i in range(count):
+        template = templates[i % len(templates)]
+        jobs.append({
+            "id": rng.getrandbits(53),
+            "title": template["title"],
+            "company": template["company"],
+            "location": template["location"],
+            "description": template["description"],
+            "url": template["url"],
+            "posted_date": template["posted_date"],
+            "skills": list(template["skills"]),
+            "salary": template["salary"],
+            "source": template["source"],
+        })
+    return jobs
+
+
+SYNTHETIC_SKILLS = [
+    "python", "javascript", "java", "react", "node.js", "aws", "docker", "kubernetes", "sql",
+    "mongodb", "typescript", "go", "rust", "swift", "machine learning", "ai", "devops", "ci/cd",
+    "agile", "rest api",
+]
+SYNTHETIC_SENIORITY = ["", "Junior", "Senior", "Staff", "Principal", "Lead"]
+SYNTHETIC_AREAS = ["Backend", "Frontend", "Full Stack", "Data", "Machine Learning", "Platform", "Mobile",
+                   "Cloud", "Security", "Site Reliability", "Embedded", "DevOps", "QA", "Infrastructure"]
+SYNTHETIC_ROLES = ["Engineer", "Developer", "Architect", "Scientist", "Analyst", "Manager", "Consultant"]
+SYNTHETIC_COMPANIES = ["Acme", "Globex", "Initech", "Umbrella", "Hooli", "Stark Industries", "Wayne Enterprises",
+                       "Cyberdyne", "Soylent", "Tyrell", "Aperture", "Black Mesa", "Vandelay", "Wonka"]
+SYNTHETIC_FILLER = ("We are looking for a motivated teammate to design build and operate services used by "
+                    "millions of customers collaborate across product design and operations mentor others "
+                    "and own features end to end in a fast paced environment").split()
+
+
+def make_synthetic_jobs(count: int, seed: int = 42) -> List[Dict]:
+    """Build `count` varied job dicts (distinct titles, skills and descriptions) for retrieval-scale tests"""
+    rng = random.Random(seed)
+    jobs = []
+    for _ in range(count):
+        skills = rng.sample(SYNTHETIC_SKILLS, rng.randint(2, 5))
+        title = " ".join(w for w in [rng.choice(SYNTHETIC_SENIORITY), rng.choice(SYNTHETIC_AREAS),
+                                     rng.choice(SYNTHETIC_ROLES)] if w)
+        words = rng.sample(SYNTHETIC_FILLER, 20) + skills + rng.sample(SYNTHETIC_SKILLS, 2)
+        rng.shuffle(words)
+        jobs.append({
+            "id": rng.getrandbits(53),
+            "title": title,
+            "company": rng.choice(SYNTHETIC_COMPANIES),
+            "location": "Remote",
+            "description": f"{title}. " + " ".join(words),
+            "url": "",
+            "posted_date": "",
+            "skills": skills,
+            "salary": "Not specified",
+            "source": "synthetic",
+        })
+    return jobs
+
+
+def time_call(fn: Callable[[], object], iterations: int, warmup: int = 3) -> Dict[str, float]:
+    """Run `fn` repeatedly and return latency stats in milliseconds"""
+    for _ in range(warmup):
+        fn()
+
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+
+    samples.sort()
+    return {
+        "iterations": iterations,
+        "mean_ms": round(statistics.mean(samples), 3),
+        "p50_ms": round(samples[len(samples) // 2], 3),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+        "p99_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.99))], 3),
+        "max_ms": round(samples[-1], 3),
+        "ops_per_sec": round(1000 / statistics.mean(samples), 1),
+    }
+
+
+def print_table(rows: List[Dict], columns: List[str]) -> None:
+    """Print rows of results as an aligned text table"""
+    widths = {c: max(len(c), *(len(str(r.get(c, ""))) for r in rows)) for c in columns}
+    print("  ".join(c.ljust(widths[c]) for c in columns))
+    print("  ".join("-" * widths[c] for c in columns))
+    for row in rows:
+        print("  ".join(str(row.get(c, "")).ljust(widths[c]) for c in columns))
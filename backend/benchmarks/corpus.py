@@ -0,0 +1,151 @@
+"""Deterministic synthetic corpus for benchmarks: resumes (text, PDF, DOCX) and job postings"""
+import io
+import random
+from typing import Dict, List
+
+from docx import Document
+
+from benchmarks.common import (SYNTHETIC_AREAS, SYNTHETIC_COMPANIES, SYNTHETIC_FILLER, SYNTHETIC_ROLES,
+                               SYNTHETIC_SENIORITY, make_synthetic_jobs)
+from services.resume_parser import TECH_SKILLS
+
+FIRST_NAMES = ["Alex", "Sam", "Jordan", "Taylor", "Morgan", "Casey", "Riley", "Jamie", "Avery", "Quinn"]
+LAST_NAMES = ["Rivera", "Chen", "Okafor", "Novak", "Haddad", "Lindqvist", "Tanaka", "Moreau", "Patel", "Silva"]
+SCHOOLS = ["State University", "Institute of Technology", "City College", "Polytechnic University"]
+DEGREES = ["B.S. Computer Science", "M.S. Computer Science", "B.S. Electrical Engineering", "B.A. Mathematics"]
+CERTIFICATIONS = ["AWS Certified Solutions Architect", "Certified Kubernetes Administrator",
+                  "Google Cloud Professional Data Engineer", "Certified Scrum Master"]
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+ACHIEVEMENTS = [
+    "Built and operated {skill} services handling millions of requests per day",
+    "Led migration of legacy systems to {skill}, cutting infrastructure cost by 30%",
+    "Designed {skill} data pipelines feeding reporting for the whole company",
+    "Mentored engineers and introduced {skill} best practices across teams",
+    "Reduced p95 latency of core APIs by 40% using {skill}",
+]
+
+# Phrases filter_jobs_by_clearance looks for, at the share of postings that need each level
+CLEARANCE_PHRASES = [
+    (0.05, "Active TS/SCI clearance with polygraph required."),
+    (0.10, "Must hold an active secret clearance."),
+    (0.05, "Confidential clearance required for this role."),
+]
+
+
+def make_resume_text(rng: random.Random, jobs_held: int = 3) -> str:
+    """One plain-text resume with the usual sections, dated roles and a spread of skills"""
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    area = rng.choice(SYNTHETIC_AREAS)
+    skills = rng.sample(TECH_SKILLS, rng.randint(6, 14))
+    lines = [
+        name,
+        f"{name.split()[0].lower()}@example.com | (555) 010-{rng.randint(1000, 9999)}",
+        "",
+        "Professional Summary",
+        f"{area} {rng.choice(SYNTHETIC_ROLES).lower()} with {rng.randint(2, 15)} years of experience "
+        f"building products with {', '.join(skills[:3])}.",
+        "",
+        "Technical Skills",
+        ", ".join(skills),
+        "",
+        "Professional Experience",
+    ]
+    year = 2024
+    for _ in range(jobs_held):
+        start = year - rng.randint(1, 4)
+        end = "Present" if year == 2024 else str(year)
+        title = " ".join(w for w in [rng.choice(SYNTHETIC_SENIORITY), area, rng.choice(SYNTHETIC_ROLES)] if w)
+        lines.append(f"{title}, {rng.choice(SYNTHETIC_COMPANIES)}  {rng.choice(MONTHS)} {start} - {end}")
+        for _ in range(rng.randint(2, 4)):
+            lines.append("- " + rng.choice(ACHIEVEMENTS).format(skill=rng.choice(skills)))
+        lines.append("- " + " ".join(rng.sample(SYNTHETIC_FILLER, 12)))
+        year = start
+    lines += [
+        "",
+        "Projects",
+        f"- Open source {rng.choice(skills)} toolkit used by {rng.randint(10, 900)} developers",
+        "",
+        "Education",
+        f"{rng.choice(DEGREES)}, {rng.choice(SCHOOLS)}, {year - rng.randint(0, 2)}",
+        "",
+        "Certifications",
+        rng.choice(CERTIFICATIONS),
+    ]
+    return "\n".join(lines)
+
+
+def make_resume_texts(count: int, seed: int = 42) -> List[str]:
+    rng = random.Random(seed)
+    return [make_resume_text(rng, jobs_held=rng.randint(2, 5)) for _ in range(count)]
+
+
+def resume_to_docx(text: str) -> bytes:
+    document = Document()
+    for line in text.split("\n"):
+        document.add_paragraph(line)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def resume_to_pdf(text: str, lines_per_page: int = 54) -> bytes:
+    """
+    Minimal single-font PDF (Helvetica, one text object per page). Small and
+    dependency-free, but a real PDF that PyPDF2 parses like any other.
+    """
+    lines = [line.encode("latin-1", "replace").replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+             for line in text.split("\n")]
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+
+    # Object numbers: 1 catalog, 2 page tree, 3 font, then a (page, content) pair per page
+    objects: Dict[int, bytes] = {
+        1: b"<< /Type /Catalog /Pages 2 0 R >>",
+        3: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    }
+    kids = []
+    for i, page_lines in enumerate(pages):
+        page_num, content_num = 4 + 2 * i, 5 + 2 * i
+        kids.append(f"{page_num} 0 R".encode())
+        stream = b"BT /F1 10 Tf 12 TL 50 780 Td\n" + b"".join(b"(" + line + b") Tj T*\n" for line in page_lines) + b"ET"
+        objects[page_num] = (b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                             b"/Resources << /Font << /F1 3 0 R >> >> /Contents " + f"{content_num} 0 R".encode() + b" >>")
+        objects[content_num] = f"<< /Length {len(stream)} >>\nstream\n".encode() + stream + b"\nendstream"
+    objects[2] = b"<< /Type /Pages /Kids [" + b" ".join(kids) + f"] /Count {len(pages)} >>".encode()
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = {}
+    for num in sorted(objects):
+        offsets[num] = out.tell()
+        out.write(f"{num} 0 obj\n".encode() + objects[num] + b"\nendobj\n")
+    xref = out.tell()
+    out.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode())
+    for num in sorted(objects):
+        out.write(f"{offsets[num]:010d} 00000 n \n".encode())
+    out.write(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode())
+    return out.getvalue()
+
+
+def make_resume_files(count: int, seed: int = 42) -> List[Dict]:
+    """Resumes as uploaded files, alternating PDF and DOCX: {"filename", "content", "text"}"""
+    files = []
+    for i, text in enumerate(make_resume_texts(count, seed)):
+        if i % 2:
+            files.append({"filename": f"resume_{i}.docx", "content": resume_to_docx(text), "text": text})
+        else:
+            files.append({"filename": f"resume_{i}.pdf", "content": resume_to_pdf(text), "text": text})
+    return files
+
+
+def make_job_postings(count: int, seed: int = 42) -> List[Dict]:
+    """make_synthetic_jobs plus clearance requirements on a realistic share of postings"""
+    rng = random.Random(seed + 1)
+    jobs = make_synthetic_jobs(count, seed)
+    for job in jobs:
+        roll = rng.random()
+        for share, phrase in CLEARANCE_PHRASES:
+            if roll < share:
+                job["description"] += " " + phrase
+                break
+            roll -= share
+    return jobs
@@ -0,0 +1,194 @@
+"""
+Local stand-in for a Redis server, for exercising CACHE_BACKEND=redis
+without installing one
+
+Speaks RESP2 and implements what services/shared_cache.py uses plus a few
+commands for poking at it by hand: PING, ECHO, AUTH, SELECT, GET, SET
+(EX/PX/NX/XX), DEL, EXISTS, PTTL, DBSIZE, FLUSHDB, FLUSHALL. Data lives in
+memory and expires lazily on access.
+
+Run standalone and point the backend at it:
+    python -m benchmarks.fake_redis --port 6390
+    CACHE_BACKEND=redis CACHE_REDIS_URL=redis://127.0.0.1:6390/0 python serve.py
+"""
+import argparse
+import socketserver
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    request_queue_size = 512  # Many workers connect at once; the default of 5 drops SYNs
+
+
+class FakeRedis:
+    """Threaded RESP server with per-database dicts of (value, expires_at)"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, password: Optional[str] = None):
+        self.password = password
+        self.databases: Dict[int, Dict[bytes, Tuple[bytes, Optional[float]]]] = {}
+        self.commands = 0
+        self._lock = threading.Lock()
+        self._server = _Server((host, port), self._handler_class())
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"redis://{host}:{port}/0"
+
+    def start(self) -> "FakeRedis":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-redis", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler_class(self):
+        store = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                session = {"db": 0, "authed": store.password is None}
+                while True:
+                    try:
+                        args = _read_command(self.rfile)
+                    except (OSError, ValueError):
+                        return
+                    if args is None:
+                        return
+                    self.wfile.write(store.execute(session, args))
+
+        return Handler
+
+    def execute(self, session: Dict, args: List[bytes]) -> bytes:
+        name = args[0].upper().decode()
+        with self._lock:
+            self.commands += 1
+        if name == "AUTH":
+            session["authed"] = len(args) > 1 and args[-1].decode() == self.password
+            return b"+OK\r\n" if session["authed"] else _error("WRONGPASS invalid password")
+        if not session["authed"]:
+            return _error("NOAUTH Authentication required.")
+        handler = getattr(self, f"_cmd_{name.lower()}", None)
+        if handler is None:
+            return _error(f"ERR unknown command '{name}'")
+        try:
+            with self._lock:
+                return handler(session, args[1:])
+        except (IndexError, ValueError):
+            return _error(f"ERR wrong number or type of arguments for '{name}'")
+
+    def _db(self, session: Dict) -> Dict[bytes, Tuple[bytes, Optional[float]]]:
+        return self.databases.setdefault(session["db"], {})
+
+    def _live(self, session: Dict, key: bytes) -> Optional[Tuple[bytes, Optional[float]]]:
+        db = self._db(session)
+        entry = db.get(key)
+        if entry is not None and entry[1] is not None and entry[1] <= time.time():
+            del db[key]
+            return None
+        return entry
+
+    # Commands (called with the lock held)
+
+    def _cmd_ping(self, session, args):
+        return _bulk(args[0]) if args else b"+PONG\r\n"
+
+    def _cmd_echo(self, session, args):
+        return _bulk(args[0])
+
+    def _cmd_select(self, session, args):
+        session["db"] = int(args[0])
+        return b"+OK\r\n"
+
+    def _cmd_get(self, session, args):
+        entry = self._live(session, args[0])
+        return _bulk(entry[0] if entry else None)
+
+    def _cmd_set(self, session, args):
+        key, value, options = args[0], args[1], [a.upper() for a in args[2:]]
+        expires_at = None
+        for flag, scale in ((b"EX", 1.0), (b"PX", 0.001)):
+            if flag in options:
+                expires_at = time.time() + float(options[options.index(flag) + 1]) * scale
+        exists = self._live(session, key) is not None
+        if (b"NX" in options and exists) or (b"XX" in options and not exists):
+            return _bulk(None)
+        self._db(session)[key] = (value, expires_at)
+        return b"+OK\r\n"
+
+    def _cmd_del(self, session, args):
+        removed = sum(1 for key in args if self._live(session, key) is not None and self._db(session).pop(key))
+        return b":%d\r\n" % removed
+
+    def _cmd_exists(self, session, args):
+        return b":%d\r\n" % sum(1 for key in args if self._live(session, key) is not None)
+
+    def _cmd_pttl(self, session, args):
+        entry = self._live(session, args[0])
+        if entry is None:
+            return b":-2\r\n"
+        return b":-1\r\n" if entry[1] is None else b":%d\r\n" % int((entry[1] - time.time()) * 1000)
+
+    def _cmd_dbsize(self, session, args):
+        return b":%d\r\n" % len(self._db(session))
+
+    def _cmd_flushdb(self, session, args):
+        self._db(session).clear()
+        return b"+OK\r\n"
+
+    def _cmd_flushall(self, session, args):
+        self.databases.clear()
+        return b"+OK\r\n"
+
+
+def _read_command(reader) -> Optional[List[bytes]]:
+    line = reader.readline()
+    if not line:
+        return None
+    if not line.startswith(b"*"):
+        return line.split()  # Inline command, as typed into telnet / nc
+    args = []
+    for _ in range(int(line[1:])):
+        header = reader.readline()
+        if not header.startswith(b"$"):
+            raise ValueError("expected bulk string")
+        data = reader.read(int(header[1:]) + 2)
+        args.append(data[:-2])
+    return args
+
+
+def _bulk(value: Optional[bytes]) -> bytes:
+    return b"$-1\r\n" if value is None else b"$%d\r\n%s\r\n" % (len(value), value)
+
+
+def _error(message: str) -> bytes:
+    return f"-{message}\r\n".encode()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6390)
+    parser.add_argument("--password", help="Require AUTH with this password")
+    args = parser.parse_args()
+
+    server = FakeRedis(args.host, args.port, args.password).start()
+    print(f"Fake Redis on {server.url}. Start the backend with:\n")
+    print(f"  export CACHE_BACKEND=redis CACHE_REDIS_URL={server.url}\n")
+    try:
+        while True:
+            time.sleep(10)
+            print(f"  {server.commands} commands, {sum(len(db) for db in server.databases.values())} keys")
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
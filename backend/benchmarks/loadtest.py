@@ -0,0 +1,314 @@
+"""
+End-to-end HTTP load test against local upstream stand-ins
+
+Starts the fake JSearch / amazon.jobs / Greenhouse / Anthropic servers
+(benchmarks/upstreams.py), launches the backend under uvicorn on a throwaway
+database with its base URLs pointed at them, seeds a user, then drives a
+weighted mix of endpoints from concurrent clients over real HTTP. Reports
+requests per second, latency percentiles and error rate per endpoint, plus
+what each fake upstream saw.
+
+Usage (from backend/):
+    python -m benchmarks.loadtest
+    python -m benchmarks.loadtest --duration 60 --concurrency 64 --workers 4
+    python -m benchmarks.loadtest --mix match=5,jobs=1 --upstream jsearch=600:0.1
+    python -m benchmarks.loadtest --target http://127.0.0.1:8000 --token <jwt>
+
+With --target the backend is not started; point it at the fake upstreams
+yourself (python -m benchmarks.upstreams prints the variables to export).
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional
+
+import httpx
+
+from benchmarks.common import BACKEND_DIR, load_sample_jobs, print_table
+from benchmarks.corpus import make_resume_files, make_resume_texts
+from benchmarks.upstreams import add_upstream_arguments, upstreams_from_args
+
+QUERIES = ["software engineer", "python developer", "data scientist", "frontend engineer", "devops engineer",
+           "machine learning engineer", "backend developer", "cloud architect"]
+DEFAULT_MIX = "jobs=3,match=3,suggestions=2,resumes=1,saved_jobs=2,save_job=1,dashboard=1,upload=0.2"
+
+
+class Scenario:
+    """One endpoint in the mix: builds a request from the shared fixtures"""
+
+    def __init__(self, name: str, build: Callable[[random.Random], Dict], auth: bool = False):
+        self.name = name
+        self.build = build
+        self.auth = auth
+
+
+def build_scenarios(resume_texts: List[str], resume_files: List[Dict], jobs: List[Dict]) -> Dict[str, Scenario]:
+    def jobs_request(rng):
+        return {"method": "GET", "url": "/jobs",
+                "params": {"query": rng.choice(QUERIES), "source": rng.choice(["all", "indeed", "aws"]),
+                           "limit": 20, "fields": "summary"}}
+
+    def match_request(rng):
+        return {"method": "POST", "url": "/match",
+                "json": {"resume_text": rng.choice(resume_texts), "query": rng.choice(QUERIES), "limit": 20}}
+
+    def suggestions_request(rng):
+        job = rng.choice(jobs)
+        return {"method": "POST", "url": "/suggestions",
+                "json": {"resume_text": rng.choice(resume_texts), "resume_skills": ["Python", "SQL"],
+                         "job_title": job["title"], "job_description": job["description"],
+                         "job_skills": job["skills"], "matched_skills": job["skills"][:1]}}
+
+    def save_job_request(rng):
+        job = rng.choice(jobs)
+        return {"method": "POST", "url": "/user/saved-jobs",
+                "json": {"job_external_id": str(job["id"]), "title": job["title"], "company": job["company"],
+                         "location": job["location"], "description": job["description"][:500],
+                         "url": job["url"], "source": job["source"], "match_percentage": rng.randint(20, 95),
+                         "matched_skills": job["skills"][:2]}}
+
+    def upload_request(rng):
+        resume = rng.choice(resume_files)
+        content_type = "application/pdf" if resume["filename"].endswith(".pdf") else \
+            "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+        return {"method": "POST", "url": "/user/resumes/upload",
+                "files": {"file": (resume["filename"], resume["content"], content_type)}}
+
+    scenarios = [
+        Scenario("jobs", jobs_request),
+        Scenario("match", match_request),
+        Scenario("suggestions", suggestions_request),
+        Scenario("resumes", lambda rng: {"method": "GET", "url": "/user/resumes"}, auth=True),
+        Scenario("saved_jobs", lambda rng: {"method": "GET", "url": "/user/saved-jobs",
+                                            "params": {"sort": rng.choice(["recent", "match"])}}, auth=True),
+        Scenario("save_job", save_job_request, auth=True),
+        Scenario("dashboard", lambda rng: {"method": "GET", "url": "/user/dashboard"}, auth=True),
+        Scenario("upload", upload_request, auth=True),
+    ]
+    return {scenario.name: scenario for scenario in scenarios}
+
+
+def parse_mix(spec: str, scenarios: Dict[str, Scenario]) -> Dict[str, float]:
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        if name not in scenarios:
+            raise SystemExit(f"Unknown endpoint {name!r} in --mix; choose from {', '.join(scenarios)}")
+        mix[name] = float(weight or 1)
+    return {name: weight for name, weight in mix.items() if weight > 0}
+
+
+class EndpointStats:
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.statuses: Dict[str, int] = {}
+        self.errors = 0
+
+    def record(self, ms: float, status: str, ok: bool) -> None:
+        self.latencies.append(ms)
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        if not ok:
+            self.errors += 1
+
+    def summary(self, elapsed: float) -> Dict:
+        samples = sorted(self.latencies)
+        if not samples:
+            return {"requests": 0}
+
+        def pct(p: float) -> float:
+            return round(samples[min(len(samples) - 1, int(len(samples) * p))], 2)
+
+        return {
+            "requests": len(samples),
+            "rps": round(len(samples) / elapsed, 1),
+            "p50_ms": pct(0.50),
+            "p95_ms": pct(0.95),
+            "p99_ms": pct(0.99),
+            "max_ms": round(samples[-1], 2),
+            "error_rate": round(self.errors / len(samples), 4),
+            "statuses": dict(sorted(self.statuses.items())),
+        }
+
+
+async def drive(base_url: str, token: Optional[str], scenarios: Dict[str, Scenario], mix: Dict[str, float],
+                concurrency: int, duration: float, warmup: float, timeout: float, seed: int) -> Dict:
+    """Run the mix from `concurrency` clients; returns per-endpoint stats over the measured window"""
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    stats = {name: EndpointStats() for name in names}
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        loop_start = time.perf_counter()
+        measure_from = loop_start + warmup
+        stop_at = measure_from + duration
+
+        async def client_loop(worker: int):
+            rng = random.Random(seed * 1000 + worker)
+            while True:
+                start = time.perf_counter()
+                if start >= stop_at:
+                    return
+                scenario = scenarios[rng.choices(names, weights)[0]]
+                request = scenario.build(rng)
+                try:
+                    response = await client.request(headers=headers if scenario.auth else None, **request)
+                    status, ok = str(response.status_code), response.status_code < 400
+                except httpx.HTTPError as e:
+                    status, ok = type(e).__name__, False
+                if start >= measure_from:
+                    stats[scenario.name].record((time.perf_counter() - start) * 1000, status, ok)
+
+        await asyncio.gather(*(client_loop(i) for i in range(concurrency)))
+
+    return {name: endpoint.summary(duration) for name, endpoint in stats.items()}
+
+
+# Local backend
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def seed_user(env: Dict[str, str]) -> str:
+    """Create the schema and a load-test user in the backend's database; returns a bearer token"""
+    os.environ.update(env)
+    from database import SessionLocal, init_db
+    from models.db_models import User
+    from services.auth_service import auth_service
+
+    init_db()
+    with SessionLocal() as db:
+        user = User(email="loadtest@example.com", name="Load Test")
+        db.add(user)
+        db.commit()
+        return auth_service.create_access_token(user.id, user.email)
+
+
+def start_backend(env: Dict[str, str], port: int, workers: int, log_path: str) -> subprocess.Popen:
+    command = [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+               "--workers", str(workers), "--log-level", "warning", "--no-access-log"]
+    with open(log_path, "ab") as log:
+        return subprocess.Popen(command, cwd=BACKEND_DIR, env={**os.environ, **env},
+                                stdout=log, stderr=subprocess.STDOUT)
+
+
+def wait_ready(base_url: str, process: subprocess.Popen, timeout: float = 60) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"Backend exited during startup (status {process.returncode})")
+        try:
+            if httpx.get(f"{base_url}/", timeout=2).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.25)
+    raise SystemExit(f"Backend not ready after {timeout:.0f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=20.0, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=3.0, help="Seconds of load before measuring")
+    parser.add_argument("--concurrency", type=int, default=32, help="Concurrent clients")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Endpoint weights, e.g. match=3,jobs=1")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Client timeout per request in seconds")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes for the backend")
+    parser.add_argument("--no-llm", action="store_true", help="Run the backend without an Anthropic key")
+    parser.add_argument("--target", help="Load an already-running backend instead of starting one")
+    parser.add_argument("--token", help="Bearer token for /user/* endpoints with --target")
+    parser.add_argument("--output", help="Write the report as JSON")
+    add_upstream_arguments(parser)
+    args = parser.parse_args()
+
+    resume_texts = make_resume_texts(50, args.seed)
+    resume_files = make_resume_files(10, args.seed)
+    scenarios = build_scenarios(resume_texts, resume_files, load_sample_jobs())
+    mix = parse_mix(args.mix, scenarios)
+
+    upstreams = upstreams_from_args(args).start()
+    backend = None
+    token = args.token
+    try:
+        if args.target:
+            base_url = args.target.rstrip("/")
+            if not token:
+                mix = {name: weight for name, weight in mix.items() if not scenarios[name].auth}
+                print("No --token given; skipping /user/* endpoints")
+        else:
+            tmp_dir = tempfile.mkdtemp(prefix="applesauce-loadtest-")
+            env = {
+                **upstreams.env(),
+                "DATABASE_URL": f"sqlite:///{os.path.join(tmp_dir, 'loadtest.db')}",
+                "BLOB_STORE_DIR": os.path.join(tmp_dir, "blobs"),
+                "VECTOR_INDEX_DIR": os.path.join(tmp_dir, "vector_index"),
+                "JOB_SNAPSHOT_DIR": os.path.join(tmp_dir, "job_snapshot"),
+                # Workers share one cache, as under serve.py, kept with the rest of the run's files
+                "CACHE_BACKEND": os.getenv("CACHE_BACKEND", "sqlite"),
+                "CACHE_SQLITE_PATH": os.path.join(tmp_dir, "cache.db"),
+                "JWT_SECRET_KEY": "loadtest-secret",
+                "RAPIDAPI_KEY": "loadtest",
+                "ANTHROPIC_API_KEY": "" if args.no_llm else "loadtest",
+                # The fake upstreams are free; quotas would turn most of the run into fallbacks
+                "QUOTA_JSEARCH_MONTHLY": "0",
+                "QUOTA_JSEARCH_PER_MINUTE": "0",
+                "QUOTA_USER_JSEARCH_PER_MINUTE": "0",
+                "QUOTA_ANTHROPIC_MONTHLY": "0",
+                "QUOTA_ANTHROPIC_PER_MINUTE": "0",
+                "QUOTA_USER_ANTHROPIC_PER_MINUTE": "0",
+            }
+            token = seed_user(env)
+            port = _free_port()
+            base_url = f"http://127.0.0.1:{port}"
+            log_path = os.path.join(tmp_dir, "backend.log")
+            backend = start_backend(env, port, args.workers, log_path)
+            wait_ready(base_url, backend)
+            print(f"Backend on {base_url} ({args.workers} worker(s)), log at {log_path}")
+
+        print(f"Fake upstreams on {upstreams.base_url}")
+        print(f"Driving {', '.join(f'{n}={w:g}' for n, w in mix.items())} with {args.concurrency} clients "
+              f"for {args.duration:.0f}s (+{args.warmup:.0f}s warmup)")
+        results = asyncio.run(drive(base_url, token, scenarios, mix, args.concurrency, args.duration,
+                                    args.warmup, args.timeout, args.seed))
+    finally:
+        if backend:
+            backend.terminate()
+            backend.wait(timeout=30)
+        upstreams.stop()
+
+    total = sum(r.get("requests", 0) for r in results.values())
+    errors = sum(round(r["error_rate"] * r["requests"]) for r in results.values() if r.get("requests"))
+    print(f"\n{total} requests in {args.duration:.0f}s: {total / args.duration:.1f} req/s, "
+          f"{errors / total if total else 0:.2%} errors\n")
+    print_table([{"endpoint": name, **r, "statuses": " ".join(f"{s}:{n}" for s, n in r.get("statuses", {}).items())}
+                 for name, r in results.items()],
+                ["endpoint", "requests", "rps", "p50_ms", "p95_ms", "p99_ms", "max_ms", "error_rate", "statuses"])
+    print("\nUpstream calls:")
+    print_table([{"upstream": name, **s, **upstreams.profiles[name].to_dict()} for name, s in upstreams.stats.items()],
+                ["upstream", "requests", "injected_errors", "latency_ms", "error_rate"])
+
+    if args.output:
+        report = {
+            "config": {key: value for key, value in vars(args).items() if key != "token"},
+            "endpoints": results,
+            "upstreams": {name: {**s, **upstreams.profiles[name].to_dict()} for name, s in upstreams.stats.items()},
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
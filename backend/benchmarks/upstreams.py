@@ -0,0 +1,324 @@
+"""
+Local stand-ins for the upstream APIs the backend calls: JSearch, amazon.jobs,
+Greenhouse and the Anthropic Messages API
+
+One threaded HTTP server answers for all four under a path prefix each, so
+the app is pointed at it with:
+
+    JSEARCH_BASE_URL=http://127.0.0.1:<port>/jsearch
+    AMAZON_JOBS_BASE_URL=http://127.0.0.1:<port>/amazon
+    GREENHOUSE_BASE_URL=http://127.0.0.1:<port>/greenhouse
+    ANTHROPIC_BASE_URL=http://127.0.0.1:<port>/anthropic
+
+Job payloads are the postings captured in match_result.json, converted to
+each API's wire format. A directory of recorded responses (jsearch.json,
+amazon.json, greenhouse.json: raw response bodies saved from the real APIs)
+replaces them. Each upstream gets its own latency and error-injection
+profile, and request counts are kept per upstream.
+
+Run standalone to point a dev server at it:
+    python -m benchmarks.upstreams --port 9100 --latency-ms 200 --error-rate 0.05
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import parse_qs, urlparse
+
+from benchmarks.common import load_sample_jobs
+
+UPSTREAMS = ["jsearch", "amazon", "greenhouse", "anthropic"]
+BASE_URL_ENV = {
+    "jsearch": "JSEARCH_BASE_URL",
+    "amazon": "AMAZON_JOBS_BASE_URL",
+    "greenhouse": "GREENHOUSE_BASE_URL",
+    "anthropic": "ANTHROPIC_BASE_URL",
+}
+
+
+class UpstreamProfile:
+    """Latency and failure behaviour of one fake upstream"""
+
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0, error_rate: float = 0.0,
+                 error_status: int = 500):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+
+    def delay(self, rng: random.Random) -> float:
+        return max(0.0, rng.gauss(self.latency_ms, self.jitter_ms) if self.jitter_ms else self.latency_ms) / 1000
+
+    def to_dict(self) -> Dict:
+        return {"latency_ms": self.latency_ms, "jitter_ms": self.jitter_ms,
+                "error_rate": self.error_rate, "error_status": self.error_status}
+
+
+def parse_profile(spec: str, default: UpstreamProfile) -> UpstreamProfile:
+    """'LATENCY_MS[:ERROR_RATE[:STATUS]]', e.g. '800:0.05:429'; omitted parts keep the defaults"""
+    parts = spec.split(":")
+    return UpstreamProfile(
+        latency_ms=float(parts[0]) if parts[0] else default.latency_ms,
+        jitter_ms=default.jitter_ms,
+        error_rate=float(parts[1]) if len(parts) > 1 and parts[1] else default.error_rate,
+        error_status=int(parts[2]) if len(parts) > 2 and parts[2] else default.error_status,
+    )
+
+
+# Wire-format payloads
+
+def _jsearch_payload(jobs) -> Dict:
+    return {"status": "OK", "data": [{
+        "job_id": str(job["id"]),
+        "job_title": job["title"],
+        "employer_name": job["company"],
+        "job_city": (job.get("location") or "").split(",")[0].strip(),
+        "job_state": (job.get("location") or ", ").split(",")[-1].strip(),
+        "job_description": job["description"],
+        "job_apply_link": job["url"],
+        "job_posted_at_datetime_utc": job["posted_date"],
+        "job_salary": job.get("salary"),
+    } for job in jobs]}
+
+
+def _amazon_payload(jobs) -> Dict:
+    return {"hits": len(jobs), "jobs": [{
+        "id_icims": str(job["id"]),
+        "title": job["title"],
+        "location": job.get("location") or "",
+        "description": job["description"],
+        "job_path": f"/en/jobs/{job['id']}",
+        "posted_date": job["posted_date"],
+    } for job in jobs]}
+
+
+def _greenhouse_payload(jobs) -> Dict:
+    return {"jobs": [{
+        "id": int(job["id"]) & ((1 << 53) - 1),
+        "title": job["title"],
+        "location": {"name": job.get("location") or ""},
+        "content": job["description"],
+        "absolute_url": job["url"],
+        "updated_at": job["posted_date"],
+    } for job in jobs]}
+
+
+def load_payloads(directory: Optional[str] = None) -> Dict[str, Dict]:
+    """Response bodies per job upstream, from recorded files where present"""
+    jobs = load_sample_jobs()
+    payloads = {
+        "jsearch": _jsearch_payload(jobs),
+        "amazon": _amazon_payload(jobs),
+        "greenhouse": _greenhouse_payload(jobs),
+    }
+    if directory:
+        for name in payloads:
+            path = os.path.join(directory, f"{name}.json")
+            if os.path.exists(path):
+                with open(path, encoding="utf-8") as f:
+                    payloads[name] = json.load(f)
+    return payloads
+
+
+def _vary_ids(payload: Dict, key: str, id_field: str, query: str) -> Dict:
+    """Same postings with IDs derived from the query, so different searches grow the job pool"""
+    if not query:
+        return payload
+    varied = []
+    for job in payload.get(key, []):
+        job = dict(job)
+        digest = hashlib.blake2b(f"{job.get(id_field)}:{query}".encode(), digest_size=6).digest()
+        job[id_field] = int.from_bytes(digest, "big") if isinstance(job.get(id_field), int) else digest.hex()
+        varied.append(job)
+    return {**payload, key: varied}
+
+
+# Canned Messages API replies, picked by what the prompt asks for
+
+def _llm_reply(prompt: str, rng: random.Random) -> str:
+    if "JSON array of skill names" in prompt:
+        return json.dumps(rng.sample(["Python", "SQL", "Docker", "Kubernetes", "React", "AWS", "Terraform",
+                                      "GraphQL", "Kafka", "Spark"], 5))
+    if '"priority"' in prompt:
+        return json.dumps([
+            {"priority": "high", "title": "Highlight the missing core skills",
+             "action": "Add a project that uses the job's required stack end to end."},
+            {"priority": "medium", "title": "Quantify your recent impact",
+             "action": "Attach a metric to each bullet in your latest role."},
+            {"priority": "low", "title": "Tailor the professional summary",
+             "action": "Open the summary with the role title and your strongest matching skill."},
+        ])
+    if "quality assessment" in prompt:
+        return json.dumps({"score": rng.randint(55, 95),
+                           "strengths": ["Clear structure", "Relevant experience"],
+                           "improvements": ["Quantify achievements", "Tighten the summary"],
+                           "ats_friendly": True})
+    return "OK"
+
+
+class FakeUpstreams:
+    """The stand-in server plus its per-upstream counters"""
+
+    def __init__(self, profiles: Dict[str, UpstreamProfile], payloads: Dict[str, Dict],
+                 host: str = "127.0.0.1", port: int = 0, seed: int = 0):
+        self.profiles = profiles
+        self.payloads = payloads
+        self.stats = {name: {"requests": 0, "injected_errors": 0} for name in UPSTREAMS}
+        self._lock = threading.Lock()
+        self._rng = random.Random(seed)
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def env(self) -> Dict[str, str]:
+        """Environment variables that point the app at these stand-ins"""
+        return {var: f"{self.base_url}/{name}" for name, var in BASE_URL_ENV.items()}
+
+    def start(self) -> "FakeUpstreams":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-upstreams", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _draw(self, upstream: str):
+        """Count a request and decide its delay and whether it fails"""
+        profile = self.profiles[upstream]
+        with self._lock:
+            self.stats[upstream]["requests"] += 1
+            delay = profile.delay(self._rng)
+            fail = self._rng.random() < profile.error_rate
+            if fail:
+                self.stats[upstream]["injected_errors"] += 1
+            reply_rng = random.Random(self._rng.random())
+        return delay, fail, profile.error_status, reply_rng
+
+    def _handler_class(self):
+        upstreams = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status: int, body: Dict) -> None:
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _route(self, method: str) -> None:
+                url = urlparse(self.path)
+                upstream, _, path = url.path.lstrip("/").partition("/")
+                if upstream not in upstreams.profiles:
+                    self._send(404, {"error": f"unknown upstream {upstream!r}"})
+                    return
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+
+                delay, fail, error_status, rng = upstreams._draw(upstream)
+                time.sleep(delay)
+                if fail:
+                    self._send(error_status, {"type": "error", "error": {"type": "injected", "message": "injected failure"}})
+                    return
+
+                query = parse_qs(url.query)
+                if upstream == "jsearch" and method == "GET" and path == "search":
+                    payload = _vary_ids(upstreams.payloads["jsearch"], "data", "job_id", query.get("query", [""])[0])
+                elif upstream == "amazon" and method == "GET" and path == "en/search.json":
+                    payload = _vary_ids(upstreams.payloads["amazon"], "jobs", "id_icims", query.get("search", [""])[0])
+                elif upstream == "greenhouse" and method == "GET" and path.endswith("/jobs"):
+                    payload = upstreams.payloads["greenhouse"]
+                elif upstream == "anthropic" and method == "POST" and path == "v1/messages":
+                    payload = self._message(json.loads(body or b"{}"), rng)
+                else:
+                    self._send(404, {"error": f"no route for {method} /{upstream}/{path}"})
+                    return
+                self._send(200, payload)
+
+            def _message(self, request: Dict, rng: random.Random) -> Dict:
+                prompt = "".join(
+                    message["content"] if isinstance(message.get("content"), str)
+                    else "".join(part.get("text", "") for part in message.get("content", []))
+                    for message in request.get("messages", [])
+                )
+                text = _llm_reply(prompt, rng)
+                return {
+                    "id": f"msg_{rng.getrandbits(64):016x}",
+                    "type": "message",
+                    "role": "assistant",
+                    "model": request.get("model", "fake"),
+                    "content": [{"type": "text", "text": text}],
+                    "stop_reason": "end_turn",
+                    "stop_sequence": None,
+                    "usage": {"input_tokens": len(prompt) // 4, "output_tokens": len(text) // 4},
+                }
+
+            def do_GET(self):
+                self._route("GET")
+
+            def do_POST(self):
+                self._route("POST")
+
+        return Handler
+
+
+def add_upstream_arguments(parser: argparse.ArgumentParser) -> None:
+    group = parser.add_argument_group("fake upstreams")
+    group.add_argument("--latency-ms", type=float, default=150.0, help="Mean upstream response time")
+    group.add_argument("--jitter-ms", type=float, default=50.0, help="Standard deviation of upstream response time")
+    group.add_argument("--error-rate", type=float, default=0.0, help="Share of upstream calls that fail")
+    group.add_argument("--error-status", type=int, default=500)
+    group.add_argument("--upstream", action="append", default=[], metavar="NAME=LATENCY[:ERRORS[:STATUS]]",
+                       help=f"Per-upstream override ({', '.join(UPSTREAMS)}), e.g. anthropic=900:0.05:529")
+    group.add_argument("--payloads", help="Directory of recorded responses (jsearch.json, amazon.json, greenhouse.json)")
+
+
+def upstreams_from_args(args, port: int = 0) -> FakeUpstreams:
+    default = UpstreamProfile(args.latency_ms, args.jitter_ms, args.error_rate, args.error_status)
+    profiles = {name: default for name in UPSTREAMS}
+    for override in args.upstream:
+        name, _, spec = override.partition("=")
+        if name not in profiles:
+            raise SystemExit(f"Unknown upstream {name!r}; choose from {', '.join(UPSTREAMS)}")
+        profiles[name] = parse_profile(spec, default)
+    return FakeUpstreams(profiles, load_payloads(args.payloads), port=port)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=9100)
+    add_upstream_arguments(parser)
+    args = parser.parse_args()
+
+    upstreams = upstreams_from_args(args, port=args.port).start()
+    print("Fake upstreams running. Start the backend with:\n")
+    for var, value in upstreams.env().items():
+        print(f"  export {var}={value}")
+    print("  export RAPIDAPI_KEY=loadtest ANTHROPIC_API_KEY=loadtest\n")
+    try:
+        while True:
+            time.sleep(10)
+            print("  ".join(f"{name}: {s['requests']} req / {s['injected_errors']} err"
+                            for name, s in upstreams.stats.items()))
+    except KeyboardInterrupt:
+        upstreams.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,27 +1,133 @@
 """Database configuration and session management"""
+import hashlib
+import logging
 import os
-from sqlalchemy import create_engine
+from datetime import datetime
+
+from sqlalchemy import create_engine, delete, event, func, insert, inspect, select, text
+from sqlalchemy.exc import OperationalError, ProgrammingError
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from services.metrics import instrument_engine
+
+logger = logging.getLogger(__name__)
 
 # SQLite database file location
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./applesauce.db")
 
-# Create engine with SQLite-specific settings
+
+def _shared_memory_url(url: str) -> str:
+    """
+    Give an in-memory SQLite URL a name and shared cache, so the blocking and
+    async engines (separate connections) open the same database rather than
+    one empty database each
+    """
+    if url in ("sqlite://", "sqlite:///:memory:"):
+        return f"sqlite:///file:applesauce-{os.getpid()}?mode=memory&cache=shared&uri=true"
+    if url.startswith("sqlite") and "mode=memory" in url and "cache=shared" not in url:
+        return url + "&cache=shared"
+    return url
+
+
+DATABASE_URL = _shared_memory_url(DATABASE_URL)
+
+
+def _async_url(url: str) -> str:
+    """Map a sync database URL onto its asyncio driver (aiosqlite / asyncpg)"""
+    if url.startswith("sqlite:"):
+        return "sqlite+aiosqlite:" + url[len("sqlite:"):]
+    for prefix in ("postgresql+psycopg2:", "postgresql:", "postgres:"):
+        if url.startswith(prefix):
+            return "postgresql+asyncpg:" + url[len(prefix):]
+    return url
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", _async_url(DATABASE_URL))
+
+IS_SQLITE = DATABASE_URL.startswith("sqlite")
+IS_SQLITE_MEMORY = IS_SQLITE and "mode=memory" in DATABASE_URL
+
+# SQLite performance profile, applied to every new connection.
+# "production" enables WAL so readers don't block on writers; "default" leaves SQLite's stock settings.
+SQLITE_PROFILE = os.getenv("SQLITE_PROFILE", "production")
+SQLITE_PRAGMAS = {
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),  # Wait for locks instead of failing
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),  # Safe with WAL, far fewer fsyncs than FULL
+    "cache_size": int(os.getenv("SQLITE_CACHE_SIZE", "-65536")),  # Negative = KiB, so 64 MB page cache
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+    "temp_store": os.getenv("SQLITE_TEMP_STORE", "MEMORY"),
+}
+
+# "auto" skips the create_all/column/index checks on startup when the stored schema version
+# matches the models; "always" runs them every time
+SCHEMA_CHECK = os.getenv("SCHEMA_CHECK", "auto")
+
+# Connection pool sizing
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+
+
+def apply_sqlite_pragmas(dbapi_connection, pragmas: dict = SQLITE_PRAGMAS, memory: bool = False):
+    """Run PRAGMA statements on a freshly opened SQLite connection"""
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            if memory and name in ("journal_mode", "mmap_size"):
+                continue  # Not applicable to in-memory databases
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+def _on_sqlite_connect(dbapi_connection, connection_record):
+    apply_sqlite_pragmas(dbapi_connection, memory=IS_SQLITE_MEMORY)
+
+
+def _engine_options() -> dict:
+    """Pool options shared by the blocking and async engines"""
+    if IS_SQLITE_MEMORY:
+        # One connection per engine: the database lives as long as a connection to it is open
+        return {"poolclass": StaticPool}
+    return {"pool_size": DB_POOL_SIZE, "max_overflow": DB_MAX_OVERFLOW, "pool_timeout": DB_POOL_TIMEOUT}
+
+
+# Create engine with SQLite-specific settings (blocking API, used by scripts and background jobs)
 engine = create_engine(
     DATABASE_URL,
-    connect_args={"check_same_thread": False}  # Required for SQLite
+    connect_args={"check_same_thread": False} if IS_SQLITE else {},  # Required for SQLite
+    **_engine_options()
 )
 
-# Session factory
+# Async engine for request handlers, so queries don't block the event loop
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **_engine_options())
+
+if IS_SQLITE and SQLITE_PROFILE == "production":
+    event.listen(engine, "connect", _on_sqlite_connect)
+    event.listen(async_engine.sync_engine, "connect", _on_sqlite_connect)
+
+# Statement timings for /metrics and slow-request breakdowns
+instrument_engine(engine, "sync")
+instrument_engine(async_engine.sync_engine, "async")
+
+# Session factories
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    expire_on_commit=False,  # Attribute access after commit would otherwise need an await
+)
 
 # Base class for models
 Base = declarative_base()
 
 
 def get_db():
-    """Dependency for getting database sessions in FastAPI endpoints"""
+    """Dependency for getting blocking database sessions"""
     db = SessionLocal()
     try:
         yield db
@@ -29,7 +135,135 @@ def get_db():
         db.close()
 
 
+async def get_async_db():
+    """Dependency for getting async database sessions in FastAPI endpoints"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 def init_db():
     """Initialize database tables"""
     from models import db_models  # Import to register models
+    version = schema_version()
+    if SCHEMA_CHECK != "always" and _stored_schema_version() == version:
+        return
     Base.metadata.create_all(bind=engine)
+    _add_missing_columns()
+    _ensure_indexes()
+    _store_schema_version(version)
+
+
+def schema_version() -> str:
+    """Fingerprint of the tables, columns and indexes the models declare"""
+    parts = []
+    for table in Base.metadata.sorted_tables:
+        for column in table.columns:
+            column_type = column.type.compile(dialect=engine.dialect)
+            parts.append(f"{table.name}.{column.name} {column_type} nullable={column.nullable}")
+        for index in table.indexes:
+            expressions = ",".join(str(expression) for expression in index.expressions)
+            parts.append(f"{table.name} index {index.name} ({expressions}) unique={index.unique}")
+    return hashlib.sha256("\n".join(sorted(parts)).encode()).hexdigest()[:32]
+
+
+def _stored_schema_version():
+    try:
+        with engine.connect() as conn:
+            # Plain SQL: the first compiled statement of a process costs more than the whole check
+            return conn.execute(text("SELECT version FROM schema_version WHERE id = 1")).scalar()
+    except (OperationalError, ProgrammingError):
+        return None  # New database, or one created before versions were stored
+
+
+def _store_schema_version(version: str):
+    from models.db_models import SchemaVersion
+    with engine.begin() as conn:
+        conn.execute(delete(SchemaVersion))
+        conn.execute(insert(SchemaVersion).values(id=1, version=version))
+
+
+def _add_missing_columns():
+    """Add nullable columns introduced after a table was created (create_all won't alter tables)"""
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing or not column.nullable:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+
+
+def _ensure_indexes():
+    """
+    Create indexes added to models after their tables already existed
+    (create_all skips those). A failure propagates, so init_db doesn't
+    record the schema as current.
+    """
+    inspector = inspect(engine)
+    for table in Base.metadata.sorted_tables:
+        existing = {index["name"] for index in inspector.get_indexes(table.name)} if inspector.has_table(table.name) else set()
+        for index in table.indexes:
+            if index.name in existing:
+                continue
+            if index.name == "uq_saved_jobs_user_title_company":
+                _merge_duplicate_saved_jobs()
+            index.create(bind=engine, checkfirst=True)
+
+
+# Saved-job fields carried over from duplicates, newest non-empty value first
+_MERGED_SAVED_JOB_FIELDS = ("job_external_id", "location", "description", "url", "source", "match_percentage",
+                            "matched_skills", "status", "notes", "applied_at", "updated_at")
+
+
+def _merge_duplicate_saved_jobs():
+    """
+    Fold saved jobs repeating a (user, title, company) into the oldest one,
+    before the unique index over those columns is created. The kept row takes
+    each field from the most recently updated duplicate that has it, and their
+    stored match scores unless it has its own for that resume.
+    """
+    from models.db_models import MatchScore, SavedJob
+    from services.match_scores import saved_job_key
+
+    with SessionLocal() as db:
+        groups = db.execute(
+            select(SavedJob.user_id, SavedJob.title, SavedJob.company)
+            .group_by(SavedJob.user_id, SavedJob.title, SavedJob.company)
+            .having(func.count() > 1)
+        ).all()
+        removed = 0
+        for user_id, title, company in groups:
+            rows = db.query(SavedJob).filter(
+                SavedJob.user_id == user_id, SavedJob.title == title, SavedJob.company == company
+            ).all()
+            kept = min(rows, key=lambda row: row.id)
+            newest_first = sorted(rows, key=lambda row: (row.updated_at or row.created_at or datetime.min, row.id),
+                                  reverse=True)
+            for field in _MERGED_SAVED_JOB_FIELDS:
+                value = next((getattr(row, field) for row in newest_first if getattr(row, field) not in (None, "", [])),
+                             getattr(kept, field))
+                setattr(kept, field, value)
+
+            kept_key = saved_job_key(kept.id)
+            scored = {(score.resume_id, score.scorer_version)
+                      for score in db.query(MatchScore).filter(MatchScore.job_id == kept_key)}
+            for row in newest_first:
+                if row is kept:
+                    continue
+                for score in db.query(MatchScore).filter(MatchScore.job_id == saved_job_key(row.id)):
+                    if (score.resume_id, score.scorer_version) in scored:
+                        db.delete(score)
+                    else:
+                        score.job_id = kept_key
+                        scored.add((score.resume_id, score.scorer_version))
+                db.delete(row)
+                removed += 1
+            db.flush()
+        db.commit()
+    if removed:
+        logger.warning("Merged %d duplicate saved_jobs rows into %d before creating "
+                       "uq_saved_jobs_user_title_company", removed, len(groups))
@@ -1,16 +1,42 @@
-from fastapi import FastAPI, UploadFile, File
+from typing import Optional
+from fastapi import FastAPI, UploadFile, File, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from services.resume_parser import parse_resume_structured
 from services.job_matcher import match_jobs, get_suggestions
 from services.job_api_service import job_api_service
 from services.clearance_filter import clearance_filter, ClearanceLevel
 from services.llm_service import llm_service
+from services.match_scores import match_score_service
+from services.task_queue import task_queue
+from services.cache_warmer import cache_warmer
+from services.job_snapshot import job_snapshots
+from services.semantic_search import semantic_search
+from services.job_pool import job_pool
+from services.retrieval import retrieval_pipeline
+from services.pagination import paginate, parse_fields, project_fields, InvalidCursor
 from routes.auth import router as auth_router
 from routes.user import router as user_router
+from routes.admin import router as admin_router
 from database import init_db
+from responses import FastJSONResponse
+from middleware.compression import CompressionMiddleware
+from middleware.timing import RequestTimingMiddleware
+from middleware.profiling import RequestProfilerMiddleware
+from middleware.quota import QuotaClientMiddleware
+from services.metrics import metrics
+from services.quota import quota_governor
+from services.profiling import run_in_threadpool
 import json
 
-app = FastAPI(title="AppleSauce API", description="Resume matching and job search API")
+app = FastAPI(
+    title="AppleSauce API",
+    description="Resume matching and job search API",
+    default_response_class=FastJSONResponse,
+)
+
+# Compress large responses (brotli or gzip, whichever the client accepts)
+app.add_middleware(CompressionMiddleware)
 
 app.add_middleware(
     CORSMiddleware,
@@ -19,20 +45,42 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Paid upstream calls count against the caller's rate limit (services/quota.py)
+app.add_middleware(QuotaClientMiddleware)
+
+# Admins can send X-Profile: 1 to get a cProfile of a single request
+app.add_middleware(RequestProfilerMiddleware)
+
+# Outermost, so request timings include compression and CORS handling
+app.add_middleware(RequestTimingMiddleware)
+
 # Include routers
 app.include_router(auth_router)
 app.include_router(user_router)
+app.include_router(admin_router)
 
 # Initialize database on startup
 @app.on_event("startup")
 async def startup_event():
     init_db()
+    task_queue.start()
+    cache_warmer.start(ingest=_ingest_jobs)
+    job_snapshots.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    task_queue.stop()
+    cache_warmer.stop()
+    job_snapshots.stop()
+    semantic_search.flush()
+    quota_governor.flush()
 
 @app.post("/upload-resume")
 async def upload_resume(file: UploadFile = File(...)):
     """Upload and parse a resume (PDF or DOCX), returning structured data"""
     content = await file.read()
-    result = parse_resume_structured(content, file.filename)
+    # PDF/DOCX parsing is CPU-bound, keep it off the event loop
+    result = await run_in_threadpool(parse_resume_structured, content, file.filename)
 
     return {
         "filename": file.filename,
@@ -43,33 +91,60 @@ async def upload_resume(file: UploadFile = File(...)):
         "message": "Resume parsed successfully" if "error" not in result else result["error"]
     }
 
+def _fetch_jobs(query: str, source: str) -> list:
+    """Fetch jobs for a query from the requested source(s)"""
+    cache_warmer.record(query, source)
+    jobs = job_api_service.search(query, source)
+    _ingest_jobs(jobs)
+    return jobs
+
+def _ingest_jobs(jobs: list) -> None:
+    """Feed fetched jobs to the background consumers (none of these block the request)"""
+    job_pool.schedule_add_jobs(jobs)
+    # Precompute match scores for newly seen jobs against active primary resumes
+    match_score_service.schedule_catalog_jobs(jobs)
+    semantic_search.schedule_index_jobs(jobs)
+
+def _limit_param(data: dict, default: int, maximum: int) -> int:
+    """`limit` from a JSON request body, clamped to 1..maximum"""
+    try:
+        limit = int(data.get("limit", default))
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="limit must be an integer")
+    return max(1, min(limit, maximum))
+
+def _page_response(jobs: list, limit: Optional[int], cursor: Optional[str], fields: Optional[str],
+                   with_clearance: bool = False) -> dict:
+    """Apply cursor pagination and field projection to a job list, converting the page to dicts"""
+    try:
+        page, next_cursor = paginate(jobs, limit, cursor)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return {
+        "jobs": project_fields(page, parse_fields(fields), with_clearance),
+        "next_cursor": next_cursor,
+    }
+
 @app.get("/jobs/clearance")
-async def get_jobs_by_clearance(level: str = "none", query: str = "engineer", source: str = "all"):
+async def get_jobs_by_clearance(
+    level: str = "none",
+    query: str = "engineer",
+    source: str = "all",
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+):
     """
     Get job listings filtered by security clearance level
     
     - level: "none", "confidential", "secret", "top_secret"
     - query: Search keywords (e.g., "python developer", "data scientist")
     - source: "indeed", "aws", "netflix", "microsoft", "all"
+    - limit / cursor: Page size and the `next_cursor` from the previous page
+    - fields: Comma-separated fields to return, or "summary" for list views
     """
-    # Get jobs using existing endpoint logic
-    jobs = []
-    
-    if source == "all" or source == "indeed":
-        indeed_jobs = job_api_service.search_indeed_jobs(query)
-        jobs.extend(indeed_jobs)
-    
-    if source == "all" or source in ["aws", "amazon"]:
-        aws_jobs = job_api_service.search_company_careers("aws", query)
-        jobs.extend(aws_jobs)
-    
-    if source == "all" or source == "netflix":
-        netflix_jobs = job_api_service.search_company_careers("netflix", query)
-        jobs.extend(netflix_jobs)
-    
-    if source == "all" or source == "microsoft":
-        microsoft_jobs = job_api_service.search_company_careers("microsoft", query)
-        jobs.extend(microsoft_jobs)
+    jobs = await run_in_threadpool(_fetch_jobs, query, source)
     
     # Filter by clearance level
     try:
@@ -79,65 +154,133 @@ async def get_jobs_by_clearance(level: str = "none", query: str = "engineer", so
     
     filtered_jobs = clearance_filter.filter_jobs_by_clearance(jobs, clearance_level)
     
-    return {
-        "jobs": filtered_jobs, 
+    return FastJSONResponse({
+        **_page_response(filtered_jobs, limit, cursor, fields, with_clearance=True),
         "count": len(filtered_jobs), 
         "query": query,
         "clearance_level": level
-    }
+    })
 
 @app.get("/jobs")
-async def get_jobs(query: str = "software engineer", source: str = "all"):
+async def get_jobs(
+    query: str = "software engineer",
+    source: str = "all",
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+):
     """
     Get job listings from multiple sources
     
     - query: Search keywords (e.g., "python developer", "data scientist")
     - source: "indeed", "aws", "netflix", "microsoft", "all"
+    - limit / cursor: Page size and the `next_cursor` from the previous page
+    - fields: Comma-separated fields to return, or "summary" for list views
     """
-    jobs = []
-    
-    if source == "all" or source == "indeed":
-        # Fetch from Indeed/JSearch
-        indeed_jobs = job_api_service.search_indeed_jobs(query)
-        jobs.extend(indeed_jobs)
-    
-    if source == "all" or source in ["aws", "amazon"]:
-        aws_jobs = job_api_service.search_company_careers("aws", query)
-        jobs.extend(aws_jobs)
-    
-    if source == "all" or source == "netflix":
-        netflix_jobs = job_api_service.search_company_careers("netflix", query)
-        jobs.extend(netflix_jobs)
-    
-    if source == "all" or source == "microsoft":
-        microsoft_jobs = job_api_service.search_company_careers("microsoft", query)
-        jobs.extend(microsoft_jobs)
-    
-    return {"jobs": jobs, "count": len(jobs), "query": query}
+    jobs = await run_in_threadpool(_fetch_jobs, query, source)
+    return FastJSONResponse({**_page_response(jobs, limit, cursor, fields), "count": len(jobs), "query": query})
 
 @app.get("/jobs/company/{company}")
-async def get_company_jobs(company: str, keywords: str = ""):
+async def get_company_jobs(
+    company: str,
+    keywords: str = "",
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+):
     """
     Get jobs from specific company
     
     Supported companies: aws, netflix, microsoft, oracle, l3harris, openai
     """
-    jobs = job_api_service.search_company_careers(company, keywords)
-    return {"jobs": jobs, "company": company, "count": len(jobs)}
+    cache_warmer.record(keywords, company)
+    jobs = await run_in_threadpool(job_api_service.search_company_careers, company, keywords)
+    _ingest_jobs(jobs)
+    return FastJSONResponse({**_page_response(jobs, limit, cursor, fields), "company": company, "count": len(jobs)})
+
+@app.get("/jobs/{job_id}")
+async def get_job_detail(job_id: int):
+    """Get the full posting (including description) for a job returned by a list endpoint"""
+    job = await run_in_threadpool(job_api_service.get_job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found. Refresh the job list and try again.")
+    return FastJSONResponse(job.to_dict())
 
 @app.post("/match")
 async def match_resume(data: dict):
-    """Match resume text to jobs and return scored results"""
+    """
+    Match resume text to jobs and return scored results
+
+    Candidates come from the local job pool (every job fetched so far),
+    plus the live results for `query`. With a pool snapshot open the
+    weighted scorer ranks the whole pool; otherwise it ranks a shortlist
+    retrieved by the resume's skills and title words.
+
+    Request body:
+    - resume_text: Full resume text
+    - skills: Pre-extracted skills from resume (optional)
+    - query: Live search query (default "software engineer")
+    - limit: Number of matches to return (default 50)
+    - clearance_level: Only jobs requiring "confidential", "secret" or "top_secret" (optional)
+    """
     resume_text = data.get("resume_text", "")
     resume_skills = data.get("skills", [])  # Pre-extracted skills from resume
     query = data.get("query", "software engineer")
+    limit = _limit_param(data, 50, 200)
+    try:
+        clearance_level = ClearanceLevel(str(data.get("clearance_level") or "none").lower()).value
+    except ValueError:
+        clearance_level = ClearanceLevel.NONE.value
+
+    # Live results keep the pool fresh and are always part of the shortlist
+    cache_warmer.record(query, "indeed")
+    live_jobs = await run_in_threadpool(job_api_service.search_indeed_jobs, query)
+    _ingest_jobs(live_jobs)
+
+    result = await run_in_threadpool(retrieval_pipeline.match, resume_text, resume_skills, limit, live_jobs,
+                                     clearance_level)
+    matches = [match.to_dict() for match in result["matches"]]
+    # Job dicts are plain JSON types, so skip FastAPI's generic encoder
+    return FastJSONResponse({**result, "matches": matches, "count": len(matches)})
+
+@app.get("/match/stats")
+async def match_stats():
+    """Per-stage latency, candidate recall samples and pool size for the matching pipeline"""
+    return retrieval_pipeline.stats()
+
+@app.get("/metrics")
+async def get_metrics():
+    """Prometheus text format: request, stage, DB query and LLM token metrics for this process"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.post("/match/semantic")
+async def match_resume_semantic(data: dict):
+    """
+    Match a resume against every indexed job using embeddings
+
+    Retrieves the nearest jobs from the vector index, then re-ranks that
+    shortlist with the weighted scorer plus the embedding similarity.
+
+    Request body:
+    - resume_text: Full resume text
+    - skills: Pre-extracted skills from resume (optional)
+    - limit: Number of matches to return (default 20)
+    """
+    if not semantic_search.is_available():
+        raise HTTPException(status_code=503, detail="Semantic matching is not available (requires numpy)")
+
+    resume_text = data.get("resume_text", "")
+    resume_skills = data.get("skills", [])
+    limit = _limit_param(data, 20, 100)
 
-    # Get jobs
-    jobs = job_api_service.search_indeed_jobs(query)
+    def rank():
+        shortlist = semantic_search.shortlist(resume_text, resume_skills, k=limit * 5)
+        jobs = job_pool.get_jobs([int(job_id) for job_id, _ in shortlist])
+        similarities = {int(job_id): similarity for job_id, similarity in shortlist}
+        return match_jobs(resume_text, jobs, resume_skills or None, semantic_scores=similarities)[:limit]
 
-    # Match and score with weighted algorithm
-    matches = match_jobs(resume_text, jobs, resume_skills if resume_skills else None)
-    return {"matches": matches, "count": len(matches)}
+    matches = [match.to_dict() for match in await run_in_threadpool(rank)]
+    return FastJSONResponse({"matches": matches, "count": len(matches)})
 
 @app.post("/suggestions")
 async def get_job_suggestions(data: dict):
@@ -159,8 +302,10 @@ async def get_job_suggestions(data: dict):
     job_skills = data.get("job_skills", [])
     matched_skills = data.get("matched_skills", [])
 
-    # Use LLM service to generate personalized suggestions
-    suggestions = llm_service.generate_job_suggestions(
+    # Use LLM service to generate personalized suggestions (blocking: the API call,
+    # the quota ledger and waiting on another worker's cache refresh)
+    suggestions = await run_in_threadpool(
+        llm_service.generate_job_suggestions,
         resume_text=resume_text,
         resume_skills=resume_skills,
         job_title=job_title,
@@ -186,7 +331,7 @@ async def analyze_resume(data: dict):
     resume_text = data.get("resume_text", "")
     sections = data.get("sections", {})
 
-    analysis = llm_service.analyze_resume_quality(resume_text, sections)
+    analysis = await run_in_threadpool(llm_service.analyze_resume_quality, resume_text, sections)
 
     return {
         "analysis": analysis,
@@ -0,0 +1,73 @@
+"""Opt-in cProfile of a single request, for admins sending an X-Profile header"""
+import time
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from services.auth_service import auth_service
+from services.profiling import profiler
+
+PROFILE_HEADER = "x-profile"
+
+
+class RequestProfilerMiddleware:
+    """
+    Profile a request with cProfile when it carries `X-Profile: 1` and an
+    admin's bearer token. The response gets an X-Profile-Id header; the
+    summary is at GET /admin/profiles/{id}. Work handed to the threadpool via
+    services.profiling.run_in_threadpool is included.
+
+    cProfile sees the whole event loop thread, so other requests interleaved
+    with the profiled one show up in its stats; only one request is profiled
+    at a time (X-Profile: busy otherwise).
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        if headers.get(PROFILE_HEADER, "").lower() not in ("1", "true", "yes") or not self._is_admin(headers):
+            await self.app(scope, receive, send)
+            return
+
+        started = profiler.begin_request(scope["method"], scope["path"])
+        if started is None:
+            await self.app(scope, receive, self._with_header(send, "X-Profile", "busy"))
+            return
+
+        request, handle, token = started
+        status = {"code": 500}
+        send_with_id = self._with_header(send, "X-Profile-Id", request.id)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send_with_id(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.end_request(request, handle, token, status["code"], (time.perf_counter() - start) * 1000)
+
+    @staticmethod
+    def _is_admin(headers: Headers) -> bool:
+        authorization = headers.get("authorization", "")
+        if not authorization:
+            return False
+        token = authorization[7:] if authorization.startswith("Bearer ") else authorization
+        token_data = auth_service.verify_token(token)
+        return bool(token_data) and auth_service.is_admin(token_data.get("email"))
+
+    @staticmethod
+    def _with_header(send: Send, name: str, value: str) -> Send:
+        async def wrapped(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append(name, value)
+            await send(message)
+        return wrapped
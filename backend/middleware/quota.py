@@ -0,0 +1,28 @@
+"""Attribute paid upstream calls to the request's caller, for per-user quota buckets"""
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from services.quota import reset_quota_client, set_quota_client
+
+
+class QuotaClientMiddleware:
+    """
+    Record who is calling (bearer token, else client address) for
+    services.quota. The token is only verified if the request ends up
+    making a paid upstream call.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        client = scope.get("client")
+        token = set_quota_client(Headers(scope=scope).get("authorization", ""), client[0] if client else "")
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            reset_quota_client(token)
@@ -0,0 +1,58 @@
+"""Request timing: latency histograms per route and a stage breakdown for slow requests"""
+import os
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from services.metrics import end_trace, metrics, start_trace
+
+# Requests slower than this are logged with their per-stage breakdown (0 disables the log)
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "1000"))
+
+http_request_seconds = metrics.histogram(
+    "applesauce_http_request_seconds", "HTTP request handling time", ("method", "route", "status")
+)
+
+
+class RequestTimingMiddleware:
+    """
+    Time each HTTP request and collect the spans recorded while handling it
+    (upstream calls, parsing, matching stages, LLM calls, DB statements).
+    Requests over SLOW_REQUEST_MS are printed with that breakdown.
+    """
+
+    def __init__(self, app: ASGIApp, slow_request_ms: float = SLOW_REQUEST_MS) -> None:
+        self.app = app
+        self.slow_request_ms = slow_request_ms
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = {"code": 500}
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        trace, token = start_trace()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            seconds = time.perf_counter() - start
+            end_trace(token)
+            # Route template rather than the raw path, so IDs don't explode the label set
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            http_request_seconds.observe(seconds, method=scope["method"], route=route, status=str(status["code"]))
+            if self.slow_request_ms and seconds * 1000 >= self.slow_request_ms:
+                print(f"Slow request: {scope['method']} {scope['path']} {status['code']} "
+                      f"{seconds * 1000:.1f} ms [{format_trace(trace)}]")
+
+
+def format_trace(trace) -> str:
+    """'stage calls x total ms' entries, slowest first"""
+    stages = sorted(trace.items(), key=lambda item: item[1][1], reverse=True)
+    return ", ".join(f"{name} {calls}x {ms:.1f}ms" for name, (calls, ms) in stages) or "no spans"
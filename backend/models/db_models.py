@@ -1,7 +1,7 @@
 """Database models for AppleSauce"""
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, JSON, Boolean
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, BigInteger, String, Text, DateTime, ForeignKey, JSON, Boolean, Index
+from sqlalchemy.orm import relationship, deferred
 from database import Base
 
 
@@ -37,17 +37,26 @@ class Resume(Base):
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
 
     # Resume content
+    # Heavy text/JSON columns are deferred (group "content") so list queries
+    # don't read or parse them; detail views load them with undefer_group("content")
     filename = Column(String(255), nullable=False)
-    raw_text = Column(Text, nullable=True)
+    content_type = Column(String(100), nullable=True)
+    raw_text = deferred(Column(Text, nullable=True), group="content")  # Legacy rows only, new text lives in the blob store
+
+    # Blob store references (SHA-256 keys) for the original upload and extracted text
+    original_blob_key = Column(String(64), nullable=True)
+    text_blob_key = Column(String(64), nullable=True)
 
     # Parsed data (stored as JSON)
     skills = Column(JSON, default=list)
-    sections = Column(JSON, default=dict)
+    sections = deferred(Column(JSON, default=dict), group="content")
     experience_years = Column(Integer, default=0)
+    parser_version = Column(Integer, nullable=True)  # resume_parser.PARSER_VERSION that produced the fields above
+    semantic_skills = Column(JSON, nullable=True)  # Extra skills found by the LLM during background enrichment
 
     # Quality analysis (from LLM)
     quality_score = Column(Integer, nullable=True)
-    quality_analysis = Column(JSON, nullable=True)
+    quality_analysis = deferred(Column(JSON, nullable=True), group="content")
 
     # Metadata
     is_primary = Column(Boolean, default=False)  # User's main resume
@@ -57,6 +66,14 @@ class Resume(Base):
     # Relationships
     user = relationship("User", back_populates="resumes")
 
+    __table_args__ = (
+        # Per-user listing/counting and primary resume lookup
+        Index("ix_resumes_user_primary", "user_id", "is_primary"),
+        # Whether a blob is still referenced when a resume is deleted
+        Index("ix_resumes_original_blob_key", "original_blob_key"),
+        Index("ix_resumes_text_blob_key", "text_blob_key"),
+    )
+
 
 class SavedJob(Base):
     """Saved/bookmarked jobs for a user"""
@@ -70,7 +87,7 @@ class SavedJob(Base):
     title = Column(String(500), nullable=False)
     company = Column(String(255), nullable=False)
     location = Column(String(255), nullable=True)
-    description = Column(Text, nullable=True)
+    description = deferred(Column(Text, nullable=True))  # Only loaded when explicitly requested
     url = Column(String(1000), nullable=True)
     source = Column(String(50), nullable=True)  # indeed, aws, etc.
 
@@ -89,3 +106,130 @@ class SavedJob(Base):
 
     # Relationships
     user = relationship("User", back_populates="saved_jobs")
+
+    __table_args__ = (
+        # Listing newest first, with and without a status filter
+        Index("ix_saved_jobs_user_created", "user_id", "created_at"),
+        Index("ix_saved_jobs_user_status_created", "user_id", "status", "created_at"),
+        # Sorting by fit (match_percentage is kept in sync with the primary resume's match_scores)
+        Index("ix_saved_jobs_user_match", "user_id", "match_percentage", "created_at"),
+        # A user can save a given title/company only once
+        Index("uq_saved_jobs_user_title_company", "user_id", "title", "company", unique=True),
+    )
+
+
+class MatchScore(Base):
+    """Precomputed match score between a resume and a job, for one scorer version"""
+    __tablename__ = "match_scores"
+
+    id = Column(Integer, primary_key=True, index=True)
+    resume_id = Column(Integer, ForeignKey("resumes.id"), nullable=False)
+    # "saved:<saved_job id>" for saved jobs, the catalog's stable job ID for fetched jobs
+    job_id = Column(String(64), nullable=False)
+    scorer_version = Column(Integer, nullable=False)  # job_matcher.SCORER_VERSION
+
+    match_percentage = Column(Integer, nullable=False)
+    matched_skills = Column(JSON, default=list)
+    score_breakdown = Column(JSON, nullable=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        # One score per resume/job/scorer version; also serves lookups by resume and job
+        Index("uq_match_scores_resume_job_version", "resume_id", "job_id", "scorer_version", unique=True),
+        # Best-fitting jobs for a resume
+        Index("ix_match_scores_resume_version_score", "resume_id", "scorer_version", "match_percentage"),
+    )
+
+
+class Task(Base):
+    """Persistent background task (see services/task_queue.py)"""
+    __tablename__ = "tasks"
+
+    id = Column(String(32), primary_key=True)  # uuid4 hex, safe to hand to clients
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    kind = Column(String(100), nullable=False)
+    payload = Column(JSON, default=dict)
+
+    # queued -> running -> succeeded / failed (failed attempts go back to queued until max_attempts)
+    status = Column(String(20), nullable=False, default="queued")
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    run_after = Column(DateTime, nullable=False, default=datetime.utcnow)  # Retry backoff
+    locked_until = Column(DateTime, nullable=True)  # Lease held by the worker running the task
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # Workers claiming the next runnable task
+        Index("ix_tasks_status_run_after", "status", "run_after"),
+        Index("ix_tasks_user_created", "user_id", "created_at"),
+    )
+
+
+class CatalogJob(Base):
+    """Job posting seen in any fetch, kept as the local pool for retrieval (see services/job_pool.py)"""
+    __tablename__ = "catalog_jobs"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=False)  # JobAPIService stable ID
+    source = Column(String(50), nullable=True)
+    title = Column(String(500), nullable=False)
+    company = Column(String(255), nullable=True)
+    skills = Column(JSON, default=list)
+    payload = deferred(Column(JSON, nullable=False))  # Full job dict as returned by the job APIs
+
+    first_seen_at = Column(DateTime, default=datetime.utcnow)
+    last_seen_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        # Expiring stale postings
+        Index("ix_catalog_jobs_last_seen", "last_seen_at"),
+    )
+
+
+class SchemaVersion(Base):
+    """Fingerprint of the schema init_db last applied, so later starts can skip the checks"""
+    __tablename__ = "schema_version"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(String(64), nullable=False)
+    applied_at = Column(DateTime, default=datetime.utcnow)
+
+
+class UpstreamUsage(Base):
+    """Paid upstream usage per calendar month, summed across workers (see services/quota.py)"""
+    __tablename__ = "upstream_usage"
+
+    id = Column(Integer, primary_key=True)
+    period = Column(String(7), nullable=False)  # UTC month, "YYYY-MM"
+    upstream = Column(String(50), nullable=False)
+    units = Column(BigInteger, nullable=False, default=0)  # Requests for JSearch, tokens for Anthropic
+    calls = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("uq_upstream_usage_period_upstream", "period", "upstream", unique=True),
+    )
+
+
+class SearchQuery(Base):
+    """Job searches per day, query and user, for cache warming (see services/cache_warmer.py)"""
+    __tablename__ = "search_queries"
+
+    id = Column(Integer, primary_key=True)
+    day = Column(String(10), nullable=False)  # UTC date, "YYYY-MM-DD"
+    user_id = Column(Integer, nullable=False, default=0)  # 0 = anonymous
+    query = Column(String(255), nullable=False)  # job_api_service.normalize_query
+    source = Column(String(50), nullable=False)
+    hits = Column(Integer, nullable=False, default=0)
+    last_seen_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("uq_search_queries_day_user_query_source", "day", "user_id", "query", "source", unique=True),
+        # A user's recent searches
+        Index("ix_search_queries_user_day", "user_id", "day"),
+    )
@@ -0,0 +1,35 @@
+"""Fast JSON response class for large payloads"""
+import json
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+# Try to import orjson, gracefully fall back to the standard library if not available
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    orjson = None
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson when it is installed.
+
+    Returning this directly from a route skips FastAPI's `jsonable_encoder`
+    pass, so it should only wrap content made of plain JSON types
+    (dicts, lists, strings, numbers, bools, None, datetimes).
+    """
+
+    def render(self, content: Any) -> bytes:
+        if ORJSON_AVAILABLE:
+            # Same fallback for other types as the standard library path below
+            return orjson.dumps(content, default=str, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(
+            content,
+            ensure_ascii=False,
+            allow_nan=False,
+            separators=(",", ":"),
+            default=str,
+        ).encode("utf-8")
@@ -0,0 +1,87 @@
+"""Admin-only diagnostics - require an account listed in ADMIN_EMAILS"""
+import json
+import time
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+
+from routes.auth import require_admin
+from services.cache_warmer import cache_warmer
+from services.profiling import PROFILE_MAX_SECONDS, PROFILE_SAMPLE_INTERVAL_MS, ProfilerBusy, profiler, run_in_threadpool
+from services.quota import quota_governor
+
+router = APIRouter(prefix="/admin", tags=["Admin"], dependencies=[Depends(require_admin)])
+
+PROFILE_FORMATS = ("collapsed", "speedscope")
+PSTATS_SORTS = ("cumulative", "tottime", "calls", "ncalls", "time")
+
+
+@router.post("/profile")
+async def sample_profile(
+    seconds: float = Query(default=10, gt=0, le=PROFILE_MAX_SECONDS),
+    interval_ms: float = Query(default=PROFILE_SAMPLE_INTERVAL_MS, ge=1, le=1000),
+    format: str = Query(default="collapsed"),
+    include_idle: bool = False,
+):
+    """
+    Sample every thread of this worker process (event loop, threadpool,
+    background executors) for `seconds`, then return the profile:
+
+    - format=collapsed: folded stacks for flamegraph.pl / inferno / speedscope
+    - format=speedscope: speedscope.app JSON
+
+    Parked threads (idle executors, the loop waiting in select) are skipped
+    unless include_idle is set.
+    """
+    if format not in PROFILE_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of: {', '.join(PROFILE_FORMATS)}")
+
+    try:
+        profile = await run_in_threadpool(profiler.sample, seconds, interval_ms, include_idle)
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(profile.started_at))
+    headers = {"X-Profile-Samples": str(profile.sample_count)}
+    if format == "speedscope":
+        headers["Content-Disposition"] = f'attachment; filename="profile-{stamp}.speedscope.json"'
+        return Response(json.dumps(profile.speedscope()), media_type="application/json", headers=headers)
+    headers["Content-Disposition"] = f'attachment; filename="profile-{stamp}.folded"'
+    return Response(profile.collapsed(), media_type="text/plain", headers=headers)
+
+
+@router.get("/profiles")
+async def list_request_profiles():
+    """Recent per-request profiles (requests sent with X-Profile: 1), newest first"""
+    return {"profiles": profiler.list_requests()}
+
+
+@router.get("/profiles/{profile_id}")
+async def get_request_profile(
+    profile_id: str,
+    sort: str = Query(default="cumulative"),
+    limit: int = Query(default=40, ge=1, le=500),
+    format: Optional[str] = Query(default="text"),
+):
+    """cProfile summary of one profiled request (format=pstats downloads the raw stats file)"""
+    request = profiler.get_request(profile_id)
+    if not request:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if format == "pstats":
+        return Response(request.dump(), media_type="application/octet-stream",
+                        headers={"Content-Disposition": f'attachment; filename="request-{profile_id}.pstats"'})
+    if sort not in PSTATS_SORTS:
+        raise HTTPException(status_code=400, detail=f"sort must be one of: {', '.join(PSTATS_SORTS)}")
+    return Response(request.summary(sort, limit), media_type="text/plain")
+
+
+@router.get("/quota")
+async def quota_status():
+    """Monthly budget, usage and policy mode per paid upstream (usage is summed across workers)"""
+    return {"upstreams": await run_in_threadpool(quota_governor.status)}
+
+
+@router.get("/cache-warmer")
+async def cache_warmer_status():
+    """Most frequent searches and what the last warming passes in this worker did"""
+    return await run_in_threadpool(cache_warmer.status)
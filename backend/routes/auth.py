@@ -2,21 +2,21 @@
 from datetime import datetime
 from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, Header, Query
+from services.profiling import run_in_threadpool
 from fastapi.responses import RedirectResponse
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from database import get_db
+from database import get_async_db
 from models.db_models import User
 from services.auth_service import auth_service
+from services.principal_cache import principal_cache, Principal
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 
-def get_current_user(
-    authorization: Optional[str] = Header(None),
-    db: Session = Depends(get_db)
-) -> Optional[User]:
-    """Dependency to get current authenticated user from JWT token"""
+def _verify_authorization(authorization: Optional[str]) -> Optional[dict]:
+    """Decode the JWT from an Authorization header, or None if missing/invalid"""
     if not authorization:
         return None
 
@@ -26,20 +26,60 @@ def get_current_user(
     else:
         token = authorization
 
-    token_data = auth_service.verify_token(token)
+    return auth_service.verify_token(token)
+
+
+async def _load_user(db: AsyncSession, user_id: int) -> Optional[User]:
+    """Fetch a user row by ID"""
+    result = await db.execute(select(User).where(User.id == user_id))
+    return result.scalar_one_or_none()
+
+
+async def get_current_user(
+    authorization: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db)
+) -> Optional[User]:
+    """Dependency to get current authenticated user from JWT token"""
+    token_data = _verify_authorization(authorization)
     if not token_data:
         return None
 
-    user = db.query(User).filter(User.id == token_data["user_id"]).first()
+    user = await _load_user(db, token_data["user_id"])
+    if user:
+        principal_cache.put(user)
     return user
 
 
-def require_auth(
+async def get_current_principal(
+    authorization: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db)
+) -> Optional[Principal]:
+    """
+    Dependency to get a cached snapshot of the authenticated user.
+
+    Use this instead of get_current_user when the route only needs the
+    user's ID or profile fields - it skips the users table on cache hits.
+    """
+    token_data = _verify_authorization(authorization)
+    if not token_data:
+        return None
+
+    principal = principal_cache.get(token_data["user_id"])
+    if principal:
+        return principal
+
+    user = await _load_user(db, token_data["user_id"])
+    if not user:
+        return None
+    return principal_cache.put(user)
+
+
+async def require_auth(
     authorization: Optional[str] = Header(None),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> User:
     """Dependency that requires authentication - raises 401 if not authenticated"""
-    user = get_current_user(authorization, db)
+    user = await get_current_user(authorization, db)
     if not user:
         raise HTTPException(
             status_code=401,
@@ -49,9 +89,31 @@ def require_auth(
     return user
 
 
+async def require_principal(
+    authorization: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db)
+) -> Principal:
+    """Like require_auth, but returns a cached Principal snapshot instead of a User row"""
+    principal = await get_current_principal(authorization, db)
+    if not principal:
+        raise HTTPException(
+            status_code=401,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return principal
+
+
+async def require_admin(current_user: Principal = Depends(require_principal)) -> Principal:
+    """Dependency for admin-only endpoints - raises 403 unless the user is listed in ADMIN_EMAILS"""
+    if not auth_service.is_admin(current_user.email):
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return current_user
+
+
 @router.get("/status")
 async def auth_status(
-    current_user: Optional[User] = Depends(get_current_user)
+    current_user: Optional[Principal] = Depends(get_current_principal)
 ):
     """Check authentication status and configuration"""
     return {
@@ -87,7 +149,7 @@ async def google_login(redirect_url: str = Query(default="")):
 async def google_callback(
     code: str = Query(...),
     state: str = Query(default=""),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Google OAuth callback - exchanges code for user info and creates/updates user
@@ -96,16 +158,19 @@ async def google_callback(
         raise HTTPException(status_code=400, detail="Missing authorization code")
 
     # Exchange code for user info
-    user_info = auth_service.exchange_google_code(code)
+    # Token exchange makes blocking HTTP calls to Google
+    user_info = await run_in_threadpool(auth_service.exchange_google_code, code)
     if not user_info:
         raise HTTPException(status_code=400, detail="Failed to authenticate with Google")
 
     # Find or create user
-    user = db.query(User).filter(User.google_id == user_info["google_id"]).first()
+    result = await db.execute(select(User).where(User.google_id == user_info["google_id"]))
+    user = result.scalar_one_or_none()
 
     if not user:
         # Check if email exists (maybe signed up differently)
-        user = db.query(User).filter(User.email == user_info["email"]).first()
+        result = await db.execute(select(User).where(User.email == user_info["email"]))
+        user = result.scalar_one_or_none()
         if user:
             # Link Google account to existing user
             user.google_id = user_info["google_id"]
@@ -126,8 +191,8 @@ async def google_callback(
     if user_info.get("picture_url"):
         user.picture_url = user_info["picture_url"]
 
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
 
     # Create JWT token
     access_token = auth_service.create_access_token(user.id, user.email)
@@ -151,7 +216,7 @@ async def google_callback(
 
 
 @router.post("/logout")
-async def logout(current_user: User = Depends(require_auth)):
+async def logout(current_user: Principal = Depends(require_principal)):
     """
     Logout current user (client should discard token)
     """
@@ -163,7 +228,7 @@ async def logout(current_user: User = Depends(require_auth)):
 @router.post("/apple")
 async def apple_login(
     data: dict,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Sign in with Apple - receives identity token from iOS app
@@ -187,12 +252,14 @@ async def apple_login(
     # To verify: decode JWT, check issuer is "https://appleid.apple.com", verify signature
 
     # Find existing user by Apple ID
-    user = db.query(User).filter(User.apple_id == user_id).first()
+    result = await db.execute(select(User).where(User.apple_id == user_id))
+    user = result.scalar_one_or_none()
 
     if not user:
         # Check if email exists (maybe signed up with Google)
         if email:
-            user = db.query(User).filter(User.email == email).first()
+            result = await db.execute(select(User).where(User.email == email))
+            user = result.scalar_one_or_none()
             if user:
                 # Link Apple account to existing user
                 user.apple_id = user_id
@@ -218,8 +285,8 @@ async def apple_login(
     if full_name and full_name != "Apple User":
         user.name = full_name
 
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
 
     # Create JWT token
     access_token = auth_service.create_access_token(user.id, user.email)
@@ -237,7 +304,7 @@ async def apple_login(
 
 
 @router.get("/me")
-async def get_current_user_info(current_user: User = Depends(require_auth)):
+async def get_current_user_info(current_user: Principal = Depends(require_principal)):
     """Get current authenticated user's information"""
     return {
         "id": current_user.id,
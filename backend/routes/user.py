@@ -1,15 +1,25 @@
 """Protected user routes - require authentication"""
 from datetime import datetime
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Response
+from sqlalchemy import select, update, delete, func, case
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only, undefer_group
 from pydantic import BaseModel
 
-from database import get_db
-from models.db_models import User, Resume, SavedJob
-from routes.auth import require_auth
+from database import get_async_db
+from models.db_models import Resume, SavedJob, MatchScore, Task
+from routes.auth import require_principal
 from services.resume_parser import parse_resume_structured
-from services.llm_service import llm_service
+from services.blob_store import blob_store
+from services.principal_cache import Principal
+from services.profiling import run_in_threadpool
+from services.dashboard_cache import dashboard_cache
+from services.match_scores import match_score_service, saved_job_key
+from services.blob_gc import delete_blobs_task
+from services.resume_enrichment import ENRICH_RESUME_TASK
+from services.task_queue import task_queue, task_to_dict
 
 router = APIRouter(prefix="/user", tags=["User"])
 
@@ -27,6 +37,16 @@ class SaveJobRequest(BaseModel):
     matched_skills: Optional[List[str]] = []
 
 
+# Saved job pipeline statuses, in the order the dashboard reports them
+JOB_STATUSES = ["saved", "applied", "interviewing", "rejected", "offer"]
+
+# Saved job orderings, each served by an index on saved_jobs
+SAVED_JOB_SORTS = {
+    "recent": (SavedJob.created_at.desc(),),
+    "match": (SavedJob.match_percentage.desc(), SavedJob.created_at.desc()),
+}
+
+
 class UpdateJobStatusRequest(BaseModel):
     status: str  # saved, applied, interviewing, rejected, offer
     notes: Optional[str] = None
@@ -35,11 +55,20 @@ class UpdateJobStatusRequest(BaseModel):
 # Resume endpoints
 @router.get("/resumes")
 async def get_user_resumes(
-    current_user: User = Depends(require_auth),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(require_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get all resumes for the current user"""
-    resumes = db.query(Resume).filter(Resume.user_id == current_user.id).all()
+    # Only the columns the list shows - raw text and JSON blobs stay on disk
+    result = await db.execute(
+        select(Resume)
+        .options(load_only(
+            Resume.id, Resume.filename, Resume.skills, Resume.experience_years,
+            Resume.quality_score, Resume.is_primary, Resume.created_at,
+        ))
+        .where(Resume.user_id == current_user.id)
+    )
+    resumes = result.scalars().all()
     return {
         "resumes": [
             {
@@ -60,46 +89,52 @@ async def get_user_resumes(
 @router.post("/resumes/upload")
 async def upload_user_resume(
     file: UploadFile = File(...),
-    current_user: User = Depends(require_auth),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(require_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Upload and save a resume for the current user"""
     content = await file.read()
-    result = parse_resume_structured(content, file.filename)
+    # PDF/DOCX parsing is CPU-bound, keep it off the event loop
+    result = await run_in_threadpool(parse_resume_structured, content, file.filename)
 
     if "error" in result:
         raise HTTPException(status_code=400, detail=result["error"])
 
+    # Keep the original file and extracted text in the blob store so resumes
+    # can be re-parsed later without asking the user to upload again
+    original_blob_key = await run_in_threadpool(blob_store.put, content)
+    text_blob_key = await run_in_threadpool(blob_store.put_text, result.get("text", ""))
+
     # Check if this is the first resume (make it primary)
-    existing_count = db.query(Resume).filter(Resume.user_id == current_user.id).count()
+    existing_count = await db.scalar(
+        select(func.count()).select_from(Resume).where(Resume.user_id == current_user.id)
+    )
     is_primary = existing_count == 0
 
-    # Analyze quality if LLM is available
-    quality_analysis = None
-    quality_score = None
-    if llm_service.is_available():
-        analysis = llm_service.analyze_resume_quality(
-            result.get("text", ""),
-            result.get("sections", {})
-        )
-        quality_score = analysis.get("score")
-        quality_analysis = analysis
-
     # Create resume record
     resume = Resume(
         user_id=current_user.id,
         filename=file.filename,
-        raw_text=result.get("text", ""),
+        content_type=file.content_type,
+        original_blob_key=original_blob_key,
+        text_blob_key=text_blob_key,
         skills=result.get("skills", []),
         sections=result.get("sections", {}),
         experience_years=result.get("experience_years", 0),
-        quality_score=quality_score,
-        quality_analysis=quality_analysis,
+        parser_version=result.get("parser_version"),
         is_primary=is_primary,
     )
     db.add(resume)
-    db.commit()
-    db.refresh(resume)
+    await db.flush()
+
+    # LLM quality analysis, semantic skills and match scoring run in the
+    # background; the task commits with the resume so it can't be orphaned
+    task = task_queue.new_task(ENRICH_RESUME_TASK, {"resume_id": resume.id}, user_id=current_user.id)
+    db.add(task)
+    # No refresh needed: the ID and defaults are populated on flush, and
+    # reloading would just re-read the deferred text columns
+    await db.commit()
+    task_queue.notify()
 
     return {
         "id": resume.id,
@@ -107,9 +142,9 @@ async def upload_user_resume(
         "skills": resume.skills,
         "sections": resume.sections,
         "experience_years": resume.experience_years,
-        "quality_score": resume.quality_score,
-        "quality_analysis": resume.quality_analysis,
+        "quality_score": None,  # Filled in by the enrichment task
         "is_primary": resume.is_primary,
+        "task_id": task.id,
         "message": "Resume uploaded and saved successfully"
     }
 
@@ -117,23 +152,29 @@ async def upload_user_resume(
 @router.get("/resumes/{resume_id}")
 async def get_resume(
     resume_id: int,
-    current_user: User = Depends(require_auth),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(require_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get a specific resume by ID"""
-    resume = db.query(Resume).filter(
+    result = await db.execute(select(Resume).options(undefer_group("content")).where(
         Resume.id == resume_id,
         Resume.user_id == current_user.id
-    ).first()
+    ))
+    resume = result.scalar_one_or_none()
 
     if not resume:
         raise HTTPException(status_code=404, detail="Resume not found")
 
+    raw_text = resume.raw_text
+    if resume.text_blob_key:
+        raw_text = await run_in_threadpool(blob_store.get_text, resume.text_blob_key)
+
     return {
         "id": resume.id,
         "filename": resume.filename,
-        "raw_text": resume.raw_text,
+        "raw_text": raw_text,
         "skills": resume.skills or [],
+        "semantic_skills": resume.semantic_skills or [],
         "sections": resume.sections or {},
         "experience_years": resume.experience_years,
         "quality_score": resume.quality_score,
@@ -143,23 +184,60 @@ async def get_resume(
     }
 
 
+@router.get("/resumes/{resume_id}/original")
+async def download_original_resume(
+    resume_id: int,
+    current_user: Principal = Depends(require_principal),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Download the originally uploaded resume file"""
+    result = await db.execute(select(Resume.filename, Resume.content_type, Resume.original_blob_key).where(
+        Resume.id == resume_id,
+        Resume.user_id == current_user.id
+    ))
+    row = result.first()
+
+    if not row:
+        raise HTTPException(status_code=404, detail="Resume not found")
+    if not row.original_blob_key:
+        raise HTTPException(status_code=404, detail="Original file was not kept for this resume")
+
+    content = await run_in_threadpool(blob_store.get, row.original_blob_key)
+    if content is None:
+        raise HTTPException(status_code=404, detail="Original file is missing from storage")
+
+    return Response(
+        content=content,
+        media_type=row.content_type or "application/octet-stream",
+        headers={"Content-Disposition": f'attachment; filename="{row.filename}"'},
+    )
+
+
 @router.delete("/resumes/{resume_id}")
 async def delete_resume(
     resume_id: int,
-    current_user: User = Depends(require_auth),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(require_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete a resume"""
-    resume = db.query(Resume).filter(
+    result = await db.execute(select(Resume).where(
         Resume.id == resume_id,
         Resume.user_id == current_user.id
-    ).first()
+    ))
+    resume = result.scalar_one_or_none()
 
     if not resume:
         raise HTTPException(status_code=404, detail="Resume not found")
 
-    db.delete(resume)
-    db.commit()
+    blob_keys = {key for key in (resume.original_blob_key, resume.text_blob_key) if key}
+    await db.execute(delete(MatchScore).where(MatchScore.resume_id == resume_id))
+    await db.delete(resume)
+    # Its blobs go once the grace period is over, if no resume (of any user) uses them by then;
+    # the task commits with the deletion so they can't be orphaned
+    if blob_keys:
+        db.add(delete_blobs_task(blob_keys))
+    await db.commit()
+    task_queue.notify()
 
     return {"message": "Resume deleted successfully"}
 
@@ -167,27 +245,34 @@ async def delete_resume(
 @router.put("/resumes/{resume_id}/primary")
 async def set_primary_resume(
     resume_id: int,
-    current_user: User = Depends(require_auth),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(require_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Set a resume as the primary resume"""
-    resume = db.query(Resume).filter(
+    result = await db.execute(select(Resume).where(
         Resume.id == resume_id,
         Resume.user_id == current_user.id
-    ).first()
+    ))
+    resume = result.scalar_one_or_none()
 
     if not resume:
         raise HTTPException(status_code=404, detail="Resume not found")
 
-    # Unset current primary
-    db.query(Resume).filter(
-        Resume.user_id == current_user.id,
-        Resume.is_primary == True
-    ).update({"is_primary": False})
+    # Unset current primary (leaving this resume alone: the bulk update doesn't touch the loaded object,
+    # so clearing it here would not be undone by the assignment below when it is already primary)
+    await db.execute(
+        update(Resume)
+        .where(Resume.user_id == current_user.id, Resume.is_primary == True, Resume.id != resume_id)
+        .values(is_primary=False)
+        .execution_options(synchronize_session=False)
+    )
 
     # Set new primary
     resume.is_primary = True
-    db.commit()
+    await db.commit()
+
+    # Re-sync saved job match percentages to the new primary resume
+    match_score_service.schedule_resume(resume_id)
 
     return {"message": "Primary resume updated", "resume_id": resume_id}
 
@@ -196,16 +281,34 @@ async def set_primary_resume(
 @router.get("/saved-jobs")
 async def get_saved_jobs(
     status: Optional[str] = None,
-    current_user: User = Depends(require_auth),
-    db: Session = Depends(get_db)
+    sort: str = "recent",
+    current_user: Principal = Depends(require_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get all saved jobs for the current user, optionally filtered by status"""
-    query = db.query(SavedJob).filter(SavedJob.user_id == current_user.id)
+    """
+    Get all saved jobs for the current user, optionally filtered by status.
+
+    sort: "recent" (newest first) or "match" (best fit with the primary resume first)
+    """
+    if sort not in SAVED_JOB_SORTS:
+        raise HTTPException(status_code=400, detail=f"sort must be one of: {', '.join(SAVED_JOB_SORTS)}")
+
+    query = (
+        select(SavedJob)
+        .options(load_only(
+            SavedJob.id, SavedJob.job_external_id, SavedJob.title, SavedJob.company,
+            SavedJob.location, SavedJob.url, SavedJob.source, SavedJob.match_percentage,
+            SavedJob.matched_skills, SavedJob.status, SavedJob.notes, SavedJob.applied_at,
+            SavedJob.created_at,
+        ))
+        .where(SavedJob.user_id == current_user.id)
+    )
 
     if status:
-        query = query.filter(SavedJob.status == status)
+        query = query.where(SavedJob.status == status)
 
-    jobs = query.order_by(SavedJob.created_at.desc()).all()
+    result = await db.execute(query.order_by(*SAVED_JOB_SORTS[sort]))
+    jobs = result.scalars().all()
 
     return {
         "saved_jobs": [
@@ -233,20 +336,10 @@ async def get_saved_jobs(
 @router.post("/saved-jobs")
 async def save_job(
     job: SaveJobRequest,
-    current_user: User = Depends(require_auth),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(require_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Save a job to the user's list"""
-    # Check if already saved
-    existing = db.query(SavedJob).filter(
-        SavedJob.user_id == current_user.id,
-        SavedJob.title == job.title,
-        SavedJob.company == job.company
-    ).first()
-
-    if existing:
-        raise HTTPException(status_code=400, detail="Job already saved")
-
     saved_job = SavedJob(
         user_id=current_user.id,
         job_external_id=job.job_external_id,
@@ -261,8 +354,15 @@ async def save_job(
         status="saved",
     )
     db.add(saved_job)
-    db.commit()
-    db.refresh(saved_job)
+    try:
+        # The unique (user_id, title, company) index rejects duplicates atomically
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="Job already saved")
+
+    # Replace the client-supplied match percentage with the stored score for the primary resume
+    match_score_service.schedule_saved_job(saved_job.id)
 
     return {
         "id": saved_job.id,
@@ -274,14 +374,15 @@ async def save_job(
 async def update_saved_job(
     job_id: int,
     update: UpdateJobStatusRequest,
-    current_user: User = Depends(require_auth),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(require_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update a saved job's status or notes"""
-    saved_job = db.query(SavedJob).filter(
+    result = await db.execute(select(SavedJob).where(
         SavedJob.id == job_id,
         SavedJob.user_id == current_user.id
-    ).first()
+    ))
+    saved_job = result.scalar_one_or_none()
 
     if not saved_job:
         raise HTTPException(status_code=404, detail="Saved job not found")
@@ -294,7 +395,7 @@ async def update_saved_job(
     if update.status == "applied" and not saved_job.applied_at:
         saved_job.applied_at = datetime.utcnow()
 
-    db.commit()
+    await db.commit()
 
     return {"message": "Job updated successfully", "status": saved_job.status}
 
@@ -302,69 +403,111 @@ async def update_saved_job(
 @router.delete("/saved-jobs/{job_id}")
 async def delete_saved_job(
     job_id: int,
-    current_user: User = Depends(require_auth),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(require_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Remove a saved job"""
-    saved_job = db.query(SavedJob).filter(
+    result = await db.execute(select(SavedJob).where(
         SavedJob.id == job_id,
         SavedJob.user_id == current_user.id
-    ).first()
+    ))
+    saved_job = result.scalar_one_or_none()
 
     if not saved_job:
         raise HTTPException(status_code=404, detail="Saved job not found")
 
-    db.delete(saved_job)
-    db.commit()
+    await db.execute(delete(MatchScore).where(
+        MatchScore.resume_id.in_(select(Resume.id).where(Resume.user_id == current_user.id)),
+        MatchScore.job_id == saved_job_key(job_id),
+    ))
+    await db.delete(saved_job)
+    await db.commit()
 
     return {"message": "Saved job removed"}
 
 
+# Background task status
+@router.get("/tasks/{task_id}")
+async def get_task(
+    task_id: str,
+    current_user: Principal = Depends(require_principal),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Poll the status of a background task (e.g. resume enrichment after upload)"""
+    result = await db.execute(select(Task).where(
+        Task.id == task_id,
+        Task.user_id == current_user.id
+    ))
+    task = result.scalar_one_or_none()
+
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    return task_to_dict(task)
+
+
 # Dashboard/stats endpoint
+async def _load_dashboard_stats(db: AsyncSession, user_id: int) -> dict:
+    """Resume and saved-job stats for the dashboard, using indexed aggregate queries"""
+    # Saved job counts for every status in one grouped query
+    result = await db.execute(
+        select(SavedJob.status, func.count(SavedJob.id))
+        .where(SavedJob.user_id == user_id)
+        .group_by(SavedJob.status)
+    )
+    status_counts = {status: count for status, count in result.all()}
+
+    # Resume count and primary resume ID (answered from the user_id/is_primary index)
+    result = await db.execute(
+        select(
+            func.count(Resume.id),
+            func.max(case((Resume.is_primary == True, Resume.id))),
+        ).where(Resume.user_id == user_id)
+    )
+    resume_count, primary_id = result.one()
+
+    # Fetch only the primary resume fields the dashboard shows (no raw_text/quality_analysis)
+    primary = None
+    if primary_id is not None:
+        result = await db.execute(
+            select(Resume.id, Resume.filename, Resume.skills, Resume.quality_score)
+            .where(Resume.id == primary_id)
+        )
+        row = result.one()
+        primary = {
+            "id": row.id,
+            "filename": row.filename,
+            "skills_count": len(row.skills or []),
+            "quality_score": row.quality_score,
+        }
+
+    jobs = {status: status_counts.get(status, 0) for status in JOB_STATUSES}
+    jobs["total"] = sum(status_counts.values())
+
+    return {
+        "resumes": {
+            "count": resume_count,
+            "primary": primary,
+        },
+        "jobs": jobs,
+    }
+
+
 @router.get("/dashboard")
 async def get_dashboard(
-    current_user: User = Depends(require_auth),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(require_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get dashboard stats for the current user"""
-    resume_count = db.query(Resume).filter(Resume.user_id == current_user.id).count()
-    primary_resume = db.query(Resume).filter(
-        Resume.user_id == current_user.id,
-        Resume.is_primary == True
-    ).first()
-
-    # Job stats by status
-    saved_count = db.query(SavedJob).filter(
-        SavedJob.user_id == current_user.id,
-        SavedJob.status == "saved"
-    ).count()
-    applied_count = db.query(SavedJob).filter(
-        SavedJob.user_id == current_user.id,
-        SavedJob.status == "applied"
-    ).count()
-    interviewing_count = db.query(SavedJob).filter(
-        SavedJob.user_id == current_user.id,
-        SavedJob.status == "interviewing"
-    ).count()
+    stats = dashboard_cache.get(current_user.id)
+    if stats is None:
+        stats = await _load_dashboard_stats(db, current_user.id)
+        dashboard_cache.put(current_user.id, stats)
 
     return {
         "user": {
             "name": current_user.name,
             "email": current_user.email,
         },
-        "resumes": {
-            "count": resume_count,
-            "primary": {
-                "id": primary_resume.id,
-                "filename": primary_resume.filename,
-                "skills_count": len(primary_resume.skills or []),
-                "quality_score": primary_resume.quality_score,
-            } if primary_resume else None,
-        },
-        "jobs": {
-            "saved": saved_count,
-            "applied": applied_count,
-            "interviewing": interviewing_count,
-            "total": saved_count + applied_count + interviewing_count,
-        }
+        **stats,
     }
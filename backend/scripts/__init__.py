@@ -0,0 +1 @@
+# Maintenance and diagnostic scripts
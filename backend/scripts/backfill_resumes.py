@@ -0,0 +1,206 @@
+"""
+Re-parse stored resumes after the extraction rules change
+
+Recomputes skills, sections and experience_years for every resume whose
+parser_version is older than resume_parser.PARSER_VERSION. Rows are streamed
+in primary-key order (keyset pagination, so each chunk is an index range
+scan no matter how far in we are), extraction runs in a process pool, and
+each chunk is written back with a single bulk UPDATE. Progress is
+checkpointed to a JSON file after every committed chunk, so an interrupted
+run picks up where it stopped.
+
+Stored match scores of resumes whose skills or experience changed are
+dropped, and primary resumes are re-scored against their saved jobs.
+
+Usage (from backend/):
+    python -m scripts.backfill_resumes
+    python -m scripts.backfill_resumes --workers 8 --chunk-size 1000
+    python -m scripts.backfill_resumes --dry-run --limit 5000
+    python -m scripts.backfill_resumes --force --reset    # re-parse everything from scratch
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import delete, or_, select, update
+
+from database import SessionLocal, init_db
+from models.db_models import MatchScore, Resume
+from services.blob_store import blob_store
+from services.match_scores import match_score_service
+from services.resume_parser import PARSER_VERSION, extract_structured, parse_resume_structured
+
+DEFAULT_CHECKPOINT = "backfill_resumes.checkpoint.json"
+# Resume columns the backfill rewrites
+FIELDS = ("skills", "sections", "experience_years", "parser_version")
+
+
+def new_checkpoint(force: bool) -> Dict[str, Any]:
+    return {"parser_version": PARSER_VERSION, "force": force, "last_id": 0,
+            "processed": 0, "updated": 0, "unchanged": 0, "failed": 0}
+
+
+def load_checkpoint(path: str, force: bool) -> Dict[str, Any]:
+    """Load progress from a previous run of the same parser version"""
+    fresh = new_checkpoint(force)
+    if not os.path.exists(path):
+        return fresh
+    with open(path) as f:
+        checkpoint = json.load(f)
+    if checkpoint.get("parser_version") != PARSER_VERSION or checkpoint.get("force") != force:
+        print(f"Ignoring checkpoint from a different run ({path})")
+        return fresh
+    return checkpoint
+
+
+def save_checkpoint(path: str, checkpoint: Dict[str, Any]) -> None:
+    """Atomically replace the checkpoint file"""
+    checkpoint["saved_at"] = datetime.utcnow().isoformat()
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".checkpoint-")
+    with os.fdopen(fd, "w") as f:
+        json.dump(checkpoint, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def fetch_chunk(db, after_id: int, chunk_size: int, force: bool):
+    """Next chunk of resumes after after_id, in primary-key order"""
+    query = (
+        select(Resume.id, Resume.filename, Resume.text_blob_key, Resume.original_blob_key,
+               Resume.raw_text, Resume.skills, Resume.experience_years, Resume.is_primary)
+        .where(Resume.id > after_id)
+        .order_by(Resume.id)
+        .limit(chunk_size)
+    )
+    if not force:
+        query = query.where(or_(Resume.parser_version.is_(None), Resume.parser_version < PARSER_VERSION))
+    return db.execute(query).all()
+
+
+def reparse_row(row: Tuple) -> Tuple[int, Optional[Dict[str, Any]], Optional[str]]:
+    """
+    Re-run extraction for one resume (runs in a worker process).
+
+    Returns (resume_id, extracted fields or None, error message or None).
+    """
+    resume_id, filename, text_blob_key, original_blob_key, raw_text = row
+    try:
+        text = blob_store.get_text(text_blob_key) if text_blob_key else raw_text
+        if text is None and original_blob_key:
+            content = blob_store.get(original_blob_key)
+            if content is not None:
+                # Failures come back as an "error" entry, not an exception; keep the stored fields then
+                result = parse_resume_structured(content, filename)
+                if "error" in result:
+                    return resume_id, None, f"could not parse original file: {result['error']}"
+                return resume_id, {key: result[key] for key in FIELDS}, None
+        if text is None:
+            return resume_id, None, "no stored text or original file"
+        return resume_id, extract_structured(text), None
+    except Exception as e:
+        return resume_id, None, str(e)
+
+
+def run(args) -> Dict[str, Any]:
+    init_db()  # Adds the parser_version column to older databases
+    if args.reset:
+        checkpoint = new_checkpoint(args.force)
+    else:
+        checkpoint = load_checkpoint(args.checkpoint, args.force)
+    if checkpoint["last_id"]:
+        print(f"Resuming after resume id {checkpoint['last_id']} ({checkpoint['processed']} already processed)")
+
+    executor = ProcessPoolExecutor(max_workers=args.workers) if args.workers > 1 else None
+    mapper = executor.map if executor else map
+    db = SessionLocal()
+    started = time.perf_counter()
+    processed_this_run = 0
+
+    try:
+        while args.limit is None or processed_this_run < args.limit:
+            chunk_size = args.chunk_size
+            if args.limit is not None:
+                chunk_size = min(chunk_size, args.limit - processed_this_run)
+            rows = fetch_chunk(db, checkpoint["last_id"], chunk_size, args.force)
+            if not rows:
+                break
+
+            previous = {row.id: (row.skills, row.experience_years) for row in rows}
+            primary_ids = {row.id for row in rows if row.is_primary}
+            work = [(row.id, row.filename, row.text_blob_key, row.original_blob_key, row.raw_text) for row in rows]
+            kwargs = {"chunksize": max(1, len(work) // (args.workers * 4))} if executor else {}
+
+            updates = []
+            changed_ids = []
+            for resume_id, fields, error in mapper(reparse_row, work, **kwargs):
+                if error:
+                    checkpoint["failed"] += 1
+                    print(f"  resume {resume_id}: {error}")
+                    continue
+                if (fields["skills"], fields["experience_years"]) == previous[resume_id]:
+                    checkpoint["unchanged"] += 1
+                else:
+                    checkpoint["updated"] += 1
+                    changed_ids.append(resume_id)
+                updates.append({"id": resume_id, **fields})
+
+            if updates and not args.dry_run:
+                # ORM bulk UPDATE by primary key: one executemany per chunk
+                db.execute(update(Resume), updates)
+                if changed_ids:
+                    # Scores computed from the old skills are stale
+                    db.execute(delete(MatchScore).where(MatchScore.resume_id.in_(changed_ids)))
+                db.commit()
+
+                if args.rescore:
+                    for resume_id in changed_ids:
+                        if resume_id in primary_ids:
+                            match_score_service.score_resume(resume_id)
+
+            checkpoint["last_id"] = rows[-1].id
+            checkpoint["processed"] += len(rows)
+            processed_this_run += len(rows)
+            if not args.dry_run:
+                save_checkpoint(args.checkpoint, checkpoint)
+
+            elapsed = time.perf_counter() - started
+            rate = processed_this_run / elapsed if elapsed else 0
+            print(f"  {checkpoint['processed']} processed (last id {checkpoint['last_id']}, "
+                  f"{checkpoint['updated']} changed, {checkpoint['failed']} failed, {rate:.0f}/s)")
+    finally:
+        db.close()
+        if executor:
+            executor.shutdown()
+
+    return checkpoint
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunk-size", type=int, default=500, help="Resumes per keyset page and bulk update")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Extraction processes (1 = run inline)")
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT, help="Progress file used to resume interrupted runs")
+    parser.add_argument("--limit", type=int, default=None, help="Stop after this many resumes")
+    parser.add_argument("--force", action="store_true", help="Re-parse resumes already at the current parser version")
+    parser.add_argument("--reset", action="store_true", help="Ignore any existing checkpoint")
+    parser.add_argument("--no-rescore", dest="rescore", action="store_false",
+                        help="Drop stale match scores without re-scoring primary resumes")
+    parser.add_argument("--dry-run", action="store_true", help="Extract and report without writing results")
+    args = parser.parse_args()
+
+    print(f"Backfilling resumes to parser version {PARSER_VERSION}")
+    checkpoint = run(args)
+    print(f"\nDone: {checkpoint['processed']} processed, {checkpoint['updated']} changed, "
+          f"{checkpoint['unchanged']} unchanged, {checkpoint['failed']} failed")
+    if checkpoint["failed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
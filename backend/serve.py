@@ -0,0 +1,427 @@
+#!/usr/bin/env python3
+"""
+Production server launcher for the AppleSauce backend
+
+Runs N uvicorn worker processes behind one listening socket owned by a
+master process. On Linux/macOS the master imports the app once and forks
+the workers, so imported code and read-only data are shared copy-on-write,
+and supports graceful, zero-downtime restarts:
+
+    SIGHUP   rolling restart: start a new worker, wait until it is serving,
+             then gracefully stop an old one, one at a time
+    SIGUSR2  upgrade: exec a new master (re-importing the code) on the same
+             socket; once its workers are up it stops this master
+    SIGTTIN / SIGTTOU   add / remove a worker
+    SIGTERM / SIGINT    graceful shutdown (in-flight requests finish)
+
+Workers that exit unexpectedly are replaced. On Windows (no fork) it falls
+back to uvicorn's own multi-process supervisor without preload or signals.
+
+Usage (from backend/):
+    python serve.py                          # CPU-count workers on 0.0.0.0:8000
+    python serve.py --workers 4 --port 8001 --pid-file applesauce.pid
+    python serve.py --reload                 # single auto-reloading dev server
+    kill -HUP $(cat applesauce.pid)          # zero-downtime restart
+"""
+import argparse
+import asyncio
+import os
+import random
+import select
+import signal
+import socket
+import sys
+import time
+import traceback
+from typing import Dict, List, Optional
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+LISTEN_FD_ENV = "APPLESAUCE_LISTEN_FD"  # Socket handed to a new master by SIGUSR2
+PARENT_MASTER_ENV = "APPLESAUCE_PARENT_MASTER"  # Old master for the new one to stop once it's serving
+
+WORKER_BOOT_TIMEOUT = 60  # Seconds a new worker may take to start serving
+FAST_FAILURE_SECONDS = 5  # A worker dying this soon after starting counts towards MAX_FAST_FAILURES
+MAX_FAST_FAILURES = 5
+# Seconds a stopping worker keeps reading connections it accepted just before it stopped accepting
+ACCEPTED_DRAIN_SECONDS = 0.5
+
+
+def env_int(name: str, default: Optional[int]) -> Optional[int]:
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--app", default="main:app", help="ASGI app as module:attribute")
+    parser.add_argument("--host", default=os.getenv("SERVER_HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=env_int("SERVER_PORT", 8000))
+    parser.add_argument("--workers", type=int, default=env_int("WEB_CONCURRENCY", os.cpu_count() or 1),
+                        help="Worker processes (default: CPU count, or WEB_CONCURRENCY)")
+    parser.add_argument("--backlog", type=int, default=env_int("SERVER_BACKLOG", 2048),
+                        help="Pending connections queued by the kernel")
+    parser.add_argument("--keepalive", type=int, default=env_int("SERVER_KEEPALIVE", 5),
+                        help="Seconds an idle keep-alive connection is held open")
+    parser.add_argument("--limit-concurrency", type=int, default=env_int("SERVER_LIMIT_CONCURRENCY", None),
+                        help="Per-worker cap on concurrent connections/tasks before answering 503")
+    parser.add_argument("--max-requests", type=int, default=env_int("SERVER_MAX_REQUESTS", None),
+                        help="Recycle a worker after this many requests (plus up to --max-requests-jitter)")
+    parser.add_argument("--max-requests-jitter", type=int, default=env_int("SERVER_MAX_REQUESTS_JITTER", 0))
+    parser.add_argument("--graceful-timeout", type=int, default=env_int("SERVER_GRACEFUL_TIMEOUT", 30),
+                        help="Seconds a stopping worker gets to finish in-flight requests")
+    parser.add_argument("--no-preload", dest="preload", action="store_false",
+                        help="Import the app in each worker instead of once in the master "
+                             "(SIGHUP then also picks up code changes)")
+    parser.add_argument("--pid-file", default=os.getenv("SERVER_PID_FILE"))
+    parser.add_argument("--log-level", default=os.getenv("SERVER_LOG_LEVEL", "info"))
+    parser.add_argument("--no-access-log", dest="access_log", action="store_false")
+    parser.add_argument("--reload", action="store_true", help="Development: one auto-reloading worker")
+    return parser.parse_args(argv)
+
+
+def uvicorn_options(args: argparse.Namespace) -> Dict:
+    """Settings shared by every worker's uvicorn Config"""
+    return {
+        "backlog": args.backlog,
+        "timeout_keep_alive": args.keepalive,
+        "limit_concurrency": args.limit_concurrency,
+        "timeout_graceful_shutdown": args.graceful_timeout,
+        "log_level": args.log_level,
+        "access_log": args.access_log,
+        "lifespan": "on",
+    }
+
+
+def import_app(path: str):
+    module_name, _, attribute = path.partition(":")
+    module = __import__(module_name, fromlist=[attribute])
+    return getattr(module, attribute)
+
+
+def bind_socket(args: argparse.Namespace) -> socket.socket:
+    inherited = os.environ.pop(LISTEN_FD_ENV, None)
+    if inherited:
+        sock = socket.socket(fileno=int(inherited))
+    else:
+        family = socket.AF_INET6 if ":" in args.host else socket.AF_INET
+        try:
+            sock = socket.create_server((args.host, args.port), family=family, backlog=args.backlog)
+        except OSError as e:
+            raise SystemExit(f"Cannot listen on {args.host}:{args.port}: {e}")
+    sock.set_inheritable(True)
+    return sock
+
+
+class Worker:
+    def __init__(self, pid: int, generation: int, ready_fd: int):
+        self.pid = pid
+        self.generation = generation
+        self.ready_fd = ready_fd
+        self.ready = False
+        self.started_at = time.monotonic()
+        self.stopping = False
+
+
+class Master:
+    """Pre-fork supervisor: owns the socket, forks workers, handles restart signals"""
+
+    def __init__(self, args: argparse.Namespace, sock: socket.socket):
+        self.args = args
+        self.sock = sock
+        self.target = max(1, args.workers)
+        self.app = None
+        self.generation = 0
+        self.workers: Dict[int, Worker] = {}
+        self.signals: List[int] = []
+        self.stopping = False
+        self.stop_deadline = 0.0
+        self.fast_failures = 0
+        self.parent_master = int(os.environ.pop(PARENT_MASTER_ENV, "") or 0)
+        # Signal handlers only queue the signal; the wakeup pipe interrupts the select() in the main loop
+        self._wakeup_read, wakeup_write = os.pipe()
+        os.set_blocking(self._wakeup_read, False)
+        os.set_blocking(wakeup_write, False)
+        signal.set_wakeup_fd(wakeup_write)
+
+    # Lifecycle
+
+    def run(self) -> None:
+        # Line-buffered so forked children don't inherit (and later re-flush) half-written output
+        sys.stdout.reconfigure(line_buffering=True)
+        sys.path.insert(0, BACKEND_DIR)
+        self._init_database()
+        if self.args.preload:
+            self.app = import_app(self.args.app)
+            # Deferred imports (SDK, numpy, parsers) too, so workers share them instead of each loading them
+            from services.lazy_imports import load_all
+            load_all()
+        self._write_pid_file()
+        for sig in (signal.SIGHUP, signal.SIGUSR2, signal.SIGTERM, signal.SIGINT, signal.SIGTTIN, signal.SIGTTOU,
+                    signal.SIGCHLD):
+            signal.signal(sig, self._on_signal)
+
+        host, port = self.sock.getsockname()[:2]
+        print(f"Master {os.getpid()} listening on http://{host}:{port} with {self.target} worker(s)"
+              f"{' (preloaded)' if self.app is not None else ''}")
+        try:
+            while not (self.stopping and not self.workers):
+                self._handle_signals()
+                self._reap()
+                if self.stopping:
+                    self._stop()  # Escalates to SIGKILL past the graceful deadline
+                else:
+                    self._maintain()
+                self._wait_for_events(1.0)
+        finally:
+            self._remove_pid_file()
+        print(f"Master {os.getpid()} stopped")
+
+    def _init_database(self) -> None:
+        """Create/migrate the schema once, before forking, so workers don't race on it"""
+        from database import engine, init_db
+        init_db()
+        # Pooled connections must not be shared across fork
+        engine.dispose()
+
+    def _on_signal(self, signum, frame) -> None:
+        self.signals.append(signum)
+
+    def _handle_signals(self) -> None:
+        while self.signals:
+            signum = self.signals.pop(0)
+            if signum in (signal.SIGTERM, signal.SIGINT):
+                self._stop()
+            elif signum == signal.SIGHUP and not self.stopping:
+                self.generation += 1
+                print(f"Rolling restart to generation {self.generation}")
+            elif signum == signal.SIGUSR2 and not self.stopping:
+                self._spawn_new_master()
+            elif signum == signal.SIGTTIN:
+                self.target += 1
+                print(f"Workers: {self.target}")
+            elif signum == signal.SIGTTOU and self.target > 1:
+                self.target -= 1
+                print(f"Workers: {self.target}")
+
+    def _stop(self) -> None:
+        if not self.stopping:
+            print(f"Shutting down {len(self.workers)} worker(s) gracefully")
+            self.stopping = True
+            self.stop_deadline = time.monotonic() + self.args.graceful_timeout + 5
+            for worker in self.workers.values():
+                self._stop_worker(worker)
+        elif time.monotonic() > self.stop_deadline:
+            for worker in self.workers.values():
+                self._kill(worker.pid, signal.SIGKILL)
+
+    # Workers
+
+    def _maintain(self) -> None:
+        current = [w for w in self.workers.values() if w.generation == self.generation and not w.stopping]
+        old = [w for w in self.workers.values() if w.generation != self.generation and not w.stopping]
+        booting = [w for w in current if not w.ready]
+
+        if old:
+            # Rolling: one new worker at a time, and an old one stops only once its replacement serves
+            if not booting and len(current) < self.target:
+                self._spawn()
+            ready = [w for w in current if w.ready]
+            if ready and len(ready) + len(old) > self.target:
+                self._stop_worker(old[0])
+            elif not booting and len(current) >= self.target:
+                self._stop_worker(old[0])
+        else:
+            for _ in range(self.target - len(current)):
+                self._spawn()
+            for worker in current[self.target:]:
+                self._stop_worker(worker)
+
+        for worker in booting:
+            if time.monotonic() - worker.started_at > WORKER_BOOT_TIMEOUT:
+                print(f"Worker {worker.pid} did not start within {WORKER_BOOT_TIMEOUT}s, killing it")
+                self._kill(worker.pid, signal.SIGKILL)
+
+        if self.parent_master and all(w.ready for w in self.workers.values()) and len(self.workers) >= self.target:
+            print(f"Upgrade complete, stopping old master {self.parent_master}")
+            self._kill(self.parent_master, signal.SIGTERM)
+            self.parent_master = 0
+
+    def _spawn(self) -> None:
+        read_fd, write_fd = os.pipe()
+        limit = self.args.max_requests
+        if limit:
+            limit += random.randint(0, self.args.max_requests_jitter)
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            code = 1
+            try:
+                code = run_worker(self.args, self.sock, self.app, write_fd, limit)
+            except BaseException:
+                traceback.print_exc()
+            finally:
+                sys.stdout.flush()
+                sys.stderr.flush()
+                os._exit(code)
+        os.close(write_fd)
+        self.workers[pid] = Worker(pid, self.generation, read_fd)
+
+    def _stop_worker(self, worker: Worker) -> None:
+        if not worker.stopping:
+            worker.stopping = True
+            self._kill(worker.pid, signal.SIGTERM)
+
+    def _reap(self) -> None:
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            worker = self.workers.pop(pid, None)
+            if worker is None:
+                continue
+            os.close(worker.ready_fd)
+            if worker.stopping or self.stopping:
+                continue
+            code = os.waitstatus_to_exitcode(status)
+            lifetime = time.monotonic() - worker.started_at
+            if not worker.ready or lifetime < FAST_FAILURE_SECONDS:
+                self.fast_failures += 1
+                if self.fast_failures >= MAX_FAST_FAILURES:
+                    print(f"Workers keep failing at startup (last exit {code}), giving up")
+                    self._stop()
+                    return
+            else:
+                self.fast_failures = 0
+            # Recycled by --max-requests exits cleanly; anything else is a crash worth flagging
+            print(f"Worker {pid} exited ({code}) after {lifetime:.0f}s, replacing it")
+
+    def _wait_for_events(self, timeout: float) -> None:
+        pending = {w.ready_fd: w for w in self.workers.values() if not w.ready}
+        if self.signals:
+            return
+        readable, _, _ = select.select(list(pending) + [self._wakeup_read], [], [], timeout)
+        for fd in readable:
+            if fd == self._wakeup_read:
+                try:
+                    os.read(fd, 512)
+                except BlockingIOError:
+                    pass
+                continue
+            worker = pending[fd]
+            if os.read(fd, 1):
+                worker.ready = True
+                self.fast_failures = 0
+                print(f"Worker {worker.pid} ready (generation {worker.generation})")
+
+    # Upgrade
+
+    def _spawn_new_master(self) -> None:
+        """Fork and exec a fresh master on the same socket; it stops us once its workers serve"""
+        print("Starting a new master for upgrade")
+        pid = os.fork()
+        if pid == 0:
+            os.environ[LISTEN_FD_ENV] = str(self.sock.fileno())
+            os.environ[PARENT_MASTER_ENV] = str(os.getppid())
+            try:
+                os.chdir(BACKEND_DIR)
+                os.execv(sys.executable, [sys.executable, os.path.abspath(__file__)] + sys.argv[1:])
+            finally:
+                os._exit(1)
+
+    # Helpers
+
+    @staticmethod
+    def _kill(pid: int, sig: int) -> None:
+        try:
+            os.kill(pid, sig)
+        except ProcessLookupError:
+            pass
+
+    def _write_pid_file(self) -> None:
+        if self.args.pid_file:
+            with open(self.args.pid_file, "w") as f:
+                f.write(str(os.getpid()))
+
+    def _remove_pid_file(self) -> None:
+        if self.args.pid_file:
+            try:
+                with open(self.args.pid_file) as f:
+                    ours = f.read().strip() == str(os.getpid())
+                if ours:
+                    os.remove(self.args.pid_file)
+            except OSError:
+                pass
+
+
+def run_worker(args: argparse.Namespace, sock: socket.socket, app, ready_fd: int, max_requests: Optional[int]) -> int:
+    """Body of a forked worker: serve on the inherited socket until told to stop"""
+    import uvicorn
+
+    # Master's handlers don't apply here; uvicorn installs its own for SIGINT/SIGTERM
+    signal.set_wakeup_fd(-1)
+    for sig in (signal.SIGHUP, signal.SIGUSR2, signal.SIGTTIN, signal.SIGTTOU):
+        signal.signal(sig, signal.SIG_IGN)
+    signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+
+    if app is None:
+        app = import_app(args.app)
+
+    class ReadyServer(uvicorn.Server):
+        """Tells the master once startup (lifespan included) has finished; stops without dropping accepted connections"""
+
+        async def startup(self, sockets=None):
+            await super().startup(sockets)
+            if self.started:
+                os.write(ready_fd, b"1")
+            os.close(ready_fd)
+
+        async def shutdown(self, sockets=None):
+            # uvicorn closes connections that have no request in progress; one accepted
+            # just before the stop may not have been read yet, so let it arrive first
+            for server in self.servers:
+                server.close()
+            await asyncio.sleep(ACCEPTED_DRAIN_SECONDS)
+            await super().shutdown(sockets)
+
+    config = uvicorn.Config(app, limit_max_requests=max_requests, **uvicorn_options(args))
+    server = ReadyServer(config)
+    server.run(sockets=[sock])
+    return 0 if server.started else 3
+
+
+def run_windows(args: argparse.Namespace) -> None:
+    """No fork on Windows: uvicorn's supervisor spawns workers that import the app themselves"""
+    import uvicorn
+
+    print(f"Starting {args.workers} worker(s) on http://{args.host}:{args.port} "
+          "(no preload or restart signals on Windows)")
+    uvicorn.run(args.app, host=args.host, port=args.port, workers=args.workers,
+                limit_max_requests=args.max_requests, app_dir=BACKEND_DIR, **uvicorn_options(args))
+
+
+def main():
+    args = parse_args()
+    os.chdir(BACKEND_DIR)
+
+    if args.reload:
+        import uvicorn
+        print(f"Starting development server on http://{args.host}:{args.port} (auto-reload)")
+        uvicorn.run(args.app, host=args.host, port=args.port, reload=True, app_dir=BACKEND_DIR,
+                    log_level=args.log_level)
+        return
+
+    # Workers share one cache file instead of each filling its own (services/shared_cache.py)
+    os.environ.setdefault("CACHE_BACKEND", "sqlite")
+
+    if not hasattr(os, "fork"):
+        run_windows(args)
+        return
+
+    Master(args, bind_socket(args)).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -5,7 +5,11 @@ from typing import Optional, Dict, Any
 from dotenv import load_dotenv
 from jose import JWTError, jwt
 from sqlalchemy.orm import Session
-import requests
+
+from services.lazy_imports import lazy_import
+from services.metrics import span
+
+requests = lazy_import("requests")  # Only the Google OAuth exchange needs it
 
 load_dotenv()
 
@@ -19,6 +23,9 @@ GOOGLE_CLIENT_ID = os.getenv("GOOGLE_CLIENT_ID", "")
 GOOGLE_CLIENT_SECRET = os.getenv("GOOGLE_CLIENT_SECRET", "")
 GOOGLE_REDIRECT_URI = os.getenv("GOOGLE_REDIRECT_URI", "http://127.0.0.1:8000/auth/callback")
 
+# Comma-separated emails allowed to use /admin endpoints (none by default)
+ADMIN_EMAILS = {email.strip().lower() for email in os.getenv("ADMIN_EMAILS", "").split(",") if email.strip()}
+
 
 class AuthService:
     """Handles authentication operations"""
@@ -28,6 +35,10 @@ class AuthService:
         self.google_client_secret = GOOGLE_CLIENT_SECRET
         self.google_redirect_uri = GOOGLE_REDIRECT_URI
 
+    def is_admin(self, email: Optional[str]) -> bool:
+        """Check if an account may use admin-only endpoints"""
+        return bool(email) and email.lower() in ADMIN_EMAILS
+
     def is_google_configured(self) -> bool:
         """Check if Google OAuth is properly configured"""
         return bool(self.google_client_id and self.google_client_secret)
@@ -68,15 +79,17 @@ class AuthService:
         }
 
         try:
-            token_response = requests.post(token_url, data=token_data)
-            token_response.raise_for_status()
+            with span("upstream.google_token"):
+                token_response = requests.post(token_url, data=token_data)
+                token_response.raise_for_status()
             tokens = token_response.json()
 
             # Get user info
             userinfo_url = "https://www.googleapis.com/oauth2/v2/userinfo"
             headers = {"Authorization": f"Bearer {tokens['access_token']}"}
-            userinfo_response = requests.get(userinfo_url, headers=headers)
-            userinfo_response.raise_for_status()
+            with span("upstream.google_userinfo"):
+                userinfo_response = requests.get(userinfo_url, headers=headers)
+                userinfo_response.raise_for_status()
             user_info = userinfo_response.json()
 
             return {
@@ -0,0 +1,54 @@
+"""Deferred deletion of resume blobs that no resume refers to any more"""
+import os
+import time
+from typing import Any, Dict, List
+
+from sqlalchemy import or_, select
+
+from database import SessionLocal
+from models.db_models import Resume
+from services.blob_store import blob_store
+from services.task_queue import task_queue
+
+# Blobs stored again within this long (a concurrent upload of the same file) are left for a later sweep
+BLOB_GC_GRACE_SECONDS = float(os.getenv("BLOB_GC_GRACE_SECONDS", "600"))
+
+DELETE_BLOBS_TASK = "blobs.delete_unreferenced"
+
+
+def delete_blobs_task(keys: List[str]):
+    """Task row deleting `keys` after the grace period, to commit with the rows that stopped using them"""
+    return task_queue.new_task(DELETE_BLOBS_TASK, {"keys": sorted(keys)}, delay=BLOB_GC_GRACE_SECONDS)
+
+
+@task_queue.register(DELETE_BLOBS_TASK)
+def delete_unreferenced_blobs(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Delete the given blobs unless a resume refers to them again or one was
+    stored again recently. Blobs are content-addressed, so another upload of
+    the same file (by any user) shares them; an upload stores its blobs before
+    committing its row, and put refreshes a blob's time, so a recent time
+    means a row may be about to refer to it. Those are checked again later.
+    """
+    keys = set(payload["keys"])
+    with SessionLocal() as db:
+        rows = db.execute(select(Resume.original_blob_key, Resume.text_blob_key).where(
+            or_(Resume.original_blob_key.in_(keys), Resume.text_blob_key.in_(keys))
+        )).all()
+    unreferenced = keys - {key for row in rows for key in row}
+
+    deleted, recent = [], []
+    for key in sorted(unreferenced):
+        modified_at = blob_store.modified_at(key)
+        if modified_at is None:
+            continue
+        if time.time() - modified_at < BLOB_GC_GRACE_SECONDS:
+            recent.append(key)
+        else:
+            blob_store.delete(key)
+            deleted.append(key)
+    if recent:
+        with SessionLocal() as db:
+            db.add(delete_blobs_task(recent))
+            db.commit()
+    return {"deleted": len(deleted), "still_used": len(keys - unreferenced), "rechecking": len(recent)}
@@ -0,0 +1,119 @@
+"""Content-addressed blob storage for original resume uploads and extracted text"""
+import hashlib
+import os
+import tempfile
+from abc import ABC, abstractmethod
+from typing import Optional
+
+BLOB_STORE_DIR = os.getenv("BLOB_STORE_DIR", "./blobs")
+
+
+class BlobStore(ABC):
+    """
+    Interface for content-addressed storage.
+
+    Blobs are keyed by the SHA-256 of their bytes, so identical uploads are
+    stored once and a key always refers to the same content. Keys map to
+    "sha256/ab/cd/<hash>" paths, which work equally well as filesystem paths
+    or S3 object keys.
+    """
+
+    @abstractmethod
+    def put(self, data: bytes) -> str:
+        """Store bytes and return their key"""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the bytes for a key, or None if missing"""
+
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        """Whether a blob is stored under key"""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Remove a blob; deleting a missing key is not an error"""
+
+    @abstractmethod
+    def modified_at(self, key: str) -> Optional[float]:
+        """When the blob was last stored (epoch seconds; put refreshes it), or None if missing"""
+
+    def put_text(self, text: str) -> str:
+        return self.put(text.encode("utf-8"))
+
+    def get_text(self, key: str) -> Optional[str]:
+        data = self.get(key)
+        return data.decode("utf-8") if data is not None else None
+
+    @staticmethod
+    def key_for(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+
+    @staticmethod
+    def relative_path(key: str) -> str:
+        """Sharded location for a key, e.g. sha256/3f/a2/3fa2..."""
+        if len(key) != 64 or any(c not in "0123456789abcdef" for c in key):
+            raise ValueError(f"Invalid blob key: {key!r}")
+        return f"sha256/{key[:2]}/{key[2:4]}/{key}"
+
+
+class LocalBlobStore(BlobStore):
+    """Blob store backed by a sharded directory tree on the local filesystem"""
+
+    def __init__(self, root: str = BLOB_STORE_DIR):
+        self.root = os.path.abspath(root)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, *self.relative_path(key).split("/"))
+
+    def put(self, data: bytes) -> str:
+        key = self.key_for(data)
+        path = self._path(key)
+        if os.path.exists(path):
+            # Same content already stored: refresh its time so a pending deletion sweep spares it
+            try:
+                os.utime(path)
+                return key
+            except FileNotFoundError:
+                pass  # Deleted in between, store it again
+
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+
+        # Write to a temp file and rename, so readers never see a partial blob
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return key
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            with open(self._path(key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def modified_at(self, key: str) -> Optional[float]:
+        try:
+            return os.path.getmtime(self._path(key))
+        except FileNotFoundError:
+            return None
+
+
+# Singleton instance
+blob_store = LocalBlobStore()
@@ -0,0 +1,288 @@
+"""
+Predictive cache warming for job searches
+
+Every search is counted per day, query, source and (signed-in) user in the
+search_queries table. A background thread in each worker then, every
+WARM_INTERVAL seconds:
+
+  - writes this worker's counts to the database
+  - refetches the WARM_TOP_N most frequent searches of the last
+    WARM_LOOKBACK_DAYS whose shared cache entries are missing or about to go
+    stale, so first-page loads are cache hits. Paid upstreams (JSearch) are
+    only refetched for searches seen in the last WARM_RECENT_SECONDS, and
+    only while the quota governor is in normal mode
+  - during the off-peak hours, once a day: fetches each active user's recent
+    searches and pre-scores the results against their primary resume
+
+With a shared cache backend only one worker warms per interval (a claim in
+the cache); with the per-worker memory backend every worker warms its own.
+"""
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, desc, func, select, union, update
+from sqlalchemy.exc import IntegrityError
+
+from database import SessionLocal
+from models.db_models import Resume, SearchQuery, User
+from services.job_api_service import job_api_service, normalize_query
+from services.job_record import JobRecord
+from services.match_scores import match_score_service
+from services.quota import QuotaClient, current_client
+from services.shared_cache import SharedCache
+
+CACHE_WARMING = os.getenv("CACHE_WARMING", "on") != "off"
+WARM_INTERVAL = float(os.getenv("WARM_INTERVAL", "60"))  # seconds between warming passes
+WARM_TOP_N = int(os.getenv("WARM_TOP_N", "20"))  # most frequent searches kept warm
+WARM_LOOKBACK_DAYS = int(os.getenv("WARM_LOOKBACK_DAYS", "7"))  # window search frequency is counted over
+WARM_LEAD_SECONDS = float(os.getenv("WARM_LEAD_SECONDS", "150"))  # refetch entries with less than this left fresh
+WARM_RECENT_SECONDS = float(os.getenv("WARM_RECENT_SECONDS", "3600"))  # paid upstreams: only searches this recent
+WARM_OFF_PEAK_HOURS = os.getenv("WARM_OFF_PEAK_HOURS", "2-6")  # local hours "start-end" for the per-user pass
+WARM_ACTIVE_USER_DAYS = int(os.getenv("WARM_ACTIVE_USER_DAYS", "14"))  # signed in or searched this recently
+WARM_USER_QUERIES = int(os.getenv("WARM_USER_QUERIES", "3"))  # recent searches prefetched per user
+WARM_MAX_USERS = int(os.getenv("WARM_MAX_USERS", "500"))
+
+DEFAULT_QUERY = "software engineer"  # The /jobs and /match default, for users with no searches yet
+
+# (Authorization header, "" if anonymous, query, source) -> [hits, last seen];
+# headers are resolved to users once per flush
+PendingKey = Tuple[str, str, str]
+
+
+def _off_peak_hours(spec: str) -> Tuple[int, int]:
+    start, _, end = spec.partition("-")
+    return int(start), int(end or start)
+
+
+class CacheWarmer:
+    """Counts searches and keeps the popular ones (and active users' own) warm in the shared cache"""
+
+    def __init__(self, session_factory=SessionLocal):
+        self.session_factory = session_factory
+        self.claims = SharedCache("warmer", WARM_INTERVAL)
+        self.off_peak = _off_peak_hours(WARM_OFF_PEAK_HOURS)
+        self._pending: Dict[PendingKey, List[Any]] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._ingest: Callable[[List[JobRecord]], None] = lambda jobs: None
+        self.last_pass: Dict[str, Any] = {}
+        self.last_user_pass: Dict[str, Any] = {}
+
+    def record(self, query: str, source: str = "all") -> None:
+        """Count a search; cheap enough for request handlers (written out on the next pass)"""
+        if self._thread is None:
+            return
+        query = normalize_query(query)[:255]
+        if not query:
+            return
+        client = current_client()
+        key = (client.authorization if client is not None else "", query, source.lower()[:50])
+        now = datetime.utcnow()
+        with self._lock:
+            entry = self._pending.get(key)
+            if entry is None:
+                self._pending[key] = [1, now]
+            else:
+                entry[0] += 1
+                entry[1] = now
+
+    # Background thread
+
+    def start(self, ingest: Optional[Callable[[List[JobRecord]], None]] = None) -> None:
+        """
+        Start warming in this process. `ingest` receives fetched jobs, to
+        feed the job pool and score precomputation like a live search does.
+        """
+        if self._thread or not CACHE_WARMING:
+            return
+        if ingest:
+            self._ingest = ingest
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="cache-warmer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout)
+        self._thread = None
+        self.flush()
+
+    def _run(self) -> None:
+        # First pass after one interval, out of the way of startup
+        while not self._stop.wait(WARM_INTERVAL):
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"Cache warming failed: {e}")
+
+    def run_once(self) -> None:
+        """One warming pass (blocking)"""
+        self.flush()
+        if self.claims.claim("popular", WARM_INTERVAL * 0.9):
+            self.last_pass = {"at": datetime.utcnow().isoformat(), **self.warm_popular()}
+        if self.is_off_peak():
+            today = datetime.utcnow().strftime("%Y-%m-%d")
+            if self.claims.claim(f"users:{today}", 24 * 3600):
+                self.last_user_pass = {"at": datetime.utcnow().isoformat(), **self.prefetch_users()}
+                self.prune()
+
+    def is_off_peak(self, hour: Optional[int] = None) -> bool:
+        hour = time.localtime().tm_hour if hour is None else hour
+        start, end = self.off_peak
+        if start == end:
+            return False
+        return start <= hour < end if start < end else hour >= start or hour < end
+
+    # Popular searches
+
+    def popular(self, limit: int = WARM_TOP_N) -> List[Dict[str, Any]]:
+        """Most frequent searches over the lookback window, all workers and users combined"""
+        since = (datetime.utcnow() - timedelta(days=WARM_LOOKBACK_DAYS)).strftime("%Y-%m-%d")
+        hits = func.sum(SearchQuery.hits).label("hits")
+        with self.session_factory() as db:
+            rows = db.execute(
+                select(SearchQuery.query, SearchQuery.source, hits, func.max(SearchQuery.last_seen_at).label("last_seen"))
+                .where(SearchQuery.day >= since)
+                .group_by(SearchQuery.query, SearchQuery.source)
+                .order_by(desc(hits))
+                .limit(limit)
+            ).all()
+        return [{"query": row.query, "source": row.source, "hits": row.hits, "last_seen": row.last_seen}
+                for row in rows]
+
+    def warm_popular(self) -> Dict[str, int]:
+        recent = datetime.utcnow() - timedelta(seconds=WARM_RECENT_SECONDS)
+        searches = self.popular()
+        fetched = 0
+        for search in searches:
+            jobs = job_api_service.refresh_search(search["query"], search["source"], WARM_LEAD_SECONDS,
+                                                  include_paid=search["last_seen"] >= recent)
+            if jobs:
+                fetched += len(jobs)
+                self._ingest(jobs)
+        return {"searches": len(searches), "jobs_fetched": fetched}
+
+    # Active users, off-peak
+
+    def prefetch_users(self) -> Dict[str, int]:
+        """Fetch each active user's recent searches and pre-score the jobs against their primary resume"""
+        since = datetime.utcnow() - timedelta(days=WARM_ACTIVE_USER_DAYS)
+        since_day = since.strftime("%Y-%m-%d")
+        with self.session_factory() as db:
+            active = union(
+                select(SearchQuery.user_id).where(SearchQuery.day >= since_day, SearchQuery.user_id != 0),
+                select(User.id).where(User.last_login >= since),
+            )
+            resumes = db.execute(
+                select(Resume.id, Resume.user_id)
+                .where(Resume.is_primary == True, Resume.user_id.in_(active))
+                .order_by(Resume.updated_at.desc())
+                .limit(WARM_MAX_USERS)
+            ).all()
+
+        users = scored = 0
+        for resume_id, user_id in resumes:
+            if self._stop.is_set():
+                break
+            jobs: Dict[int, JobRecord] = {}
+            for query, source in self.recent_searches(user_id, since_day) or [(DEFAULT_QUERY, "all")]:
+                for job in job_api_service.search(query, source):
+                    jobs[job.id] = job
+            if jobs:
+                self._ingest(list(jobs.values()))
+                scored += match_score_service.score_jobs_for_resume(resume_id, list(jobs.values()))
+            users += 1
+        return {"users": users, "jobs_scored": scored}
+
+    def recent_searches(self, user_id: int, since_day: str, limit: int = WARM_USER_QUERIES) -> List[Tuple[str, str]]:
+        last_seen = func.max(SearchQuery.last_seen_at)
+        with self.session_factory() as db:
+            rows = db.execute(
+                select(SearchQuery.query, SearchQuery.source)
+                .where(SearchQuery.user_id == user_id, SearchQuery.day >= since_day)
+                .group_by(SearchQuery.query, SearchQuery.source)
+                .order_by(desc(last_seen))
+                .limit(limit)
+            ).all()
+        return [(row.query, row.source) for row in rows]
+
+    # Search counts
+
+    def flush(self) -> None:
+        """Write counted searches to the database, adding to what other workers wrote"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+
+        user_ids: Dict[str, int] = {"": 0}
+        rows: Dict[Tuple[str, int, str, str], List[Any]] = {}
+        for (authorization, query, source), (hits, last_seen) in pending.items():
+            user_id = user_ids.get(authorization)
+            if user_id is None:
+                user_id = user_ids[authorization] = QuotaClient(authorization, "").user_id or 0
+            key = (last_seen.strftime("%Y-%m-%d"), user_id, query, source)
+            row = rows.setdefault(key, [0, last_seen])
+            row[0] += hits
+            row[1] = max(row[1], last_seen)
+
+        try:
+            with self.session_factory() as db:
+                for (day, user_id, query, source), (hits, last_seen) in rows.items():
+                    self._increment(db, day, user_id, query, source, hits, last_seen)
+                db.commit()
+        except Exception as e:
+            print(f"Search stats write failed, dropping {len(rows)} rows: {e}")
+
+    @staticmethod
+    def _increment(db, day: str, user_id: int, query: str, source: str, hits: int, last_seen: datetime) -> None:
+        def add_to_row() -> int:
+            return db.execute(
+                update(SearchQuery)
+                .where(SearchQuery.day == day, SearchQuery.user_id == user_id,
+                       SearchQuery.query == query, SearchQuery.source == source)
+                .values(hits=SearchQuery.hits + hits, last_seen_at=last_seen)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+
+        if add_to_row():
+            return
+        try:
+            with db.begin_nested():
+                db.add(SearchQuery(day=day, user_id=user_id, query=query, source=source, hits=hits,
+                                   last_seen_at=last_seen))
+        except IntegrityError:
+            add_to_row()  # Another worker wrote the row first
+
+    def prune(self) -> int:
+        """Drop counts older than both windows"""
+        days = max(WARM_LOOKBACK_DAYS, WARM_ACTIVE_USER_DAYS)
+        cutoff = (datetime.utcnow() - timedelta(days=days)).strftime("%Y-%m-%d")
+        with self.session_factory() as db:
+            removed = db.execute(delete(SearchQuery).where(SearchQuery.day < cutoff)).rowcount
+            db.commit()
+        return removed
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            pending = sum(hits for hits, _ in self._pending.values())
+        return {
+            "enabled": CACHE_WARMING,
+            "running": self._thread is not None,
+            "off_peak_hours": WARM_OFF_PEAK_HOURS,
+            "pending_searches": pending,
+            "last_pass": self.last_pass,
+            "last_user_pass": self.last_user_pass,
+            "popular": [{**search, "last_seen": search["last_seen"].isoformat() if search["last_seen"] else None}
+                        for search in self.popular()],
+        }
+
+
+# Singleton instance
+cache_warmer = CacheWarmer()
@@ -2,6 +2,8 @@ from enum import Enum
 from typing import List, Dict, Optional
 import re
 
+from services.job_record import Job, JobRecord, as_record
+
 class ClearanceLevel(Enum):
     NONE = "none"
     CONFIDENTIAL = "confidential"
@@ -46,13 +48,19 @@ class ClearanceFilter:
         
         return ClearanceLevel.NONE
     
-    def filter_jobs_by_clearance(self, jobs: List[Dict], required_level: ClearanceLevel) -> List[Dict]:
-        """Filter jobs by clearance level"""
+    def job_clearance_level(self, job: JobRecord) -> ClearanceLevel:
+        """Clearance a job requires, extracted once and cached on the record"""
+        if job.clearance_level is None:
+            job.clearance_level = self.extract_clearance_level(job.description or "").value
+        return ClearanceLevel(job.clearance_level)
+
+    def filter_jobs_by_clearance(self, jobs: List[Job], required_level: ClearanceLevel) -> List[JobRecord]:
+        """Filter jobs by clearance level (each record's clearance_level is set)"""
         filtered_jobs = []
         
         for job in jobs:
-            job_clearance = self.extract_clearance_level(job.get("description", ""))
-            job["clearance_level"] = job_clearance.value
+            job = as_record(job)
+            job_clearance = self.job_clearance_level(job)
             
             if required_level == ClearanceLevel.NONE or job_clearance == required_level:
                 filtered_jobs.append(job)
@@ -0,0 +1,71 @@
+"""Per-user cache of dashboard stats, invalidated on resume or saved-job writes"""
+import os
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from models.db_models import Resume, SavedJob
+from services.cache import TTLCache
+
+DASHBOARD_CACHE_TTL = float(os.getenv("DASHBOARD_CACHE_TTL", "30"))  # seconds, 0 disables
+DASHBOARD_CACHE_SIZE = int(os.getenv("DASHBOARD_CACHE_SIZE", "10000"))
+
+# Session.info key holding user IDs whose dashboards change when the session commits
+_DIRTY_USERS_KEY = "dashboard_dirty_users"
+
+
+class DashboardCache:
+    """TTL/LRU cache of dashboard stats keyed by user ID"""
+
+    def __init__(self, max_size: int = DASHBOARD_CACHE_SIZE, ttl: float = DASHBOARD_CACHE_TTL):
+        self._cache = TTLCache(max_size=max_size, ttl=ttl)
+
+    def get(self, user_id: int) -> Optional[Dict[str, Any]]:
+        return self._cache.get(user_id)
+
+    def put(self, user_id: int, stats: Dict[str, Any]) -> None:
+        self._cache.set(user_id, stats)
+
+    def invalidate(self, user_id: int) -> None:
+        self._cache.invalidate(user_id)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def set_ttl(self, ttl: float) -> None:
+        """Change the entry lifetime (0 disables caching)"""
+        self._cache.ttl = ttl
+        self._cache.clear()
+
+
+# Singleton instance
+dashboard_cache = DashboardCache()
+
+
+# Invalidate when a Resume or SavedJob row is written. The entry is dropped at
+# flush time and again after commit, so a dashboard read that races the
+# transaction can't re-cache pre-commit data. Bulk UPDATE/DELETE statements
+# bypass these events; callers using them must invalidate explicitly.
+@event.listens_for(Resume, "after_insert")
+@event.listens_for(Resume, "after_update")
+@event.listens_for(Resume, "after_delete")
+@event.listens_for(SavedJob, "after_insert")
+@event.listens_for(SavedJob, "after_update")
+@event.listens_for(SavedJob, "after_delete")
+def _mark_dashboard_dirty(mapper, connection, target):
+    dashboard_cache.invalidate(target.user_id)
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_DIRTY_USERS_KEY, set()).add(target.user_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session):
+    for user_id in session.info.pop(_DIRTY_USERS_KEY, ()):
+        dashboard_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session):
+    session.info.pop(_DIRTY_USERS_KEY, None)
@@ -0,0 +1,170 @@
+"""Text embeddings for semantic resume/job matching"""
+import hashlib
+import math
+import os
+import re
+import threading
+from typing import Dict, List, Optional
+
+from services.lazy_imports import lazy_import
+
+# numpy is required for semantic matching; without it the feature is disabled
+np = lazy_import("numpy")
+NUMPY_AVAILABLE = np is not None
+
+# Optional: a real local embedding model (pip install sentence-transformers). It pulls in
+# torch, so it is only imported when the embedder is first built.
+sentence_transformers = lazy_import("sentence_transformers")
+SENTENCE_TRANSFORMERS_AVAILABLE = sentence_transformers is not None
+
+from services.job_matcher import SKILL_SYNONYMS
+
+# "auto" uses sentence-transformers when installed, otherwise the hashing embedder
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "auto")
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+HASHING_DIM = int(os.getenv("EMBEDDING_HASHING_DIM", "384"))
+
+# Related technologies that should land near each other even when the exact
+# words differ (the hashing embedder has no learned semantics of its own)
+CONCEPT_GROUPS = {
+    "relational_databases": ["postgresql", "mysql", "sqlite", "oracle", "sql server", "mariadb", "sql",
+                             "relational", "rdbms"],
+    "nosql_databases": ["mongodb", "dynamodb", "cassandra", "redis", "couchbase", "nosql"],
+    "cloud": ["amazon web services", "azure", "google cloud platform", "cloud", "ec2", "s3", "lambda"],
+    "containers": ["docker", "kubernetes", "containers", "container", "helm", "ecs", "eks"],
+    "frontend": ["react.js", "vue.js", "angular", "next.js", "frontend", "front-end", "html", "css"],
+    "backend": ["nodejs", "django", "flask", "fastapi", "spring", "express", "backend", "back-end", "api"],
+    "machine_learning": ["machine learning", "artificial intelligence", "tensorflow", "pytorch",
+                         "scikit-learn", "deep learning", "nlp", "data science"],
+    "devops": ["continuous integration", "jenkins", "terraform", "ansible", "devops", "sre", "github actions"],
+    "data_engineering": ["spark", "hadoop", "kafka", "airflow", "etl", "data pipeline", "snowflake"],
+    "mobile": ["ios", "android", "swift", "kotlin", "react native", "flutter", "mobile"],
+}
+
+STOP_WORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is", "it", "of", "on", "or",
+    "our", "the", "to", "we", "will", "with", "you", "your", "this", "that", "have", "has", "experience",
+}
+
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]")
+
+
+def _build_term_map() -> Dict[str, str]:
+    """Map synonyms onto their canonical skill name"""
+    terms = {}
+    for canonical, synonyms in SKILL_SYNONYMS.items():
+        terms[canonical] = canonical
+        for synonym in synonyms:
+            terms.setdefault(synonym, canonical)
+    return terms
+
+
+def _build_concept_map() -> Dict[str, List[str]]:
+    concepts: Dict[str, List[str]] = {}
+    for concept, members in CONCEPT_GROUPS.items():
+        for member in members:
+            concepts.setdefault(member, []).append(concept)
+    return concepts
+
+
+_TERMS = _build_term_map()
+_CONCEPTS = _build_concept_map()
+
+
+class HashingEmbedder:
+    """
+    Dependency-free embedder: canonicalized unigrams and bigrams plus concept
+    tags, hashed into a fixed-size signed vector (the "hashing trick").
+    """
+
+    def __init__(self, dim: int = HASHING_DIM):
+        self.dim = dim
+        self.name = f"hashing-{dim}-v1"
+
+    def _features(self, text: str) -> Dict[str, float]:
+        tokens = [_TERMS.get(t, t) for t in _TOKEN.findall(text.lower()) if t not in STOP_WORDS]
+        counts: Dict[str, float] = {}
+        for i, token in enumerate(tokens):
+            counts[token] = counts.get(token, 0) + 1
+            if i + 1 < len(tokens):
+                bigram = f"{token} {tokens[i + 1]}"
+                bigram = _TERMS.get(bigram, bigram)
+                counts[bigram] = counts.get(bigram, 0) + 0.5
+                for concept in _CONCEPTS.get(bigram, ()):
+                    counts["concept:" + concept] = counts.get("concept:" + concept, 0) + 1
+            for concept in _CONCEPTS.get(token, ()):
+                counts["concept:" + concept] = counts.get("concept:" + concept, 0) + 1
+        # Sublinear term frequency so long descriptions don't drown out skills
+        return {feature: 1 + math.log(count) if count >= 1 else count for feature, count in counts.items()}
+
+    def embed(self, texts: List[str]):
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature, weight in self._features(text).items():
+                digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+                value = int.from_bytes(digest, "little")
+                sign = 1.0 if value & 1 else -1.0
+                vectors[row, (value >> 1) % self.dim] += sign * weight
+        return _normalize(vectors)
+
+
+class SentenceTransformerEmbedder:
+    """Local transformer embedding model (CPU-friendly MiniLM by default), loaded on first use"""
+
+    def __init__(self, model_name: str = EMBEDDING_MODEL):
+        self.model_name = model_name
+        self._model = None
+        self._lock = threading.Lock()
+        self.name = f"st:{model_name}"
+
+    def _load(self):
+        with self._lock:
+            if self._model is None:
+                print(f"Loading embedding model {self.model_name}")
+                self._model = sentence_transformers.SentenceTransformer(self.model_name, device="cpu")
+        return self._model
+
+    @property
+    def dim(self) -> int:
+        return self._load().get_sentence_embedding_dimension()
+
+    def embed(self, texts: List[str]):
+        vectors = self._load().encode(texts, batch_size=64, normalize_embeddings=True, show_progress_bar=False)
+        return np.asarray(vectors, dtype=np.float32)
+
+
+def _normalize(vectors):
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def job_embedding_text(job: Dict) -> str:
+    """Text used to embed a job posting: title and skills first, then the description"""
+    skills = ", ".join(job.get("skills") or [])
+    return f"{job.get('title', '')}\n{skills}\n{(job.get('description') or '')[:2000]}"
+
+
+def resume_embedding_text(resume_text: str, skills: Optional[List[str]] = None) -> str:
+    return f"{', '.join(skills or [])}\n{resume_text[:4000]}"
+
+
+_embedder = None
+_embedder_lock = threading.Lock()
+
+
+def get_embedder():
+    """Process-wide embedder chosen by EMBEDDING_BACKEND, or None if semantic matching is unavailable"""
+    global _embedder
+    if not NUMPY_AVAILABLE:
+        return None
+    with _embedder_lock:
+        if _embedder is None:
+            use_model = EMBEDDING_BACKEND == "sentence-transformers" or (
+                EMBEDDING_BACKEND == "auto" and SENTENCE_TRANSFORMERS_AVAILABLE
+            )
+            if use_model and SENTENCE_TRANSFORMERS_AVAILABLE:
+                _embedder = SentenceTransformerEmbedder()
+            else:
+                _embedder = HashingEmbedder()
+        return _embedder
@@ -1,19 +1,141 @@
-import requests
 import os
-from typing import List, Dict
+import hashlib
+from typing import Callable, List, Dict, Optional, Tuple
 from dotenv import load_dotenv
+from services.job_catalog import job_catalog
+from services.job_pool import job_pool
+from services.job_record import JobRecord
+from services.lazy_imports import lazy_import
+from services.metrics import span
+from services.quota import NORMAL, QuotaExceeded, quota_governor
+from services.shared_cache import SharedCache
+
+requests = lazy_import("requests")  # Imported on the first upstream call
 
 # Load environment variables from .env file
 load_dotenv()
 
+# Upstream job APIs. Override to point at local stand-ins (benchmarks/loadtest.py)
+JSEARCH_BASE_URL = os.getenv("JSEARCH_BASE_URL", "https://jsearch.p.rapidapi.com").rstrip("/")
+AMAZON_JOBS_BASE_URL = os.getenv("AMAZON_JOBS_BASE_URL", "https://www.amazon.jobs").rstrip("/")
+GREENHOUSE_BASE_URL = os.getenv("GREENHOUSE_BASE_URL", "https://api.greenhouse.io").rstrip("/")
+
+# Search results shared by all workers (services/shared_cache.py). Fresh for the TTL, then served
+# stale for up to JOB_SEARCH_CACHE_STALE more seconds while one request refreshes them.
+JOB_SEARCH_CACHE_TTL = float(os.getenv("JOB_SEARCH_CACHE_TTL", "600"))  # seconds, 0 disables
+JOB_SEARCH_CACHE_STALE = float(os.getenv("JOB_SEARCH_CACHE_STALE", "3600"))
+
+# (shared cache key, fetch, paid upstream or None, quota units) for one cached upstream search
+SearchEntry = Tuple[str, Callable[[], List[Dict]], Optional[str], int]
+
+
+def normalize_query(query: str) -> str:
+    """Search text as used in cache keys and query statistics"""
+    return " ".join(query.lower().split())
+
+
 class JobAPIService:
     """Service to fetch jobs from multiple sources"""
     
     def __init__(self):
         # Get API keys from environment variables
         self.rapidapi_key = os.getenv("RAPIDAPI_KEY", "")
+        self.cache = SharedCache("jobs", JOB_SEARCH_CACHE_TTL, JOB_SEARCH_CACHE_STALE)
+
+    def _cached_search(self, key: str, fetch, upstream: Optional[str] = None, units: int = 1) -> List[JobRecord]:
+        """
+        Search results from the shared cache, or fetch() them. Empty results
+        aren't cached since failed upstream calls also return []. Jobs are
+        added to this worker's catalog either way so detail lookups work,
+        and returned as the catalog's records.
+
+        Fetches from a paid `upstream` go through the quota governor: while
+        it is conserving, a stale entry is served rather than refreshed, and
+        a refused fetch serves whatever is cached (or nothing).
+        """
+        if upstream:
+            if quota_governor.mode(upstream) != NORMAL:
+                jobs = self.cache.get(key)
+                if jobs:
+                    return job_catalog.add_jobs(jobs)
+            fetch = self._metered(upstream, units, fetch)
+
+        try:
+            jobs = self.cache.get_or_compute(key, fetch, cacheable=bool)
+        except QuotaExceeded as e:
+            print(f"Warning: {e}, serving cached results")
+            jobs = self.cache.get(key) or []
+        return job_catalog.add_jobs(jobs)
+
+    @staticmethod
+    def _metered(upstream: str, units: int, fetch):
+        def metered_fetch() -> List[Dict]:
+            quota_governor.acquire(upstream, units)  # Failed calls count too, the upstream bills them
+            return fetch()
+        return metered_fetch
         
-    def search_indeed_jobs(self, query: str, location: str = "United States", num_pages: int = 1) -> List[Dict]:
+    def _jsearch_entry(self, query: str, location: str = "United States", num_pages: int = 1) -> SearchEntry:
+        key = f"jsearch:{normalize_query(query)}|{normalize_query(location)}|{num_pages}"
+        return key, lambda: self._fetch_jsearch_jobs(query, location, num_pages), "jsearch", num_pages
+
+    def _company_entry(self, company: str, keywords: str) -> Optional[SearchEntry]:
+        company_lower = company.lower()
+        if company_lower == "aws" or company_lower == "amazon":
+            return f"aws:{normalize_query(keywords)}", lambda: self._fetch_amazon_jobs(keywords), None, 0
+        if company_lower == "netflix":
+            return f"netflix:{normalize_query(keywords)}", lambda: self._fetch_netflix_jobs(keywords), None, 0
+        return None
+
+    def _search_entries(self, query: str, source: str = "all") -> List[SearchEntry]:
+        """The cached upstream searches a search() for `query` on `source` is made of"""
+        entries = []
+        if source in ("all", "indeed") and self.rapidapi_key:
+            entries.append(self._jsearch_entry(query))
+        if source in ("all", "aws", "amazon"):
+            entries.append(self._company_entry("aws", query))
+        if source in ("all", "netflix"):
+            entries.append(self._company_entry("netflix", query))
+        return entries
+
+    def search(self, query: str, source: str = "all") -> List[JobRecord]:
+        """Jobs for `query` from one source ("indeed", "aws", "netflix", "microsoft") or "all" of them"""
+        jobs = []
+        if source == "all" or source == "indeed":
+            jobs.extend(self.search_indeed_jobs(query))
+        if source == "all" or source in ["aws", "amazon"]:
+            jobs.extend(self.search_company_careers("aws", query))
+        if source == "all" or source == "netflix":
+            jobs.extend(self.search_company_careers("netflix", query))
+        if source == "all" or source == "microsoft":
+            jobs.extend(self.search_company_careers("microsoft", query))
+        return jobs
+
+    def refresh_search(self, query: str, source: str = "all", lead_seconds: float = 0.0,
+                       include_paid: bool = True) -> List[JobRecord]:
+        """
+        Refetch the cached results search() uses for `query` when they are
+        missing or fresh for less than `lead_seconds`, so the next request
+        is a cache hit. Paid upstreams are skipped unless `include_paid` and
+        the quota governor is in normal mode. Returns the jobs fetched.
+        """
+        fetched = []
+        for key, fetch, upstream, units in self._search_entries(query, source):
+            remaining = self.cache.fresh_for(key)
+            if remaining is not None and remaining > lead_seconds:
+                continue
+            if upstream:
+                if not include_paid or quota_governor.mode(upstream) != NORMAL:
+                    continue
+                fetch = self._metered(upstream, units, fetch)
+            try:
+                jobs = self.cache.refresh(key, fetch, cacheable=bool)
+            except QuotaExceeded:
+                continue
+            if jobs:
+                fetched.extend(job_catalog.add_jobs(jobs))
+        return fetched
+
+    def search_indeed_jobs(self, query: str, location: str = "United States", num_pages: int = 1) -> List[JobRecord]:
         """
         Search jobs using JSearch API (aggregates Indeed, LinkedIn, etc.)
         Free tier: 2,500 requests/month
@@ -22,8 +144,12 @@ class JobAPIService:
         if not self.rapidapi_key:
             print("Warning: RAPIDAPI_KEY not set. No jobs will be returned from JSearch.")
             return []
-        
-        url = "https://jsearch.p.rapidapi.com/search"
+
+        return self._cached_search(*self._jsearch_entry(query, location, num_pages))
+
+    def _fetch_jsearch_jobs(self, query: str, location: str, num_pages: int) -> List[Dict]:
+        """Fetch one search from JSearch"""
+        url = f"{JSEARCH_BASE_URL}/search"
         
         headers = {
             "X-RapidAPI-Key": self.rapidapi_key,
@@ -38,15 +164,16 @@ class JobAPIService:
         }
         
         try:
-            response = requests.get(url, headers=headers, params=querystring, timeout=10)
-            response.raise_for_status()
+            with span("upstream.jsearch"):
+                response = requests.get(url, headers=headers, params=querystring, timeout=10)
+                response.raise_for_status()
             data = response.json()
             
             # Transform to our format
             jobs = []
             for job in data.get("data", []):
                 jobs.append({
-                    "id": hash(job.get("job_id", "")),
+                    "id": self._stable_id("jsearch", job.get("job_id", "")),
                     "title": job.get("job_title", ""),
                     "company": job.get("employer_name", ""),
                     "location": job.get("job_city", "") + ", " + job.get("job_state", ""),
@@ -64,20 +191,18 @@ class JobAPIService:
             print(f"Error fetching from JSearch API: {e}")
             return []
     
-    def search_company_careers(self, company: str, keywords: str = "") -> List[Dict]:
+    def search_company_careers(self, company: str, keywords: str = "") -> List[JobRecord]:
         """
         Search specific company career pages
         Currently supported: Netflix, AWS
         Not yet implemented: Microsoft, Oracle, L3Harris, OpenAI
         """
-        company_lower = company.lower()
+        entry = self._company_entry(company, keywords)
         
-        if company_lower == "aws" or company_lower == "amazon":
-            return self._fetch_amazon_jobs(keywords)
-        elif company_lower == "netflix":
-            return self._fetch_netflix_jobs(keywords)
-        elif company_lower == "microsoft":
-            return self._fetch_microsoft_jobs(keywords)
+        if entry:
+            return self._cached_search(*entry)
+        elif company.lower() == "microsoft":
+            return job_catalog.add_jobs(self._fetch_microsoft_jobs(keywords))
         else:
             # Company not yet supported
             print(f"Warning: {company} careers API not implemented. No jobs returned.")
@@ -85,7 +210,7 @@ class JobAPIService:
     
     def _fetch_amazon_jobs(self, keywords: str) -> List[Dict]:
         """Fetch jobs from Amazon/AWS careers API"""
-        url = "https://www.amazon.jobs/en/search.json"
+        url = f"{AMAZON_JOBS_BASE_URL}/en/search.json"
         params = {
             "offset": 0,
             "result_limit": 10,
@@ -98,14 +223,15 @@ class JobAPIService:
             params["search"] = keywords
         
         try:
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
+            with span("upstream.amazon"):
+                response = requests.get(url, params=params, timeout=10)
+                response.raise_for_status()
             data = response.json()
             
             jobs = []
             for job in data.get("jobs", []):
                 jobs.append({
-                    "id": hash(job.get("id_icims", "")),
+                    "id": self._stable_id("aws", job.get("id_icims", "")),
                     "title": job.get("title", ""),
                     "company": "Amazon Web Services",
                     "location": job.get("location", ""),
@@ -126,18 +252,19 @@ class JobAPIService:
     def _fetch_netflix_jobs(self, keywords: str) -> List[Dict]:
         """Fetch jobs from Netflix careers"""
         # Netflix uses Greenhouse API
-        url = "https://api.greenhouse.io/v1/boards/netflix/jobs"
+        url = f"{GREENHOUSE_BASE_URL}/v1/boards/netflix/jobs"
         
         try:
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
+            with span("upstream.greenhouse"):
+                response = requests.get(url, timeout=10)
+                response.raise_for_status()
             data = response.json()
             
             jobs = []
             for job in data.get("jobs", [])[:10]:  # Limit to 10
                 if keywords.lower() in job.get("title", "").lower():
                     jobs.append({
-                        "id": job.get("id", 0),
+                        "id": self._stable_id("netflix", str(job.get("id", ""))),
                         "title": job.get("title", ""),
                         "company": "Netflix",
                         "location": job.get("location", {}).get("name", ""),
@@ -189,6 +316,24 @@ class JobAPIService:
         
         return "none"
     
+    def get_job(self, job_id: int) -> Optional[JobRecord]:
+        """
+        Look up a previously fetched job (including its full description) by ID.
+        This worker's catalog is checked first, then the job pool in the
+        database, which every worker fills and which survives restarts and
+        catalog eviction (blocking on a catalog miss).
+        """
+        jobs = job_pool.get_jobs([job_id])
+        return jobs[0] if jobs else None
+    
+    def _stable_id(self, source: str, external_id: str) -> int:
+        """
+        Derive a job ID that is stable across processes and restarts.
+        Kept within 53 bits so JavaScript clients can represent it exactly.
+        """
+        digest = hashlib.blake2b(f"{source}:{external_id}".encode(), digest_size=8).digest()
+        return int.from_bytes(digest, "big") & ((1 << 53) - 1)
+    
     def _extract_skills(self, description: str) -> List[str]:
         """Extract common tech skills from job description"""
         common_skills = [
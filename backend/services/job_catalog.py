@@ -0,0 +1,65 @@
+"""In-memory catalog of recently fetched jobs, used to serve job details on demand"""
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+
+from services.job_record import Job, JobRecord
+
+# Upper bound on how many jobs are remembered for detail lookups
+DEFAULT_MAX_JOBS = 5000
+
+
+def _same_posting(record: JobRecord, job: Dict) -> bool:
+    """Whether a fetched posting dict matches a record we already hold (cheap fields only)"""
+    return (record.title == job.get("title", "") and record.url == job.get("url", "")
+            and record.posted_date == job.get("posted_date", ""))
+
+
+class JobCatalog:
+    """
+    Bounded, thread-safe store of job records keyed by their stable ID.
+
+    Also the place posting dicts become records: add_jobs hands back the
+    record already held for a job when the posting is unchanged, so a search
+    served from the shared cache reuses the records (and their cached
+    keyword IDs and clearance level) instead of building new ones.
+    """
+
+    def __init__(self, max_jobs: int = DEFAULT_MAX_JOBS):
+        self.max_jobs = max_jobs
+        self._jobs: "OrderedDict[int, JobRecord]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add_jobs(self, jobs: Iterable[Job]) -> List[JobRecord]:
+        """Remember jobs so they can be looked up later by ID. Returns their records, in order."""
+        records = []
+        with self._lock:
+            for job in jobs:
+                if type(job) is JobRecord:
+                    record = job
+                else:
+                    record = self._jobs.get(job.get("id"))
+                    if record is None or not _same_posting(record, job):
+                        record = JobRecord.from_dict(job)
+                records.append(record)
+                if record.id is None:
+                    continue
+                self._jobs[record.id] = record
+                self._jobs.move_to_end(record.id)
+
+            # Evict the least recently seen jobs
+            while len(self._jobs) > self.max_jobs:
+                self._jobs.popitem(last=False)
+        return records
+
+    def get(self, job_id: int) -> Optional[JobRecord]:
+        """Return the full job record for an ID, or None if it is unknown"""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+
+# Singleton instance
+job_catalog = JobCatalog()
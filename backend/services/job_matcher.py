@@ -1,5 +1,21 @@
+import os
 import re
-from typing import List, Dict, Set
+from array import array
+from functools import lru_cache
+from typing import List, Dict, FrozenSet, Iterable, Optional, Set
+
+from services.job_record import Job, JobMatch, JobRecord, Vocabulary, as_record, keyword_vocabulary
+from services.lazy_imports import lazy_import
+from services.metrics import timed
+
+np = lazy_import("numpy")  # Only match_snapshot needs it
+
+# Bump whenever the scoring weights or component scores change, so stored
+# match_scores from the old scorer are recomputed instead of reused
+SCORER_VERSION = 1
+
+# Share of the total given to embedding similarity when semantic scores are supplied
+SEMANTIC_WEIGHT = float(os.getenv("SEMANTIC_WEIGHT", "0.3"))
 
 # Skill synonyms for better matching
 SKILL_SYNONYMS = {
@@ -21,6 +37,16 @@ SKILL_SYNONYMS = {
 }
 
 
+# Words ignored in job titles
+TITLE_STOP_WORDS = frozenset({"the", "a", "an", "and", "or", "at", "in", "for", "-", "/"})
+
+# Description words counted for the keyword score, minus very common ones
+KEYWORD_PATTERN = re.compile(r'\b[a-zA-Z]{4,}\b')
+COMMON_WORDS = frozenset({"with", "that", "this", "have", "from", "they", "will", "been",
+                          "would", "could", "should", "about", "which", "their", "there",
+                          "what", "when", "where", "work", "working", "experience", "team"})
+
+
 def _normalize_skill(skill: str) -> Set[str]:
     """Return a set of normalized variations for a skill"""
     skill_lower = skill.lower().strip()
@@ -35,75 +61,99 @@ def _normalize_skill(skill: str) -> Set[str]:
     return variations
 
 
-def _calculate_skill_score(resume_skills: List[str], job_skills: List[str]) -> tuple:
-    """Calculate skill match score and return matched skills"""
-    if not job_skills:
-        return 0.0, []
+@lru_cache(maxsize=4096)
+def _skill_variations(skill: str) -> FrozenSet[str]:
+    """_normalize_skill, memoized: job skills come from a small set of names"""
+    return frozenset(_normalize_skill(skill))
+
 
-    # Normalize resume skills
+def _resume_skill_set(resume_skills: List[str]) -> Set[str]:
+    """Normalized variations of every resume skill"""
     resume_skill_set = set()
     for skill in resume_skills:
         resume_skill_set.update(_normalize_skill(skill))
+    return resume_skill_set
+
+
+def _calculate_skill_score(resume_skill_set: Set[str], job: JobRecord) -> tuple:
+    """Calculate skill match score and return matched skills"""
+    if not job.skill_names:
+        return 0.0, []
 
     # Find matches
     matched_skills = []
-    for job_skill in job_skills:
-        job_skill_variations = _normalize_skill(job_skill)
-        if resume_skill_set & job_skill_variations:
+    for job_skill in job.skill_names:
+        if not resume_skill_set.isdisjoint(_skill_variations(job_skill)):
             matched_skills.append(job_skill)
 
-    score = len(matched_skills) / len(job_skills) if job_skills else 0
+    score = len(matched_skills) / len(job.skill_names)
     return score, matched_skills
 
 
-def _calculate_title_score(resume_text: str, job_title: str) -> float:
-    """Calculate how well the job title matches resume content"""
+def title_words(job_title: str) -> List[str]:
+    """Words of a job title the title score counts (common words removed, repeats kept)"""
+    return [w for w in job_title.lower().split() if w not in TITLE_STOP_WORDS and len(w) > 2]
+
+
+def _calculate_title_score(resume_lower: str, job_title: str) -> float:
+    """Calculate how well the job title matches (lowercased) resume content"""
     if not job_title:
         return 0.0
 
-    resume_lower = resume_text.lower()
-    title_words = job_title.lower().split()
+    words = title_words(job_title)
+    if not words:
+        return 0.0
 
-    # Remove common words
-    stop_words = {"the", "a", "an", "and", "or", "at", "in", "for", "-", "/"}
-    title_words = [w for w in title_words if w not in stop_words and len(w) > 2]
+    matches = sum(1 for word in words if word in resume_lower)
+    return matches / len(words)
 
-    if not title_words:
-        return 0.0
 
-    matches = sum(1 for word in title_words if word in resume_lower)
-    return matches / len(title_words)
+def description_keywords(text: str) -> Set[str]:
+    """Significant words of a text, as the keyword score counts them"""
+    return set(KEYWORD_PATTERN.findall(text.lower())) - COMMON_WORDS
 
 
-def _calculate_keyword_score(resume_text: str, job_description: str) -> float:
-    """Calculate general keyword overlap between resume and job description"""
-    if not job_description:
-        return 0.0
+def _job_keyword_ids(job: JobRecord, vocabulary: Vocabulary) -> array:
+    """The job description's keywords as vocabulary IDs, computed once per record and vocabulary"""
+    keyword_ids = job.keyword_ids
+    if keyword_ids is None or job.keyword_generation != vocabulary.generation:
+        description = job.description
+        words = description_keywords(description) if description else ()
+        keyword_ids = array("I", [vocabulary.id(word) for word in words])
+        job.keyword_ids, job.keyword_generation = keyword_ids, vocabulary.generation
+    return keyword_ids
+
 
-    # Extract significant words from job description
-    job_words = set(re.findall(r'\b[a-zA-Z]{4,}\b', job_description.lower()))
-    resume_words = set(re.findall(r'\b[a-zA-Z]{4,}\b', resume_text.lower()))
+def _resume_keyword_ids(resume_text: str, vocabulary: Vocabulary) -> Set[int]:
+    """Resume keywords that appear in some job description seen so far (the only ones that can overlap)"""
+    keyword_ids = (vocabulary.get(word) for word in description_keywords(resume_text))
+    return {keyword_id for keyword_id in keyword_ids if keyword_id is not None}
 
-    # Remove very common words
-    common_words = {"with", "that", "this", "have", "from", "they", "will", "been",
-                    "would", "could", "should", "about", "which", "their", "there",
-                    "what", "when", "where", "work", "working", "experience", "team"}
-    job_words -= common_words
-    resume_words -= common_words
 
-    if not job_words:
+def _calculate_keyword_score(resume_keyword_ids: Set[int], job: JobRecord, vocabulary: Vocabulary) -> float:
+    """Calculate general keyword overlap between resume and job description"""
+    job_keyword_ids = _job_keyword_ids(job, vocabulary)
+    if not job_keyword_ids:
         return 0.0
 
-    overlap = len(job_words & resume_words)
+    overlap = sum(1 for keyword_id in job_keyword_ids if keyword_id in resume_keyword_ids)
     return min(overlap / 20, 1.0)  # Cap at 1.0, expect ~20 keyword matches for full score
 
 
-def match_jobs(resume_text: str, jobs: List[Dict], resume_skills: List[str] = None) -> List[Dict]:
+@timed("match.score")
+def match_jobs(resume_text: str, jobs: Iterable[Job], resume_skills: List[str] = None,
+               semantic_scores: Optional[Dict] = None) -> List[JobMatch]:
     """
     Match jobs based on weighted scoring:
     - 50% skill match
     - 30% title match
     - 20% keyword overlap
+
+    If semantic_scores (embedding cosine similarity keyed by job ID) is given,
+    it contributes SEMANTIC_WEIGHT of the total and the lexical score the rest.
+
+    Jobs may be JobRecords or posting dicts; matches reference the records
+    (JobMatch.to_dict gives the response shape).
     """
     # Extract skills from resume text if not provided
     if resume_skills is None:
@@ -112,39 +162,101 @@ def match_jobs(resume_text: str, jobs: List[Dict], resume_skills: List[str] = No
         resume_words = set(re.findall(r'\b\w+\b', resume_text.lower()))
         resume_skills = list(resume_words)
 
+    # Resume side, once per call rather than once per job
+    jobs = [as_record(job) for job in jobs]
+    resume_skill_set = _resume_skill_set(resume_skills)
+    resume_lower = resume_text.lower()
+    vocabulary = keyword_vocabulary()
+    for job in jobs:
+        _job_keyword_ids(job, vocabulary)  # New descriptions' words join the vocabulary before the resume is looked up
+    resume_keyword_ids = _resume_keyword_ids(resume_text, vocabulary)
+
     matches = []
 
     for job in jobs:
-        job_skills = job.get("skills", [])
-        job_title = job.get("title", "")
-        job_description = job.get("description", "")
-
         # Calculate component scores
-        skill_score, matched_skills = _calculate_skill_score(resume_skills, job_skills)
-        title_score = _calculate_title_score(resume_text, job_title)
-        keyword_score = _calculate_keyword_score(resume_text, job_description)
+        skill_score, matched_skills = _calculate_skill_score(resume_skill_set, job)
+        title_score = _calculate_title_score(resume_lower, job.title)
+        keyword_score = _calculate_keyword_score(resume_keyword_ids, job, vocabulary)
 
         # Weighted combination: 50% skills, 30% title, 20% keywords
         total_score = (skill_score * 0.5) + (title_score * 0.3) + (keyword_score * 0.2)
 
+        score_breakdown = {
+            "skills": round(skill_score * 100),
+            "title": round(title_score * 100),
+            "keywords": round(keyword_score * 100)
+        }
+        if semantic_scores is not None:
+            semantic_score = min(max(semantic_scores.get(job.id, 0.0), 0.0), 1.0)
+            total_score = total_score * (1 - SEMANTIC_WEIGHT) + semantic_score * SEMANTIC_WEIGHT
+            score_breakdown["semantic"] = round(semantic_score * 100)
+
         # Convert to percentage (0-100)
         match_percentage = int(round(total_score * 100))
 
-        matches.append({
-            **job,
-            "matched_skills": matched_skills,
-            "match_percentage": match_percentage,
-            "score_breakdown": {
-                "skills": round(skill_score * 100),
-                "title": round(title_score * 100),
-                "keywords": round(keyword_score * 100)
-            }
-        })
+        matches.append(JobMatch(job, matched_skills, match_percentage, score_breakdown))
 
     # Sort by match percentage descending
-    return sorted(matches, key=lambda x: x["match_percentage"], reverse=True)
+    return sorted(matches, key=lambda x: x.match_percentage, reverse=True)
 
 
-def get_suggestions(jobs: List[Dict]) -> List[Dict]:
+@timed("match.snapshot")
+def match_snapshot(resume_text: str, snapshot, resume_skills: List[str] = None, limit: int = 20,
+                   clearance_level: Optional[str] = None) -> List[JobMatch]:
+    """
+    match_jobs over every job in a services.job_snapshot.JobSnapshot, with
+    the same scores and tie order (rows are in job ID order), computed from
+    the snapshot's inverted postings rather than per job. Only the top
+    `limit` rows are turned into records. `clearance_level` (other than
+    "none") keeps only jobs requiring that level.
+    """
+    if resume_skills is None:
+        # Same fallback as match_jobs: every resume word is a potential skill
+        resume_skills = list(set(re.findall(r'\b\w+\b', resume_text.lower())))
+    if not len(snapshot) or limit <= 0:
+        return []
+
+    # Which vocabulary entries the resume matches, then per-row counts of them
+    resume_skill_set = _resume_skill_set(resume_skills)
+    resume_lower = resume_text.lower()
+    skill_ids = [skill_id for skill_id, skill in enumerate(snapshot.skill_names)
+                 if not resume_skill_set.isdisjoint(_skill_variations(skill))]
+    title_ids = [word_id for word_id, word in enumerate(snapshot.title_words) if word in resume_lower]
+    keyword_ids = snapshot.keyword_ids(description_keywords(resume_text))
+
+    skill_counts = snapshot.columns["skill_counts"]
+    title_counts = snapshot.columns["title_counts"]
+    skill_scores = snapshot.hits("skill", skill_ids) / np.maximum(skill_counts, 1)
+    title_scores = snapshot.hits("title", title_ids) / np.maximum(title_counts, 1)
+    keyword_scores = np.minimum(snapshot.hits("keyword", keyword_ids) / 20, 1.0)
+
+    # Weighted combination: 50% skills, 30% title, 20% keywords
+    totals = (skill_scores * 0.5) + (title_scores * 0.3) + (keyword_scores * 0.2)
+    percentages = np.rint(totals * 100).astype(np.int64)
+
+    rows = np.arange(len(snapshot))
+    if clearance_level and clearance_level != "none":
+        rows = rows[snapshot.clearance_mask(clearance_level)]
+    if len(rows) > limit:
+        kth = np.partition(percentages[rows], len(rows) - limit)[len(rows) - limit]
+        rows = rows[percentages[rows] >= kth]
+    top = rows[np.argsort(-percentages[rows], kind="stable")][:limit].tolist()
+
+    matches = []
+    matched = set(skill_ids)
+    for row, job in zip(top, snapshot.records(top)):
+        matched_skills = [snapshot.skill_names[skill_id] for skill_id in snapshot.skill_ids(row)
+                          if skill_id in matched]
+        score_breakdown = {
+            "skills": int(np.rint(skill_scores[row] * 100)),
+            "title": int(np.rint(title_scores[row] * 100)),
+            "keywords": int(np.rint(keyword_scores[row] * 100)),
+        }
+        matches.append(JobMatch(job, matched_skills, int(percentages[row]), score_breakdown))
+    return matches
+
+
+def get_suggestions(jobs: List[JobMatch]) -> List[JobMatch]:
     """Get job suggestions (returns top 3 jobs)"""
     return jobs[:3]
\ No newline at end of file
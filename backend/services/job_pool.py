@@ -0,0 +1,394 @@
+"""Persistent local pool of fetched jobs with an inverted index for candidate generation"""
+import os
+import re
+import threading
+import time
+from array import array
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session, undefer
+
+from services.lazy_imports import lazy_import
+
+np = lazy_import("numpy")
+NUMPY_AVAILABLE = np is not None
+
+from database import SessionLocal
+from models.db_models import CatalogJob
+from services.job_catalog import job_catalog
+from services.job_matcher import SKILL_SYNONYMS, TITLE_STOP_WORDS
+from services.job_record import Job, JobRecord
+
+# Same weights as match_jobs gives the skill and title components, so the
+# retrieval score is the scorer's total minus its keyword-overlap part
+SKILL_WEIGHT = 0.5
+TITLE_WEIGHT = 0.3
+
+# Jobs not seen in any fetch for this long are dropped from the pool (0 keeps them forever)
+JOB_POOL_RETENTION_DAYS = float(os.getenv("JOB_POOL_RETENTION_DAYS", "30"))
+JOB_POOL_SYNC_SECONDS = float(os.getenv("JOB_POOL_SYNC_SECONDS", "60"))  # how often workers pick up each other's jobs
+SYNC_OVERLAP = timedelta(minutes=2)
+COMPACT_MIN_DEAD = 1000  # Dead index rows tolerated before a rebuild, however small the pool
+
+_IN_CHUNK = 500
+_WORD = re.compile(r"[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]")
+
+
+def _build_canonical_skills() -> Dict[str, str]:
+    canonical = {}
+    for name, synonyms in SKILL_SYNONYMS.items():
+        canonical[name] = name
+        for synonym in synonyms:
+            canonical.setdefault(synonym, name)
+    return canonical
+
+
+_CANONICAL_SKILLS = _build_canonical_skills()
+
+
+def canonical_skill(skill: str) -> str:
+    skill = skill.lower().strip()
+    return _CANONICAL_SKILLS.get(skill, skill)
+
+
+def _retention_cutoff() -> Optional[datetime]:
+    if not JOB_POOL_RETENTION_DAYS:
+        return None
+    return datetime.utcnow() - timedelta(days=JOB_POOL_RETENTION_DAYS)
+
+
+def _timestamp(value: Optional[datetime]) -> float:
+    """Seconds since the epoch for a naive UTC datetime"""
+    return (value - _EPOCH).total_seconds() if value else 0.0
+
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def title_terms(title: str) -> Set[str]:
+    """Title words as match_jobs counts them"""
+    return {w for w in title.lower().split() if w not in TITLE_STOP_WORDS and len(w) > 2}
+
+
+def resume_terms(resume_text: str) -> Set[str]:
+    return set(resume_text.lower().split()) | set(_WORD.findall(resume_text.lower()))
+
+
+class _PoolIndex:
+    """
+    Posting lists of internal row numbers per skill and title term. Rows are
+    only appended: a job whose title or skills change gets a new row, and the
+    old one (like an expired job's) is marked dead and skipped until the next
+    rebuild.
+    """
+
+    def __init__(self):
+        self.ids: List[Optional[int]] = []
+        self.row_of: Dict[int, int] = {}
+        self.postings: Dict[str, array] = {}
+        # Per-row skill and title word counts, the denominators of match_jobs' component scores
+        self.skill_counts = array("i")
+        self.title_counts = array("i")
+        self.fingerprints = array("q")  # hash of (title, skills), to tell refreshed from changed postings
+        self.last_seen = array("d")  # epoch seconds
+        self.alive = bytearray()
+        self.dead = 0
+
+    def __len__(self) -> int:
+        return len(self.row_of)
+
+    def add(self, job_id: int, title: str, skills: List[str], seen: float) -> bool:
+        """Index a job, or re-index it if its title or skills changed. Returns whether it was new."""
+        skills = skills or []
+        fingerprint = hash((title, tuple(skills)))
+        row = self.row_of.get(job_id)
+        if row is not None:
+            self.last_seen[row] = max(self.last_seen[row], seen)
+            if self.fingerprints[row] == fingerprint:
+                return False
+            self.remove(job_id)
+        is_new = row is None
+
+        row = len(self.ids)
+        self.ids.append(job_id)
+        self.row_of[job_id] = row
+        skill_terms = {"s:" + canonical_skill(skill) for skill in skills}
+        title_words = {"t:" + word for word in title_terms(title)}
+        self.skill_counts.append(len(skills))
+        self.title_counts.append(len(title_words))
+        self.fingerprints.append(fingerprint)
+        self.last_seen.append(seen)
+        self.alive.append(1)
+        for term in skill_terms | title_words:
+            postings = self.postings.get(term)
+            if postings is None:
+                postings = self.postings[term] = array("i")
+            postings.append(row)
+        return is_new
+
+    def remove(self, job_id: int) -> None:
+        row = self.row_of.pop(job_id, None)
+        if row is not None:
+            self.ids[row] = None
+            self.alive[row] = 0
+            self.dead += 1
+
+    def expire(self, cutoff: float) -> int:
+        """Drop jobs last seen before cutoff; returns how many"""
+        expired = [job_id for job_id, row in self.row_of.items() if self.last_seen[row] < cutoff]
+        for job_id in expired:
+            self.remove(job_id)
+        return len(expired)
+
+
+class JobPool:
+    """
+    Every job posting we've fetched, stored in catalog_jobs so the pool grows
+    past what a single live API query returns.
+
+    The index held in memory is small: job IDs plus posting lists of
+    internal row numbers per term. Full postings stay in the database and are
+    loaded by ID for the shortlist only.
+
+    Every JOB_POOL_SYNC_SECONDS the index picks up jobs other workers added or
+    refreshed (by last_seen_at), drops jobs not seen within
+    JOB_POOL_RETENTION_DAYS (deleting them from catalog_jobs too), and is
+    rebuilt once dead rows make up half of it.
+    """
+
+    def __init__(self, session_factory=SessionLocal):
+        self.session_factory = session_factory
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._index = _PoolIndex()
+        self._synced_through: Optional[datetime] = None  # Latest last_seen_at read from the database
+        self._last_sync = 0.0
+        self._sync_pending = False
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="job-pool")
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    # Building
+
+    def _ensure_loaded(self) -> None:
+        with self._lock:
+            if not self._loaded:
+                self._load()
+                self._loaded = True
+                if len(self._index):
+                    print(f"Job pool loaded with {len(self._index)} jobs")
+            elif JOB_POOL_SYNC_SECONDS and not self._sync_pending \
+                    and time.monotonic() - self._last_sync >= JOB_POOL_SYNC_SECONDS:
+                self._sync_pending = True
+                self._executor.submit(self._run_sync)
+
+    def _load(self) -> None:
+        """Build a fresh index from every job within the retention window and swap it in"""
+        index = _PoolIndex()
+        query = select(CatalogJob.id, CatalogJob.title, CatalogJob.skills, CatalogJob.last_seen_at)
+        cutoff = _retention_cutoff()
+        if cutoff is not None:
+            query = query.where(CatalogJob.last_seen_at >= cutoff)
+        with self.session_factory() as db:
+            rows = db.execute(query).all()
+        synced_through = None
+        for row in rows:
+            index.add(row.id, row.title, row.skills, _timestamp(row.last_seen_at))
+            if row.last_seen_at and (synced_through is None or row.last_seen_at > synced_through):
+                synced_through = row.last_seen_at
+        with self._lock:
+            self._index = index
+            self._synced_through = synced_through
+            self._last_sync = time.monotonic()
+
+    def sync(self) -> int:
+        """
+        Apply changes made by other workers since the last sync, expire old
+        jobs and rebuild the index if it is mostly dead rows. Returns how many
+        rows the database delta contained.
+        """
+        cutoff = _retention_cutoff()
+        query = select(CatalogJob.id, CatalogJob.title, CatalogJob.skills, CatalogJob.last_seen_at)
+        if self._synced_through is not None:
+            # Re-read a margin, for rows committed late or stamped by a worker whose clock lags
+            query = query.where(CatalogJob.last_seen_at >= self._synced_through - SYNC_OVERLAP)
+        with self.session_factory() as db:
+            if cutoff is not None:
+                db.execute(delete(CatalogJob).where(CatalogJob.last_seen_at < cutoff))
+                db.commit()
+            rows = db.execute(query).all()
+
+        with self._lock:
+            for row in rows:
+                self._index.add(row.id, row.title, row.skills, _timestamp(row.last_seen_at))
+                if row.last_seen_at and (self._synced_through is None or row.last_seen_at > self._synced_through):
+                    self._synced_through = row.last_seen_at
+            if cutoff is not None:
+                self._index.expire(_timestamp(cutoff))
+            rebuild = self._index.dead > max(len(self._index), COMPACT_MIN_DEAD)
+            self._last_sync = time.monotonic()
+        if rebuild:
+            self._load()
+        return len(rows)
+
+    def _run_sync(self) -> None:
+        try:
+            self.sync()
+        except Exception as e:
+            print(f"Job pool sync failed: {e}")
+        finally:
+            self._sync_pending = False
+            self._last_sync = time.monotonic()
+
+    def add_jobs(self, jobs: Iterable[Job]) -> int:
+        """Persist jobs (refreshing ones already stored) and index new or changed ones. Returns how many were new."""
+        jobs = [job for job in jobs if job.get("id") is not None]
+        if not jobs:
+            return 0
+        self._ensure_loaded()
+
+        now = datetime.utcnow()
+        rows = {}
+        for job in jobs:
+            rows[job["id"]] = {
+                "id": job["id"],
+                "source": job.get("source"),
+                "title": job.get("title") or "",
+                "company": job.get("company"),
+                "skills": job.get("skills") or [],
+                "payload": job.to_dict() if type(job) is JobRecord else job,
+                "first_seen_at": now,
+                "last_seen_at": now,
+            }
+        with self.session_factory() as db:
+            db.execute(_upsert(db), list(rows.values()))
+            db.commit()
+
+        seen = _timestamp(now)
+        with self._lock:
+            return sum(self._index.add(row["id"], row["title"], row["skills"], seen) for row in rows.values())
+
+    def schedule_add_jobs(self, jobs: List[Job]) -> Future:
+        """add_jobs on a background thread, so fetch endpoints don't wait on the write"""
+        return self._executor.submit(self._run_add_jobs, jobs)
+
+    def _run_add_jobs(self, jobs: List[Job]) -> int:
+        try:
+            return self.add_jobs(jobs)
+        except Exception as e:
+            print(f"Job pool update failed: {e}")
+            return 0
+
+    # Querying
+
+    def candidates(self, skills: List[str], resume_text: str, limit: int = 300) -> List[Tuple[int, float]]:
+        """
+        Jobs with the highest share of their skills and title words covered by a
+        resume, as (job ID, retrieval score), best first.
+        """
+        self._ensure_loaded()
+        skill_terms = {"s:" + canonical_skill(skill) for skill in skills}
+        title_query = {"t:" + word for word in resume_terms(resume_text)}
+
+        with self._lock:
+            index = self._index
+            total = len(index.ids)
+            if not len(index):
+                return []
+            skill_postings = [index.postings[t] for t in skill_terms if t in index.postings]
+            title_postings = [index.postings[t] for t in title_query if t in index.postings]
+            ids = index.ids
+
+            if NUMPY_AVAILABLE:
+                skill_hits = np.zeros(total, dtype=np.float32)
+                for postings in skill_postings:
+                    skill_hits[np.frombuffer(postings, dtype=np.intc)] += 1
+                title_hits = np.zeros(total, dtype=np.float32)
+                for postings in title_postings:
+                    title_hits[np.frombuffer(postings, dtype=np.intc)] += 1
+                skill_counts = np.maximum(np.frombuffer(index.skill_counts, dtype=np.intc), 1)
+                title_counts = np.maximum(np.frombuffer(index.title_counts, dtype=np.intc), 1)
+                scores = SKILL_WEIGHT * skill_hits / skill_counts + TITLE_WEIGHT * title_hits / title_counts
+                if index.dead:
+                    scores *= np.frombuffer(index.alive, dtype=np.uint8)
+
+                matched = np.flatnonzero(scores)
+                if len(matched) > limit:
+                    matched = matched[np.argpartition(-scores[matched], limit - 1)[:limit]]
+                best = matched[np.argsort(-scores[matched], kind="stable")]
+                return [(ids[row], float(scores[row])) for row in best]
+
+            accumulated: Dict[int, float] = {}
+            for postings in skill_postings:
+                for row in postings:
+                    if index.alive[row]:
+                        accumulated[row] = accumulated.get(row, 0.0) + SKILL_WEIGHT / max(index.skill_counts[row], 1)
+            for postings in title_postings:
+                for row in postings:
+                    if index.alive[row]:
+                        accumulated[row] = accumulated.get(row, 0.0) + TITLE_WEIGHT / max(index.title_counts[row], 1)
+            best = sorted(accumulated.items(), key=lambda item: item[1], reverse=True)[:limit]
+            return [(ids[row], score) for row, score in best]
+
+    def get_jobs(self, job_ids: List[int]) -> List[JobRecord]:
+        """
+        Full postings for the given IDs, in the same order (unknown IDs are
+        skipped). Records this worker's catalog holds are reused; the rest are
+        loaded from the database and added to the catalog.
+        """
+        found: Dict[int, JobRecord] = {}
+        missing = []
+        for job_id in job_ids:
+            record = job_catalog.get(job_id)
+            if record is None:
+                missing.append(job_id)
+            else:
+                found[job_id] = record
+        if missing:
+            with self.session_factory() as db:
+                for i in range(0, len(missing), _IN_CHUNK):
+                    rows = db.execute(
+                        select(CatalogJob.payload).where(CatalogJob.id.in_(missing[i:i + _IN_CHUNK]))
+                    ).all()
+                    found.update((record.id, record) for record in job_catalog.add_jobs(row.payload for row in rows))
+        return [found[job_id] for job_id in job_ids if job_id in found]
+
+    def iter_jobs(self, batch_size: int = 1000) -> Iterable[List[Dict]]:
+        """Every posting in the pool, in ID order batches (for offline evaluation)"""
+        last_id: Optional[int] = None
+        with self.session_factory() as db:
+            while True:
+                query = select(CatalogJob).options(undefer(CatalogJob.payload)).order_by(CatalogJob.id).limit(batch_size)
+                if last_id is not None:
+                    query = query.where(CatalogJob.id > last_id)
+                batch = db.execute(query).scalars().all()
+                if not batch:
+                    return
+                last_id = batch[-1].id
+                yield [job.payload for job in batch]
+
+
+def _upsert(db: Session):
+    """INSERT that refreshes the stored posting and last_seen_at for jobs already in the pool"""
+    dialect = db.get_bind().dialect.name
+    module = postgresql if dialect == "postgresql" else sqlite
+    statement = module.insert(CatalogJob)
+    return statement.on_conflict_do_update(
+        index_elements=[CatalogJob.id],
+        set_={
+            "title": statement.excluded.title,
+            "company": statement.excluded.company,
+            "skills": statement.excluded.skills,
+            "payload": statement.excluded.payload,
+            "last_seen_at": statement.excluded.last_seen_at,
+        },
+    )
+
+
+# Singleton instance
+job_pool = JobPool()
@@ -0,0 +1,239 @@
+"""
+Compact in-memory job postings
+
+Jobs arrive from the upstream APIs (and the shared cache, and the job pool)
+as JSON dicts of about ten string keys. Held as dicts, a posting costs
+several kilobytes, most of it the description. A JobRecord keeps the same
+posting in __slots__, with:
+
+  - company, location, salary, source and skills interned: a catalog has
+    few distinct values, so records share one string object each (and an
+    interned string is freed with the last record using it)
+  - the description zlib-compressed; scoring uses cached keyword IDs
+    (job_matcher) and a cached clearance level (clearance_filter) instead
+    of the text, so it is only inflated for detail views and embeddings
+
+Keyword IDs come from a process-wide vocabulary that is replaced by an
+empty one once it outgrows KEYWORD_VOCABULARY_MAX; records notice the new
+generation and re-derive their IDs the next time they are scored.
+
+Records are converted back to dicts at the response boundary (to_dict) and
+when written to JSON stores. get() and [] give dict-style read access for
+code that handles both (embeddings, pagination, the job pool).
+"""
+import os
+import sys
+import threading
+import zlib
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+DESCRIPTION_COMPRESS_LEVEL = 6
+DESCRIPTION_COMPRESS_MIN = 128  # Shorter descriptions are kept as plain strings
+# Distinct description words remembered before the keyword vocabulary starts over
+KEYWORD_VOCABULARY_MAX = int(os.getenv("KEYWORD_VOCABULARY_MAX", "200000"))
+
+_MISSING = object()
+
+
+class Vocabulary:
+    """Interned strings numbered in first-seen order; IDs are stable for the life of the vocabulary"""
+
+    def __init__(self, generation: int = 0):
+        self.generation = generation
+        self._ids: Dict[str, int] = {}
+        self._names: List[str] = []
+        self._lock = threading.Lock()
+
+    def id(self, name: str) -> int:
+        """ID for a string, assigning the next one if it is new"""
+        vocab_id = self._ids.get(name)
+        if vocab_id is None:
+            with self._lock:
+                vocab_id = self._ids.get(name)
+                if vocab_id is None:
+                    name = sys.intern(name)
+                    vocab_id = len(self._names)
+                    self._names.append(name)
+                    self._ids[name] = vocab_id
+        return vocab_id
+
+    def get(self, name: str) -> Optional[int]:
+        """ID for a string already seen, else None"""
+        return self._ids.get(name)
+
+    def name(self, vocab_id: int) -> str:
+        return self._names[vocab_id]
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+
+_keyword_vocabulary = Vocabulary()  # Description words, filled in by job_matcher
+_keyword_vocabulary_lock = threading.Lock()
+
+
+def keyword_vocabulary() -> Vocabulary:
+    """
+    The vocabulary to assign keyword IDs from. Callers keep the one they got
+    for the whole scoring pass, so IDs stay comparable even if it is replaced.
+    """
+    global _keyword_vocabulary
+    vocabulary = _keyword_vocabulary
+    if len(vocabulary) > KEYWORD_VOCABULARY_MAX:
+        with _keyword_vocabulary_lock:
+            if _keyword_vocabulary is vocabulary:
+                _keyword_vocabulary = Vocabulary(vocabulary.generation + 1)
+            vocabulary = _keyword_vocabulary
+    return vocabulary
+
+
+def _intern(value: Any) -> Any:
+    return sys.intern(value) if type(value) is str else value
+
+
+class JobRecord:
+    """One job posting; see the module docstring for the layout"""
+    __slots__ = ("id", "title", "company", "location", "url", "posted_date", "salary", "source", "skill_names",
+                 "_description", "keyword_ids", "keyword_generation", "clearance_level", "extra")
+
+    # Keys of the posting dicts, in the order the job APIs produce them
+    FIELDS = ("id", "title", "company", "location", "description", "url", "posted_date", "skills", "salary", "source")
+
+    def __init__(self, id: Any, title: str = "", company: str = "", location: str = "", description: str = "",
+                 url: str = "", posted_date: str = "", skills: Iterable[str] = (), salary: str = "",
+                 source: str = "", extra: Optional[Dict[str, Any]] = None):
+        self.id = id
+        self.title = title
+        self.company = _intern(company)
+        self.location = _intern(location)
+        self.url = url
+        self.posted_date = posted_date
+        self.salary = _intern(salary)
+        self.source = _intern(source)
+        self.skill_names = tuple(_intern(skill) for skill in skills or ())
+        if type(description) is str and len(description) >= DESCRIPTION_COMPRESS_MIN:
+            description = zlib.compress(description.encode("utf-8"), DESCRIPTION_COMPRESS_LEVEL)
+        self._description = description
+        self.keyword_ids: Optional[array] = None  # Cached by job_matcher on first score
+        self.keyword_generation = -1  # Generation of the keyword vocabulary keyword_ids index into
+        self.clearance_level: Optional[str] = None  # Cached by clearance_filter on first check
+        self.extra = extra  # Keys outside FIELDS, kept as they came
+
+    @classmethod
+    def from_dict(cls, job: Dict[str, Any]) -> "JobRecord":
+        extra = {key: value for key, value in job.items() if key not in _FIELD_SET}
+        return cls(
+            job.get("id"), job.get("title", ""), job.get("company", ""), job.get("location", ""),
+            job.get("description", ""), job.get("url", ""), job.get("posted_date", ""), job.get("skills") or (),
+            job.get("salary", ""), job.get("source", ""), extra or None,
+        )
+
+    @property
+    def description(self) -> str:
+        if type(self._description) is bytes:
+            return zlib.decompress(self._description).decode("utf-8")
+        return self._description
+
+    @property
+    def skills(self) -> List[str]:
+        return list(self.skill_names)
+
+    def _value(self, name: str, with_clearance: bool = False) -> Any:
+        if name in _FIELD_SET:
+            return getattr(self, name)
+        if name == "clearance_level":
+            return self.clearance_level if with_clearance and self.clearance_level is not None else _MISSING
+        return self.extra.get(name, _MISSING) if self.extra else _MISSING
+
+    def to_dict(self, fields: Optional[Iterable[str]] = None, with_clearance: bool = False) -> Dict[str, Any]:
+        """
+        JSON-ready posting with the given fields (all by default). The cached
+        clearance level is only included with_clearance, since records are
+        shared between requests.
+        """
+        if fields is None:
+            job = {name: getattr(self, name) for name in self.FIELDS}
+            if self.extra:
+                job.update(self.extra)
+            if with_clearance and self.clearance_level is not None:
+                job["clearance_level"] = self.clearance_level
+            return job
+        values = ((name, self._value(name, with_clearance)) for name in fields)
+        return {name: value for name, value in values if value is not _MISSING}
+
+    def get(self, name: str, default: Any = None) -> Any:
+        value = self._value(name)
+        return default if value is _MISSING else value
+
+    def __getitem__(self, name: str) -> Any:
+        value = self._value(name)
+        if value is _MISSING:
+            raise KeyError(name)
+        return value
+
+    def __repr__(self) -> str:
+        return f"JobRecord(id={self.id!r}, title={self.title!r}, company={self.company!r})"
+
+
+_FIELD_SET = frozenset(JobRecord.FIELDS)
+
+
+class JobMatch:
+    """A scored job: the shared record plus this resume's scores (no copy of the posting)"""
+    __slots__ = ("job", "matched_skills", "match_percentage", "score_breakdown")
+
+    MATCH_FIELDS = ("matched_skills", "match_percentage", "score_breakdown")
+
+    def __init__(self, job: JobRecord, matched_skills: List[str], match_percentage: int,
+                 score_breakdown: Dict[str, int]):
+        self.job = job
+        self.matched_skills = matched_skills
+        self.match_percentage = match_percentage
+        self.score_breakdown = score_breakdown
+
+    @property
+    def id(self) -> Any:
+        return self.job.id
+
+    def to_dict(self, fields: Optional[Iterable[str]] = None, with_clearance: bool = False) -> Dict[str, Any]:
+        """The posting's dict with the match fields added, as match_jobs used to return"""
+        if fields is None:
+            match = self.job.to_dict(with_clearance=with_clearance)
+            match.update((name, getattr(self, name)) for name in self.MATCH_FIELDS)
+            return match
+        values = ((name, self._value(name, with_clearance)) for name in fields)
+        return {name: value for name, value in values if value is not _MISSING}
+
+    def _value(self, name: str, with_clearance: bool = False) -> Any:
+        if name in self.MATCH_FIELDS:
+            return getattr(self, name)
+        return self.job._value(name, with_clearance)
+
+    def get(self, name: str, default: Any = None) -> Any:
+        value = self._value(name)
+        return default if value is _MISSING else value
+
+    def __getitem__(self, name: str) -> Any:
+        value = self._value(name)
+        if value is _MISSING:
+            raise KeyError(name)
+        return value
+
+
+Job = Union[JobRecord, Dict[str, Any]]
+
+
+def as_record(job: Job) -> JobRecord:
+    """The record for a job given as either a record or a posting dict"""
+    return job if type(job) is JobRecord else JobRecord.from_dict(job)
+
+
+def as_dict(job: Union[JobRecord, JobMatch, Dict[str, Any]], fields: Optional[Iterable[str]] = None,
+            with_clearance: bool = False) -> Dict[str, Any]:
+    """JSON-ready dict for a record, match or posting dict (the response boundary)"""
+    if type(job) is dict:
+        if fields is None:
+            return job
+        return {name: job[name] for name in fields if name in job}
+    return job.to_dict(fields, with_clearance)
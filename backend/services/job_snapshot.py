@@ -0,0 +1,448 @@
+"""
+Memory-mapped columnar snapshot of the job pool, shared by every worker on a host
+
+Each worker would otherwise hold its own copy of the pool's postings and
+match features. Instead, one worker at a time (holding an OS lock on
+.build.lock) periodically writes the pool to an immutable generation
+directory of .npy columns (rows in job ID order):
+
+    ids                int64[n]
+    clearance          uint8[n]   code: index into CLEARANCE_LEVELS
+    skill_counts       uint32[n]  denominators of the skill and title scores
+    title_counts       uint32[n]
+    skills_offsets     uint64[n+1] + skills_ids uint32   per-job skill IDs (CSR)
+    {skill,title,keyword}_offsets uint64[v+1] + _rows uint32
+                                  inverted postings: rows per vocabulary entry,
+                                  repeated when a job lists a term twice
+    {skill,title,keyword}_vocab   fixed-width UTF-8 strings by ID (keywords sorted)
+    payload_offsets    uint64[n+1] + payloads.bin       zlib'd job JSON
+
+and makes it current by atomically replacing the CURRENT pointer file (as
+the vector index does). Workers open the columns with mmap_mode="r", so N
+workers share one copy in the page cache, and notice new generations
+within JOB_SNAPSHOT_CHECK_SECONDS. job_matcher.match_snapshot scores a
+resume against every row with vectorized operations and only inflates the
+payloads of the top matches.
+
+Requires numpy; without it (or with JOB_SNAPSHOT=off) /match keeps using
+the job pool's in-memory index.
+"""
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import zlib
+from array import array
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import func, select
+
+from database import SessionLocal
+from models.db_models import CatalogJob
+from services.clearance_filter import ClearanceLevel, clearance_filter
+from services.job_catalog import job_catalog
+from services.job_matcher import description_keywords, title_words
+from services.job_pool import job_pool
+from services.job_record import JobRecord
+from services.lazy_imports import lazy_import
+from services.shared_cache import SharedCache
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+np = lazy_import("numpy")
+NUMPY_AVAILABLE = np is not None
+
+JOB_SNAPSHOT = os.getenv("JOB_SNAPSHOT", "on") != "off" and NUMPY_AVAILABLE
+JOB_SNAPSHOT_DIR = os.getenv("JOB_SNAPSHOT_DIR", "./job_snapshot")
+JOB_SNAPSHOT_INTERVAL = float(os.getenv("JOB_SNAPSHOT_INTERVAL", "300"))  # seconds between rebuilds while the pool changes
+JOB_SNAPSHOT_CHECK_SECONDS = float(os.getenv("JOB_SNAPSHOT_CHECK_SECONDS", "5"))  # how often workers look for a new generation
+
+FORMAT_VERSION = 1
+CLEARANCE_LEVELS = [level.value for level in ClearanceLevel]
+VOCABULARIES = ("skill", "title", "keyword")
+COLUMNS = (
+    "ids", "clearance", "skill_counts", "title_counts", "skills_offsets", "skills_ids", "payload_offsets",
+    *(f"{kind}_{part}" for kind in VOCABULARIES for part in ("offsets", "rows", "vocab")),
+)
+
+
+class JobSnapshot:
+    """One generation, opened read-only; columns are numpy views of the mapped files"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.name = os.path.basename(path)
+        with open(os.path.join(path, "meta.json")) as f:
+            self.meta = json.load(f)
+        if self.meta.get("format") != FORMAT_VERSION:
+            raise ValueError(f"unsupported snapshot format {self.meta.get('format')}")
+        self.generation = self.meta["generation"]
+        self.columns = {name: _load_column(os.path.join(path, f"{name}.npy")) for name in COLUMNS}
+        payloads_path = os.path.join(path, "payloads.bin")
+        self.payloads = np.memmap(payloads_path, dtype=np.uint8, mode="r") if os.path.getsize(payloads_path) else b""
+        self.ids = self.columns["ids"]
+        self.clearance = self.columns["clearance"]
+        # Small vocabularies are decoded once per worker; keywords stay mapped and are binary-searched
+        self.skill_names = _decode(self.columns["skill_vocab"])
+        self.title_words = _decode(self.columns["title_vocab"])
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def rows_of(self, job_ids: List[int]):
+        """Row of each job ID, or -1 where the snapshot doesn't have it"""
+        job_ids = np.asarray(job_ids, dtype=np.int64)
+        rows = np.searchsorted(self.ids, job_ids)
+        found = rows < len(self.ids)
+        found[found] = self.ids[rows[found]] == job_ids[found]
+        return np.where(found, rows, -1)
+
+    def keyword_ids(self, words: Iterable[str]) -> List[int]:
+        """Vocabulary IDs of the given keywords that appear in some posting"""
+        vocab = self.columns["keyword_vocab"]
+        width = vocab.dtype.itemsize
+        query = sorted(word.encode() for word in words if len(word) <= width)
+        if not query or not len(vocab):
+            return []
+        query = np.array(query, dtype=vocab.dtype)
+        positions = np.minimum(np.searchsorted(vocab, query), len(vocab) - 1)
+        return positions[vocab[positions] == query].tolist()
+
+    def hits(self, kind: str, vocab_ids: List[int]):
+        """Per-row count of postings for the given vocabulary entries"""
+        offsets, rows = self.columns[f"{kind}_offsets"], self.columns[f"{kind}_rows"]
+        parts = [rows[offsets[i]:offsets[i + 1]] for i in vocab_ids]
+        if not parts:
+            return np.zeros(len(self), dtype=np.int64)
+        return np.bincount(np.concatenate(parts), minlength=len(self))
+
+    def skill_ids(self, row: int) -> List[int]:
+        offsets = self.columns["skills_offsets"]
+        return self.columns["skills_ids"][offsets[row]:offsets[row + 1]].tolist()
+
+    def clearance_mask(self, level: str):
+        return self.clearance == CLEARANCE_LEVELS.index(level)
+
+    def records(self, rows: List[int]) -> List[JobRecord]:
+        """Records for rows, reusing the catalog's when the posting is unchanged"""
+        offsets = self.columns["payload_offsets"]
+        jobs = [json.loads(zlib.decompress(self.payloads[offsets[row]:offsets[row + 1]].tobytes()))
+                for row in rows]
+        records = job_catalog.add_jobs(jobs)
+        for record, row in zip(records, rows):
+            if record.clearance_level is None:
+                record.clearance_level = CLEARANCE_LEVELS[self.clearance[row]]
+        return records
+
+    def nbytes(self) -> int:
+        return sum(os.path.getsize(os.path.join(self.path, entry)) for entry in os.listdir(self.path))
+
+
+def _load_column(path: str):
+    try:
+        return np.load(path, mmap_mode="r")
+    except ValueError:
+        return np.load(path)  # Empty columns can't be mapped
+
+
+def _decode(vocab) -> List[str]:
+    return [value.decode("utf-8") for value in vocab.tolist()]
+
+
+def _strings(values: List[str]):
+    encoded = [value.encode("utf-8") for value in values]
+    return np.array(encoded, dtype=f"S{max([1, *map(len, encoded)])}")
+
+
+def _postings(lists: List[array]):
+    offsets = np.zeros(len(lists) + 1, dtype=np.uint64)
+    offsets[1:] = np.cumsum([len(rows) for rows in lists])
+    rows = np.concatenate([np.frombuffer(rows, dtype=np.uint32) for rows in lists]) if lists else []
+    return offsets, np.asarray(rows, dtype=np.uint32)
+
+
+@contextmanager
+def build_lock(path: str):
+    """
+    Exclusive, non-blocking OS lock on path/.build.lock for the duration of a
+    build, across every process on the host. Yields whether it was taken;
+    the OS releases it if the process dies mid-build.
+    """
+    os.makedirs(path, exist_ok=True)
+    with open(os.path.join(path, ".build.lock"), "a+b") as f:
+        try:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def current_generation(path: str) -> int:
+    """Number of the generation CURRENT points at (0 if none)"""
+    try:
+        with open(os.path.join(path, "CURRENT")) as f:
+            return _generation_number(f.read().strip())
+    except FileNotFoundError:
+        return 0
+
+
+def _generation_number(name: str) -> int:
+    try:
+        return int(name[len("gen-"):]) if name.startswith("gen-") else 0
+    except ValueError:
+        return 0
+
+
+def _check_newer(path: str, generation: int) -> None:
+    current = current_generation(path)
+    if generation <= current:
+        raise ValueError(f"generation {generation} is not newer than the current generation {current}")
+
+
+def write_snapshot(path: str, generation: int, batches: Iterable[List[Dict]], fingerprint: List[Any]) -> str:
+    """
+    Write the jobs (batches of posting dicts in ascending ID order) as
+    generation `generation` under `path` and make it current. Returns the
+    generation directory. Callers hold build_lock(path); a generation that
+    isn't newer than the current one is refused, so CURRENT never moves back.
+    """
+    os.makedirs(path, exist_ok=True)
+    _check_newer(path, generation)
+    staging_dir = tempfile.mkdtemp(dir=path, prefix=".staging-")
+    try:
+        return _write_generation(path, staging_dir, generation, batches, fingerprint)
+    except BaseException:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        raise
+
+
+def _write_generation(path: str, staging_dir: str, generation: int, batches: Iterable[List[Dict]],
+                      fingerprint: List[Any]) -> str:
+    ids, clearance = array("q"), array("B")
+    skill_counts, title_counts = array("I"), array("I")
+    skills_offsets, skills_ids, payload_offsets = array("Q", [0]), array("I"), array("Q", [0])
+    vocabularies: Dict[str, Dict[str, int]] = {kind: {} for kind in VOCABULARIES}
+    postings: Dict[str, List[array]] = {kind: [] for kind in VOCABULARIES}
+
+    def post(kind: str, term: str, row: int) -> int:
+        term_id = vocabularies[kind].get(term)
+        if term_id is None:
+            term_id = vocabularies[kind][term] = len(postings[kind])
+            postings[kind].append(array("I"))
+        postings[kind][term_id].append(row)
+        return term_id
+
+    with open(os.path.join(staging_dir, "payloads.bin"), "wb") as payloads:
+        for batch in batches:
+            for job in batch:
+                row = len(ids)
+                description = job.get("description") or ""
+                skills = [skill for skill in job.get("skills") or [] if isinstance(skill, str)]
+                words = title_words(job.get("title") or "")
+                ids.append(job["id"])
+                clearance.append(CLEARANCE_LEVELS.index(clearance_filter.extract_clearance_level(description).value))
+                skill_counts.append(len(skills))
+                title_counts.append(len(words))
+                skills_ids.extend(post("skill", skill, row) for skill in skills)
+                skills_offsets.append(len(skills_ids))
+                for word in words:
+                    post("title", word, row)
+                for word in description_keywords(description) if description else ():
+                    post("keyword", word, row)
+                payload = zlib.compress(json.dumps(job, separators=(",", ":")).encode(), 6)
+                payloads.write(payload)
+                payload_offsets.append(payload_offsets[-1] + len(payload))
+
+    # Keywords are looked up by binary search, so their IDs follow sorted order
+    keywords = sorted(vocabularies["keyword"])
+    postings["keyword"] = [postings["keyword"][vocabularies["keyword"][word]] for word in keywords]
+    vocab_lists = {"skill": list(vocabularies["skill"]), "title": list(vocabularies["title"]), "keyword": keywords}
+
+    columns = {
+        "ids": np.frombuffer(ids, dtype=np.int64),
+        "clearance": np.frombuffer(clearance, dtype=np.uint8),
+        "skill_counts": np.frombuffer(skill_counts, dtype=np.uint32),
+        "title_counts": np.frombuffer(title_counts, dtype=np.uint32),
+        "skills_offsets": np.frombuffer(skills_offsets, dtype=np.uint64),
+        "skills_ids": np.frombuffer(skills_ids, dtype=np.uint32),
+        "payload_offsets": np.frombuffer(payload_offsets, dtype=np.uint64),
+    }
+    if len(ids) > 1 and not (columns["ids"][1:] > columns["ids"][:-1]).all():
+        raise ValueError("snapshot rows must be in ascending, unique ID order")
+    for kind in VOCABULARIES:
+        columns[f"{kind}_offsets"], columns[f"{kind}_rows"] = _postings(postings[kind])
+        columns[f"{kind}_vocab"] = _strings(vocab_lists[kind])
+    for name, values in columns.items():
+        np.save(os.path.join(staging_dir, f"{name}.npy"), values)
+    with open(os.path.join(staging_dir, "meta.json"), "w") as f:
+        json.dump({"format": FORMAT_VERSION, "generation": generation, "count": len(ids),
+                   "built_at": datetime.utcnow().isoformat(), "fingerprint": fingerprint}, f)
+
+    name = f"gen-{generation:06d}"
+    generation_dir = os.path.join(path, name)
+    _check_newer(path, generation)
+    os.replace(staging_dir, generation_dir)
+    fd, tmp_path = tempfile.mkstemp(dir=path, prefix=".current-")
+    with os.fdopen(fd, "w") as f:
+        f.write(name)
+    os.replace(tmp_path, os.path.join(path, "CURRENT"))
+    return generation_dir
+
+
+class JobSnapshotStore:
+    """
+    The current snapshot generation for this worker, plus the background
+    thread that picks up new generations and rebuilds the snapshot when the
+    job pool has changed: one worker at a time, under an OS lock on
+    .build.lock (the shared cache claim only spares the others the check).
+    """
+
+    def __init__(self, path: str = JOB_SNAPSHOT_DIR, session_factory=SessionLocal):
+        self.path = os.path.abspath(path)
+        self.session_factory = session_factory
+        self.claims = SharedCache("job-snapshot", JOB_SNAPSHOT_INTERVAL)
+        self._snapshot: Optional[JobSnapshot] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last_build_check = 0.0
+        self.last_build: Dict[str, Any] = {}
+
+    def current(self) -> Optional[JobSnapshot]:
+        """The snapshot to score against, or None if there is none (yet)"""
+        return self._snapshot
+
+    def refresh(self) -> bool:
+        """Switch to the generation CURRENT points at, if it isn't the one open. Returns whether it switched."""
+        try:
+            with open(os.path.join(self.path, "CURRENT")) as f:
+                name = f.read().strip()
+        except FileNotFoundError:
+            return False
+        with self._lock:
+            if self._snapshot is not None and self._snapshot.name == name:
+                return False
+            try:
+                snapshot = JobSnapshot(os.path.join(self.path, name))
+            except (OSError, ValueError, KeyError) as e:
+                print(f"Could not open job snapshot {name}: {e}")
+                return False
+            # Requests already scoring keep the old generation's arrays; its files stay mapped until they finish
+            self._snapshot = snapshot
+        return True
+
+    # Building
+
+    def fingerprint(self) -> List[Any]:
+        """Changes whenever jobs are added to or refreshed in the pool"""
+        with self.session_factory() as db:
+            count, last_seen = db.execute(select(func.count(CatalogJob.id), func.max(CatalogJob.last_seen_at))).one()
+        return [count, last_seen.isoformat() if last_seen else None]
+
+    def build(self, force: bool = False) -> Optional[int]:
+        """
+        Write a new generation from the job pool unless the current one is up
+        to date or another process is building one. Returns its number.
+        """
+        with build_lock(self.path) as locked:
+            if not locked:
+                return None
+            fingerprint = self.fingerprint()
+            if not fingerprint[0]:
+                return None
+            self.refresh()
+            snapshot = self._snapshot
+            if snapshot is not None and snapshot.meta.get("fingerprint") == fingerprint and not force:
+                return None
+
+            start = time.perf_counter()
+            # Past every generation on disk, including one a crashed build never made current
+            generation = max([current_generation(self.path),
+                              *(_generation_number(entry) for entry in os.listdir(self.path))]) + 1
+            write_snapshot(self.path, generation, job_pool.iter_jobs(), fingerprint)
+            self.refresh()
+            self._remove_old_generations()
+        self.last_build = {"at": datetime.utcnow().isoformat(), "generation": generation,
+                           "jobs": fingerprint[0], "seconds": round(time.perf_counter() - start, 2)}
+        return generation
+
+    def _remove_old_generations(self) -> None:
+        """
+        Delete generations older than the current one (mapped files stay
+        readable on POSIX until unmapped) and files left by builds that died.
+        Runs under the build lock, so no build is using them.
+        """
+        current = self._snapshot.name if self._snapshot else None
+        for entry in os.listdir(self.path):
+            entry_path = os.path.join(self.path, entry)
+            if entry.startswith("gen-") and current and entry < current:
+                shutil.rmtree(entry_path, ignore_errors=True)  # Windows: retried next build
+            elif entry.startswith(".staging-"):
+                shutil.rmtree(entry_path, ignore_errors=True)
+            elif entry.startswith(".current-"):
+                try:
+                    os.remove(entry_path)
+                except OSError:
+                    pass
+
+    # Background thread
+
+    def start(self) -> None:
+        if self._thread or not JOB_SNAPSHOT:
+            return
+        self.refresh()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="job-snapshot", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(JOB_SNAPSHOT_CHECK_SECONDS):
+            try:
+                self.refresh()
+                now = time.monotonic()
+                if now - self._last_build_check >= JOB_SNAPSHOT_INTERVAL:
+                    self._last_build_check = now
+                    if self.claims.claim("build", JOB_SNAPSHOT_INTERVAL * 0.9):
+                        self.build()
+            except Exception as e:
+                print(f"Job snapshot update failed: {e}")
+
+    def status(self) -> Dict[str, Any]:
+        snapshot = self._snapshot
+        status = {"enabled": JOB_SNAPSHOT, "running": self._thread is not None, "path": self.path,
+                  "last_build": self.last_build}
+        if snapshot is not None:
+            status.update(generation=snapshot.generation, jobs=len(snapshot), built_at=snapshot.meta.get("built_at"),
+                          bytes=snapshot.nbytes())
+        return status
+
+
+# Singleton instance
+job_snapshots = JobSnapshotStore()
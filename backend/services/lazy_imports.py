@@ -0,0 +1,65 @@
+"""Deferred imports for heavy optional dependencies, to keep cold starts short"""
+import importlib
+import importlib.util
+import os
+import sys
+from types import ModuleType
+from typing import Dict, Optional
+
+# "off" imports everything eagerly at module import time (the old behaviour)
+LAZY_IMPORTS = os.getenv("LAZY_IMPORTS", "on") != "off"
+
+_registered: Dict[str, ModuleType] = {}
+
+
+def lazy_import(name: str) -> Optional[ModuleType]:
+    """
+    Module object for `name` that runs the real import on first attribute
+    access, or None if the package isn't installed. Use in place of the
+    try/except ImportError pattern for dependencies that are slow to import
+    (the SDK, numpy, document parsers), so only requests that need them pay.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    if name in _registered:
+        return _registered[name]
+    try:
+        spec = importlib.util.find_spec(name)
+    except (ImportError, ValueError):
+        spec = None
+    if spec is None or spec.loader is None:
+        return None
+    if not LAZY_IMPORTS:
+        return importlib.import_module(name)
+
+    module = _DeferredModule(name)
+    _registered[name] = module
+    return module
+
+
+class _DeferredModule(ModuleType):
+    """
+    Stand-in that imports the real module on first attribute access and
+    then copies its namespace. Unlike importlib.util.LazyLoader (before
+    Python 3.12) this is safe when threads touch it at once: the import
+    system's per-module lock makes the others wait for the finished module.
+    """
+
+    def __getattr__(self, attr: str):
+        module = importlib.import_module(self.__name__)
+        self.__dict__.update(module.__dict__)
+        return getattr(module, attr)
+
+
+def load_all() -> None:
+    """
+    Finish every deferred import now. Long-running servers call this before
+    forking workers (serve.py), so the modules are shared copy-on-write and
+    the first requests don't pay for them.
+    """
+    for name, module in list(_registered.items()):
+        try:
+            importlib.import_module(name)
+            getattr(module, "__file__", None)  # Copies the namespace onto the stand-in
+        except Exception as e:
+            print(f"Warning: deferred import of {name} failed: {e}")
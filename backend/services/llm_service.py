@@ -1,16 +1,26 @@
+import hashlib
 import os
+import threading
 from typing import Dict, List, Any, Optional
 from dotenv import load_dotenv
 
+from services.lazy_imports import lazy_import
+from services.metrics import record_llm_usage, span
+from services.quota import QuotaExceeded, current_client, quota_governor
+from services.shared_cache import SharedCache
+
 load_dotenv()
 
-# Try to import anthropic, gracefully handle if not available
-try:
-    import anthropic
-    ANTHROPIC_AVAILABLE = True
-except ImportError:
-    ANTHROPIC_AVAILABLE = False
-    anthropic = None
+# The SDK takes over a second to import, so it loads on the first LLM call
+anthropic = lazy_import("anthropic")
+ANTHROPIC_AVAILABLE = anthropic is not None
+
+# Empty uses the SDK default; point at a local stand-in for load tests (benchmarks/loadtest.py)
+ANTHROPIC_BASE_URL = os.getenv("ANTHROPIC_BASE_URL", "")
+
+# Completions for identical prompts from the same caller are reused across workers (services/shared_cache.py).
+# Every prompt carries resume text, so entries are per caller and short-lived.
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", "3600"))  # seconds, 0 disables
 
 
 class LLMService:
@@ -18,15 +28,64 @@ class LLMService:
 
     def __init__(self):
         self.api_key = os.getenv("ANTHROPIC_API_KEY", "")
-        self.client = None
         self.model = "claude-3-haiku-20240307"  # Fast and cost-effective for this use case
-
-        if ANTHROPIC_AVAILABLE and self.api_key:
-            self.client = anthropic.Anthropic(api_key=self.api_key)
+        # Built on first use: constructing it imports the SDK and sets up TLS
+        self._client = None
+        self._client_built = False
+        self._client_lock = threading.Lock()
+        self.cache = SharedCache("llm", LLM_CACHE_TTL)
+
+    @property
+    def client(self):
+        if not self._client_built:
+            with self._client_lock:
+                if not self._client_built:
+                    if ANTHROPIC_AVAILABLE and self.api_key:
+                        self._client = anthropic.Anthropic(api_key=self.api_key, base_url=ANTHROPIC_BASE_URL or None)
+                    self._client_built = True
+        return self._client
+
+    @client.setter
+    def client(self, value) -> None:
+        self._client = value
+        self._client_built = True
 
     def is_available(self) -> bool:
         """Check if LLM service is configured and available"""
-        return self.client is not None
+        if self._client_built:
+            return self._client is not None
+        return ANTHROPIC_AVAILABLE and bool(self.api_key)
+
+    def _complete(self, operation: str, prompt: str, max_tokens: int) -> str:
+        """
+        Text of a single-prompt completion. A caller repeating a prompt (the
+        signed-in user, else the client address) is served from the shared
+        cache; background work, with no caller, isn't cached.
+        """
+        client = current_client()
+        if client is None:
+            return self._call_model(operation, prompt, max_tokens)
+        key = hashlib.sha256(f"{client.key}|{self.model}|{max_tokens}|{prompt}".encode()).hexdigest()
+        return self.cache.get_or_compute(key, lambda: self._call_model(operation, prompt, max_tokens), cacheable=bool)
+
+    def _call_model(self, operation: str, prompt: str, max_tokens: int) -> str:
+        # Reserve an upper bound on the tokens (about 4 characters each) until the response reports them
+        reserved = len(prompt) // 4 + max_tokens
+        quota_governor.acquire("anthropic", reserved)
+        used = 0
+        try:
+            with span(f"llm.{operation}"):
+                response = self.client.messages.create(
+                    model=self.model,
+                    max_tokens=max_tokens,
+                    messages=[{"role": "user", "content": prompt}]
+                )
+            record_llm_usage(operation, response)
+            usage = getattr(response, "usage", None)
+            used = reserved if usage is None else (usage.input_tokens or 0) + (usage.output_tokens or 0)
+        finally:
+            quota_governor.settle("anthropic", reserved, used)
+        return response.content[0].text.strip()
 
     def extract_skills_semantic(self, resume_text: str) -> List[str]:
         """Use LLM to extract skills semantically from resume text"""
@@ -43,20 +102,16 @@ Resume:
 
 Return format: ["skill1", "skill2", "skill3", ...]"""
 
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=500,
-                messages=[{"role": "user", "content": prompt}]
-            )
+            content = self._complete("extract_skills", prompt, max_tokens=500)
 
-            # Parse the response
-            content = response.content[0].text.strip()
             # Try to extract JSON array
             import json
             if content.startswith("["):
                 return json.loads(content)
             return []
 
+        except QuotaExceeded:
+            return []
         except Exception as e:
             print(f"LLM skill extraction error: {e}")
             return []
@@ -99,13 +154,8 @@ Provide exactly 3-4 specific suggestions. For each suggestion, specify:
 Return as JSON array:
 [{{"priority": "high|medium|low", "title": "...", "action": "..."}}]"""
 
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=600,
-                messages=[{"role": "user", "content": prompt}]
-            )
+            content = self._complete("suggestions", prompt, max_tokens=600)
 
-            content = response.content[0].text.strip()
             import json
 
             # Try to find JSON in response
@@ -117,6 +167,8 @@ Return as JSON array:
 
             return self._get_fallback_suggestions(resume_skills, job_skills, matched_skills)
 
+        except QuotaExceeded:
+            return self._get_fallback_suggestions(resume_skills, job_skills, matched_skills)
         except Exception as e:
             print(f"LLM suggestion generation error: {e}")
             return self._get_fallback_suggestions(resume_skills, job_skills, matched_skills)
@@ -174,13 +226,8 @@ Evaluate and return JSON with:
 
 Return ONLY valid JSON."""
 
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=400,
-                messages=[{"role": "user", "content": prompt}]
-            )
+            content = self._complete("quality", prompt, max_tokens=400)
 
-            content = response.content[0].text.strip()
             import json
 
             start = content.find("{")
@@ -190,6 +237,8 @@ Return ONLY valid JSON."""
 
             return self._get_fallback_quality_analysis(resume_text, sections)
 
+        except QuotaExceeded:
+            return self._get_fallback_quality_analysis(resume_text, sections)
         except Exception as e:
             print(f"LLM quality analysis error: {e}")
             return self._get_fallback_quality_analysis(resume_text, sections)
@@ -0,0 +1,239 @@
+"""Precomputed resume/job match scores, filled in the background"""
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session, undefer
+
+from database import SessionLocal
+from models.db_models import MatchScore, Resume, SavedJob
+from services.blob_store import blob_store
+from services.job_api_service import job_api_service
+from services.job_catalog import job_catalog
+from services.job_matcher import SCORER_VERSION, match_jobs
+from services.job_record import Job, JobRecord, as_record
+
+MATCH_SCORE_WORKERS = int(os.getenv("MATCH_SCORE_WORKERS", "1"))
+# How many primary resumes (most recently updated first) newly fetched jobs are scored against
+MATCH_PRECOMPUTE_MAX_RESUMES = int(os.getenv("MATCH_PRECOMPUTE_MAX_RESUMES", "500"))
+# Catalog job IDs remembered as already scored, so repeat searches don't rescore them
+SCORED_CATALOG_JOBS_SIZE = 20000
+
+# Keep IN (...) lists well under SQLite's bound parameter limit
+_IN_CHUNK = 500
+
+
+def saved_job_key(saved_job_id: int) -> str:
+    """match_scores.job_id for a saved job"""
+    return f"saved:{saved_job_id}"
+
+
+class MatchScoreService:
+    """
+    Computes match scores once per (resume, job, scorer version) and stores them.
+
+    Scores are filled incrementally on a small background pool when a resume is
+    uploaded, the primary resume changes, a job is saved, or new jobs are
+    fetched. Saved jobs mirror the primary resume's score in
+    SavedJob.match_percentage, so sorting them by fit is an indexed read.
+    """
+
+    def __init__(self, session_factory=SessionLocal, max_workers: int = MATCH_SCORE_WORKERS):
+        self.session_factory = session_factory
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="match-scores")
+        self._scored_catalog_jobs: "OrderedDict[str, None]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    # Scheduling (safe to call from request handlers)
+
+    def schedule_resume(self, resume_id: int) -> Future:
+        return self._executor.submit(self._run, self.score_resume, resume_id)
+
+    def schedule_saved_job(self, saved_job_id: int) -> Future:
+        return self._executor.submit(self._run, self.score_saved_job, saved_job_id)
+
+    def schedule_catalog_jobs(self, jobs: List[JobRecord]) -> Optional[Future]:
+        """Score newly fetched jobs against primary resumes, skipping jobs scored recently"""
+        with self._lock:
+            new_jobs = []
+            for job in jobs:
+                key = str(job.id) if job.id is not None else ""
+                if not key or key in self._scored_catalog_jobs:
+                    continue
+                self._scored_catalog_jobs[key] = None
+                new_jobs.append(job)
+            while len(self._scored_catalog_jobs) > SCORED_CATALOG_JOBS_SIZE:
+                self._scored_catalog_jobs.popitem(last=False)
+
+        if not new_jobs:
+            return None
+        return self._executor.submit(self._run, self.score_catalog_jobs, new_jobs)
+
+    def _run(self, fn, *args):
+        try:
+            return fn(*args)
+        except Exception as e:
+            print(f"Match scoring failed ({fn.__name__}): {e}")
+
+    # Scoring (blocking, runs on the background pool or from scripts)
+
+    def score_resume(self, resume_id: int) -> int:
+        """
+        Score all of the owner's saved jobs against a resume.
+
+        Existing scores for the current scorer version are reused, so switching
+        back to a previously scored resume only rewrites SavedJob rows.
+        Returns the number of saved jobs scored.
+        """
+        with self.session_factory() as db:
+            resume = db.get(Resume, resume_id)
+            if resume is None:
+                return 0
+
+            saved_jobs = db.execute(
+                select(SavedJob).options(undefer(SavedJob.description)).where(SavedJob.user_id == resume.user_id)
+            ).scalars().all()
+            inputs = {saved_job_key(j.id): self._saved_job_input(j) for j in saved_jobs}
+            scores = self._ensure_scores(db, resume, inputs)
+
+            if resume.is_primary:
+                self._apply_to_saved_jobs(db, saved_jobs, scores)
+            db.commit()
+            return len(saved_jobs)
+
+    def score_saved_job(self, saved_job_id: int) -> None:
+        """Score a saved job against its owner's primary resume"""
+        with self.session_factory() as db:
+            saved_job = db.get(SavedJob, saved_job_id, options=[undefer(SavedJob.description)])
+            if saved_job is None:
+                return
+            resume = db.execute(
+                select(Resume).where(Resume.user_id == saved_job.user_id, Resume.is_primary == True)
+            ).scalars().first()
+            if resume is None:
+                return
+
+            key = saved_job_key(saved_job.id)
+            scores = self._ensure_scores(db, resume, {key: self._saved_job_input(saved_job)})
+            self._apply_to_saved_jobs(db, [saved_job], scores)
+            db.commit()
+
+    def score_catalog_jobs(self, jobs: List[JobRecord]) -> int:
+        """Score fetched jobs against the most recently active primary resumes"""
+        inputs = {str(job.id): job for job in jobs if job.id is not None}
+        with self.session_factory() as db:
+            resumes = db.execute(
+                select(Resume)
+                .where(Resume.is_primary == True)
+                .order_by(Resume.updated_at.desc())
+                .limit(MATCH_PRECOMPUTE_MAX_RESUMES)
+            ).scalars().all()
+            for resume in resumes:
+                self._ensure_scores(db, resume, inputs)
+                db.commit()
+            return len(resumes)
+
+    def score_jobs_for_resume(self, resume_id: int, jobs: List[JobRecord]) -> int:
+        """Score jobs against one resume ahead of its owner's next visit; returns how many were scored"""
+        inputs = {str(job.id): job for job in jobs if job.id is not None}
+        with self.session_factory() as db:
+            resume = db.get(Resume, resume_id)
+            if resume is None or not inputs:
+                return 0
+            self._ensure_scores(db, resume, inputs)
+            db.commit()
+            return len(inputs)
+
+    def _ensure_scores(self, db: Session, resume: Resume, jobs: Dict[str, Job]) -> Dict[str, Dict]:
+        """Return scores for the given jobs, computing and storing any that are missing"""
+        scores = {}
+        keys = list(jobs)
+        for i in range(0, len(keys), _IN_CHUNK):
+            rows = db.execute(
+                select(MatchScore.job_id, MatchScore.match_percentage, MatchScore.matched_skills)
+                .where(
+                    MatchScore.resume_id == resume.id,
+                    MatchScore.job_id.in_(keys[i:i + _IN_CHUNK]),
+                    MatchScore.scorer_version == SCORER_VERSION,
+                )
+            ).all()
+            for row in rows:
+                scores[row.job_id] = {"match_percentage": row.match_percentage, "matched_skills": row.matched_skills}
+
+        missing = [key for key in keys if key not in scores]
+        if not missing:
+            return scores
+
+        resume_text = load_resume_text(resume)
+        resume_skills = (resume.skills or []) + (resume.semantic_skills or [])
+        # One scoring pass for all of them; matches come back sorted, so map them back by record
+        records = {key: as_record(jobs[key]) for key in missing}
+        matches = {id(match.job): match for match in match_jobs(resume_text, records.values(), resume_skills)}
+        new_rows = []
+        for key in missing:
+            match = matches[id(records[key])]
+            scores[key] = {"match_percentage": match.match_percentage, "matched_skills": match.matched_skills}
+            new_rows.append({
+                "resume_id": resume.id,
+                "job_id": key,
+                "scorer_version": SCORER_VERSION,
+                "match_percentage": match.match_percentage,
+                "matched_skills": match.matched_skills,
+                "score_breakdown": match.score_breakdown,
+            })
+        db.execute(_insert_ignoring_duplicates(db), new_rows)
+        return scores
+
+    def _apply_to_saved_jobs(self, db: Session, saved_jobs: List[SavedJob], scores: Dict[str, Dict]) -> None:
+        """Copy the primary resume's scores onto SavedJob rows that differ"""
+        changes = []
+        for saved_job in saved_jobs:
+            score = scores.get(saved_job_key(saved_job.id))
+            if score is None:
+                continue
+            if (saved_job.match_percentage, saved_job.matched_skills) != (score["match_percentage"], score["matched_skills"]):
+                changes.append({"id": saved_job.id, **score})
+        if changes:
+            db.execute(update(SavedJob), changes)
+
+    @staticmethod
+    def _saved_job_input(saved_job: SavedJob) -> Job:
+        """Job for match_jobs, preferring the full catalog record when we still have it"""
+        external_id = saved_job.job_external_id or ""
+        if external_id.isdigit():
+            job = job_catalog.get(int(external_id))
+            if job is not None:
+                return job
+        description = saved_job.description or ""
+        return {
+            "title": saved_job.title,
+            "description": description,
+            "skills": job_api_service._extract_skills(description),
+        }
+
+
+def load_resume_text(resume: Resume) -> str:
+    """Extracted text of a resume, from the blob store or the legacy raw_text column (blocking)"""
+    if resume.text_blob_key:
+        text = blob_store.get_text(resume.text_blob_key)
+        if text is not None:
+            return text
+    return resume.raw_text or ""
+
+
+def _insert_ignoring_duplicates(db: Session):
+    """INSERT that skips rows another writer already stored"""
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        return sqlite.insert(MatchScore).on_conflict_do_nothing()
+    if dialect == "postgresql":
+        return postgresql.insert(MatchScore).on_conflict_do_nothing()
+    return insert(MatchScore)
+
+
+# Singleton instance
+match_score_service = MatchScoreService()
@@ -0,0 +1,94 @@
+"""Cursor pagination and field projection helpers for list endpoints"""
+import base64
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+from services.job_record import as_dict
+
+MAX_PAGE_LIMIT = 100
+
+# Fields returned by `fields=summary` - enough to render a job card in a list view
+SUMMARY_FIELDS = [
+    "id", "title", "company", "location", "source", "posted_date",
+    "salary", "match_percentage", "clearance_level",
+]
+
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor cannot be decoded"""
+
+
+def encode_cursor(offset: int, last_id: Any = None) -> str:
+    """Encode a position in a result list as an opaque URL-safe cursor"""
+    raw = json.dumps({"o": offset, "id": last_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[int, Any]:
+    """Decode a cursor produced by encode_cursor into (offset, last_id)"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        offset = int(data["o"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {e}")
+
+    if offset < 0:
+        raise InvalidCursor("Invalid cursor: negative offset")
+    return offset, data.get("id")
+
+
+def paginate(items: List[Dict], limit: Optional[int], cursor: Optional[str] = None) -> Tuple[List[Dict], Optional[str]]:
+    """
+    Return one page of items and the cursor for the next page.
+
+    The cursor remembers the ID of the last item served, so a page resumes
+    right after it even if upstream results shifted between requests. If that
+    item is gone, the stored offset is used instead.
+    Without a limit, the whole list is returned (legacy behaviour).
+    """
+    start = 0
+    if cursor:
+        offset, last_id = decode_cursor(cursor)
+        start = offset
+        if last_id is not None:
+            for index, item in enumerate(items):
+                if item.get("id") == last_id:
+                    start = index + 1
+                    break
+
+    if limit is None:
+        return items[start:], None
+
+    limit = max(1, min(limit, MAX_PAGE_LIMIT))
+    page = items[start:start + limit]
+    end = start + len(page)
+
+    next_cursor = None
+    if end < len(items) and page:
+        next_cursor = encode_cursor(end, page[-1].get("id"))
+
+    return page, next_cursor
+
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Parse a `fields=` query value into a list of field names (None means all fields)"""
+    if not fields:
+        return None
+
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    if "summary" in names:
+        names = SUMMARY_FIELDS + [n for n in names if n != "summary"]
+
+    # Always include the ID so clients can fetch the full record later
+    if "id" not in names:
+        names.insert(0, "id")
+    return names
+
+
+def project_fields(items: List[Any], fields: Optional[List[str]], with_clearance: bool = False) -> List[Dict]:
+    """
+    Keep only the requested fields on each item, as JSON-ready dicts (items
+    may be posting dicts, job records or matches)
+    """
+    return [as_dict(item, fields, with_clearance) for item in items]
@@ -0,0 +1,87 @@
+"""Cache of authenticated user snapshots, so auth checks can skip the users table"""
+import os
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import event
+
+from models.db_models import User
+from services.cache import TTLCache
+
+PRINCIPAL_CACHE_TTL = float(os.getenv("PRINCIPAL_CACHE_TTL", "60"))  # seconds, 0 disables
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "10000"))
+
+
+class Principal:
+    """Read-only snapshot of the User fields that routes need after authentication"""
+
+    __slots__ = ("id", "email", "name", "picture_url", "is_active", "created_at", "last_login")
+
+    def __init__(
+        self,
+        id: int,
+        email: str,
+        name: Optional[str] = None,
+        picture_url: Optional[str] = None,
+        is_active: bool = True,
+        created_at: Optional[datetime] = None,
+        last_login: Optional[datetime] = None,
+    ):
+        self.id = id
+        self.email = email
+        self.name = name
+        self.picture_url = picture_url
+        self.is_active = is_active
+        self.created_at = created_at
+        self.last_login = last_login
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(
+            id=user.id,
+            email=user.email,
+            name=user.name,
+            picture_url=user.picture_url,
+            is_active=user.is_active,
+            created_at=user.created_at,
+            last_login=user.last_login,
+        )
+
+
+class PrincipalCache:
+    """TTL/LRU cache of Principal snapshots keyed by user ID"""
+
+    def __init__(self, max_size: int = PRINCIPAL_CACHE_SIZE, ttl: float = PRINCIPAL_CACHE_TTL):
+        self._cache = TTLCache(max_size=max_size, ttl=ttl)
+
+    def get(self, user_id: int) -> Optional[Principal]:
+        return self._cache.get(user_id)
+
+    def put(self, user: User) -> Principal:
+        """Snapshot a loaded User row and cache it"""
+        principal = Principal.from_user(user)
+        self._cache.set(user.id, principal)
+        return principal
+
+    def invalidate(self, user_id: int) -> None:
+        self._cache.invalidate(user_id)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def set_ttl(self, ttl: float) -> None:
+        """Change the snapshot lifetime (0 disables caching)"""
+        self._cache.ttl = ttl
+        self._cache.clear()
+
+
+# Singleton instance
+principal_cache = PrincipalCache()
+
+
+# Drop the snapshot whenever the user row changes. Other workers keep their
+# copy until the TTL expires, which bounds how stale a snapshot can get.
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_principal(mapper, connection, target):
+    principal_cache.invalidate(target.id)
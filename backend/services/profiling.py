@@ -0,0 +1,267 @@
+"""On-demand profiling: process-wide stack sampling and opt-in per-request cProfile"""
+import cProfile
+import io
+import marshal
+import os
+import pstats
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool as _run_in_threadpool
+
+PROFILE_SAMPLE_INTERVAL_MS = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", "10"))
+PROFILE_MAX_SECONDS = float(os.getenv("PROFILE_MAX_SECONDS", "300"))
+REQUEST_PROFILES_KEPT = int(os.getenv("REQUEST_PROFILES_KEPT", "20"))
+
+# Leaf frames of threads that are parked rather than working (executor
+# workers waiting for tasks, the event loop waiting in select, ...)
+IDLE_LEAVES = {
+    ("threading.py", "wait"), ("threading.py", "_wait_for_tstate_lock"), ("queue.py", "get"),
+    ("selectors.py", "select"), ("socket.py", "accept"), ("thread.py", "_worker"),
+    ("core.py", "_connection_worker_thread"),  # aiosqlite connection thread waiting for work
+}
+
+Frame = Tuple[str, str, int]  # (function, file, first line)
+
+
+class ProfilerBusy(Exception):
+    """A sampling profile is already running in this process"""
+    pass
+
+
+class SampledProfile:
+    """Stack samples per thread, exportable as collapsed stacks or speedscope JSON"""
+
+    def __init__(self, interval_ms: float):
+        self.interval_ms = interval_ms
+        self.stacks: Dict[str, Counter] = {}  # thread name -> Counter of root-first frame tuples
+        self.sample_count = 0
+        self.started_at = time.time()
+        self.duration_s = 0.0
+
+    def add(self, thread: str, stack: Tuple[Frame, ...]) -> None:
+        self.stacks.setdefault(thread, Counter())[stack] += 1
+
+    def collapsed(self) -> str:
+        """Brendan Gregg's folded format (flamegraph.pl, speedscope, inferno): 'thread;a;b;c count'"""
+        lines = []
+        for thread, stacks in sorted(self.stacks.items()):
+            for stack, count in stacks.most_common():
+                frames = [thread] + [f"{name} ({os.path.basename(path)}:{line})" for name, path, line in stack]
+                lines.append(f"{';'.join(frame.replace(';', ':') for frame in frames)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def speedscope(self) -> Dict:
+        """speedscope.app file format, one sampled profile per thread"""
+        frames: List[Dict] = []
+        frame_index: Dict[Frame, int] = {}
+        profiles = []
+        for thread, stacks in sorted(self.stacks.items()):
+            samples, weights = [], []
+            for stack, count in stacks.most_common():
+                indices = []
+                for frame in stack:
+                    if frame not in frame_index:
+                        frame_index[frame] = len(frames)
+                        frames.append({"name": frame[0], "file": frame[1], "line": frame[2]})
+                    indices.append(frame_index[frame])
+                samples.append(indices)
+                weights.append(count * self.interval_ms)
+            profiles.append({
+                "type": "sampled",
+                "name": thread,
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": samples,
+                "weights": weights,
+            })
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": f"applesauce pid {os.getpid()} {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self.started_at))}",
+            "exporter": "applesauce",
+            "activeProfileIndex": 0,
+            "shared": {"frames": frames},
+            "profiles": profiles,
+        }
+
+
+class RequestProfile:
+    """cProfile stats gathered for one request, from the event loop and any threadpool hand-offs"""
+
+    def __init__(self, profile_id: str, method: str, path: str):
+        self.id = profile_id
+        self.method = method
+        self.path = path
+        self.created_at = time.time()
+        self.duration_ms: Optional[float] = None
+        self.status: Optional[int] = None
+        self._profiles: List[cProfile.Profile] = []
+        self._lock = threading.Lock()
+
+    def add(self, profile: cProfile.Profile) -> None:
+        with self._lock:
+            self._profiles.append(profile)
+
+    def stats(self) -> pstats.Stats:
+        with self._lock:
+            profiles = list(self._profiles)
+        stats = pstats.Stats(profiles[0], stream=io.StringIO())
+        for profile in profiles[1:]:
+            stats.add(profile)
+        return stats
+
+    def summary(self, sort: str = "cumulative", limit: int = 40) -> str:
+        out = io.StringIO()
+        out.write(f"{self.method} {self.path} -> {self.status} in {self.duration_ms:.1f} ms\n")
+        stats = self.stats()
+        stats.stream = out
+        stats.sort_stats(sort).print_stats(limit)
+        return out.getvalue()
+
+    def dump(self) -> bytes:
+        """Marshalled pstats data (what Stats.dump_stats writes), loadable with pstats or snakeviz"""
+        return marshal.dumps(self.stats().stats)
+
+    def to_dict(self) -> Dict:
+        return {"id": self.id, "method": self.method, "path": self.path, "status": self.status,
+                "duration_ms": self.duration_ms, "created_at": self.created_at}
+
+
+_request_profile: ContextVar[Optional[RequestProfile]] = ContextVar("applesauce_request_profile", default=None)
+
+
+class Profiler:
+    """
+    Sampling profiler for the whole process plus a store of per-request
+    cProfile results. Both are per worker process: with several uvicorn
+    workers, each profile covers the worker that served the admin request.
+    """
+
+    def __init__(self):
+        self._sampling = threading.Lock()
+        # cProfile hooks the whole event loop thread, so only one request is profiled at a time
+        self._request_active = threading.Lock()
+        self._requests: "OrderedDict[str, RequestProfile]" = OrderedDict()
+        self._requests_lock = threading.Lock()
+
+    # Process-wide sampling
+
+    def sample(self, seconds: float, interval_ms: float = PROFILE_SAMPLE_INTERVAL_MS,
+               include_idle: bool = False) -> SampledProfile:
+        """
+        Sample every thread's Python stack for `seconds` (blocking; call from a
+        worker thread). Raises ProfilerBusy if a profile is already running.
+        """
+        if not self._sampling.acquire(blocking=False):
+            raise ProfilerBusy("A profile is already running")
+        try:
+            seconds = min(seconds, PROFILE_MAX_SECONDS)
+            interval = max(interval_ms, 1.0) / 1000
+            profile = SampledProfile(interval * 1000)
+            own_id = threading.get_ident()
+            start = time.perf_counter()
+            deadline = start + seconds
+            next_tick = start
+            while True:
+                names = {thread.ident: thread.name for thread in threading.enumerate()}
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id == own_id:
+                        continue
+                    stack = _stack(frame)
+                    if not include_idle and stack and (os.path.basename(stack[-1][1]), stack[-1][0]) in IDLE_LEAVES:
+                        continue
+                    profile.add(names.get(thread_id, f"thread-{thread_id}"), stack)
+                profile.sample_count += 1
+                next_tick += interval
+                now = time.perf_counter()
+                if now >= deadline:
+                    break
+                # Fixed-rate ticks; if sampling itself overran, skip ahead instead of bursting
+                if next_tick > now:
+                    time.sleep(next_tick - now)
+                else:
+                    next_tick = now
+            profile.duration_s = time.perf_counter() - start
+            return profile
+        finally:
+            self._sampling.release()
+
+    def is_sampling(self) -> bool:
+        return self._sampling.locked()
+
+    # Per-request cProfile
+
+    def begin_request(self, method: str, path: str):
+        """
+        Start profiling the current request; returns (profile, cProfile handle,
+        context token), or None if another request is being profiled.
+        """
+        if not self._request_active.acquire(blocking=False):
+            return None
+        request = RequestProfile(uuid.uuid4().hex[:16], method, path)
+        token = _request_profile.set(request)
+        handle = cProfile.Profile()
+        handle.enable()
+        return request, handle, token
+
+    def end_request(self, request: RequestProfile, handle: cProfile.Profile, token, status: int,
+                    duration_ms: float) -> None:
+        handle.disable()
+        self._request_active.release()
+        _request_profile.reset(token)
+        request.add(handle)
+        request.status = status
+        request.duration_ms = round(duration_ms, 3)
+        with self._requests_lock:
+            self._requests[request.id] = request
+            while len(self._requests) > REQUEST_PROFILES_KEPT:
+                self._requests.popitem(last=False)
+
+    def get_request(self, profile_id: str) -> Optional[RequestProfile]:
+        with self._requests_lock:
+            return self._requests.get(profile_id)
+
+    def list_requests(self) -> List[Dict]:
+        with self._requests_lock:
+            return [request.to_dict() for request in reversed(self._requests.values())]
+
+
+def _stack(frame) -> Tuple[Frame, ...]:
+    frames = []
+    while frame is not None:
+        code = frame.f_code
+        frames.append((code.co_name, code.co_filename, code.co_firstlineno))
+        frame = frame.f_back
+    frames.reverse()
+    return tuple(frames)
+
+
+async def run_in_threadpool(fn: Callable, *args, **kwargs):
+    """
+    fastapi.concurrency.run_in_threadpool that carries a per-request profile
+    into the worker thread (cProfile only sees the thread it was enabled on)
+    """
+    request = _request_profile.get()
+    if request is None:
+        return await _run_in_threadpool(fn, *args, **kwargs)
+
+    def profiled():
+        handle = cProfile.Profile()
+        handle.enable()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            handle.disable()
+            request.add(handle)
+
+    return await _run_in_threadpool(profiled)
+
+
+# Singleton instance
+profiler = Profiler()
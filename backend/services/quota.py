@@ -0,0 +1,380 @@
+"""
+Quota governor for paid upstream APIs (JSearch requests, Anthropic tokens)
+
+Three layers, checked before every upstream call that the caches couldn't
+answer:
+
+  - token buckets per upstream and per caller, so one busy client or hour
+    can't drain the month (buckets are per worker process)
+  - a monthly usage ledger in the upstream_usage table, summed across
+    workers, checked against each upstream's monthly budget
+  - a policy mode per upstream derived from the ledger:
+      normal     calls go through
+      conserve   past QUOTA_CONSERVE_AT of the budget, or spending faster
+                 than an even pace over the month: callers serve stale
+                 cache entries instead of refreshing, and background work
+                 (no request caller) is refused
+      exhausted  the budget is spent: every call is refused until the next
+                 month, callers fall back to cached or non-LLM results
+
+Refused calls raise QuotaExceeded; JobAPIService and LLMService turn that
+into a stale cache entry or their _get_fallback_* results.
+"""
+import calendar
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextvars import ContextVar
+from datetime import datetime
+from functools import cached_property
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+
+from database import SessionLocal
+from models.db_models import UpstreamUsage
+from services.auth_service import auth_service
+from services.metrics import metrics
+
+# Monthly budgets (0 = unlimited) and call rates per minute (0 = no limit)
+QUOTA_JSEARCH_MONTHLY = int(os.getenv("QUOTA_JSEARCH_MONTHLY", "2500"))  # requests, the free tier
+QUOTA_JSEARCH_PER_MINUTE = float(os.getenv("QUOTA_JSEARCH_PER_MINUTE", "20"))
+QUOTA_USER_JSEARCH_PER_MINUTE = float(os.getenv("QUOTA_USER_JSEARCH_PER_MINUTE", "5"))
+QUOTA_ANTHROPIC_MONTHLY = int(os.getenv("QUOTA_ANTHROPIC_MONTHLY", "5000000"))  # input + output tokens
+QUOTA_ANTHROPIC_PER_MINUTE = float(os.getenv("QUOTA_ANTHROPIC_PER_MINUTE", "60"))
+QUOTA_USER_ANTHROPIC_PER_MINUTE = float(os.getenv("QUOTA_USER_ANTHROPIC_PER_MINUTE", "10"))
+
+QUOTA_CONSERVE_AT = float(os.getenv("QUOTA_CONSERVE_AT", "0.8"))  # fraction of the monthly budget
+QUOTA_PACE_SLACK = float(os.getenv("QUOTA_PACE_SLACK", "0.1"))  # fraction of the budget allowed ahead of even pace
+QUOTA_SYNC_SECONDS = float(os.getenv("QUOTA_SYNC_SECONDS", "15"))  # ledger write-back and reload interval
+QUOTA_MAX_CLIENTS = int(os.getenv("QUOTA_MAX_CLIENTS", "10000"))  # per-caller buckets kept per upstream
+
+NORMAL, CONSERVE, EXHAUSTED = "normal", "conserve", "exhausted"
+MODE_LEVELS = {NORMAL: 0, CONSERVE: 1, EXHAUSTED: 2}
+
+quota_requests = metrics.counter("applesauce_quota_requests_total",
+                                 "Paid upstream calls by governor decision", ("upstream", "result"))
+quota_used = metrics.gauge("applesauce_quota_used", "Units used this month, all workers", ("upstream", "unit"))
+quota_budget = metrics.gauge("applesauce_quota_budget", "Monthly budget (0 = unlimited)", ("upstream", "unit"))
+quota_remaining = metrics.gauge("applesauce_quota_remaining", "Units left in this month's budget",
+                                ("upstream", "unit"))
+quota_mode = metrics.gauge("applesauce_quota_mode", "Policy mode: 0 normal, 1 conserve, 2 exhausted", ("upstream",))
+
+
+class QuotaExceeded(Exception):
+    """An upstream call was refused; serve cached or fallback results instead"""
+
+    def __init__(self, upstream: str, reason: str):
+        super().__init__(f"{upstream} quota: {reason}")
+        self.upstream = upstream
+        self.reason = reason
+
+
+class QuotaClient:
+    """The caller of the current request, resolved only when an upstream call needs it"""
+
+    def __init__(self, authorization: str, host: str):
+        self.authorization = authorization
+        self.host = host
+
+    @cached_property
+    def user_id(self) -> Optional[int]:
+        if not self.authorization:
+            return None
+        token = self.authorization[7:] if self.authorization.startswith("Bearer ") else self.authorization
+        token_data = auth_service.verify_token(token)
+        return token_data["user_id"] if token_data else None
+
+    @cached_property
+    def key(self) -> str:
+        return f"user:{self.user_id}" if self.user_id is not None else f"ip:{self.host}"
+
+
+_client: ContextVar[Optional[QuotaClient]] = ContextVar("applesauce_quota_client", default=None)
+
+
+def set_quota_client(authorization: str, host: str):
+    """Attribute upstream calls made while handling this request; returns a reset token"""
+    return _client.set(QuotaClient(authorization, host))
+
+
+def reset_quota_client(token) -> None:
+    _client.reset(token)
+
+
+def current_client() -> Optional[QuotaClient]:
+    """Caller of the request being handled, None in background work"""
+    return _client.get()
+
+
+def current_period(now: Optional[datetime] = None) -> str:
+    return (now or datetime.utcnow()).strftime("%Y-%m")
+
+
+def month_elapsed(now: Optional[datetime] = None) -> float:
+    """Fraction of the current UTC month that has passed"""
+    now = now or datetime.utcnow()
+    days = calendar.monthrange(now.year, now.month)[1]
+    start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    return (now - start).total_seconds() / (days * 86400)
+
+
+class TokenBucket:
+    """Refills per_minute tokens a minute, holding at most a minute's worth"""
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, per_minute: float):
+        self.rate = per_minute / 60.0
+        self.capacity = per_minute
+        self.tokens = per_minute
+        self.updated = time.monotonic()
+
+    def available(self, now: float) -> float:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        return self.tokens
+
+
+class UpstreamQuota:
+    """Budget and rate limits for one paid upstream"""
+
+    def __init__(self, name: str, unit: str, monthly: int, per_minute: float, user_per_minute: float):
+        self.name = name
+        self.unit = unit
+        self.monthly = monthly
+        self.per_minute = per_minute
+        self.user_per_minute = user_per_minute
+        self.bucket = TokenBucket(per_minute) if per_minute > 0 else None
+        self.user_buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+
+    def user_bucket(self, client: str) -> TokenBucket:
+        bucket = self.user_buckets.get(client)
+        if bucket is None:
+            bucket = self.user_buckets[client] = TokenBucket(self.user_per_minute)
+            if len(self.user_buckets) > QUOTA_MAX_CLIENTS:
+                self.user_buckets.popitem(last=False)
+        else:
+            self.user_buckets.move_to_end(client)
+        return bucket
+
+
+class UsageLedger:
+    """
+    Units used per upstream and month. Usage is counted in memory and
+    written back every QUOTA_SYNC_SECONDS as increments, so workers sharing
+    the database add up; each sync also reloads the month's totals, which
+    is how a worker sees what the others have spent.
+    """
+
+    def __init__(self, session_factory=SessionLocal):
+        self.session_factory = session_factory
+        self._stored: Dict[Tuple[str, str], int] = {}  # (period, upstream) -> units in the database
+        self._pending: Dict[Tuple[str, str], List[int]] = {}  # (period, upstream) -> [units, calls] not written yet
+        self._writing: Dict[Tuple[str, str], List[int]] = {}  # Being written by the sync in progress
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._synced_at: Optional[float] = None
+        self._sync_future: Optional[Future] = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="quota-ledger")
+
+    def add(self, upstream: str, units: int, calls: int = 1) -> None:
+        key = (current_period(), upstream)
+        with self._lock:
+            pending = self._pending.setdefault(key, [0, 0])
+            pending[0] += units
+            pending[1] += calls
+        self._maybe_sync()
+
+    def used(self, upstream: str) -> int:
+        self._maybe_sync()
+        key = (current_period(), upstream)
+        with self._lock:
+            return (self._stored.get(key, 0) + self._pending.get(key, (0, 0))[0]
+                    + self._writing.get(key, (0, 0))[0])
+
+    def _maybe_sync(self) -> None:
+        if self._synced_at is None:
+            self.sync()  # First use in this process: load the month's totals before any decision
+            return
+        if time.monotonic() - self._synced_at < QUOTA_SYNC_SECONDS:
+            return
+        with self._lock:
+            if self._sync_future is None or self._sync_future.done():
+                self._sync_future = self._executor.submit(self.sync)
+
+    def flush(self) -> None:
+        if self._pending:
+            self.sync()
+
+    def sync(self) -> None:
+        """Write pending usage and reload this month's totals (blocking)"""
+        with self._sync_lock:
+            with self._lock:
+                self._writing, self._pending = self._pending, {}
+            period = current_period()
+            try:
+                with self.session_factory() as db:
+                    for (row_period, upstream), (units, calls) in self._writing.items():
+                        self._increment(db, row_period, upstream, units, calls)
+                    db.commit()
+                    rows = db.execute(
+                        select(UpstreamUsage.upstream, UpstreamUsage.units).where(UpstreamUsage.period == period)
+                    ).all()
+            except Exception as e:
+                print(f"Quota ledger sync failed: {e}")
+                with self._lock:
+                    for key, (units, calls) in self._writing.items():
+                        pending = self._pending.setdefault(key, [0, 0])
+                        pending[0] += units
+                        pending[1] += calls
+                    self._writing = {}
+                self._synced_at = time.monotonic()  # Retried after the usual interval
+                return
+            with self._lock:
+                self._stored = {(period, upstream): units for upstream, units in rows}
+                self._writing = {}
+            self._synced_at = time.monotonic()
+
+    @staticmethod
+    def _increment(db, period: str, upstream: str, units: int, calls: int) -> None:
+        now = datetime.utcnow()
+
+        def add_to_row() -> int:
+            return db.execute(
+                update(UpstreamUsage)
+                .where(UpstreamUsage.period == period, UpstreamUsage.upstream == upstream)
+                .values(units=UpstreamUsage.units + units, calls=UpstreamUsage.calls + calls, updated_at=now)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+
+        if add_to_row():
+            return
+        try:
+            with db.begin_nested():
+                db.add(UpstreamUsage(period=period, upstream=upstream, units=units, calls=calls, updated_at=now))
+        except IntegrityError:
+            add_to_row()  # Another worker created the month's row first
+
+
+class QuotaGovernor:
+    """Decides whether a paid upstream call may go ahead, and accounts for it"""
+
+    def __init__(self, upstreams: List[UpstreamQuota], ledger: Optional[UsageLedger] = None):
+        self.upstreams = {quota.name: quota for quota in upstreams}
+        self.ledger = ledger or UsageLedger()
+        self._lock = threading.Lock()
+        for quota in upstreams:
+            quota_budget.set(quota.monthly, upstream=quota.name, unit=quota.unit)
+
+    def mode(self, upstream: str) -> str:
+        quota = self.upstreams.get(upstream)
+        if quota is None or quota.monthly <= 0:
+            return NORMAL
+        return self._mode(quota, self.ledger.used(upstream))
+
+    @staticmethod
+    def _mode(quota: UpstreamQuota, used: int) -> str:
+        if quota.monthly <= 0:
+            return NORMAL
+        if used >= quota.monthly:
+            return EXHAUSTED
+        if used >= quota.monthly * QUOTA_CONSERVE_AT or used > quota.monthly * (month_elapsed() + QUOTA_PACE_SLACK):
+            return CONSERVE
+        return NORMAL
+
+    def acquire(self, upstream: str, units: int = 1) -> None:
+        """
+        Reserve `units` for one call or raise QuotaExceeded. The reservation
+        counts as used straight away; settle() corrects it once the actual
+        usage is known.
+        """
+        quota = self.upstreams.get(upstream)
+        if quota is None:
+            return
+        client = _client.get()
+        if quota.monthly > 0:
+            used = self.ledger.used(upstream)
+            if used + units > quota.monthly:
+                self._refuse(quota, "exhausted")
+            if client is None and self._mode(quota, used) != NORMAL:
+                self._refuse(quota, "conserve")  # Background work waits for a quieter month
+
+        client_key = client.key if client and quota.user_per_minute > 0 else None
+        with self._lock:
+            now = time.monotonic()
+            user_bucket = quota.user_bucket(client_key) if client_key else None
+            if user_bucket and user_bucket.available(now) < 1:
+                reason = "user_rate_limited"
+            elif quota.bucket and quota.bucket.available(now) < 1:
+                reason = "rate_limited"
+            else:
+                reason = None
+                for bucket in (user_bucket, quota.bucket):
+                    if bucket:
+                        bucket.tokens -= 1
+        if reason:
+            self._refuse(quota, reason)
+
+        quota_requests.inc(upstream=upstream, result="allowed")
+        self.record(upstream, units)
+
+    def settle(self, upstream: str, reserved: int, actual: int) -> None:
+        """Replace a reservation from acquire() with the units the call actually used"""
+        if upstream in self.upstreams and actual != reserved:
+            self.record(upstream, actual - reserved, calls=0)
+
+    def record(self, upstream: str, units: int, calls: int = 1) -> None:
+        quota = self.upstreams.get(upstream)
+        if quota is None:
+            return
+        self.ledger.add(upstream, units, calls)
+        self._publish(quota)
+
+    def _refuse(self, quota: UpstreamQuota, reason: str) -> None:
+        quota_requests.inc(upstream=quota.name, result=reason)
+        raise QuotaExceeded(quota.name, reason)
+
+    def _publish(self, quota: UpstreamQuota) -> Dict[str, Any]:
+        used = self.ledger.used(quota.name)
+        mode = self._mode(quota, used)
+        remaining = max(quota.monthly - used, 0) if quota.monthly > 0 else -1
+        quota_used.set(used, upstream=quota.name, unit=quota.unit)
+        quota_remaining.set(remaining, upstream=quota.name, unit=quota.unit)
+        quota_mode.set(MODE_LEVELS[mode], upstream=quota.name)
+        return {"used": used, "remaining": remaining, "mode": mode}
+
+    def status(self) -> List[Dict[str, Any]]:
+        """Budget, usage and policy mode per upstream (remaining is -1 when unlimited)"""
+        elapsed = month_elapsed()
+        statuses = []
+        for quota in self.upstreams.values():
+            with self._lock:
+                rate_tokens = quota.bucket.available(time.monotonic()) if quota.bucket else None
+            statuses.append({
+                "upstream": quota.name,
+                "unit": quota.unit,
+                "period": current_period(),
+                "budget": quota.monthly,
+                **self._publish(quota),
+                "even_pace_used": int(quota.monthly * elapsed),
+                "per_minute": quota.per_minute,
+                "user_per_minute": quota.user_per_minute,
+                "rate_tokens": round(rate_tokens, 2) if rate_tokens is not None else None,
+            })
+        return statuses
+
+    def flush(self) -> None:
+        """Write pending usage now (on shutdown)"""
+        self.ledger.flush()
+
+
+# Singleton instance
+quota_governor = QuotaGovernor([
+    UpstreamQuota("jsearch", "requests", QUOTA_JSEARCH_MONTHLY, QUOTA_JSEARCH_PER_MINUTE,
+                  QUOTA_USER_JSEARCH_PER_MINUTE),
+    UpstreamQuota("anthropic", "tokens", QUOTA_ANTHROPIC_MONTHLY, QUOTA_ANTHROPIC_PER_MINUTE,
+                  QUOTA_USER_ANTHROPIC_PER_MINUTE),
+])
@@ -0,0 +1,56 @@
+"""Background enrichment of uploaded resumes (LLM analysis and match precomputation)"""
+from typing import Any, Dict
+
+from sqlalchemy.orm import undefer_group
+
+from database import SessionLocal
+from models.db_models import Resume
+from services.llm_service import llm_service
+from services.match_scores import load_resume_text, match_score_service
+from services.task_queue import task_queue
+
+ENRICH_RESUME_TASK = "resume.enrich"
+
+
+@task_queue.register(ENRICH_RESUME_TASK)
+def enrich_resume(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Run the slow post-upload steps for a resume:
+    LLM quality analysis, semantic skill extraction, then match score precomputation.
+    """
+    resume_id = payload["resume_id"]
+
+    with SessionLocal() as db:
+        resume = db.get(Resume, resume_id, options=[undefer_group("content")])
+        if resume is None:
+            return {"skipped": "resume was deleted"}
+
+        if llm_service.is_available():
+            text = load_resume_text(resume)
+
+            analysis = llm_service.analyze_resume_quality(text, resume.sections or {})
+            resume.quality_score = analysis.get("score")
+            resume.quality_analysis = analysis
+
+            # Keep only skills the keyword parser missed
+            known = {skill.lower() for skill in resume.skills or []}
+            semantic_skills = []
+            for skill in llm_service.extract_skills_semantic(text):
+                if isinstance(skill, str) and skill.lower() not in known:
+                    known.add(skill.lower())
+                    semantic_skills.append(skill)
+            resume.semantic_skills = semantic_skills
+
+        quality_score = resume.quality_score
+        semantic_count = len(resume.semantic_skills or [])
+        db.commit()
+
+    # Scored after enrichment so the semantic skills count towards matches
+    saved_jobs_scored = match_score_service.score_resume(resume_id)
+
+    return {
+        "resume_id": resume_id,
+        "quality_score": quality_score,
+        "semantic_skills": semantic_count,
+        "saved_jobs_scored": saved_jobs_scored,
+    }
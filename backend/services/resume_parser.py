@@ -1,8 +1,16 @@
-import PyPDF2
-from docx import Document
+import hashlib
 import io
+import os
 import re
-from typing import Dict, List, Any
+from typing import Any, Callable, Dict, List
+
+from services.lazy_imports import lazy_import
+from services.metrics import span
+from services.shared_cache import SharedCache
+
+# Loaded on the first upload rather than at startup
+PyPDF2 = lazy_import("PyPDF2")
+docx = lazy_import("docx")
 
 # Expanded skill keywords for better extraction
 TECH_SKILLS = [
@@ -36,6 +44,14 @@ SECTION_PATTERNS = {
     "certifications": r"(?i)^[\s]*certifications?|certificates?|licenses?",
 }
 
+# Bump whenever TECH_SKILLS, SECTION_PATTERNS or the extraction functions change,
+# so scripts/backfill_resumes.py knows which stored resumes are stale
+PARSER_VERSION = 1
+
+# Parsed results keyed by file content, shared by all workers (services/shared_cache.py)
+PARSE_CACHE_TTL = float(os.getenv("PARSE_CACHE_TTL", str(24 * 3600)))  # seconds, 0 disables
+parse_cache = SharedCache("parse", PARSE_CACHE_TTL)
+
 # Date patterns for experience parsing
 DATE_PATTERNS = [
     r"(?i)(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?\s*\d{4}",
@@ -58,28 +74,49 @@ def parse_resume(content: bytes, filename: str) -> str:
 
 
 def parse_resume_structured(content: bytes, filename: str) -> Dict[str, Any]:
-    """Extract structured data from PDF or DOCX files"""
+    """
+    Extract structured data from PDF or DOCX files. Re-uploads of the same
+    file reuse the derived fields from the cache; the text itself is always
+    extracted again, since it must not outlive the resume in a shared store.
+    """
+    extension = os.path.splitext(filename.lower())[1]
+    key = f"fields:v{PARSER_VERSION}:{extension}:{hashlib.sha256(content).hexdigest()}"
+    return _parse_resume_structured(
+        content, filename, lambda text: parse_cache.get_or_compute(key, lambda: extract_structured(text))
+    )
+
+
+def _parse_resume_structured(content: bytes, filename: str,
+                             extract: Callable[[str], Dict[str, Any]] = None) -> Dict[str, Any]:
     try:
         if filename.lower().endswith('.pdf'):
-            text = _parse_pdf(content)
+            with span("parse.pdf_extract"):
+                text = _parse_pdf(content)
         elif filename.lower().endswith('.docx'):
-            text = _parse_docx(content)
+            with span("parse.docx_extract"):
+                text = _parse_docx(content)
         else:
             return {"error": "Unsupported file format", "text": "", "skills": [], "sections": {}}
 
-        # Extract structured data
+        return {"text": text, **(extract or extract_structured)(text)}
+    except Exception as e:
+        return {"error": str(e), "text": "", "skills": [], "sections": {}}
+
+
+def extract_structured(text: str) -> Dict[str, Any]:
+    """Extract skills, sections and experience from already-parsed resume text"""
+    with span("parse.skills"):
         skills = _extract_skills(text)
+    with span("parse.sections"):
         sections = _extract_sections(text)
+    with span("parse.experience"):
         experience_years = _estimate_experience_years(text)
-
-        return {
-            "text": text,
-            "skills": skills,
-            "sections": sections,
-            "experience_years": experience_years,
-        }
-    except Exception as e:
-        return {"error": str(e), "text": "", "skills": [], "sections": {}}
+    return {
+        "skills": skills,
+        "sections": sections,
+        "experience_years": experience_years,
+        "parser_version": PARSER_VERSION,
+    }
 
 
 def _parse_pdf(content: bytes) -> str:
@@ -97,7 +134,7 @@ def _parse_pdf(content: bytes) -> str:
 def _parse_docx(content: bytes) -> str:
     """Extract text from DOCX"""
     doc_file = io.BytesIO(content)
-    doc = Document(doc_file)
+    doc = docx.Document(doc_file)
     text = ""
     for paragraph in doc.paragraphs:
         text += paragraph.text + "\n"
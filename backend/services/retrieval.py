@@ -0,0 +1,212 @@
+"""
+Matching against the local job pool: exhaustively over the shared snapshot
+when one is open (services/job_snapshot.py), else two-stage, inverted-index
+candidate generation over the pool, then the full scorer
+"""
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from services.clearance_filter import ClearanceLevel, clearance_filter
+from services.job_matcher import match_jobs, match_snapshot
+from services.job_record import Job, JobMatch
+from services.job_pool import job_pool
+from services.job_snapshot import JobSnapshot, job_snapshots
+from services.metrics import record_span
+
+RETRIEVAL_CANDIDATES = int(os.getenv("RETRIEVAL_CANDIDATES", "300"))  # Shortlist size for the full scorer
+# Fraction of requests re-scored exhaustively in the background to measure candidate recall
+RETRIEVAL_RECALL_SAMPLE_RATE = float(os.getenv("RETRIEVAL_RECALL_SAMPLE_RATE", "0"))
+STATS_WINDOW = 1000  # Recent samples kept per stage
+
+
+class StageStats:
+    """Rolling latency samples for one pipeline stage"""
+
+    def __init__(self, window: int = STATS_WINDOW):
+        self._samples = deque(maxlen=window)
+        self.count = 0
+
+    def record(self, ms: float) -> None:
+        self._samples.append(ms)
+        self.count += 1
+
+    def summary(self) -> Dict[str, float]:
+        samples = sorted(self._samples)
+        if not samples:
+            return {"count": self.count}
+        return {
+            "count": self.count,
+            "p50_ms": round(samples[len(samples) // 2], 3),
+            "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+            "max_ms": round(samples[-1], 3),
+        }
+
+
+class RetrievalPipeline:
+    """
+    Stage 1 pulls the best few hundred candidates from the local job pool by
+    shared canonical skills and title words; stage 2 runs match_jobs on that
+    shortlist only. Latency is tracked per stage, and recall of stage 1 can be
+    measured against an exhaustive match_jobs run over the whole pool.
+    """
+
+    def __init__(self, candidates: int = RETRIEVAL_CANDIDATES):
+        self.candidates = candidates
+        self.stages = {"retrieve": StageStats(), "hydrate": StageStats(), "rank": StageStats()}
+        self._recalls = deque(maxlen=STATS_WINDOW)
+        self._lock = threading.Lock()
+        self._evaluator = ThreadPoolExecutor(max_workers=1, thread_name_prefix="retrieval-recall")
+
+    def match(self, resume_text: str, skills: Optional[List[str]], limit: int = 20,
+              extra_jobs: Optional[List[Job]] = None, clearance_level: Optional[str] = None) -> Dict:
+        """
+        Rank the pool for a resume. extra_jobs (e.g. a live search result) are
+        always included in the shortlist. clearance_level (other than "none")
+        keeps only jobs requiring that level. Returns matches plus per-stage timings.
+        """
+        skills = skills or []
+        if clearance_level == "none":
+            clearance_level = None
+        snapshot = job_snapshots.current()
+        if snapshot is not None:
+            return self._match_snapshot(snapshot, resume_text, skills, limit, extra_jobs or [], clearance_level)
+        return self._match_pool(resume_text, skills, limit, extra_jobs or [], clearance_level)
+
+    def _match_pool(self, resume_text: str, skills: List[str], limit: int, extra_jobs: List[Job],
+                    clearance_level: Optional[str]) -> Dict:
+        """Inverted-index shortlist from the job pool, hydrated and ranked by the full scorer"""
+        timings = {}
+
+        start = time.perf_counter()
+        candidates = job_pool.candidates(skills, resume_text, self.candidates)
+        timings["retrieve_ms"] = self._record("retrieve", start)
+
+        start = time.perf_counter()
+        jobs = job_pool.get_jobs([job_id for job_id, _ in candidates])
+        shortlisted = {job.id for job in jobs}
+        jobs.extend(job for job in extra_jobs if job.get("id") not in shortlisted)
+        if clearance_level:
+            jobs = clearance_filter.filter_jobs_by_clearance(jobs, ClearanceLevel(clearance_level))
+        timings["hydrate_ms"] = self._record("hydrate", start)
+
+        start = time.perf_counter()
+        matches = match_jobs(resume_text, jobs, skills or None)[:limit]
+        timings["rank_ms"] = self._record("rank", start)
+
+        if RETRIEVAL_RECALL_SAMPLE_RATE and random.random() < RETRIEVAL_RECALL_SAMPLE_RATE:
+            self._evaluator.submit(self._sample_recall, resume_text, skills, limit, matches, clearance_level)
+
+        return {
+            "matches": matches,
+            "candidates": len(jobs),
+            "pool_size": len(job_pool),
+            "timings": timings,
+        }
+
+    def _match_snapshot(self, snapshot: JobSnapshot, resume_text: str, skills: List[str], limit: int,
+                        extra_jobs: List[Job], clearance_level: Optional[str]) -> Dict:
+        """
+        Every job in the snapshot is scored, so there is no candidate stage:
+        "retrieve" is the vectorized scoring pass, "hydrate" picks the live
+        jobs the snapshot doesn't have yet, and "rank" scores and merges those.
+        """
+        timings = {}
+
+        start = time.perf_counter()
+        matches = match_snapshot(resume_text, snapshot, skills or None, limit, clearance_level)
+        timings["retrieve_ms"] = self._record("retrieve", start)
+
+        start = time.perf_counter()
+        missing = (snapshot.rows_of([job.get("id") or 0 for job in extra_jobs]) < 0) if extra_jobs else []
+        extra_jobs = [job for job, is_missing in zip(extra_jobs, missing) if is_missing]
+        if clearance_level:
+            extra_jobs = clearance_filter.filter_jobs_by_clearance(extra_jobs, ClearanceLevel(clearance_level))
+        timings["hydrate_ms"] = self._record("hydrate", start)
+
+        start = time.perf_counter()
+        if extra_jobs:
+            matches = sorted(matches + match_jobs(resume_text, extra_jobs, skills or None),
+                             key=lambda m: m.match_percentage, reverse=True)[:limit]
+        timings["rank_ms"] = self._record("rank", start)
+
+        if RETRIEVAL_RECALL_SAMPLE_RATE and random.random() < RETRIEVAL_RECALL_SAMPLE_RATE:
+            self._evaluator.submit(self._sample_recall, resume_text, skills, limit, matches, clearance_level)
+
+        return {
+            "matches": matches,
+            "candidates": len(snapshot) + len(extra_jobs),
+            "pool_size": len(job_pool),
+            "timings": timings,
+        }
+
+    def _record(self, stage: str, start: float) -> float:
+        seconds = time.perf_counter() - start
+        record_span(f"match.{stage}", seconds)
+        with self._lock:
+            self.stages[stage].record(seconds * 1000)
+        return round(seconds * 1000, 3)
+
+    def exhaustive_top(self, resume_text: str, skills: List[str], limit: int,
+                       clearance_level: Optional[str] = None) -> List[JobMatch]:
+        """
+        Top matches from match_jobs over the entire pool, or the jobs requiring
+        clearance_level in it (slow; evaluation only)
+        """
+        best = []
+        for batch in job_pool.iter_jobs():
+            if clearance_level:
+                batch = clearance_filter.filter_jobs_by_clearance(batch, ClearanceLevel(clearance_level))
+            best.extend(match_jobs(resume_text, batch, skills or None)[:limit])
+            best = sorted(best, key=lambda m: m.match_percentage, reverse=True)[:limit]
+        return best
+
+    def recall(self, resume_text: str, skills: List[str], limit: int, returned: List[JobMatch],
+               clearance_level: Optional[str] = None) -> float:
+        """Share of the returned matches that belong in the exhaustive top `limit` (under the same filter)"""
+        return recall_at_k(self.exhaustive_top(resume_text, skills, limit, clearance_level), returned)
+
+    def _sample_recall(self, resume_text: str, skills: List[str], limit: int, returned: List[JobMatch],
+                       clearance_level: Optional[str]) -> None:
+        try:
+            value = self.recall(resume_text, skills, limit, returned, clearance_level)
+            with self._lock:
+                self._recalls.append(value)
+        except Exception as e:
+            print(f"Recall sampling failed: {e}")
+
+    def stats(self) -> Dict:
+        with self._lock:
+            recalls = list(self._recalls)
+            return {
+                "pool_size": len(job_pool),
+                "candidates": self.candidates,
+                "snapshot": job_snapshots.status(),
+                "stages": {name: stats.summary() for name, stats in self.stages.items()},
+                "recall": {
+                    "samples": len(recalls),
+                    "mean": round(sum(recalls) / len(recalls), 4) if recalls else None,
+                    "sample_rate": RETRIEVAL_RECALL_SAMPLE_RATE,
+                },
+            }
+
+
+def recall_at_k(expected: List[JobMatch], returned: List[JobMatch]) -> float:
+    """
+    Recall of a ranking against the exhaustive top k, counting ties as hits:
+    any returned match scoring at least the k-th best exhaustive score is one
+    the exhaustive ranking could equally have picked.
+    """
+    if not expected:
+        return 1.0
+    cutoff = expected[-1].match_percentage
+    hits = sum(1 for match in returned[:len(expected)] if match.match_percentage >= cutoff)
+    return hits / len(expected)
+
+
+# Singleton instance
+retrieval_pipeline = RetrievalPipeline()
@@ -0,0 +1,100 @@
+"""Semantic job retrieval: embed jobs into the vector index, shortlist them for a resume"""
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from services.embeddings import get_embedder, job_embedding_text, resume_embedding_text
+from services.metrics import span
+from services.vector_index import VectorIndex
+
+SEMANTIC_MATCHING = os.getenv("SEMANTIC_MATCHING", "on")  # "off" disables embeddings entirely
+# Persist pending index additions after this many new jobs
+SEMANTIC_SAVE_EVERY = int(os.getenv("SEMANTIC_SAVE_EVERY", "500"))
+
+
+class SemanticSearch:
+    """
+    Embeds job postings into an on-disk vector index and retrieves the
+    nearest jobs for a resume. Indexing runs on a background thread so job
+    fetches don't wait on embedding.
+    """
+
+    def __init__(self, index: Optional[VectorIndex] = None):
+        self.index = index or VectorIndex()
+        self._loaded = False
+        self._unsaved = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="semantic-index")
+
+    def is_available(self) -> bool:
+        return SEMANTIC_MATCHING != "off" and get_embedder() is not None
+
+    def _ensure_loaded(self):
+        embedder = get_embedder()
+        with self._lock:
+            if not self._loaded:
+                self.index.load(embedder.name, embedder.dim)
+                self._loaded = True
+        return embedder
+
+    # Indexing
+
+    def schedule_index_jobs(self, jobs: List[Dict]) -> Optional[Future]:
+        if not self.is_available():
+            return None
+        return self._executor.submit(self._run_index_jobs, jobs)
+
+    def _run_index_jobs(self, jobs: List[Dict]) -> int:
+        try:
+            return self.index_jobs(jobs)
+        except Exception as e:
+            print(f"Semantic indexing failed: {e}")
+            return 0
+
+    def index_jobs(self, jobs: List[Dict]) -> int:
+        """Embed and index jobs not already in the index (blocking). Returns how many were added."""
+        embedder = self._ensure_loaded()
+        new_jobs = [job for job in jobs if job.get("id") is not None and str(job["id"]) not in self.index]
+        if not new_jobs:
+            return 0
+
+        vectors = embedder.embed([job_embedding_text(job) for job in new_jobs])
+        added = self.index.add([str(job["id"]) for job in new_jobs], vectors)
+
+        with self._lock:
+            self._unsaved += added
+            should_save = self._unsaved >= SEMANTIC_SAVE_EVERY
+            if should_save:
+                self._unsaved = 0
+        if should_save:
+            self.index.save()
+        return added
+
+    def flush(self) -> None:
+        """Persist any pending index additions"""
+        if self._loaded:
+            self.index.save()
+            self._unsaved = 0
+
+    # Querying
+
+    def shortlist(self, resume_text: str, skills: Optional[List[str]] = None, k: int = 200) -> List[Tuple[str, float]]:
+        """Nearest indexed jobs for a resume as (job ID, cosine similarity), best first"""
+        embedder = self._ensure_loaded()
+        with span("semantic.embed"):
+            query = embedder.embed([resume_embedding_text(resume_text, skills)])[0]
+        with span("semantic.search"):
+            return self.index.search(query, k)
+
+    def similarities(self, resume_text: str, skills: Optional[List[str]], jobs: List[Dict]) -> Dict:
+        """Cosine similarity between a resume and each given job, keyed by job ID"""
+        embedder = get_embedder()
+        vectors = embedder.embed([resume_embedding_text(resume_text, skills)] +
+                                 [job_embedding_text(job) for job in jobs])
+        scores = vectors[1:] @ vectors[0]
+        return {job.get("id"): float(score) for job, score in zip(jobs, scores)}
+
+
+# Singleton instance
+semantic_search = SemanticSearch()
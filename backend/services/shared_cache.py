@@ -0,0 +1,427 @@
+"""
+Caches shared by every worker process: pluggable backends, namespaced keys,
+TTLs with stale reads, and stampede protection
+
+    memory  per process; fine for a single worker
+    sqlite  one WAL database file (in /dev/shm when available) shared by all
+            workers on the host
+    redis   any server speaking the Redis protocol, shared across hosts
+            (benchmarks/fake_redis.py is a local stand-in)
+
+Backend failures never fail a request: lookups miss and writes are dropped.
+"""
+import hashlib
+import json
+import os
+import socket
+import sqlite3
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, Optional, Tuple
+from urllib.parse import unquote, urlparse
+
+from services.metrics import metrics
+
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")  # memory | sqlite | redis
+CACHE_KEY_PREFIX = os.getenv("CACHE_KEY_PREFIX", "applesauce")
+CACHE_MEMORY_MAX_BYTES = int(os.getenv("CACHE_MEMORY_MAX_BYTES", str(64 * 1024 * 1024)))
+CACHE_SQLITE_PATH = os.getenv("CACHE_SQLITE_PATH", "")  # Default: per-database file in /dev/shm or the temp dir
+CACHE_SQLITE_MAX_ENTRIES = int(os.getenv("CACHE_SQLITE_MAX_ENTRIES", "100000"))
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL", "redis://127.0.0.1:6379/0")
+CACHE_REDIS_TIMEOUT = float(os.getenv("CACHE_REDIS_TIMEOUT", "0.5"))  # seconds per command
+# How long one caller may hold a key's refresh lock; others serve stale data or wait up to this long
+CACHE_LOCK_SECONDS = float(os.getenv("CACHE_LOCK_SECONDS", "30"))
+CACHE_WAIT_INTERVAL = 0.05  # seconds between checks while another worker computes a missing entry
+BACKEND_RETRY_SECONDS = 5.0  # After a connection failure, skip the backend for this long
+
+cache_requests = metrics.counter(
+    "applesauce_cache_requests_total", "Shared cache lookups by outcome", ("namespace", "result")
+)
+
+
+class CacheBackendError(Exception):
+    """The cache backend could not be reached or rejected a command"""
+    pass
+
+
+class CacheBackend(ABC):
+    """Byte values under string keys, each with its own expiry"""
+    name = "base"
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        """The value, or None if missing or expired"""
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        """Store a value for ttl seconds"""
+
+    @abstractmethod
+    def add(self, key: str, value: bytes, ttl: float) -> bool:
+        """Store only if the key is absent (or expired); True if stored. Used for locks."""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Remove a key if present"""
+
+
+class MemoryBackend(CacheBackend):
+    """In-process LRU bounded by total value size"""
+    name = "memory"
+
+    def __init__(self, max_bytes: int = CACHE_MEMORY_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[bytes, float]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] < time.time():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (value, time.time() + ttl)
+            self._bytes += len(value)
+            while self._bytes > self.max_bytes and self._entries:
+                self._remove(next(iter(self._entries)))
+
+    def add(self, key: str, value: bytes, ttl: float) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] >= time.time():
+                return False
+            self._remove(key)
+            self._entries[key] = (value, time.time() + ttl)
+            self._bytes += len(value)
+            return True
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._remove(key)
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= len(entry[0])
+
+
+def default_sqlite_path() -> str:
+    """One cache file per database, in shared memory when the host has it"""
+    directory = "/dev/shm" if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK) else tempfile.gettempdir()
+    database_url = os.getenv("DATABASE_URL", "sqlite:///./applesauce.db")
+    digest = hashlib.sha1(f"{os.getcwd()}|{database_url}".encode()).hexdigest()[:12]
+    return os.path.join(directory, f"applesauce-cache-{digest}.db")
+
+
+class SQLiteBackend(CacheBackend):
+    """Cache table in a WAL-mode SQLite file, shared by every process on the host"""
+    name = "sqlite"
+    PURGE_INTERVAL = 60.0  # seconds between sweeps of expired rows
+
+    def __init__(self, path: str = "", max_entries: int = CACHE_SQLITE_MAX_ENTRIES):
+        self.path = path or default_sqlite_path()
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._next_purge = 0.0
+
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per thread, and never one inherited across fork
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")  # Losing recent entries on power loss is fine for a cache
+            conn.execute("CREATE TABLE IF NOT EXISTS cache "
+                         "(key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL)")
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_cache_expires_at ON cache (expires_at)")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _execute(self, sql: str, params: tuple = ()):
+        try:
+            return self._connection().execute(sql, params)
+        except sqlite3.Error as e:
+            raise CacheBackendError(str(e)) from e
+
+    def get(self, key: str) -> Optional[bytes]:
+        row = self._execute("SELECT value FROM cache WHERE key = ? AND expires_at >= ?", (key, time.time())).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._execute("INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                      (key, value, time.time() + ttl))
+        self._maybe_purge()
+
+    def add(self, key: str, value: bytes, ttl: float) -> bool:
+        now = time.time()
+        self._execute("DELETE FROM cache WHERE key = ? AND expires_at < ?", (key, now))
+        cursor = self._execute("INSERT OR IGNORE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                               (key, value, now + ttl))
+        return cursor.rowcount == 1
+
+    def delete(self, key: str) -> None:
+        self._execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def _maybe_purge(self) -> None:
+        now = time.time()
+        if now < self._next_purge:
+            return
+        self._next_purge = now + self.PURGE_INTERVAL
+        self._execute("DELETE FROM cache WHERE expires_at < ?", (now,))
+        excess = self._execute("SELECT COUNT(*) FROM cache").fetchone()[0] - self.max_entries
+        if excess > 0:
+            # Over the cap: drop the entries closest to expiring
+            self._execute("DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY expires_at LIMIT ?)",
+                          (excess,))
+
+
+class RedisBackend(CacheBackend):
+    """Minimal Redis protocol (RESP2) client: GET, SET with PX/NX, DEL"""
+    name = "redis"
+
+    def __init__(self, url: str = CACHE_REDIS_URL, timeout: float = CACHE_REDIS_TIMEOUT):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "127.0.0.1"
+        self.port = parsed.port or 6379
+        self.password = unquote(parsed.password) if parsed.password else None
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.timeout = timeout
+        self._local = threading.local()
+        self._down_until = 0.0
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+        if time.monotonic() < self._down_until:
+            raise CacheBackendError(f"redis at {self.host}:{self.port} unavailable")
+        try:
+            sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        except OSError as e:
+            self._down_until = time.monotonic() + BACKEND_RETRY_SECONDS
+            raise CacheBackendError(f"cannot connect to redis at {self.host}:{self.port}: {e}") from e
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        conn = (sock, sock.makefile("rb"))
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        try:
+            if self.password:
+                self._command("AUTH", self.password)
+            if self.db:
+                self._command("SELECT", str(self.db))
+        except CacheBackendError:
+            self._local.conn = None
+            sock.close()
+            self._down_until = time.monotonic() + BACKEND_RETRY_SECONDS
+            raise
+        return conn
+
+    def _command(self, *args):
+        sock, reader = self._connection()
+        parts = [f"*{len(args)}\r\n".encode()]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode()
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        try:
+            sock.sendall(b"".join(parts))
+            return self._read_reply(reader)
+        except (OSError, ValueError) as e:
+            # The connection may be out of step with the server now; start over next time
+            self._local.conn = None
+            sock.close()
+            raise CacheBackendError(f"redis command {args[0]} failed: {e}") from e
+
+    def _read_reply(self, reader):
+        line = reader.readline()
+        if not line.endswith(b"\r\n"):
+            raise ValueError("connection closed")
+        kind, body = line[:1], line[1:-2]
+        if kind == b"+":
+            return body.decode()
+        if kind == b"-":
+            raise CacheBackendError(body.decode())
+        if kind == b":":
+            return int(body)
+        if kind == b"$":
+            length = int(body)
+            if length < 0:
+                return None
+            data = reader.read(length + 2)
+            if len(data) != length + 2:
+                raise ValueError("connection closed")
+            return data[:-2]
+        if kind == b"*":
+            length = int(body)
+            return None if length < 0 else [self._read_reply(reader) for _ in range(length)]
+        raise ValueError(f"unexpected reply {line!r}")
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._command("GET", key)
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._command("SET", key, value, "PX", max(1, int(ttl * 1000)))
+
+    def add(self, key: str, value: bytes, ttl: float) -> bool:
+        return self._command("SET", key, value, "PX", max(1, int(ttl * 1000)), "NX") == "OK"
+
+    def delete(self, key: str) -> None:
+        self._command("DEL", key)
+
+
+def create_backend(kind: str = CACHE_BACKEND) -> CacheBackend:
+    if kind == "sqlite":
+        return SQLiteBackend(CACHE_SQLITE_PATH)
+    if kind == "redis":
+        return RedisBackend(CACHE_REDIS_URL)
+    if kind != "memory":
+        print(f"Warning: unknown CACHE_BACKEND {kind!r}, using memory")
+    return MemoryBackend()
+
+
+class SharedCache:
+    """
+    JSON values under `namespace` on a cache backend. Entries are fresh for
+    `ttl` seconds, then may be served stale for `stale_ttl` more while one
+    caller recomputes them. A ttl of 0 disables the cache.
+    """
+
+    def __init__(self, namespace: str, ttl: float, stale_ttl: float = 0.0, backend: Optional[CacheBackend] = None):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._backend = backend
+        self._last_error = 0.0
+
+    @property
+    def backend(self) -> CacheBackend:
+        return self._backend or cache_backend
+
+    def _key(self, key: str) -> str:
+        if len(key) > 200:
+            key = hashlib.sha256(key.encode()).hexdigest()
+        return f"{CACHE_KEY_PREFIX}:{self.namespace}:{key}"
+
+    def get(self, key: str) -> Optional[Any]:
+        """Cached value (fresh or stale), or None"""
+        entry = self._read(self._key(key))
+        return entry[0] if entry else None
+
+    def set(self, key: str, value: Any) -> None:
+        if self.ttl > 0:
+            self._write(self._key(key), value)
+
+    def delete(self, key: str) -> None:
+        self._call(self.backend.delete, None, self._key(key))
+
+    def fresh_for(self, key: str) -> Optional[float]:
+        """Seconds until the entry goes stale (negative once it has), or None if it isn't cached"""
+        entry = self._read(self._key(key))
+        return entry[1] - time.time() if entry else None
+
+    def claim(self, key: str, seconds: float) -> bool:
+        """Take `key` for `seconds` if nobody holds it, across all workers sharing the backend"""
+        return bool(self._call(self.backend.add, False, self._key(key), b"1", seconds))
+
+    def refresh(self, key: str, compute: Callable[[], Any],
+                cacheable: Callable[[Any], bool] = lambda value: value is not None) -> Optional[Any]:
+        """
+        Recompute an entry ahead of its expiry (cache warming). Returns the
+        new value, or None without computing if another caller is already
+        refreshing the key.
+        """
+        if self.ttl <= 0:
+            return None
+        full_key = self._key(key)
+        lock_key = full_key + ":lock"
+        if not self._call(self.backend.add, False, lock_key, b"1", CACHE_LOCK_SECONDS):
+            return None
+        try:
+            value = compute()
+            if cacheable(value):
+                self._write(full_key, value)
+                cache_requests.inc(namespace=self.namespace, result="warm")
+        finally:
+            self._call(self.backend.delete, None, lock_key)
+        return value
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any],
+                       cacheable: Callable[[Any], bool] = lambda value: value is not None) -> Any:
+        """
+        Cached value, or compute() stored for next time if cacheable(result).
+        Only one caller across all workers computes a given key at a time:
+        the others get the stale value if there is one, otherwise they wait
+        for the first caller's result (computing it themselves if that takes
+        longer than CACHE_LOCK_SECONDS).
+        """
+        if self.ttl <= 0:
+            return compute()
+
+        full_key = self._key(key)
+        lock_key = full_key + ":lock"
+        deadline = time.monotonic() + CACHE_LOCK_SECONDS
+        waited = False
+        while True:
+            entry = self._read(full_key)
+            if entry and entry[1] >= time.time():
+                cache_requests.inc(namespace=self.namespace, result="coalesced" if waited else "hit")
+                return entry[0]
+            if self._call(self.backend.add, True, lock_key, b"1", CACHE_LOCK_SECONDS):
+                try:
+                    value = compute()
+                    if cacheable(value):
+                        self._write(full_key, value)
+                finally:
+                    self._call(self.backend.delete, None, lock_key)
+                cache_requests.inc(namespace=self.namespace, result="refresh" if entry else "miss")
+                return value
+            if entry:
+                cache_requests.inc(namespace=self.namespace, result="stale")
+                return entry[0]
+            if time.monotonic() >= deadline:
+                cache_requests.inc(namespace=self.namespace, result="wait_timeout")
+                return compute()
+            waited = True
+            time.sleep(CACHE_WAIT_INTERVAL)
+
+    def _read(self, full_key: str) -> Optional[Tuple[Any, float]]:
+        """(value, fresh_until) or None"""
+        data = self._call(self.backend.get, None, full_key)
+        if data is None:
+            return None
+        try:
+            envelope = json.loads(data)
+            return envelope["v"], envelope["t"]
+        except (ValueError, KeyError, TypeError):
+            return None
+
+    def _write(self, full_key: str, value: Any) -> None:
+        data = json.dumps({"v": value, "t": time.time() + self.ttl}, separators=(",", ":")).encode()
+        self._call(self.backend.set, None, full_key, data, self.ttl + self.stale_ttl)
+
+    def _call(self, fn: Callable, default: Any, *args) -> Any:
+        try:
+            return fn(*args)
+        except CacheBackendError as e:
+            cache_requests.inc(namespace=self.namespace, result="error")
+            now = time.monotonic()
+            if now - self._last_error > 60:
+                self._last_error = now
+                print(f"Cache backend error ({self.backend.name}, {self.namespace}): {e}")
+            return default
+
+
+# Singleton instance
+cache_backend = create_backend()
@@ -0,0 +1,222 @@
+"""Persistent in-process background task queue backed by the tasks table"""
+import os
+import threading
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import and_, or_, select, update
+
+from database import SessionLocal
+from models.db_models import Task
+
+TASK_WORKERS = int(os.getenv("TASK_WORKERS", "2"))  # 0 disables workers in this process
+TASK_POLL_INTERVAL = float(os.getenv("TASK_POLL_INTERVAL", "2"))  # seconds between idle polls
+TASK_LEASE_SECONDS = int(os.getenv("TASK_LEASE_SECONDS", "300"))  # running tasks are reclaimed after this
+TASK_MAX_ATTEMPTS = int(os.getenv("TASK_MAX_ATTEMPTS", "3"))
+TASK_RETRY_BACKOFF = float(os.getenv("TASK_RETRY_BACKOFF", "10"))  # seconds, doubled per attempt
+
+class TaskQueue:
+    """
+    Background task queue with task state in the database.
+
+    Tasks are rows in the tasks table, so they survive restarts: a task left
+    "running" by a process that died is picked up again once its lease
+    expires. Several worker processes can share one database; claims are
+    made with a conditional UPDATE so each task runs once per attempt.
+    """
+
+    def __init__(self, session_factory=SessionLocal):
+        self.session_factory = session_factory
+        self._handlers: Dict[str, Callable[[Dict[str, Any]], Any]] = {}
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def register(self, kind: str):
+        """Decorator registering the handler for a task kind"""
+        def decorator(fn: Callable[[Dict[str, Any]], Any]):
+            self._handlers[kind] = fn
+            return fn
+        return decorator
+
+    def new_task(self, kind: str, payload: Dict[str, Any], user_id: Optional[int] = None,
+                 max_attempts: int = TASK_MAX_ATTEMPTS, delay: float = 0) -> Task:
+        """
+        Build a task row for the caller to add to its own session, to run
+        `delay` seconds from now.
+
+        Committing it together with the rows it refers to means a task is
+        never queued for data that was rolled back. Call notify() after commit.
+        """
+        if kind not in self._handlers:
+            raise ValueError(f"No handler registered for task kind: {kind}")
+        return Task(
+            id=uuid.uuid4().hex,
+            user_id=user_id,
+            kind=kind,
+            payload=payload,
+            status="queued",
+            attempts=0,
+            max_attempts=max_attempts,
+            run_after=datetime.utcnow() + timedelta(seconds=delay),
+        )
+
+    def enqueue(self, kind: str, payload: Dict[str, Any], user_id: Optional[int] = None) -> str:
+        """Persist a task in its own transaction and wake a worker (blocking)"""
+        task = self.new_task(kind, payload, user_id)
+        task_id = task.id  # Read before commit expires the instance
+        with self.session_factory() as db:
+            db.add(task)
+            db.commit()
+        self.notify()
+        return task_id
+
+    def notify(self) -> None:
+        """Wake idle workers so newly committed tasks start without waiting for the next poll"""
+        self._wake.set()
+
+    # Workers
+
+    def start(self, workers: int = TASK_WORKERS) -> None:
+        if self._threads or workers <= 0:
+            return
+        self._stop.clear()
+        for i in range(workers):
+            thread = threading.Thread(target=self._work, name=f"task-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        print(f"Task queue started with {workers} worker(s)")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop workers; a task still running is reclaimed after its lease expires"""
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def _work(self) -> None:
+        # Tasks left over from a previous process can wait one poll interval; claiming
+        # right away would compete with startup and the first requests (new tasks wake us)
+        self._wake.wait(TASK_POLL_INTERVAL)
+        while not self._stop.is_set():
+            try:
+                ran = self.run_next()
+            except Exception as e:
+                print(f"Task worker error: {e}")
+                ran = False
+            if not ran:
+                self._wake.wait(TASK_POLL_INTERVAL)
+                self._wake.clear()
+
+    def run_next(self) -> bool:
+        """Claim and run one runnable task. Returns False if there was nothing to do."""
+        task_id = self._claim()
+        if task_id is None:
+            return False
+        self._execute(task_id)
+        return True
+
+    def run_pending(self) -> int:
+        """Run tasks until none are runnable (for scripts and one-off draining)"""
+        count = 0
+        while self.run_next():
+            count += 1
+        return count
+
+    def _runnable(self, now: datetime):
+        return or_(
+            and_(Task.status == "queued", Task.run_after <= now),
+            # Lease expired: the worker running it died or hung
+            and_(Task.status == "running", Task.locked_until < now),
+        )
+
+    def _claim(self) -> Optional[str]:
+        now = datetime.utcnow()
+        with self.session_factory() as db:
+            candidates = db.execute(
+                select(Task.id).where(self._runnable(now)).order_by(Task.run_after).limit(5)
+            ).scalars().all()
+            for task_id in candidates:
+                claimed = db.execute(
+                    update(Task)
+                    .where(Task.id == task_id, self._runnable(now))
+                    .values(
+                        status="running",
+                        attempts=Task.attempts + 1,
+                        locked_until=now + timedelta(seconds=TASK_LEASE_SECONDS),
+                        started_at=now,
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+                db.commit()
+                if claimed.rowcount == 1:
+                    return task_id
+        return None
+
+    def _execute(self, task_id: str) -> None:
+        with self.session_factory() as db:
+            task = db.get(Task, task_id)
+            kind, payload = task.kind, dict(task.payload or {})
+            attempts, max_attempts, last_error = task.attempts, task.max_attempts, task.error
+
+        # Run the handler outside any transaction, it may take a while
+        handler = self._handlers.get(kind)
+        outcome: Dict[str, Any]
+        if handler is None:
+            outcome = self._finished("failed", error=f"No handler registered for task kind: {kind}")
+        elif attempts > max_attempts:
+            # Claimed again after its lease expired too many times
+            outcome = self._finished("failed", error=last_error or "Task did not finish before its lease expired")
+        else:
+            try:
+                outcome = self._finished("succeeded", result=handler(payload))
+            except Exception as e:
+                print(f"Task {task_id} ({kind}) failed on attempt {attempts}: {e}")
+                if attempts < max_attempts:
+                    backoff = TASK_RETRY_BACKOFF * 2 ** (attempts - 1)
+                    outcome = {
+                        "status": "queued",
+                        "error": str(e),
+                        "locked_until": None,
+                        "run_after": datetime.utcnow() + timedelta(seconds=backoff),
+                    }
+                else:
+                    outcome = self._finished("failed", error=str(e))
+
+        with self.session_factory() as db:
+            db.execute(
+                update(Task).where(Task.id == task_id).values(**outcome)
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+
+    @staticmethod
+    def _finished(status: str, result: Any = None, error: Optional[str] = None) -> Dict[str, Any]:
+        return {
+            "status": status,
+            "result": result,
+            "error": error,
+            "locked_until": None,
+            "finished_at": datetime.utcnow(),
+        }
+
+
+def task_to_dict(task: Task) -> Dict[str, Any]:
+    """Client-facing view of a task"""
+    return {
+        "id": task.id,
+        "kind": task.kind,
+        "status": task.status,
+        "attempts": task.attempts,
+        "result": task.result,
+        "error": task.error,
+        "created_at": task.created_at.isoformat() if task.created_at else None,
+        "started_at": task.started_at.isoformat() if task.started_at else None,
+        "finished_at": task.finished_at.isoformat() if task.finished_at else None,
+    }
+
+
+# Singleton instance
+task_queue = TaskQueue()
@@ -0,0 +1,264 @@
+"""On-disk approximate nearest-neighbour index (IVF) for job embeddings"""
+import json
+import os
+import shutil
+import tempfile
+import threading
+from typing import List, Optional, Tuple
+
+from services.lazy_imports import lazy_import
+
+np = lazy_import("numpy")
+NUMPY_AVAILABLE = np is not None
+
+VECTOR_INDEX_DIR = os.getenv("VECTOR_INDEX_DIR", "./vector_index")
+VECTOR_INDEX_NPROBE = int(os.getenv("VECTOR_INDEX_NPROBE", "12"))  # Lists scanned per query
+# Below this many vectors a flat scan is fast enough and exact
+FLAT_THRESHOLD = 2000
+# Retrain the lists once unindexed additions reach this fraction of the index
+REBUILD_FRACTION = 0.2
+KMEANS_ITERATIONS = 8
+KMEANS_SAMPLE_PER_LIST = 40
+_ASSIGN_BATCH = 8192
+
+
+class VectorIndex:
+    """
+    Inverted-file (IVF) index over L2-normalized vectors, scored by inner product.
+
+    Vectors are clustered with spherical k-means and stored contiguously by
+    cluster, so a query scores the nearest `nprobe` centroids and then only the
+    vectors in those lists. Newly added vectors go to a small delta that is
+    scanned exhaustively until the next rebuild.
+
+    On disk, each build is written to its own generation directory and made
+    current by atomically replacing the CURRENT pointer file, so readers in
+    other processes never see a half-written index. Vectors are memory-mapped.
+    """
+
+    def __init__(self, path: str = VECTOR_INDEX_DIR, nprobe: int = VECTOR_INDEX_NPROBE):
+        self.path = os.path.abspath(path)
+        self.nprobe = nprobe
+        self.model: Optional[str] = None
+        self.dim: Optional[int] = None
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._generation = 0
+        self._centroids = None
+        self._offsets = None
+        self._vectors = None
+        self._ids = None
+        self._delta_vectors: List = []
+        self._delta_ids: List[str] = []
+        self._delta_matrix = None  # Stacked delta vectors, rebuilt lazily after additions
+        self._known = set()
+
+    def __len__(self) -> int:
+        main = len(self._ids) if self._ids is not None else 0
+        return main + len(self._delta_ids)
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self._known
+
+    # Persistence
+
+    def load(self, model: str, dim: int) -> bool:
+        """Open the index on disk if it was built with the same model; otherwise start empty"""
+        with self._lock:
+            self._reset()
+            self.model, self.dim = model, dim
+
+            current = os.path.join(self.path, "CURRENT")
+            if not os.path.exists(current):
+                return False
+            with open(current) as f:
+                generation_dir = os.path.join(self.path, f.read().strip())
+            with open(os.path.join(generation_dir, "meta.json")) as f:
+                meta = json.load(f)
+            if meta.get("model") != model or meta.get("dim") != dim:
+                print(f"Vector index at {self.path} was built with {meta.get('model')}, rebuilding for {model}")
+                return False
+
+            self._generation = meta["generation"]
+            self._centroids = np.load(os.path.join(generation_dir, "centroids.npy"))
+            self._offsets = np.load(os.path.join(generation_dir, "offsets.npy"))
+            self._vectors = np.load(os.path.join(generation_dir, "vectors.npy"), mmap_mode="r")
+            self._ids = np.load(os.path.join(generation_dir, "ids.npy"))
+            self._known = set(self._ids.tolist())
+
+            delta_path = os.path.join(self.path, "delta.npz")
+            if os.path.exists(delta_path):
+                delta = np.load(delta_path)
+                if int(delta["generation"]) == self._generation:
+                    self._delta_vectors = list(delta["vectors"])
+                    self._delta_ids = delta["ids"].tolist()
+                    self._known.update(self._delta_ids)
+            return True
+
+    def save(self) -> None:
+        """Persist pending additions (the main lists are written when rebuilt)"""
+        with self._lock:
+            if self._ids is None and self._delta_ids:
+                self.rebuild()  # Nothing on disk yet
+                return
+            os.makedirs(self.path, exist_ok=True)
+            vectors = np.array(self._delta_vectors, dtype=np.float32).reshape(-1, self.dim)
+            fd, tmp_path = tempfile.mkstemp(dir=self.path, prefix=".delta-", suffix=".npz")
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, generation=self._generation, vectors=vectors,
+                         ids=np.array(self._delta_ids, dtype="U64"))
+            os.replace(tmp_path, os.path.join(self.path, "delta.npz"))
+
+    def _write_generation(self) -> None:
+        os.makedirs(self.path, exist_ok=True)
+        name = f"gen-{self._generation:06d}"
+        generation_dir = os.path.join(self.path, name)
+        staging_dir = tempfile.mkdtemp(dir=self.path, prefix=".staging-")
+        np.save(os.path.join(staging_dir, "centroids.npy"), self._centroids)
+        np.save(os.path.join(staging_dir, "offsets.npy"), self._offsets)
+        np.save(os.path.join(staging_dir, "vectors.npy"), self._vectors)
+        np.save(os.path.join(staging_dir, "ids.npy"), self._ids)
+        with open(os.path.join(staging_dir, "meta.json"), "w") as f:
+            json.dump({"model": self.model, "dim": self.dim, "generation": self._generation,
+                       "count": len(self._ids), "lists": len(self._centroids)}, f)
+        if os.path.exists(generation_dir):
+            shutil.rmtree(generation_dir)  # Left over from a build that never became current
+        os.replace(staging_dir, generation_dir)
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.path, prefix=".current-")
+        with os.fdopen(fd, "w") as f:
+            f.write(name)
+        os.replace(tmp_path, os.path.join(self.path, "CURRENT"))
+
+        # Older generations are no longer referenced
+        for entry in os.listdir(self.path):
+            if entry.startswith("gen-") and entry != name:
+                shutil.rmtree(os.path.join(self.path, entry), ignore_errors=True)
+        delta_path = os.path.join(self.path, "delta.npz")
+        if os.path.exists(delta_path):
+            os.remove(delta_path)
+
+    # Building
+
+    def add(self, ids: List[str], vectors) -> int:
+        """Add vectors for unseen IDs; rebuilds the lists when the delta grows large. Returns how many were added."""
+        with self._lock:
+            added = 0
+            for item_id, vector in zip(ids, vectors):
+                if item_id in self._known:
+                    continue
+                self._known.add(item_id)
+                self._delta_ids.append(item_id)
+                self._delta_vectors.append(np.asarray(vector, dtype=np.float32))
+                added += 1
+            if added:
+                self._delta_matrix = None
+
+            main = len(self._ids) if self._ids is not None else 0
+            if added and len(self._delta_ids) >= max(FLAT_THRESHOLD, REBUILD_FRACTION * main):
+                self.rebuild()
+            return added
+
+    def rebuild(self) -> None:
+        """Re-cluster every vector (main lists plus delta) and write a new generation"""
+        with self._lock:
+            parts, id_parts = [], []
+            if self._ids is not None:
+                parts.append(np.asarray(self._vectors))
+                id_parts.append(self._ids)
+            if self._delta_ids:
+                parts.append(np.array(self._delta_vectors, dtype=np.float32).reshape(-1, self.dim))
+                id_parts.append(np.array(self._delta_ids, dtype="U64"))
+            if not parts:
+                return
+            vectors = np.concatenate(parts).astype(np.float32, copy=False)
+            ids = np.concatenate(id_parts)
+
+            n_lists = 1 if len(vectors) < FLAT_THRESHOLD else min(4096, int(2 * np.sqrt(len(vectors))))
+            centroids = _train_centroids(vectors, n_lists)
+            assignments = _assign(vectors, centroids)
+            order = np.argsort(assignments, kind="stable")
+
+            self._centroids = centroids
+            self._offsets = np.concatenate([[0], np.cumsum(np.bincount(assignments, minlength=n_lists))])
+            self._vectors = vectors[order]
+            self._ids = ids[order]
+            self._delta_vectors, self._delta_ids, self._delta_matrix = [], [], None
+            self._generation += 1
+            self._write_generation()
+
+    # Querying
+
+    def search(self, query, k: int = 50) -> List[Tuple[str, float]]:
+        """Return up to k (id, cosine similarity) pairs, best first"""
+        query = np.asarray(query, dtype=np.float32)
+        with self._lock:
+            candidate_scores, candidate_ids = [], []
+
+            if self._ids is not None and len(self._ids):
+                lists = np.arange(len(self._centroids))
+                if len(lists) > self.nprobe:
+                    centroid_scores = self._centroids @ query
+                    lists = np.argpartition(-centroid_scores, self.nprobe)[:self.nprobe]
+                for lst in lists:
+                    start, end = int(self._offsets[lst]), int(self._offsets[lst + 1])
+                    if start == end:
+                        continue
+                    candidate_scores.append(self._vectors[start:end] @ query)
+                    candidate_ids.append(self._ids[start:end])
+
+            if self._delta_ids:
+                if self._delta_matrix is None:
+                    self._delta_matrix = (np.array(self._delta_vectors, dtype=np.float32),
+                                          np.array(self._delta_ids, dtype="U64"))
+                candidate_scores.append(self._delta_matrix[0] @ query)
+                candidate_ids.append(self._delta_matrix[1])
+
+        if not candidate_scores:
+            return []
+        scores = np.concatenate(candidate_scores)
+        ids = np.concatenate(candidate_ids)
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(str(ids[i]), float(scores[i])) for i in top]
+
+
+def _assign(vectors, centroids):
+    """Index of the most similar centroid for every vector, in batches to bound memory"""
+    assignments = np.empty(len(vectors), dtype=np.int64)
+    for start in range(0, len(vectors), _ASSIGN_BATCH):
+        batch = vectors[start:start + _ASSIGN_BATCH]
+        assignments[start:start + _ASSIGN_BATCH] = np.argmax(batch @ centroids.T, axis=1)
+    return assignments
+
+
+def _train_centroids(vectors, n_lists: int, seed: int = 0):
+    """Spherical k-means on a sample of the vectors"""
+    rng = np.random.default_rng(seed)
+    if n_lists == 1:
+        centroid = vectors.mean(axis=0, keepdims=True)
+        return centroid / max(np.linalg.norm(centroid), 1e-12)
+
+    sample_size = min(len(vectors), n_lists * KMEANS_SAMPLE_PER_LIST)
+    sample = vectors[rng.choice(len(vectors), sample_size, replace=False)]
+    centroids = sample[rng.choice(len(sample), n_lists, replace=False)].copy()
+
+    for _ in range(KMEANS_ITERATIONS):
+        assignments = _assign(sample, centroids)
+        counts = np.bincount(assignments, minlength=n_lists)
+        # Per-list sums: sort by list, then sum each contiguous run
+        order = np.argsort(assignments, kind="stable")
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        sums = np.zeros_like(centroids)
+        nonempty = counts > 0
+        sums[nonempty] = np.add.reduceat(sample[order], starts[nonempty], axis=0)
+        empty = counts == 0
+        if empty.any():
+            # Re-seed empty lists from random sample points
+            sums[empty] = sample[rng.choice(len(sample), int(empty.sum()))]
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        centroids = sums / np.maximum(norms, 1e-12)
+    return centroids.astype(np.float32)
@@ -0,0 +1,57 @@
+"""
+Shared fixtures: the app runs against a throwaway SQLite database and blob
+store, configured before any application module reads its settings.
+
+Run from backend/:
+    python -m pytest -q tests
+"""
+import os
+import sys
+import tempfile
+import uuid
+
+import pytest
+
+_tmp_dir = tempfile.mkdtemp(prefix="applesauce-tests-")
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{os.path.join(_tmp_dir, 'test.db')}",
+    "BLOB_STORE_DIR": os.path.join(_tmp_dir, "blobs"),
+    "VECTOR_INDEX_DIR": os.path.join(_tmp_dir, "vector_index"),
+    "JOB_SNAPSHOT_DIR": os.path.join(_tmp_dir, "job_snapshot"),
+    "CACHE_BACKEND": "memory",
+    "TASK_WORKERS": "0",
+    "ANTHROPIC_API_KEY": "",
+    "RAPIDAPI_KEY": "",
+})
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from database import SessionLocal, init_db  # noqa: E402
+from main import app  # noqa: E402
+from models.db_models import User  # noqa: E402
+from services.auth_service import auth_service  # noqa: E402
+
+init_db()
+
+
+@pytest.fixture
+def client():
+    # Not entered as a context manager: the startup hooks would start the background threads
+    return TestClient(app)
+
+
+@pytest.fixture
+def user():
+    """A fresh user for each test, so tests don't see each other's rows"""
+    with SessionLocal() as db:
+        user = User(email=f"user-{uuid.uuid4().hex[:12]}@example.com", name="Test User")
+        db.add(user)
+        db.commit()
+        db.refresh(user)
+        return user
+
+
+@pytest.fixture
+def auth_headers(user):
+    return {"Authorization": f"Bearer {auth_service.create_access_token(user.id, user.email)}"}
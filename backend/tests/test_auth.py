@@ -0,0 +1,51 @@
+"""Authentication dependencies and the principal cache behind them"""
+from sqlalchemy import event
+
+from database import SessionLocal, async_engine
+from models.db_models import User
+from services.principal_cache import principal_cache
+
+
+def users_queries(client, headers) -> int:
+    """How many statements against the users table a GET /auth/me runs"""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        assert client.get("/auth/me", headers=headers).status_code == 200
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", capture)
+    return sum("FROM users" in statement for statement in statements)
+
+
+def test_repeat_requests_skip_the_users_table(client, auth_headers):
+    assert users_queries(client, auth_headers) == 1
+    assert users_queries(client, auth_headers) == 0
+
+
+def test_updating_the_user_drops_the_cached_snapshot(client, user, auth_headers):
+    client.get("/auth/me", headers=auth_headers)
+    with SessionLocal() as db:
+        db.get(User, user.id).name = "Renamed User"
+        db.commit()
+
+    assert client.get("/auth/me", headers=auth_headers).json()["name"] == "Renamed User"
+
+
+def test_deleted_user_is_no_longer_authenticated(client, user, auth_headers):
+    client.get("/auth/me", headers=auth_headers)
+    with SessionLocal() as db:
+        db.delete(db.get(User, user.id))
+        db.commit()
+
+    assert principal_cache.get(user.id) is None
+    assert client.get("/auth/me", headers=auth_headers).status_code == 401
+
+
+def test_invalid_token_is_401(client):
+    response = client.get("/auth/me", headers={"Authorization": "Bearer not-a-jwt"})
+
+    assert response.status_code == 401
@@ -0,0 +1,93 @@
+"""scripts/backfill_resumes.py re-parsing of stored resumes"""
+from argparse import Namespace
+
+import pytest
+from sqlalchemy import func
+
+from database import SessionLocal
+from models.db_models import MatchScore, Resume
+from scripts import backfill_resumes
+from services.blob_store import blob_store
+from services.resume_parser import PARSER_VERSION
+
+RESUME_TEXT = "Skills\nPython, Docker, PostgreSQL\nExperience\nEngineer, Acme 2015 - present"
+
+
+@pytest.fixture
+def checkpoint(tmp_path):
+    """Checkpoint that starts after every resume other tests created"""
+    path = str(tmp_path / "checkpoint.json")
+    with SessionLocal() as db:
+        last_id = db.query(func.max(Resume.id)).scalar() or 0
+    backfill_resumes.save_checkpoint(path, {**backfill_resumes.new_checkpoint(False), "last_id": last_id})
+    return path
+
+
+def run(checkpoint: str, **overrides) -> dict:
+    args = Namespace(checkpoint=checkpoint, chunk_size=2, workers=1, limit=None, force=False,
+                     reset=False, rescore=False, dry_run=False)
+    for name, value in overrides.items():
+        setattr(args, name, value)
+    return backfill_resumes.run(args)
+
+
+def add_resume(user_id: int, **fields) -> int:
+    with SessionLocal() as db:
+        resume = Resume(user_id=user_id, filename="resume.pdf", skills=[], experience_years=0, **fields)
+        db.add(resume)
+        db.commit()
+        return resume.id
+
+
+def test_stale_resumes_are_reparsed_and_their_scores_dropped(user, checkpoint):
+    stale = add_resume(user.id, text_blob_key=blob_store.put_text(RESUME_TEXT))
+    current = add_resume(user.id, raw_text=RESUME_TEXT, parser_version=PARSER_VERSION)
+    with SessionLocal() as db:
+        db.add(MatchScore(resume_id=stale, job_id="job-1", scorer_version=1, match_percentage=10))
+        db.commit()
+
+    result = run(checkpoint)
+
+    assert (result["processed"], result["updated"], result["failed"]) == (1, 1, 0)
+    with SessionLocal() as db:
+        reparsed = db.get(Resume, stale)
+        assert {"python", "docker", "postgresql"} <= {skill.lower() for skill in reparsed.skills}
+        assert reparsed.parser_version == PARSER_VERSION
+        assert db.get(Resume, current).skills == []  # Already at the current version
+        assert db.query(MatchScore).filter(MatchScore.resume_id == stale).count() == 0
+
+
+def test_an_interrupted_run_resumes_from_its_checkpoint(user, checkpoint):
+    ids = [add_resume(user.id, raw_text=RESUME_TEXT) for _ in range(3)]
+
+    first = run(checkpoint, limit=2)
+    assert (first["processed"], first["last_id"]) == (2, ids[1])
+
+    second = run(checkpoint)
+    assert (second["processed"], second["last_id"]) == (3, ids[2])
+    with SessionLocal() as db:
+        assert {db.get(Resume, resume_id).parser_version for resume_id in ids} == {PARSER_VERSION}
+
+
+def test_unparseable_originals_keep_their_stored_fields(user, checkpoint):
+    resume_id = add_resume(user.id, original_blob_key=blob_store.put(b"not really a pdf"))
+    with SessionLocal() as db:
+        db.get(Resume, resume_id).skills = ["kept"]
+        db.commit()
+
+    result = run(checkpoint)
+
+    assert (result["processed"], result["failed"]) == (1, 1)
+    with SessionLocal() as db:
+        resume = db.get(Resume, resume_id)
+        assert (resume.skills, resume.parser_version) == (["kept"], None)
+
+
+def test_dry_run_writes_nothing(user, checkpoint):
+    resume_id = add_resume(user.id, raw_text=RESUME_TEXT)
+
+    assert run(checkpoint, dry_run=True)["updated"] == 1
+
+    with SessionLocal() as db:
+        assert db.get(Resume, resume_id).parser_version is None
+    assert backfill_resumes.load_checkpoint(checkpoint, False)["processed"] == 0
@@ -0,0 +1,35 @@
+"""benchmarks/corpus.py synthetic corpus and bench_suite.py run comparison"""
+import pytest
+
+from benchmarks.bench_suite import compare
+from benchmarks.corpus import make_job_postings, make_resume_files, make_resume_texts
+from services.resume_parser import _extract_skills, parse_resume_structured
+
+
+def test_corpus_is_reproducible_from_its_seed():
+    assert make_resume_texts(5, seed=7) == make_resume_texts(5, seed=7)
+    assert make_job_postings(20, seed=7) == make_job_postings(20, seed=7)
+    assert make_resume_texts(5, seed=7) != make_resume_texts(5, seed=8)
+
+
+@pytest.mark.parametrize("index", [0, 1], ids=["pdf", "docx"])
+def test_generated_files_parse_back_to_their_text(index):
+    resume = make_resume_files(2, seed=3)[index]
+
+    parsed = parse_resume_structured(resume["content"], resume["filename"])
+
+    assert "error" not in parsed
+    assert set(parsed["skills"]) == set(_extract_skills(resume["text"]))
+    assert parsed["skills"]
+
+
+def results(**metrics):
+    return {"commit": "abc", "corpus": {"seed": 42}, "results": {"match_jobs": metrics}}
+
+
+def test_compare_counts_only_changes_beyond_the_threshold():
+    baseline = results(p50_ms=10.0, p95_ms=20.0, items_per_sec=1000.0)
+
+    assert compare(baseline, results(p50_ms=10.5, p95_ms=19.0, items_per_sec=980.0), threshold=10) == 0
+    # Slower p95 and lower throughput are both regressions
+    assert compare(baseline, results(p50_ms=10.0, p95_ms=30.0, items_per_sec=500.0), threshold=10) == 2
@@ -0,0 +1,56 @@
+"""services/blob_store.py local content-addressed storage"""
+import hashlib
+import os
+
+import pytest
+
+from services.blob_store import LocalBlobStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return LocalBlobStore(str(tmp_path))
+
+
+def test_put_is_keyed_by_content_and_stored_once(store, tmp_path):
+    key = store.put(b"resume bytes")
+
+    assert key == hashlib.sha256(b"resume bytes").hexdigest()
+    assert store.put(b"resume bytes") == key
+    assert store.get(key) == b"resume bytes"
+    shard = tmp_path / "sha256" / key[:2] / key[2:4]
+    assert os.listdir(shard) == [key]  # No leftover temp files
+
+
+def test_text_round_trips_as_utf8(store):
+    key = store.put_text("Zoë – Python")
+
+    assert store.get_text(key) == "Zoë – Python"
+    assert store.get(key) == "Zoë – Python".encode("utf-8")
+
+
+def test_missing_blobs_read_as_none_and_delete_quietly(store):
+    key = store.put(b"gone soon")
+    store.delete(key)
+
+    assert not store.exists(key)
+    assert store.get(key) is None
+    assert store.get_text(key) is None
+    assert store.modified_at(key) is None
+    store.delete(key)
+
+
+def test_storing_again_refreshes_the_modified_time(store):
+    key = store.put(b"shared")
+    old = store.modified_at(key) - 3600
+    os.utime(store._path(key), (old, old))
+
+    store.put(b"shared")
+
+    assert store.modified_at(key) > old
+
+
+@pytest.mark.parametrize("key", ["", "abc", "../" + "a" * 61, "A" * 64, "g" * 64])
+def test_malformed_keys_are_rejected(store, key):
+    with pytest.raises(ValueError):
+        store.get(key)
@@ -0,0 +1,106 @@
+"""services/cache_warmer.py search counting and warming passes"""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database import Base, SessionLocal
+from models.db_models import Resume, SearchQuery, User
+from services.cache_warmer import CacheWarmer
+from services.job_api_service import job_api_service
+from services.job_record import JobRecord
+from services.match_scores import match_score_service
+from services.quota import reset_quota_client, set_quota_client
+
+
+def test_a_users_searches_are_counted_together(user, auth_headers):
+    warmer = CacheWarmer()
+    warmer._thread = object()  # record() only counts while the warmer runs
+    for _ in range(3):
+        # Each request gets its own quota client
+        token = set_quota_client(auth_headers["Authorization"], "127.0.0.1")
+        try:
+            warmer.record("Site Reliability Engineer")
+        finally:
+            reset_quota_client(token)
+
+    assert len(warmer._pending) == 1
+    warmer.flush()
+    with SessionLocal() as db:
+        rows = db.query(SearchQuery).filter(SearchQuery.user_id == user.id).all()
+    assert [(row.query, row.hits) for row in rows] == [("site reliability engineer", 3)]
+
+
+@pytest.fixture
+def warmer(tmp_path):
+    """Warmer over a database of its own, so other tests' searches don't count"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'warmer.db'}")
+    Base.metadata.create_all(engine)
+    yield CacheWarmer(session_factory=sessionmaker(bind=engine))
+    engine.dispose()
+
+
+def add_searches(warmer: CacheWarmer, *rows) -> None:
+    with warmer.session_factory() as db:
+        for days_ago, user_id, query, hits in rows:
+            seen = datetime.utcnow() - timedelta(days=days_ago)
+            db.add(SearchQuery(day=seen.strftime("%Y-%m-%d"), user_id=user_id, query=query, source="all",
+                               hits=hits, last_seen_at=seen))
+        db.commit()
+
+
+def test_popular_searches_are_ranked_over_the_lookback_window(warmer):
+    add_searches(warmer, (0, 0, "data engineer", 3), (1, 1, "data engineer", 4),
+                 (0, 0, "python developer", 5), (30, 0, "cobol developer", 100))
+
+    assert [(s["query"], s["hits"]) for s in warmer.popular()] == [("data engineer", 7), ("python developer", 5)]
+
+
+def test_paid_upstreams_are_only_refreshed_for_recent_searches(warmer, monkeypatch):
+    add_searches(warmer, (0, 0, "data engineer", 3), (2, 0, "python developer", 5))
+    refreshed = {}
+
+    def refresh_search(query, source, lead_seconds, include_paid):
+        refreshed[query] = include_paid
+        return [JobRecord.from_dict({"id": len(refreshed), "title": query})]
+
+    monkeypatch.setattr(job_api_service, "refresh_search", refresh_search)
+    ingested = []
+    warmer._ingest = ingested.extend
+
+    assert warmer.warm_popular() == {"searches": 2, "jobs_fetched": 2}
+    assert refreshed == {"data engineer": True, "python developer": False}
+    assert len(ingested) == 2
+
+
+def test_active_users_get_their_recent_searches_prescored(warmer, monkeypatch):
+    with warmer.session_factory() as db:
+        db.add(User(id=1, email="active@example.com"))
+        db.add(Resume(id=10, user_id=1, filename="cv.pdf", is_primary=True))
+        db.commit()
+    add_searches(warmer, (1, 1, "site reliability engineer", 2))
+    searched, scored = [], {}
+
+    def search(query, source):
+        searched.append(query)
+        return [JobRecord.from_dict({"id": 5, "title": query})]
+
+    def score_jobs_for_resume(resume_id, jobs):
+        scored[resume_id] = [job.id for job in jobs]
+        return len(jobs)
+
+    monkeypatch.setattr(job_api_service, "search", search)
+    monkeypatch.setattr(match_score_service, "score_jobs_for_resume", score_jobs_for_resume)
+
+    assert warmer.prefetch_users() == {"users": 1, "jobs_scored": 1}
+    assert searched == ["site reliability engineer"]
+    assert scored == {10: [5]}
+
+
+@pytest.mark.parametrize("hour, off_peak", [(22, True), (2, True), (3, False), (12, False)])
+def test_off_peak_window_can_wrap_midnight(hour, off_peak):
+    warmer = CacheWarmer()
+    warmer.off_peak = (22, 3)
+
+    assert warmer.is_off_peak(hour) is off_peak
@@ -0,0 +1,86 @@
+"""middleware/compression.py"""
+import asyncio
+import zlib
+
+import pytest
+from starlette.responses import PlainTextResponse, StreamingResponse
+
+from middleware.compression import BROTLI_AVAILABLE, CompressionMiddleware
+
+CHUNKS = [b"first event " * 200, b"second event " * 200, b"third event " * 200]
+
+
+def run(response, accept_encoding: str):
+    """Drive the middleware around `response`; returns (headers, body of each message sent)"""
+    sent = []
+    requested = []
+
+    async def receive():
+        if requested:
+            await asyncio.Event().wait()  # No disconnect; the response finishing cancels this
+        requested.append(True)
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": "/", "headers": [(b"accept-encoding", accept_encoding.encode())]}
+    asyncio.run(CompressionMiddleware(response)(scope, receive, send))
+    headers = {key.decode(): value.decode() for key, value in sent[0]["headers"]}
+    return headers, [message.get("body", b"") for message in sent[1:]]
+
+
+def streaming(media_type: str = "text/plain"):
+    async def chunks():
+        for chunk in CHUNKS:
+            yield chunk
+    return StreamingResponse(chunks(), media_type=media_type)
+
+
+def gzip_decoder():
+    decoder = zlib.decompressobj(31)
+    return decoder.decompress
+
+
+def brotli_decoder():
+    import brotli
+    return brotli.Decompressor().process
+
+
+DECODERS = [("gzip", gzip_decoder)] + ([("br", brotli_decoder)] if BROTLI_AVAILABLE else [])
+
+
+@pytest.mark.parametrize("encoding, decoder", DECODERS)
+def test_each_streamed_chunk_is_decodable_when_it_arrives(encoding, decoder):
+    headers, bodies = run(streaming(), encoding)
+
+    assert headers["content-encoding"] == encoding
+    assert "content-length" not in headers
+    decode = decoder()
+    # Nothing held back for a later chunk: each message decodes to exactly the chunk sent
+    assert [decode(body) for body in bodies[:len(CHUNKS)]] == CHUNKS
+    assert b"".join(decode(body) for body in bodies[len(CHUNKS):]) == b""
+
+
+def test_event_streams_are_not_compressed():
+    headers, bodies = run(streaming("text/event-stream"), "gzip, br")
+
+    assert "content-encoding" not in headers
+    assert b"".join(bodies) == b"".join(CHUNKS)
+
+
+@pytest.mark.parametrize("encoding, decoder", DECODERS)
+def test_whole_bodies_are_compressed_with_their_length(encoding, decoder):
+    body = b"plain text body " * 200
+    headers, bodies = run(PlainTextResponse(body), encoding)
+
+    assert headers["content-encoding"] == encoding
+    assert int(headers["content-length"]) == len(bodies[0]) < len(body)
+    assert decoder()(bodies[0]) == body
+
+
+def test_small_bodies_pass_through():
+    headers, bodies = run(PlainTextResponse("short"), "gzip")
+
+    assert "content-encoding" not in headers
+    assert bodies == [b"short"]
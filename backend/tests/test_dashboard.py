@@ -0,0 +1,43 @@
+"""/user/dashboard aggregates and the per-user cache behind them"""
+from database import SessionLocal
+from models.db_models import Resume, SavedJob
+
+
+def add_rows(user_id: int, statuses) -> None:
+    with SessionLocal() as db:
+        db.add(Resume(user_id=user_id, filename="primary.pdf", skills=["python", "sql"], is_primary=True,
+                      quality_score=72))
+        db.add(Resume(user_id=user_id, filename="old.pdf", skills=["java"], is_primary=False))
+        for i, status in enumerate(statuses):
+            db.add(SavedJob(user_id=user_id, title=f"Engineer {i}", company="Acme", status=status))
+        db.commit()
+
+
+def test_dashboard_counts_resumes_and_saved_jobs_by_status(client, user, auth_headers):
+    add_rows(user.id, ["saved", "saved", "applied", "offer"])
+
+    body = client.get("/user/dashboard", headers=auth_headers).json()
+
+    assert body["resumes"]["count"] == 2
+    assert body["resumes"]["primary"] == {"id": body["resumes"]["primary"]["id"], "filename": "primary.pdf",
+                                          "skills_count": 2, "quality_score": 72}
+    assert body["jobs"] == {"saved": 2, "applied": 1, "interviewing": 0, "rejected": 0, "offer": 1, "total": 4}
+
+
+def test_writes_through_the_api_refresh_the_cached_dashboard(client, user, auth_headers):
+    add_rows(user.id, ["saved"])
+    assert client.get("/user/dashboard", headers=auth_headers).json()["jobs"]["total"] == 1
+
+    job_id = client.post("/user/saved-jobs", json={"title": "Data Engineer", "company": "Acme"},
+                         headers=auth_headers).json()["id"]
+    assert client.get("/user/dashboard", headers=auth_headers).json()["jobs"]["total"] == 2
+
+    client.put(f"/user/saved-jobs/{job_id}", json={"status": "interviewing"}, headers=auth_headers)
+    assert client.get("/user/dashboard", headers=auth_headers).json()["jobs"]["interviewing"] == 1
+
+
+def test_new_user_has_an_empty_dashboard(client, auth_headers):
+    body = client.get("/user/dashboard", headers=auth_headers).json()
+
+    assert body["resumes"] == {"count": 0, "primary": None}
+    assert body["jobs"]["total"] == 0
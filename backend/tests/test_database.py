@@ -0,0 +1,64 @@
+"""database.py engine setup and startup schema checks"""
+import asyncio
+import os
+import sqlite3
+import subprocess
+import sys
+
+from database import SQLITE_PRAGMAS, apply_sqlite_pragmas, async_engine, engine
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IN_MEMORY_APP = """
+from fastapi.testclient import TestClient
+from database import SessionLocal, init_db
+from main import app
+from models.db_models import User
+from services.auth_service import auth_service
+
+init_db()
+with SessionLocal() as db:
+    user = User(email="memory@example.com", name="Memory")
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+headers = {"Authorization": "Bearer " + auth_service.create_access_token(user.id, user.email)}
+response = TestClient(app).get("/user/saved-jobs", headers=headers)
+print(response.status_code, response.json())
+"""
+
+
+def test_async_routes_see_the_in_memory_database():
+    # A fresh process: the engines are built from DATABASE_URL at import
+    env = dict(os.environ, DATABASE_URL="sqlite://")
+    env.pop("ASYNC_DATABASE_URL", None)
+    result = subprocess.run([sys.executable, "-c", IN_MEMORY_APP], cwd=BACKEND_DIR, env=env,
+                            capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().splitlines()[-1] == "200 {'saved_jobs': [], 'count': 0}"
+
+
+def pragmas(conn) -> dict:
+    return {name: conn.exec_driver_sql(f"PRAGMA {name}").scalar()
+            for name in ("journal_mode", "busy_timeout", "synchronous", "cache_size", "temp_store")}
+
+
+def test_production_profile_is_applied_to_every_connection():
+    expected = {"journal_mode": "wal", "busy_timeout": SQLITE_PRAGMAS["busy_timeout"], "synchronous": 1,
+                "cache_size": SQLITE_PRAGMAS["cache_size"], "temp_store": 2}
+    with engine.connect() as conn:
+        assert pragmas(conn) == expected
+
+    async def async_pragmas():
+        async with async_engine.connect() as conn:
+            return await conn.run_sync(lambda sync_conn: pragmas(sync_conn))
+
+    assert asyncio.run(async_pragmas()) == expected
+
+
+def test_in_memory_databases_skip_wal_and_mmap():
+    conn = sqlite3.connect(":memory:")
+    apply_sqlite_pragmas(conn, memory=True)
+
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "memory"
+    assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == SQLITE_PRAGMAS["busy_timeout"]
@@ -0,0 +1,37 @@
+"""services/job_matcher.py scoring over JobRecords"""
+from services import job_record
+from services.job_matcher import match_jobs
+from services.job_record import JobRecord
+
+JOBS = [
+    {"id": 1, "title": "Senior Python Developer", "skills": ["python", "django"],
+     "description": "Build django services, write tests, deploy containers, review designs."},
+    {"id": 2, "title": "Data Engineer", "skills": ["sql", "spark"],
+     "description": "Design pipelines, tune warehouses, model data, orchestrate spark jobs."},
+]
+RESUME = "Python developer: django services, containers, pipelines and tests."
+
+
+def scores(matches):
+    return [(match.id, match.match_percentage, match.score_breakdown, match.matched_skills) for match in matches]
+
+
+def test_scores_survive_a_keyword_vocabulary_reset(monkeypatch):
+    records = [JobRecord.from_dict(job) for job in JOBS]
+    expected = scores(match_jobs(RESUME, records, ["python", "django"]))
+
+    generation = job_record.keyword_vocabulary().generation
+    # Every call now outgrows the cap, so each pass starts a new vocabulary
+    monkeypatch.setattr(job_record, "KEYWORD_VOCABULARY_MAX", 1)
+    first = scores(match_jobs(RESUME, records, ["python", "django"]))
+    second = scores(match_jobs(RESUME, records, ["python", "django"]))
+
+    assert first == expected and second == expected
+    assert job_record.keyword_vocabulary().generation >= generation + 2
+
+
+def test_skills_round_trip_through_records():
+    record = JobRecord.from_dict(JOBS[0])
+
+    assert record.skills == ["python", "django"]
+    assert record.to_dict()["skills"] == ["python", "django"]
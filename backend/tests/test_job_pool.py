@@ -0,0 +1,24 @@
+"""services/job_pool.py: one instance per worker, sharing catalog_jobs"""
+from services.job_pool import JobPool
+
+
+def test_sync_picks_up_other_workers_jobs_and_changes():
+    writer, reader = JobPool(), JobPool()
+    writer.add_jobs([{"id": 501, "title": "Haskell Developer", "skills": ["haskell"]}])
+    reader.sync()
+    assert [job_id for job_id, _ in reader.candidates(["haskell"], "haskell developer")] == [501]
+
+    writer.add_jobs([{"id": 501, "title": "Elixir Developer", "skills": ["elixir"]}])
+    reader.sync()
+
+    assert reader.candidates(["haskell"], "haskell") == []
+    assert [job_id for job_id, _ in reader.candidates(["elixir"], "elixir developer")] == [501]
+
+
+def test_refreshing_an_unchanged_job_does_not_reindex_it():
+    pool = JobPool()
+    job = {"id": 502, "title": "Erlang Developer", "skills": ["erlang"]}
+
+    assert pool.add_jobs([job]) == 1
+    assert pool.add_jobs([job]) == 0
+    assert pool._index.dead == 0
@@ -0,0 +1,59 @@
+"""services/job_record.py compact job postings"""
+import pytest
+
+from services.job_record import JobMatch, JobRecord, as_dict, as_record
+
+POSTING = {
+    "id": 101, "title": "Backend Engineer", "company": "Acme", "location": "Austin, TX",
+    "description": "Build Python services on AWS. " * 20, "url": "https://example.com/101",
+    "posted_date": "2026-10-01", "skills": ["python", "aws"], "salary": "Competitive", "source": "Indeed/JSearch",
+    "employment_type": "FULLTIME",
+}
+
+
+def test_posting_round_trips_with_extra_keys():
+    record = JobRecord.from_dict(POSTING)
+
+    assert record.to_dict() == POSTING
+    assert type(record._description) is bytes  # Long descriptions are stored compressed
+    assert record.description == POSTING["description"]
+
+
+def test_short_descriptions_stay_plain():
+    record = JobRecord.from_dict({**POSTING, "description": "Short."})
+
+    assert record._description == "Short."
+
+
+def test_repeated_values_share_one_string():
+    first = JobRecord.from_dict({**POSTING, "company": "".join(["Ac", "me"])})
+    second = JobRecord.from_dict({**POSTING, "company": "".join(["A", "cme"])})
+
+    assert first.company is second.company
+
+
+def test_dict_style_access_and_field_projection():
+    record = JobRecord.from_dict(POSTING)
+    record.clearance_level = "secret"
+
+    assert record["title"] == "Backend Engineer"
+    assert record.get("employment_type") == "FULLTIME"
+    assert record.get("missing", "-") == "-"
+    with pytest.raises(KeyError):
+        record["missing"]
+    assert record.to_dict(["id", "skills", "missing"]) == {"id": 101, "skills": ["python", "aws"]}
+    # The cached clearance level is shared between requests, so it is opt-in
+    assert "clearance_level" not in record.to_dict()
+    assert record.to_dict(["id", "clearance_level"], with_clearance=True) == {"id": 101, "clearance_level": "secret"}
+
+
+def test_match_adds_scores_without_copying_the_posting():
+    record = as_record(POSTING)
+    match = JobMatch(record, ["python"], 80, {"skills": 50})
+
+    assert as_record(record) is record
+    assert match.id == 101 and match["company"] == "Acme"
+    assert as_dict(match) == {**POSTING, "matched_skills": ["python"], "match_percentage": 80,
+                              "score_breakdown": {"skills": 50}}
+    assert as_dict(match, ["title", "match_percentage"]) == {"title": "Backend Engineer", "match_percentage": 80}
+    assert as_dict(POSTING, ["id", "title"]) == {"id": 101, "title": "Backend Engineer"}
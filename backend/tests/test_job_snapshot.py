@@ -0,0 +1,54 @@
+"""services/job_snapshot.py generation builds and swaps"""
+import os
+
+import pytest
+
+from services.job_pool import job_pool
+from services.job_snapshot import JobSnapshotStore, build_lock, current_generation, write_snapshot
+
+JOBS = [{"id": 701, "title": "Rust Engineer", "skills": ["rust"], "description": "Systems work in rust."},
+        {"id": 702, "title": "Go Engineer", "skills": ["go"], "description": "Services written in go."}]
+
+
+@pytest.fixture
+def store(tmp_path):
+    job_pool.add_jobs(JOBS)
+    return JobSnapshotStore(str(tmp_path / "snapshot"))
+
+
+def test_build_makes_a_new_generation_current(store):
+    assert store.build() == 1
+    assert current_generation(store.path) == 1
+    assert store.current().generation == 1
+    assert store.build() is None  # Pool unchanged
+    assert store.build(force=True) == 2
+    assert sorted(os.listdir(store.path)) == [".build.lock", "CURRENT", "gen-000002"]
+
+
+def test_build_is_skipped_while_another_process_holds_the_lock(store):
+    with build_lock(store.path) as locked:
+        assert locked
+        with build_lock(store.path) as also_locked:
+            assert not also_locked
+        assert store.build() is None
+    assert current_generation(store.path) == 0
+    assert store.build() == 1
+
+
+def test_current_never_moves_to_an_older_generation(store):
+    store.build()
+    store.build(force=True)
+    with pytest.raises(ValueError):
+        write_snapshot(store.path, 1, [JOBS], [2, None])
+    assert current_generation(store.path) == 2
+    assert not [entry for entry in os.listdir(store.path) if entry.startswith(".staging-")]
+
+
+def test_failed_write_removes_its_staging_directory(store):
+    def batches():
+        yield JOBS
+        raise RuntimeError("pool read failed")
+
+    with pytest.raises(RuntimeError):
+        write_snapshot(store.path, 1, batches(), [2, None])
+    assert os.listdir(store.path) == []
@@ -0,0 +1,83 @@
+"""Job list and detail endpoints"""
+from services.job_api_service import job_api_service
+from services.job_catalog import job_catalog
+from services.job_pool import job_pool
+from services.job_record import JobRecord
+from services.pagination import paginate
+
+JOB = {
+    "id": 9001,
+    "title": "Platform Engineer",
+    "company": "Acme",
+    "location": "Remote",
+    "description": "Build the platform with Python and Kubernetes.",
+    "url": "https://example.com/jobs/9001",
+    "posted_date": "2026-10-01",
+    "skills": ["python", "kubernetes"],
+    "salary": "Competitive",
+    "source": "Acme Careers",
+}
+
+
+def test_job_detail_falls_back_to_the_job_pool(client):
+    job_pool.add_jobs([JOB])
+    # As if another worker had fetched the job, or this one had evicted or restarted since
+    job_catalog._jobs.pop(JOB["id"], None)
+
+    response = client.get(f"/jobs/{JOB['id']}")
+
+    assert response.status_code == 200
+    assert response.json()["description"] == JOB["description"]
+
+
+def test_unknown_job_is_404(client):
+    assert client.get("/jobs/123456789").status_code == 404
+
+
+
+def listing(count: int):
+    return [dict(JOB, id=9100 + i, title=f"Engineer {i}") for i in range(count)]
+
+
+def records(count: int):
+    """What job_api_service.search returns"""
+    return [JobRecord.from_dict(job) for job in listing(count)]
+
+
+def test_jobs_are_paged_with_cursors(client, monkeypatch):
+    monkeypatch.setattr(job_api_service, "search", lambda query, source: records(5))
+
+    seen, cursor = [], None
+    for _ in range(3):
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        body = client.get("/jobs", params=params).json()
+        seen += [job["id"] for job in body["jobs"]]
+        cursor = body["next_cursor"]
+        assert body["count"] == 5
+
+    assert seen == [9100, 9101, 9102, 9103, 9104]
+    assert cursor is None
+
+
+def test_page_resumes_after_the_last_job_served_when_results_shift():
+    jobs = listing(5)
+    first, cursor = paginate(jobs, 2)
+    # A new posting appears at the top before the next page is requested
+    second, _ = paginate([dict(JOB, id=9999)] + jobs, 2, cursor)
+
+    assert [job["id"] for job in second] == [9102, 9103]
+
+
+def test_summary_fields_leave_out_the_description(client, monkeypatch):
+    monkeypatch.setattr(job_api_service, "search", lambda query, source: records(1))
+
+    job = client.get("/jobs", params={"fields": "summary"}).json()["jobs"][0]
+
+    assert "description" not in job
+    assert (job["id"], job["title"], job["company"]) == (9100, "Engineer 0", "Acme")
+
+
+def test_invalid_cursor_is_400(client, monkeypatch):
+    monkeypatch.setattr(job_api_service, "search", lambda query, source: records(3))
+
+    assert client.get("/jobs", params={"limit": 1, "cursor": "not-a-cursor"}).status_code == 400
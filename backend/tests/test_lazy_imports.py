@@ -0,0 +1,88 @@
+"""Fast cold start: deferred imports and the schema-version check"""
+import builtins
+import os
+import subprocess
+import sys
+
+from sqlalchemy import event, text
+
+from database import engine, init_db, schema_version
+from services import lazy_imports
+from services.lazy_imports import lazy_import, load_all
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ("anthropic", "numpy", "PyPDF2", "docx", "sentence_transformers", "requests")
+
+
+def test_missing_package_is_none():
+    assert lazy_import("applesauce_no_such_package") is None
+
+
+def test_module_is_imported_on_first_attribute_access(tmp_path, monkeypatch):
+    (tmp_path / "applesauce_slow_module.py").write_text("import builtins\nbuiltins.slow_module_imports += 1\nVALUE = 42\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setattr("builtins.slow_module_imports", 0, raising=False)
+    monkeypatch.setattr(lazy_imports, "_registered", {})
+    monkeypatch.delitem(sys.modules, "applesauce_slow_module", raising=False)
+
+    module = lazy_import("applesauce_slow_module")
+    assert lazy_import("applesauce_slow_module") is module
+    assert builtins.slow_module_imports == 0
+
+    assert module.VALUE == 42
+    assert module.VALUE == 42
+    assert builtins.slow_module_imports == 1
+
+
+def test_load_all_finishes_deferred_imports(tmp_path, monkeypatch):
+    (tmp_path / "applesauce_preloaded.py").write_text("VALUE = 'ready'\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setattr(lazy_imports, "_registered", {})
+    monkeypatch.delitem(sys.modules, "applesauce_preloaded", raising=False)
+    module = lazy_import("applesauce_preloaded")
+
+    load_all()
+
+    assert "applesauce_preloaded" in sys.modules
+    assert module.__dict__["VALUE"] == "ready"  # Copied onto the stand-in, no further lookups
+
+
+def test_importing_the_app_leaves_heavy_dependencies_unloaded():
+    code = f"import sys, main; print([m for m in {HEAVY_MODULES!r} if m in sys.modules])"
+    result = subprocess.run([sys.executable, "-c", code], cwd=BACKEND_DIR, capture_output=True, text=True, timeout=60)
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().splitlines()[-1] == "[]"
+
+
+def captured_statements(fn) -> list:
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    return statements
+
+
+def test_init_db_skips_schema_checks_when_the_version_matches():
+    init_db()
+
+    statements = [s for s in captured_statements(init_db) if not s.startswith("PRAGMA")]
+
+    assert statements == ["SELECT version FROM schema_version WHERE id = 1"]
+
+
+def test_init_db_rechecks_a_stale_schema():
+    with engine.begin() as conn:
+        conn.execute(text("UPDATE schema_version SET version = 'stale' WHERE id = 1"))
+
+    statements = captured_statements(init_db)
+
+    assert any(s.startswith("PRAGMA main.table_info") for s in statements)
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT version FROM schema_version")).scalar() == schema_version()
@@ -0,0 +1,59 @@
+"""List endpoints leave the deferred text and JSON columns unread"""
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+from database import SessionLocal, async_engine
+from models.db_models import Resume, SavedJob
+
+
+@contextmanager
+def captured_sql():
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(" ".join(statement.split()))
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        yield statements
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", capture)
+
+
+def selects_from(statements, table: str) -> str:
+    return " ".join(s for s in statements if s.startswith("SELECT") and f"FROM {table}" in s)
+
+
+def test_resume_list_skips_content_columns_the_detail_view_loads(client, user, auth_headers):
+    with SessionLocal() as db:
+        resume = Resume(user_id=user.id, filename="cv.pdf", raw_text="x" * 10_000, skills=["python"],
+                        sections={"experience": "long"}, quality_analysis={"score": 80})
+        db.add(resume)
+        db.commit()
+        resume_id = resume.id
+
+    with captured_sql() as statements:
+        listed = client.get("/user/resumes", headers=auth_headers)
+    assert listed.json()["resumes"][0]["filename"] == "cv.pdf"
+    for column in ("raw_text", "sections", "quality_analysis"):
+        assert f"resumes.{column}" not in selects_from(statements, "resumes")
+
+    detail = client.get(f"/user/resumes/{resume_id}", headers=auth_headers).json()
+    assert detail["raw_text"] == "x" * 10_000
+    assert detail["sections"] == {"experience": "long"}
+    assert detail["quality_analysis"] == {"score": 80}
+
+
+def test_saved_job_list_skips_descriptions(client, user, auth_headers):
+    with SessionLocal() as db:
+        db.add(SavedJob(user_id=user.id, title="Engineer", company="Acme", description="d" * 10_000))
+        db.commit()
+
+    with captured_sql() as statements:
+        listed = client.get("/user/saved-jobs", headers=auth_headers)
+
+    assert listed.json()["count"] == 1
+    sql = selects_from(statements, "saved_jobs")
+    assert "saved_jobs.title" in sql
+    assert "saved_jobs.description" not in sql
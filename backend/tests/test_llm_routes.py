@@ -0,0 +1,33 @@
+"""/suggestions and /resume/analyze"""
+import asyncio
+
+import pytest
+
+from services.llm_service import llm_service
+
+
+def on_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+        return True
+    except RuntimeError:
+        return False
+
+
+@pytest.mark.parametrize("path, method, result", [
+    ("/suggestions", "generate_job_suggestions", ["Mention Kubernetes"]),
+    ("/resume/analyze", "analyze_resume_quality", {"score": 70}),
+])
+def test_llm_calls_run_off_the_event_loop(client, monkeypatch, path, method, result):
+    calls = []
+
+    def blocking_call(*args, **kwargs):
+        calls.append(on_event_loop())
+        return result
+
+    monkeypatch.setattr(llm_service, method, blocking_call)
+
+    response = client.post(path, json={"resume_text": "Python developer", "job_title": "SRE"})
+
+    assert response.status_code == 200
+    assert calls == [False]
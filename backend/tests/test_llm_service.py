@@ -0,0 +1,52 @@
+"""services/llm_service.py completion caching"""
+import pytest
+
+from services.llm_service import llm_service
+from services.quota import reset_quota_client, set_quota_client
+
+PROMPT = "RESUME (excerpt):\nJane Doe, 12 Elm St, staff engineer at Acme"
+
+
+@pytest.fixture
+def model_calls(monkeypatch):
+    calls = []
+
+    def call_model(operation, prompt, max_tokens):
+        calls.append(prompt)
+        return f"completion {len(calls)}"
+
+    monkeypatch.setattr(llm_service, "_call_model", call_model)
+    return calls
+
+
+def complete_as(authorization: str, host: str, prompt: str) -> str:
+    token = set_quota_client(authorization, host)
+    try:
+        return llm_service._complete("quality", prompt, max_tokens=400)
+    finally:
+        reset_quota_client(token)
+
+
+def test_a_callers_repeated_prompt_is_served_from_the_cache(model_calls):
+    prompt = PROMPT + " (repeat)"
+    first = complete_as("", "10.0.0.1", prompt)
+
+    assert complete_as("", "10.0.0.1", prompt) == first
+    assert len(model_calls) == 1
+
+
+def test_cached_completions_are_not_shared_between_callers(model_calls, user, auth_headers):
+    prompt = PROMPT + " (shared)"
+    mine = complete_as(auth_headers["Authorization"], "10.0.0.2", prompt)
+    theirs = complete_as("", "10.0.0.3", prompt)
+
+    assert mine != theirs
+    assert len(model_calls) == 2
+
+
+def test_background_completions_are_not_cached(model_calls):
+    prompt = PROMPT + " (background)"
+    llm_service._complete("quality", prompt, max_tokens=400)
+    llm_service._complete("quality", prompt, max_tokens=400)
+
+    assert len(model_calls) == 2
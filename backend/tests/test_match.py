@@ -0,0 +1,23 @@
+"""/match request validation"""
+import pytest
+
+from services.job_api_service import job_api_service
+
+
+@pytest.fixture(autouse=True)
+def no_live_search(monkeypatch):
+    monkeypatch.setattr(job_api_service, "search_indeed_jobs", lambda query: [])
+
+
+@pytest.mark.parametrize("limit", ["ten", None, [5]])
+def test_non_numeric_limit_is_400(client, limit):
+    response = client.post("/match", json={"resume_text": "python developer", "limit": limit})
+
+    assert response.status_code == 400
+
+
+def test_limit_is_clamped_to_at_least_one(client):
+    response = client.post("/match", json={"resume_text": "python developer", "limit": -5})
+
+    assert response.status_code == 200
+    assert response.json()["count"] <= 1
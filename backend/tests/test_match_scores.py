@@ -0,0 +1,99 @@
+"""services/match_scores.py precomputed saved-job scores"""
+import pytest
+
+from database import SessionLocal
+from models.db_models import MatchScore, Resume, SavedJob
+from services import match_scores
+from services.job_matcher import SCORER_VERSION
+from services.match_scores import match_score_service, saved_job_key
+
+PYTHON_RESUME = "Backend engineer. Skills: Python, Django, PostgreSQL, Docker, AWS."
+JAVA_RESUME = "Mobile engineer. Skills: Java, Kotlin, Android."
+
+
+def add_resume(user_id: int, text: str, is_primary: bool) -> int:
+    skills = [word.strip(".,").lower() for word in text.split("Skills:")[1].split()]
+    with SessionLocal() as db:
+        resume = Resume(user_id=user_id, filename="resume.pdf", raw_text=text, skills=skills, is_primary=is_primary)
+        db.add(resume)
+        db.commit()
+        return resume.id
+
+
+def add_saved_jobs(user_id: int) -> dict:
+    jobs = {
+        "python": SavedJob(user_id=user_id, title="Python Developer", company="Acme",
+                           description="Python, Django and PostgreSQL services on AWS with Docker."),
+        "java": SavedJob(user_id=user_id, title="Android Developer", company="Acme",
+                         description="Java and Kotlin Android apps."),
+    }
+    with SessionLocal() as db:
+        db.add_all(jobs.values())
+        db.commit()
+        return {name: job.id for name, job in jobs.items()}
+
+
+def saved_scores(jobs: dict) -> dict:
+    with SessionLocal() as db:
+        return {name: db.get(SavedJob, job_id).match_percentage for name, job_id in jobs.items()}
+
+
+def test_primary_resume_scores_are_stored_and_mirrored_on_saved_jobs(user):
+    resume_id = add_resume(user.id, PYTHON_RESUME, is_primary=True)
+    jobs = add_saved_jobs(user.id)
+
+    assert match_score_service.score_resume(resume_id) == 2
+
+    with SessionLocal() as db:
+        stored = {row.job_id: row.match_percentage for row in
+                  db.query(MatchScore).filter(MatchScore.resume_id == resume_id,
+                                              MatchScore.scorer_version == SCORER_VERSION)}
+    mirrored = saved_scores(jobs)
+    assert stored == {saved_job_key(jobs[name]): score for name, score in mirrored.items()}
+    assert mirrored["python"] > mirrored["java"]
+
+
+def test_stored_scores_are_reused(user, monkeypatch):
+    resume_id = add_resume(user.id, PYTHON_RESUME, is_primary=True)
+    add_saved_jobs(user.id)
+    match_score_service.score_resume(resume_id)
+
+    def no_rescoring(*args, **kwargs):
+        raise AssertionError("scores were recomputed")
+
+    monkeypatch.setattr(match_scores, "match_jobs", no_rescoring)
+    assert match_score_service.score_resume(resume_id) == 2
+
+
+def test_non_primary_resumes_leave_saved_jobs_alone(user):
+    add_resume(user.id, PYTHON_RESUME, is_primary=True)
+    other = add_resume(user.id, JAVA_RESUME, is_primary=False)
+    jobs = add_saved_jobs(user.id)
+
+    match_score_service.score_resume(other)
+
+    assert saved_scores(jobs) == {"python": None, "java": None}
+
+
+def test_new_saved_job_is_scored_against_the_primary_resume(user):
+    add_resume(user.id, JAVA_RESUME, is_primary=False)
+    add_resume(user.id, PYTHON_RESUME, is_primary=True)
+    jobs = add_saved_jobs(user.id)
+
+    match_score_service.score_saved_job(jobs["python"])
+
+    scores = saved_scores(jobs)
+    assert scores["python"] > 0 and scores["java"] is None
+
+
+@pytest.mark.parametrize("primary", ["python", "java"])
+def test_saved_jobs_sorted_by_fit_follow_the_primary_resume(client, user, auth_headers, primary):
+    resumes = {"python": add_resume(user.id, PYTHON_RESUME, is_primary=primary == "python"),
+               "java": add_resume(user.id, JAVA_RESUME, is_primary=primary == "java")}
+    add_saved_jobs(user.id)
+    match_score_service.score_resume(resumes[primary])
+
+    response = client.get("/user/saved-jobs?sort=match", headers=auth_headers)
+
+    assert [job["title"] for job in response.json()["saved_jobs"]][0] == \
+        {"python": "Python Developer", "java": "Android Developer"}[primary]
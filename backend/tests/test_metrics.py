@@ -0,0 +1,61 @@
+"""services/metrics.py and the request timing middleware"""
+import asyncio
+
+import pytest
+
+from middleware.timing import RequestTimingMiddleware
+from services.metrics import MetricsRegistry, span, span_seconds
+
+
+def test_metrics_endpoint_labels_requests_by_route_template(client, auth_headers):
+    client.get("/user/resumes/987654", headers=auth_headers)
+
+    body = client.get("/metrics").text
+
+    assert 'route="/user/resumes/{resume_id}",status="404"' in body
+    assert "987654" not in body
+    assert 'applesauce_db_query_seconds_count{engine="async",operation="SELECT"}' in body
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = MetricsRegistry().histogram("demo_seconds", "Demo", ("stage",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 5.0):
+        histogram.observe(value, stage="parse")
+
+    assert histogram.render() == [
+        'demo_seconds_bucket{stage="parse",le="0.1"} 1',
+        'demo_seconds_bucket{stage="parse",le="1"} 3',
+        'demo_seconds_bucket{stage="parse",le="+Inf"} 4',
+        'demo_seconds_sum{stage="parse"} 6.050000',
+        'demo_seconds_count{stage="parse"} 4',
+    ]
+
+
+def test_failing_span_is_recorded_as_an_error():
+    def count(outcome):
+        series = span_seconds._series.get(("test.failing", outcome))
+        return series[2] if series else 0
+
+    with pytest.raises(ValueError):
+        with span("test.failing"):
+            raise ValueError("boom")
+
+    assert (count("ok"), count("error")) == (0, 1)
+
+
+def test_slow_requests_are_logged_with_their_stages(capsys):
+    async def app(scope, receive, send):
+        with span("upstream.jsearch"):
+            await asyncio.sleep(0.01)
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def send(message):
+        pass
+
+    scope = {"type": "http", "method": "GET", "path": "/jobs"}
+    asyncio.run(RequestTimingMiddleware(app, slow_request_ms=1)(scope, None, send))
+
+    logged = capsys.readouterr().out
+    assert "Slow request: GET /jobs 200" in logged
+    assert "upstream.jsearch 1x" in logged
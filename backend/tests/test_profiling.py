@@ -0,0 +1,43 @@
+"""Admin profiling: per-request cProfile via X-Profile and the sampling endpoint"""
+import pytest
+
+from services import auth_service as auth_service_module
+
+
+@pytest.fixture
+def admin_headers(user, auth_headers, monkeypatch):
+    monkeypatch.setattr(auth_service_module, "ADMIN_EMAILS", {user.email})
+    return auth_headers
+
+
+def test_admin_request_with_x_profile_gets_a_profile(client, admin_headers):
+    response = client.get("/user/resumes", headers={**admin_headers, "X-Profile": "1"})
+    profile_id = response.headers["X-Profile-Id"]
+
+    listed = client.get("/admin/profiles", headers=admin_headers).json()["profiles"]
+    summary = client.get(f"/admin/profiles/{profile_id}?limit=500", headers=admin_headers)
+
+    assert listed[0]["id"] == profile_id and listed[0]["status"] == 200
+    assert summary.text.startswith("GET /user/resumes -> 200")
+    assert "get_user_resumes" in summary.text
+
+
+def test_x_profile_is_ignored_for_other_users(client, auth_headers):
+    response = client.get("/user/resumes", headers={**auth_headers, "X-Profile": "1"})
+
+    assert response.status_code == 200
+    assert "X-Profile-Id" not in response.headers
+
+
+def test_admin_endpoints_require_an_admin(client, auth_headers):
+    assert client.get("/admin/profiles", headers=auth_headers).status_code == 403
+    assert client.post("/admin/profile?seconds=0.1", headers=auth_headers).status_code == 403
+
+
+def test_sampling_profile_downloads_as_speedscope(client, admin_headers):
+    response = client.post("/admin/profile?seconds=0.2&interval_ms=5&format=speedscope&include_idle=true",
+                           headers=admin_headers)
+
+    assert response.status_code == 200
+    assert int(response.headers["X-Profile-Samples"]) > 0
+    assert response.json()["$schema"].startswith("https://www.speedscope.app/")
@@ -0,0 +1,130 @@
+"""
+SQLite query plans of every /user and /auth route
+
+Each route is driven against a seeded user, the SQL it runs is captured, and
+EXPLAIN QUERY PLAN must show no full table scan (a "SCAN <table>" step that
+doesn't use an index) in any of it.
+"""
+import io
+import re
+import sqlite3
+import uuid
+
+import pytest
+from sqlalchemy import event
+
+from database import SessionLocal, async_engine, engine
+from models.db_models import Resume, SavedJob, User
+from services.auth_service import auth_service
+from services.dashboard_cache import DASHBOARD_CACHE_TTL, dashboard_cache
+from services.principal_cache import PRINCIPAL_CACHE_TTL, principal_cache
+
+# Statements that can't use an index by design
+IGNORED_STATEMENTS = ("INSERT", "PRAGMA", "BEGIN", "COMMIT", "ROLLBACK", "SAVEPOINT", "RELEASE")
+
+FULL_SCAN = re.compile(r"^SCAN (\w+)(?!.*\bUSING\b.*\bINDEX\b)")
+
+# (method, path, request kwargs); {resume}, {other_resume}, {upload} and {saved_job} are filled in from the seed
+ROUTES = [
+    ("GET", "/auth/me", {}),
+    ("GET", "/user/resumes", {}),
+    ("POST", "/user/resumes/upload", {"files": "docx"}),
+    ("GET", "/user/resumes/{resume}", {}),
+    ("GET", "/user/resumes/{upload}/original", {}),
+    ("PUT", "/user/resumes/{other_resume}/primary", {}),
+    ("DELETE", "/user/resumes/{upload}", {}),  # Its blobs are checked for other references
+    ("GET", "/user/saved-jobs", {}),
+    ("GET", "/user/saved-jobs?status=applied", {}),
+    ("GET", "/user/saved-jobs?sort=match", {}),
+    ("POST", "/user/saved-jobs", {"json": {"title": "Staff Engineer", "company": "Acme"}}),
+    ("POST", "/user/saved-jobs", {"json": {"title": "Staff Engineer", "company": "Acme"}}),
+    ("PUT", "/user/saved-jobs/{saved_job}", {"json": {"status": "applied"}}),
+    ("DELETE", "/user/saved-jobs/{saved_job}", {}),
+    ("GET", "/user/dashboard", {}),
+]
+
+
+def _resume_docx() -> bytes:
+    from docx import Document
+
+    doc = Document()
+    for line in ["Summary", "Backend engineer", "Skills", "Python, AWS, Docker, PostgreSQL",
+                 "Experience", "Engineer, Acme 2018 - present"]:
+        doc.add_paragraph(line)
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+def _explain(statement: str, parameters) -> list:
+    conn = sqlite3.connect(engine.url.database)
+    try:
+        return [row[-1] for row in conn.execute(f"EXPLAIN QUERY PLAN {statement}", parameters or ()).fetchall()]
+    finally:
+        conn.close()
+
+
+def _seed() -> dict:
+    """Two users with enough rows that SQLite's planner prefers indexes where they exist"""
+    with SessionLocal() as db:
+        users = [User(email=f"plans-{uuid.uuid4().hex[:12]}@example.com", name="Plan User") for _ in range(2)]
+        db.add_all(users)
+        db.commit()
+        for owner in users:
+            for i in range(20):
+                db.add(Resume(user_id=owner.id, filename=f"resume{i}.pdf", skills=["Python"], is_primary=(i == 0)))
+                db.add(SavedJob(user_id=owner.id, title=f"Engineer {i}", company="Acme",
+                                status=["saved", "applied", "interviewing"][i % 3]))
+        db.commit()
+        user = users[0]
+        resumes = [resume_id for (resume_id,) in db.query(Resume.id).filter(Resume.user_id == user.id).order_by(Resume.id)]
+        saved_job = db.query(SavedJob.id).filter(SavedJob.user_id == user.id).order_by(SavedJob.id).first()[0]
+        return {"token": auth_service.create_access_token(user.id, user.email),
+                "resume": resumes[0], "other_resume": resumes[1], "saved_job": saved_job}
+
+
+@pytest.fixture(scope="module")
+def route_plans():
+    """{route label: [(statement, plan lines)]}, driving ROUTES in order"""
+    from fastapi.testclient import TestClient
+    from main import app
+
+    # Make every request reach the database
+    principal_cache.set_ttl(0)
+    dashboard_cache.set_ttl(0)
+    seed = _seed()
+    headers = {"Authorization": f"Bearer {seed['token']}"}
+    client = TestClient(app)
+
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        captured.append((statement, parameters))
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", capture)
+    plans = {}
+    try:
+        for method, path, kwargs in ROUTES:
+            if kwargs.get("files") == "docx":
+                kwargs = {"files": {"file": ("resume.docx", _resume_docx())}}
+            captured.clear()
+            response = client.request(method, path.format(**seed), headers=headers, **kwargs)
+            if path == "/user/resumes/upload":
+                seed["upload"] = response.json()["id"]
+            label = f"{method} {path}"
+            plans.setdefault(label, [])
+            plans[label] += [(statement, _explain(statement, parameters)) for statement, parameters in captured
+                             if not statement.lstrip().upper().startswith(IGNORED_STATEMENTS)]
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", capture)
+        principal_cache.set_ttl(PRINCIPAL_CACHE_TTL)
+        dashboard_cache.set_ttl(DASHBOARD_CACHE_TTL)
+    return plans
+
+
+@pytest.mark.parametrize("route", sorted({f"{method} {path}" for method, path, _ in ROUTES}))
+def test_route_queries_use_indexes(route_plans, route):
+    assert route_plans[route], f"{route} ran no queries"
+    scans = [(" ".join(statement.split())[:120], plan) for statement, plan in route_plans[route]
+             if any(FULL_SCAN.match(line) for line in plan)]
+    assert not scans, f"{route} falls back to a full table scan: {scans}"
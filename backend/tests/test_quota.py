@@ -0,0 +1,104 @@
+"""services/quota.py rate limits, monthly budgets and the shared usage ledger"""
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from models.db_models import UpstreamUsage
+from services import quota as quota_module
+from services.quota import (CONSERVE, EXHAUSTED, NORMAL, QuotaExceeded, QuotaGovernor, UpstreamQuota, UsageLedger,
+                            reset_quota_client, set_quota_client)
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    """Ledger database of its own, standing in for the one all workers share"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'usage.db'}")
+    UpstreamUsage.__table__.create(engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+def governor(session_factory, monthly=0, per_minute=0, user_per_minute=0) -> QuotaGovernor:
+    return QuotaGovernor([UpstreamQuota("paid", "requests", monthly, per_minute, user_per_minute)],
+                         UsageLedger(session_factory))
+
+
+def refusal(governor: QuotaGovernor, units: int = 1):
+    try:
+        governor.acquire("paid", units)
+    except QuotaExceeded as e:
+        return e.reason
+    return None
+
+
+@pytest.fixture
+def as_caller():
+    tokens = []
+
+    def set_caller(host: str):
+        tokens.append(set_quota_client("", host))
+
+    yield set_caller
+    for token in reversed(tokens):
+        reset_quota_client(token)
+
+
+def test_each_caller_has_its_own_rate_limit(session_factory, as_caller):
+    governed = governor(session_factory, user_per_minute=2)
+
+    as_caller("10.0.0.1")
+    assert [refusal(governed) for _ in range(3)] == [None, None, "user_rate_limited"]
+    as_caller("10.0.0.2")
+    assert refusal(governed) is None
+
+
+def test_upstream_rate_limit_applies_to_everyone(session_factory):
+    governed = governor(session_factory, per_minute=2)
+
+    assert [refusal(governed) for _ in range(3)] == [None, None, "rate_limited"]
+
+
+def test_spent_budget_refuses_every_call(session_factory, as_caller):
+    governed = governor(session_factory, monthly=10)
+    as_caller("10.0.0.1")
+
+    assert refusal(governed, units=8) is None
+    assert refusal(governed, units=3) == "exhausted"
+    governed.record("paid", 2)
+    assert governed.mode("paid") == EXHAUSTED
+
+
+def test_conserve_mode_refuses_background_work_only(session_factory, as_caller, monkeypatch):
+    monkeypatch.setattr(quota_module, "month_elapsed", lambda: 0.0)  # First day: even pace allows 10% of 100
+    governed = governor(session_factory, monthly=100)
+    assert governed.mode("paid") == NORMAL
+    governed.record("paid", 20)
+
+    assert governed.mode("paid") == CONSERVE
+    assert refusal(governed) == "conserve"
+    as_caller("10.0.0.1")
+    assert refusal(governed) is None
+
+
+def test_settle_replaces_the_reservation(session_factory):
+    governed = governor(session_factory, monthly=1000)
+
+    governed.acquire("paid", 100)
+    governed.settle("paid", reserved=100, actual=30)
+
+    assert governed.ledger.used("paid") == 30
+
+
+def test_workers_sharing_the_ledger_see_each_others_usage(session_factory):
+    first, second = UsageLedger(session_factory), UsageLedger(session_factory)
+    first.add("paid", 5)
+    second.add("paid", 7)
+
+    first.flush()
+    second.flush()
+    first.sync()
+
+    assert first.used("paid") == second.used("paid") == 12
+    with session_factory() as db:
+        row = db.query(UpstreamUsage).filter(UpstreamUsage.upstream == "paid").one()
+        assert (row.units, row.calls) == (12, 2)
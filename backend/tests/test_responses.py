@@ -0,0 +1,22 @@
+"""responses.FastJSONResponse"""
+import json
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+import responses
+from responses import FastJSONResponse
+
+CONTENT = {"salary": Decimal("125000.50"), "posted": datetime(2024, 5, 1, 9, 30), "skills": ["python"]}
+
+
+@pytest.mark.parametrize("use_orjson", [True, False] if responses.ORJSON_AVAILABLE else [False])
+def test_both_encoders_render_the_same_values(monkeypatch, use_orjson):
+    monkeypatch.setattr(responses, "ORJSON_AVAILABLE", use_orjson)
+
+    rendered = json.loads(FastJSONResponse(CONTENT).body)
+
+    assert rendered["salary"] == "125000.50"
+    assert rendered["posted"].startswith("2024-05-01")
+    assert rendered["skills"] == ["python"]
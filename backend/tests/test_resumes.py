@@ -0,0 +1,95 @@
+"""/user/resumes endpoints"""
+from database import SessionLocal
+from models.db_models import Resume, Task
+from services import blob_gc
+from services.blob_gc import DELETE_BLOBS_TASK
+from services.blob_store import blob_store
+
+
+def add_resume(user_id: int, is_primary: bool, content: bytes = None) -> int:
+    blob_keys = {}
+    if content is not None:
+        blob_keys = {"original_blob_key": blob_store.put(content), "text_blob_key": blob_store.put_text(text_of(content))}
+    with SessionLocal() as db:
+        resume = Resume(user_id=user_id, filename="resume.pdf", skills=["python"], is_primary=is_primary, **blob_keys)
+        db.add(resume)
+        db.commit()
+        return resume.id
+
+
+def text_of(content: bytes) -> str:
+    return f"extracted: {content.decode()}"
+
+
+def primary_flags(user_id: int) -> dict:
+    with SessionLocal() as db:
+        return {resume.id: resume.is_primary for resume in db.query(Resume).filter(Resume.user_id == user_id)}
+
+
+def test_set_primary_moves_the_flag(client, user, auth_headers):
+    first = add_resume(user.id, is_primary=True)
+    second = add_resume(user.id, is_primary=False)
+
+    response = client.put(f"/user/resumes/{second}/primary", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert primary_flags(user.id) == {first: False, second: True}
+
+
+def test_set_primary_on_current_primary_keeps_it(client, user, auth_headers):
+    resume_id = add_resume(user.id, is_primary=True)
+
+    response = client.put(f"/user/resumes/{resume_id}/primary", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert primary_flags(user.id) == {resume_id: True}
+    dashboard = client.get("/user/dashboard", headers=auth_headers).json()
+    assert dashboard["resumes"]["primary"]["id"] == resume_id
+
+
+def queued_blob_deletion(keys) -> dict:
+    with SessionLocal() as db:
+        tasks = db.query(Task).filter(Task.kind == DELETE_BLOBS_TASK, Task.status == "queued").all()
+        return next(task.payload for task in tasks if set(task.payload["keys"]) == set(keys))
+
+
+def test_delete_removes_unshared_blobs_after_the_grace_period(client, user, auth_headers, monkeypatch):
+    content = b"%PDF only this user's resume"
+    keys = [blob_store.key_for(content), blob_store.key_for(text_of(content).encode())]
+    resume_id = add_resume(user.id, is_primary=True, content=content)
+
+    response = client.delete(f"/user/resumes/{resume_id}", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert all(blob_store.exists(key) for key in keys)  # Deferred to the sweep
+    monkeypatch.setattr(blob_gc, "BLOB_GC_GRACE_SECONDS", 0)
+    assert blob_gc.delete_unreferenced_blobs(queued_blob_deletion(keys))["deleted"] == 2
+    assert not any(blob_store.exists(key) for key in keys)
+
+
+def test_delete_keeps_blobs_another_resume_uses(client, user, auth_headers, monkeypatch):
+    content = b"%PDF the same file uploaded twice"
+    keys = [blob_store.key_for(content), blob_store.key_for(text_of(content).encode())]
+    resume_id = add_resume(user.id, is_primary=True, content=content)
+    add_resume(user.id, is_primary=False, content=content)
+
+    client.delete(f"/user/resumes/{resume_id}", headers=auth_headers)
+    monkeypatch.setattr(blob_gc, "BLOB_GC_GRACE_SECONDS", 0)
+    blob_gc.delete_unreferenced_blobs(queued_blob_deletion(keys))
+
+    assert all(blob_store.exists(key) for key in keys)
+
+
+def test_blob_stored_again_during_the_grace_period_is_kept(client, user, auth_headers):
+    content = b"%PDF deleted while the same file is being uploaded"
+    keys = [blob_store.key_for(content), blob_store.key_for(text_of(content).encode())]
+    resume_id = add_resume(user.id, is_primary=True, content=content)
+    client.delete(f"/user/resumes/{resume_id}", headers=auth_headers)
+
+    # An upload of the same file has stored its blobs but not yet committed its row
+    blob_store.put(content)
+    blob_store.put_text(text_of(content))
+    result = blob_gc.delete_unreferenced_blobs(queued_blob_deletion(keys))
+
+    assert result == {"deleted": 0, "still_used": 0, "rechecking": 2}
+    assert all(blob_store.exists(key) for key in keys)
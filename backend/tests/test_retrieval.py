@@ -0,0 +1,25 @@
+"""services/retrieval.py matching over the job pool"""
+from services.job_pool import job_pool
+from services.retrieval import RetrievalPipeline
+
+RESUME = "Fortran and COBOL developer maintaining mainframe batch systems"
+SKILLS = ["fortran", "cobol"]
+
+
+def test_recall_is_measured_against_jobs_with_the_requested_clearance():
+    job_pool.add_jobs([
+        {"id": 801, "title": "Fortran COBOL Developer", "skills": ["fortran", "cobol"],
+         "description": "Mainframe batch systems."},
+        {"id": 802, "title": "Fortran Engineer", "skills": ["fortran"],
+         "description": "Top Secret clearance required. Mainframe work."},
+    ])
+    pipeline = RetrievalPipeline()
+
+    result = pipeline.match(RESUME, SKILLS, limit=1, clearance_level="top_secret")
+    returned = result["matches"]
+
+    assert [match.id for match in returned] == [802]
+    assert [match.id for match in pipeline.exhaustive_top(RESUME, SKILLS, 1, "top_secret")] == [802]
+    assert pipeline.recall(RESUME, SKILLS, 1, returned, "top_secret") == 1.0
+    # Against the unfiltered pool, the better-matching uncleared job would count as a miss
+    assert pipeline.recall(RESUME, SKILLS, 1, returned) == 0.0
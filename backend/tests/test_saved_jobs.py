@@ -0,0 +1,103 @@
+"""/user/saved-jobs endpoints and the unique (user, title, company) index behind them"""
+import asyncio
+import uuid
+from datetime import datetime
+
+import httpx
+from sqlalchemy import inspect, text
+
+from database import DB_MAX_OVERFLOW, DB_POOL_SIZE, SessionLocal, engine, init_db
+from main import app
+from models.db_models import MatchScore, Resume, SavedJob, User
+from services.match_scores import saved_job_key
+
+JOB = {"title": "Backend Engineer", "company": "Acme", "job_external_id": "42"}
+
+
+def test_duplicate_save_is_rejected(client, auth_headers):
+    first = client.post("/user/saved-jobs", json=JOB, headers=auth_headers)
+    second = client.post("/user/saved-jobs", json=JOB, headers=auth_headers)
+
+    assert first.status_code == 200
+    assert second.status_code == 400
+    assert second.json()["detail"] == "Job already saved"
+
+
+def test_saved_job_lifecycle(client, auth_headers):
+    job_id = client.post("/user/saved-jobs", json=dict(JOB, title="Lifecycle Engineer"), headers=auth_headers).json()["id"]
+
+    updated = client.put(f"/user/saved-jobs/{job_id}", json={"status": "applied", "notes": "Sent CV"},
+                         headers=auth_headers)
+    listed = client.get("/user/saved-jobs", params={"status": "applied"}, headers=auth_headers).json()["saved_jobs"]
+
+    assert updated.json()["status"] == "applied"
+    assert [(job["id"], job["notes"]) for job in listed] == [(job_id, "Sent CV")]
+    assert listed[0]["applied_at"] is not None
+    assert client.delete(f"/user/saved-jobs/{job_id}", headers=auth_headers).status_code == 200
+    assert client.get("/user/saved-jobs", headers=auth_headers).json()["count"] == 0
+
+
+def test_saved_jobs_of_other_users_are_not_found(client, auth_headers):
+    with SessionLocal() as db:
+        owner = User(email=f"owner-{uuid.uuid4().hex[:12]}@example.com", name="Owner")
+        db.add(owner)
+        db.flush()
+        saved_job = SavedJob(user_id=owner.id, title=JOB["title"], company=JOB["company"])
+        db.add(saved_job)
+        db.commit()
+        other = saved_job.id
+
+    assert client.put(f"/user/saved-jobs/{other}", json={"status": "applied"}, headers=auth_headers).status_code == 404
+    assert client.delete(f"/user/saved-jobs/{other}", headers=auth_headers).status_code == 404
+
+
+def test_more_concurrent_requests_than_pooled_connections_complete(auth_headers):
+    # Blocking queries on the event loop used to deadlock here waiting for a pooled connection
+    async def burst():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            requests = [http.get("/user/saved-jobs", headers=auth_headers)
+                        for _ in range(DB_POOL_SIZE + DB_MAX_OVERFLOW + 8)]
+            return await asyncio.wait_for(asyncio.gather(*requests), timeout=20)
+
+    assert {response.status_code for response in asyncio.run(burst())} == {200}
+
+
+def test_existing_duplicates_are_merged_before_the_index_is_created(client, user, auth_headers):
+    # A database from before the unique index, already holding duplicates
+    with engine.begin() as conn:
+        conn.execute(text("DROP INDEX uq_saved_jobs_user_title_company"))
+        conn.execute(text("DELETE FROM schema_version"))
+    with SessionLocal() as db:
+        rows = [
+            SavedJob(user_id=user.id, title=JOB["title"], company=JOB["company"], status="saved",
+                     notes="Referral from Sam", updated_at=datetime(2024, 1, 1)),
+            SavedJob(user_id=user.id, title=JOB["title"], company=JOB["company"], status="interviewing",
+                     match_percentage=81, updated_at=datetime(2024, 3, 1)),
+            SavedJob(user_id=user.id, title=JOB["title"], company=JOB["company"], status="applied",
+                     updated_at=datetime(2024, 2, 1)),
+        ]
+        db.add_all(rows)
+        db.commit()
+        ids = [row.id for row in rows]
+        db.add(Resume(user_id=user.id, filename="cv.txt", raw_text="Python"))
+        db.commit()
+        resume_id = db.query(Resume.id).filter(Resume.user_id == user.id).scalar()
+        db.add(MatchScore(resume_id=resume_id, job_id=saved_job_key(ids[1]), scorer_version=1, match_percentage=81))
+        db.commit()
+
+    init_db()
+
+    indexes = {index["name"] for index in inspect(engine).get_indexes("saved_jobs")}
+    assert "uq_saved_jobs_user_title_company" in indexes
+    with SessionLocal() as db:
+        remaining = db.query(SavedJob).filter(SavedJob.user_id == user.id).all()
+        assert [row.id for row in remaining] == [ids[0]]
+        kept = remaining[0]
+        # Newest update wins; fields only an older duplicate has are kept too
+        assert (kept.status, kept.match_percentage, kept.notes) == ("interviewing", 81, "Referral from Sam")
+        scores = db.query(MatchScore.job_id).filter(MatchScore.resume_id == resume_id).all()
+        assert scores == [(saved_job_key(ids[0]),)]
+
+    response = client.post("/user/saved-jobs", json=JOB, headers=auth_headers)
+    assert response.status_code == 400
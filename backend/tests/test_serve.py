@@ -0,0 +1,84 @@
+"""serve.py option parsing and the pre-fork master's restarts"""
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+import pytest
+import requests
+
+import serve
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_options_fall_back_to_the_environment(monkeypatch):
+    monkeypatch.setenv("WEB_CONCURRENCY", "3")
+    monkeypatch.setenv("SERVER_LIMIT_CONCURRENCY", "200")
+
+    args = serve.parse_args(["--port", "9000", "--no-access-log"])
+
+    assert (args.port, args.workers, args.limit_concurrency, args.preload) == (9000, 3, 200, True)
+    assert serve.uvicorn_options(args) == {
+        "backlog": 2048, "timeout_keep_alive": 5, "limit_concurrency": 200, "timeout_graceful_shutdown": 30,
+        "log_level": "info", "access_log": False, "lifespan": "on",
+    }
+
+
+def worker_pids(master: subprocess.Popen) -> set:
+    with open(f"/proc/{master.pid}/task/{master.pid}/children") as f:
+        return {int(pid) for pid in f.read().split()}
+
+
+def wait_until(condition, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        result = condition()
+        if result:
+            return result
+        time.sleep(0.1)
+    raise AssertionError("timed out")
+
+
+def serving(url: str) -> bool:
+    try:
+        return requests.get(url, timeout=2).status_code == 200
+    except requests.RequestException:
+        return False
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="reads worker PIDs from /proc")
+def test_rolling_restart_replaces_workers_without_dropping_requests(tmp_path):
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    url = f"http://127.0.0.1:{port}/"
+    master = subprocess.Popen(
+        [sys.executable, "serve.py", "--host", "127.0.0.1", "--port", str(port), "--workers", "2",
+         "--no-access-log", "--log-level", "warning", "--graceful-timeout", "5"],
+        cwd=BACKEND_DIR, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+    )
+    try:
+        wait_until(lambda: serving(url) and len(worker_pids(master)) == 2, timeout=60)
+        before = worker_pids(master)
+
+        master.send_signal(signal.SIGHUP)
+        failures = 0
+        deadline = time.monotonic() + 60
+        while time.monotonic() < deadline:
+            failures += not serving(url)
+            pids = worker_pids(master)
+            if len(pids) == 2 and not pids & before:
+                break
+        assert not worker_pids(master) & before
+        assert failures == 0
+
+        master.send_signal(signal.SIGTERM)
+        assert master.wait(timeout=30) == 0
+    finally:
+        if master.poll() is None:
+            master.kill()
+            master.wait()
+    assert "Rolling restart to generation 1" in master.stdout.read()
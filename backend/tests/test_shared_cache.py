@@ -0,0 +1,98 @@
+"""services/shared_cache.py backends and stampede protection"""
+import threading
+import time
+
+import pytest
+
+from benchmarks.fake_redis import FakeRedis
+from services import shared_cache
+from services.shared_cache import MemoryBackend, RedisBackend, SharedCache, SQLiteBackend
+
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        yield MemoryBackend()
+    elif request.param == "sqlite":
+        yield SQLiteBackend(str(tmp_path / "cache.db"))
+    else:
+        server = FakeRedis().start()
+        yield RedisBackend(server.url)
+        server.stop()
+
+
+def test_backend_get_set_add_delete(backend):
+    backend.set("k", b"one", ttl=60)
+    assert backend.get("k") == b"one"
+
+    assert not backend.add("k", b"two", ttl=60)
+    backend.delete("k")
+    assert backend.get("k") is None
+    assert backend.add("k", b"two", ttl=60)
+    assert backend.get("k") == b"two"
+
+
+def test_backend_entries_expire(backend):
+    backend.set("short", b"x", ttl=0.05)
+    assert backend.add("lock", b"1", ttl=0.05)
+    time.sleep(0.1)
+
+    assert backend.get("short") is None
+    assert backend.add("lock", b"1", ttl=60)  # An expired lock can be taken again
+
+
+def test_stale_entry_is_served_while_another_caller_refreshes(backend):
+    cache = SharedCache("stale", ttl=0.05, stale_ttl=60, backend=backend)
+    cache.set("q", "old")
+    time.sleep(0.1)
+    assert cache.claim("q:lock", 60)  # Someone else is recomputing
+
+    assert cache.get_or_compute("q", lambda: "new") == "old"
+
+
+def test_concurrent_misses_compute_once(backend):
+    cache = SharedCache("stampede", ttl=60, backend=backend)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.2)
+        return "value"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute("q", compute)))
+               for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == ["value"] * 5
+    assert len(calls) == 1
+
+
+def test_uncacheable_results_are_not_stored():
+    cache = SharedCache("uncacheable", ttl=60, backend=MemoryBackend())
+
+    assert cache.get_or_compute("q", lambda: [], cacheable=bool) == []
+    assert cache.get_or_compute("q", lambda: ["job"], cacheable=bool) == ["job"]
+    assert cache.get_or_compute("q", lambda: pytest.fail("recomputed"), cacheable=bool) == ["job"]
+
+
+def test_unreachable_backend_falls_back_to_computing(monkeypatch):
+    monkeypatch.setattr(shared_cache, "CACHE_LOCK_SECONDS", 0.2)
+    cache = SharedCache("down", ttl=60, backend=RedisBackend("redis://127.0.0.1:1/0", timeout=0.1))
+
+    assert cache.get_or_compute("q", lambda: "computed") == "computed"
+    assert cache.get("q") is None
+
+
+def test_memory_backend_evicts_least_recently_used_past_its_size():
+    backend = MemoryBackend(max_bytes=10)
+    backend.set("a", b"12345", ttl=60)
+    backend.set("b", b"12345", ttl=60)
+    backend.get("a")
+
+    backend.set("c", b"12345", ttl=60)
+
+    assert (backend.get("a"), backend.get("b"), backend.get("c")) == (b"12345", None, b"12345")
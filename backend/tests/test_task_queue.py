@@ -0,0 +1,128 @@
+"""services/task_queue.py retries, leases and failure handling"""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from models.db_models import Task
+from services import task_queue as task_queue_module
+from services.task_queue import TaskQueue
+
+
+@pytest.fixture
+def queue(tmp_path):
+    """Queue on its own database, so tasks queued by other tests aren't claimed"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'tasks.db'}")
+    Task.__table__.create(engine)
+    queue = TaskQueue(session_factory=sessionmaker(bind=engine))
+    yield queue
+    engine.dispose()
+
+
+def task(queue: TaskQueue, task_id: str) -> Task:
+    with queue.session_factory() as db:
+        return db.get(Task, task_id)
+
+
+def make_due(queue: TaskQueue, task_id: str, **values) -> None:
+    with queue.session_factory() as db:
+        row = db.get(Task, task_id)
+        row.run_after = datetime.utcnow() - timedelta(seconds=1)
+        for name, value in values.items():
+            setattr(row, name, value)
+        db.commit()
+
+
+def test_task_runs_once_and_stores_its_result(queue):
+    calls = []
+    queue.register("echo")(lambda payload: calls.append(payload) or {"echo": payload["value"]})
+
+    task_id = queue.enqueue("echo", {"value": 7})
+
+    assert queue.run_pending() == 1
+    assert calls == [{"value": 7}]
+    row = task(queue, task_id)
+    assert (row.status, row.attempts, row.result) == ("succeeded", 1, {"echo": 7})
+    assert queue.run_pending() == 0
+
+
+def test_failed_attempts_back_off_then_fail_for_good(queue, monkeypatch):
+    monkeypatch.setattr(task_queue_module, "TASK_RETRY_BACKOFF", 60)
+
+    @queue.register("flaky")
+    def flaky(payload):
+        raise RuntimeError("upstream down")
+
+    task_id = queue.enqueue("flaky", {})
+    queue.run_next()
+
+    row = task(queue, task_id)
+    assert (row.status, row.attempts, row.error) == ("queued", 1, "upstream down")
+    assert row.run_after > datetime.utcnow() + timedelta(seconds=50)
+    assert not queue.run_next()  # Not due until the backoff passes
+
+    for _ in range(2):  # Attempts 2 and 3
+        make_due(queue, task_id)
+        queue.run_next()
+    row = task(queue, task_id)
+    assert (row.status, row.attempts, row.error) == ("failed", 3, "upstream down")
+    assert row.finished_at is not None
+
+
+def test_expired_lease_is_reclaimed(queue):
+    queue.register("echo")(lambda payload: "done")
+    task_id = queue.enqueue("echo", {})
+    # A worker claimed it and died
+    make_due(queue, task_id, status="running", attempts=1, locked_until=datetime.utcnow() - timedelta(seconds=1))
+
+    assert queue.run_next()
+    row = task(queue, task_id)
+    assert (row.status, row.attempts, row.result) == ("succeeded", 2, "done")
+
+
+def test_running_task_within_its_lease_is_left_alone(queue):
+    queue.register("echo")(lambda payload: "done")
+    task_id = queue.enqueue("echo", {})
+    make_due(queue, task_id, status="running", attempts=1, locked_until=datetime.utcnow() + timedelta(minutes=5))
+
+    assert not queue.run_next()
+
+
+def test_task_reclaimed_past_its_attempts_fails_without_running(queue):
+    queue.register("echo")(lambda payload: pytest.fail("handler ran"))
+    task_id = queue.enqueue("echo", {})
+    make_due(queue, task_id, status="running", attempts=3, locked_until=datetime.utcnow() - timedelta(seconds=1))
+
+    queue.run_next()
+
+    row = task(queue, task_id)
+    assert row.status == "failed"
+    assert "lease expired" in row.error
+
+
+def test_unknown_kinds_are_rejected_or_failed(queue):
+    with pytest.raises(ValueError):
+        queue.new_task("missing", {})
+
+    queue.register("removed")(lambda payload: None)
+    task_id = queue.enqueue("removed", {})
+    del queue._handlers["removed"]  # e.g. queued by an older deploy
+    queue.run_next()
+
+    row = task(queue, task_id)
+    assert row.status == "failed"
+    assert "No handler" in row.error
+
+
+def test_delayed_task_waits_until_due(queue):
+    queue.register("echo")(lambda payload: "done")
+    with queue.session_factory() as db:
+        delayed = queue.new_task("echo", {}, delay=600)
+        db.add(delayed)
+        db.commit()
+        task_id = delayed.id
+
+    assert not queue.run_next()
+    make_due(queue, task_id)
+    assert queue.run_next()
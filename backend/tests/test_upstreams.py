@@ -0,0 +1,67 @@
+"""benchmarks/upstreams.py stand-ins for the paid and public upstream APIs"""
+import pytest
+import requests
+
+from benchmarks.upstreams import UPSTREAMS, FakeUpstreams, UpstreamProfile, load_payloads, parse_profile
+from services import job_api_service as job_api_module
+from services.job_api_service import job_api_service
+
+
+@pytest.fixture
+def upstreams():
+    fake = FakeUpstreams({name: UpstreamProfile() for name in UPSTREAMS}, load_payloads()).start()
+    yield fake
+    fake.stop()
+
+
+@pytest.fixture
+def pointed_at(upstreams, monkeypatch):
+    for name, value in upstreams.env().items():
+        if hasattr(job_api_module, name):
+            monkeypatch.setattr(job_api_module, name, value)
+    return upstreams
+
+
+def test_app_fetchers_parse_the_stand_in_payloads(pointed_at):
+    for jobs in (job_api_service._fetch_jsearch_jobs("python developer", "United States", 1),
+                 job_api_service._fetch_amazon_jobs("python"),
+                 job_api_service._fetch_netflix_jobs("")):
+        assert jobs and all(job["title"] and job["id"] for job in jobs)
+    assert {name: stats["requests"] for name, stats in pointed_at.stats.items()} == \
+        {"jsearch": 1, "amazon": 1, "greenhouse": 1, "anthropic": 0}
+
+
+def test_different_queries_return_different_job_ids(pointed_at):
+    first = {job["id"] for job in job_api_service._fetch_jsearch_jobs("python developer", "United States", 1)}
+    second = {job["id"] for job in job_api_service._fetch_jsearch_jobs("data scientist", "United States", 1)}
+
+    assert first and not first & second
+
+
+def test_messages_api_answers_in_the_shape_the_prompt_asks_for(upstreams):
+    response = requests.post(f"{upstreams.base_url}/anthropic/v1/messages", json={
+        "model": "claude", "max_tokens": 100,
+        "messages": [{"role": "user", "content": "Return a JSON array of skill names found in: ..."}],
+    })
+
+    body = response.json()
+    assert response.status_code == 200
+    assert body["type"] == "message"
+    assert body["content"][0]["text"].startswith("[")
+
+
+def test_injected_errors_use_the_profile_status(upstreams):
+    upstreams.profiles["jsearch"] = UpstreamProfile(error_rate=1.0, error_status=429)
+
+    response = requests.get(f"{upstreams.base_url}/jsearch/search", params={"query": "x"})
+
+    assert response.status_code == 429
+    assert upstreams.stats["jsearch"] == {"requests": 1, "injected_errors": 1}
+
+
+def test_profile_spec_keeps_defaults_for_omitted_parts():
+    default = UpstreamProfile(latency_ms=150, jitter_ms=50, error_rate=0.01, error_status=500)
+
+    profile = parse_profile("800::529", default)
+
+    assert profile.to_dict() == {"latency_ms": 800, "jitter_ms": 50, "error_rate": 0.01, "error_status": 529}
@@ -0,0 +1,98 @@
+"""services/vector_index.py IVF index and semantic job shortlisting"""
+import numpy as np
+import pytest
+
+from services import embeddings, vector_index
+from services.embeddings import HashingEmbedder
+from services.semantic_search import SemanticSearch
+from services.vector_index import VectorIndex
+
+DIM = 16
+
+
+def unit_vectors(n: int, seed: int = 0) -> np.ndarray:
+    vectors = np.random.default_rng(seed).normal(size=(n, DIM)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def exact_top(vectors: np.ndarray, query: np.ndarray, k: int) -> list:
+    return [str(i) for i in np.argsort(-(vectors @ query))[:k]]
+
+
+def new_index(path, vectors) -> VectorIndex:
+    index = VectorIndex(str(path))
+    index.load("test-model", DIM)
+    index.add([str(i) for i in range(len(vectors))], vectors)
+    return index
+
+
+def test_small_index_search_is_exact(tmp_path):
+    vectors = unit_vectors(200)
+    index = new_index(tmp_path, vectors)
+    query = vectors[7]
+
+    results = index.search(query, k=5)
+
+    assert [item_id for item_id, _ in results] == exact_top(vectors, query, 5)
+    assert results[0] == ("7", pytest.approx(1.0, abs=1e-5))
+
+
+def test_known_ids_are_not_added_twice(tmp_path):
+    vectors = unit_vectors(10)
+    index = new_index(tmp_path, vectors)
+
+    assert index.add(["3", "10"], unit_vectors(2, seed=1)) == 1
+    assert len(index) == 11
+
+
+def test_saved_index_reloads_with_its_pending_additions(tmp_path):
+    vectors = unit_vectors(60)
+    index = new_index(tmp_path, vectors[:50])
+    index.rebuild()
+    index.add([str(i) for i in range(50, 60)], vectors[50:])
+    index.save()
+
+    reopened = VectorIndex(str(tmp_path))
+    assert reopened.load("test-model", DIM)
+    assert len(reopened) == 60 and "55" in reopened
+    assert reopened.search(vectors[55], k=3) == index.search(vectors[55], k=3)
+
+
+def test_index_built_with_another_model_is_not_reused(tmp_path):
+    new_index(tmp_path, unit_vectors(20)).rebuild()
+
+    reopened = VectorIndex(str(tmp_path))
+    assert not reopened.load("other-model", DIM)
+    assert len(reopened) == 0
+
+
+def test_clustered_index_finds_the_nearest_vectors(tmp_path, monkeypatch):
+    monkeypatch.setattr(vector_index, "FLAT_THRESHOLD", 100)
+    vectors = unit_vectors(2000)
+    index = new_index(tmp_path, vectors)
+    assert len(index._centroids) > index.nprobe  # Queries probe only some of the lists
+
+    found = 0
+    for query in vectors[:50]:
+        found += len(set(exact_top(vectors, query, 10)) & {item_id for item_id, _ in index.search(query, k=10)})
+    assert found / 500 >= 0.8
+
+    index.nprobe = len(index._centroids)
+    assert [item_id for item_id, _ in index.search(vectors[0], k=10)] == exact_top(vectors, vectors[0], 10)
+
+
+def test_resume_shortlist_prefers_related_jobs(tmp_path, monkeypatch):
+    monkeypatch.setattr(embeddings, "_embedder", HashingEmbedder())
+    search = SemanticSearch(VectorIndex(str(tmp_path)))
+    jobs = [
+        {"id": 1, "title": "Backend Engineer", "skills": ["python", "django", "postgresql"],
+         "description": "Build Django APIs backed by PostgreSQL."},
+        {"id": 2, "title": "iOS Developer", "skills": ["swift"], "description": "Ship native iPhone apps."},
+        {"id": 3, "title": "Pastry Chef", "skills": [], "description": "Bake bread and croissants."},
+    ]
+
+    assert search.index_jobs(jobs) == 3
+    assert search.index_jobs(jobs) == 0
+
+    shortlist = search.shortlist("Python developer building Flask services on MySQL", ["python", "flask"])
+    assert shortlist[0][0] == "1"